@@ -0,0 +1,88 @@
+"""
+Measures how long resetting and deleting calculations takes on a large database, one molecule at a time with the
+original stored procedures compared to a batch of molecules at a time with the set-based ones.
+
+Calculations are synthetic single water molecules inserted directly with SQL, all dispatched. Each method resets them
+all back to pending with reset_dispatched() and then deletes them all with delete_all_calculations(), and the database
+is filled again in between.
+
+The benchmark annihilates the database before and after running, so only point it at a test database.
+
+Usage:
+    python benchmarks/cleanup_benchmark.py <database config> confirm [number of calculations] [batch size]
+
+mbfit must be importable, for example by running from the top of the repository with PYTHONPATH=. set.
+The defaults are 100000 calculations and batches of 10000 molecules.
+"""
+
+import sys, time
+
+from mbfit.database import Database
+from mbfit.molecule import Atom, Fragment, Molecule
+
+if len(sys.argv) < 3 or len(sys.argv) > 5 or sys.argv[2] != "confirm":
+    print("Usage:")
+    print("{} <database config> confirm [number of calculations] [batch size]".format(sys.argv[0]))
+    exit(1)
+
+config = sys.argv[1]
+num_calculations = int(sys.argv[3]) if len(sys.argv) >= 4 else 100000
+batch_size = int(sys.argv[4]) if len(sys.argv) == 5 else 10000
+
+def fill(database):
+    database.annihilate(confirm="confirm")
+    database.save()
+
+    # one real calculation creates the molecule, model and tag.
+    database.add_calculations([Molecule([Fragment([Atom("H", "A", 0, 0, 0), Atom("H", "A", 0, 0, 1),
+                                                   Atom("O", "B", 0, 1, 0)], "H2O", 0, 1, "H1.HO1")])],
+                              "method", "basis", False, "cleanup_benchmark")
+    database.save()
+
+    database.cursor.execute("INSERT INTO molecule_list (mol_hash, mol_name, atom_coordinates) "
+                            "SELECT 'cleanup_benchmark' || i, 'H2O', ARRAY[i, 0, 0, 0, 0, 1, 0, 1, 0]::double precision[] "
+                            "FROM generate_series(1, %s) AS i", (num_calculations,))
+    database.cursor.execute("INSERT INTO molecule_properties (mol_hash, model_name, frag_indices, energies, atomic_charges, "
+                            "status, past_log_ids, use_cp) "
+                            "SELECT 'cleanup_benchmark' || i, 'method/basis/False', '{0}', '{}', '{}', 'dispatched', '{}', False "
+                            "FROM generate_series(1, %s) AS i", (num_calculations,))
+    database.cursor.execute("INSERT INTO tags (mol_hash, model_name, tag_names) "
+                            "SELECT 'cleanup_benchmark' || i, 'method/basis/False', '{cleanup_benchmark}' "
+                            "FROM generate_series(1, %s) AS i", (num_calculations,))
+    database.save()
+
+    database.cursor.execute("ANALYZE")
+    database.save()
+
+with Database(config) as database:
+    database.set_batch_size(batch_size)
+
+    if not database.has_bulk_delete():
+        print("The database has no delete_calculations_batch function, recreate it with the current init.sql.")
+        exit(1)
+
+    print("{:>10} {:>12} {:>12} {:>12} {:>12}".format("method", "reset (s)", "pending", "delete (s)", "left"))
+
+    for name, bulk_delete in [("original", False), ("set-based", True)]:
+        database.bulk_delete = bulk_delete
+
+        fill(database)
+
+        start = time.perf_counter()
+        database.reset_dispatched("cleanup_benchmark")
+        database.save()
+        reset_time = time.perf_counter() - start
+
+        pending = database.count_pending_calculations("cleanup_benchmark")
+
+        start = time.perf_counter()
+        database.delete_all_calculations("H2O", "method", "basis", False, "cleanup_benchmark")
+        database.save()
+        delete_time = time.perf_counter() - start
+
+        database.cursor.execute("SELECT count(*) FROM molecule_properties")
+        left = database.cursor.fetchone()[0]
+
+        print("{:>10} {:>12.2f} {:>12d} {:>12.2f} {:>12d}".format(name, reset_time, pending, delete_time, left))
+
+    database.annihilate(confirm="confirm")
@@ -0,0 +1,92 @@
+"""
+Measures how long the calculation and training set counts take on a large database, read from the counters kept by
+the triggers in the database compared to counted by scanning the calculations.
+
+Calculations are synthetic single water molecules inserted directly with SQL, a quarter of them pending, a quarter
+dispatched and half complete. Giving the same tag twice makes the database count by scanning, which is how every count
+was done before the counters existed.
+
+The benchmark annihilates the database before and after running, so only point it at a test database.
+
+Usage:
+    python benchmarks/counter_benchmark.py <database config> confirm [number of calculations]
+
+mbfit must be importable, for example by running from the top of the repository with PYTHONPATH=. set.
+The default is 1000000 calculations.
+"""
+
+import sys, time
+
+from mbfit.database import Database
+from mbfit.molecule import Atom, Fragment, Molecule
+
+if len(sys.argv) < 3 or len(sys.argv) > 4 or sys.argv[2] != "confirm":
+    print("Usage:")
+    print("{} <database config> confirm [number of calculations]".format(sys.argv[0]))
+    exit(1)
+
+config = sys.argv[1]
+num_calculations = int(sys.argv[3]) if len(sys.argv) == 4 else 1000000
+
+def timed(function, *args, repeats=5):
+    start = time.perf_counter()
+    for i in range(repeats):
+        result = function(*args)
+    return result, (time.perf_counter() - start) / repeats
+
+with Database(config) as database:
+    database.annihilate(confirm="confirm")
+    database.save()
+
+    # one real calculation creates the molecule, model and tag.
+    database.add_calculations([Molecule([Fragment([Atom("H", "A", 0, 0, 0), Atom("H", "A", 0, 0, 1),
+                                                   Atom("O", "B", 0, 1, 0)], "H2O", 0, 1, "H1.HO1")])],
+                              "method", "basis", False, "counter_benchmark")
+    database.save()
+
+    print("Inserting {} calculations.".format(num_calculations))
+
+    start = time.perf_counter()
+
+    database.cursor.execute("INSERT INTO molecule_list (mol_hash, mol_name, atom_coordinates) "
+                            "SELECT 'counter_benchmark' || i, 'H2O', ARRAY[i, 0, 0, 0, 0, 1, 0, 1, 0]::double precision[] "
+                            "FROM generate_series(1, %s) AS i", (num_calculations,))
+    database.cursor.execute("INSERT INTO molecule_properties (mol_hash, model_name, frag_indices, energies, atomic_charges, "
+                            "status, past_log_ids, use_cp) "
+                            "SELECT 'counter_benchmark' || i, 'method/basis/False', '{0}', '{}', '{}', "
+                            "(ARRAY['pending', 'dispatched', 'complete', 'complete'])[i %% 4 + 1]::status_enum, '{}', False "
+                            "FROM generate_series(1, %s) AS i", (num_calculations,))
+    database.cursor.execute("INSERT INTO pending_calculations (mol_hash, model_name, frag_indices, use_cp) "
+                            "SELECT 'counter_benchmark' || i, 'method/basis/False', '{0}', False "
+                            "FROM generate_series(4, %s, 4) AS i", (num_calculations,))
+    database.cursor.execute("INSERT INTO tags (mol_hash, model_name, tag_names) "
+                            "SELECT 'counter_benchmark' || i, 'method/basis/False', '{counter_benchmark}' "
+                            "FROM generate_series(1, %s) AS i", (num_calculations,))
+    database.save()
+
+    print("Inserted in {:.1f} s.".format(time.perf_counter() - start))
+
+    database.cursor.execute("ANALYZE")
+    database.save()
+
+    print("{:>24} {:>10} {:>14} {:>14} {:>9}".format("count", "result", "counters (ms)", "scan (ms)", "speedup"))
+
+    for name, function, args in [("pending calculations", database.count_pending_calculations, ["counter_benchmark"]),
+                                 ("training set size", database.get_training_set_size,
+                                  [["H2O"], "method", "basis", False, "counter_benchmark"])]:
+        counted, counter_time = timed(function, *args)
+        scanned, scan_time = timed(function, *(args + ["counter_benchmark"]))
+
+        assert counted == scanned
+
+        print("{:>24} {:>10d} {:>14.2f} {:>14.2f} {:>8.0f}x".format(name, counted, counter_time * 1000,
+                                                                     scan_time * 1000, scan_time / counter_time))
+
+    counted, counter_time = timed(database.count_dispatched_calculations)
+    print("{:>24} {:>10d} {:>14.2f}".format("dispatched calculations", counted, counter_time * 1000))
+
+    start = time.perf_counter()
+    wrong_counts = database.check_counters()
+    print("check_counters() found {} wrong counts in {:.1f} s.".format(len(wrong_counts), time.perf_counter() - start))
+
+    database.annihilate(confirm="confirm")
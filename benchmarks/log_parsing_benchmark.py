@@ -0,0 +1,82 @@
+"""
+Measures how long it takes to find the final energy in Qchem output files of increasing size, reading every line from
+the start as the parser used to compared to searching backwards from the end of the memory mapped file with LogFile,
+and how long reading the whole log for storage in the database takes.
+
+Output files are synthetic: lines like the ones Qchem prints for each SCF cycle, with the final energy near the end.
+Each file is parsed several times and the best time is kept, so the file is in the page cache for both parsers.
+
+Usage:
+    python benchmarks/log_parsing_benchmark.py [largest size in MB] [repeats]
+
+mbfit must be importable, for example by running from the top of the repository with PYTHONPATH=. set.
+The defaults are files of up to 256 MB and 3 repeats.
+"""
+
+import sys, os, time, tempfile
+
+from mbfit.utils import LogFile
+
+if len(sys.argv) > 3:
+    print("Usage:")
+    print("{} [largest size in MB] [repeats]".format(sys.argv[0]))
+    exit(1)
+
+max_size = int(sys.argv[1]) if len(sys.argv) >= 2 else 256
+repeats = int(sys.argv[2]) if len(sys.argv) == 3 else 3
+
+marker = "Total energy in the final basis set = "
+
+line = "    {:4d}    -76.0266327341      4.16E-03  00000 Roothaan Step\n"
+footer = " SCF time:   CPU 0.05s  wall  0.00s\n Total energy in the final basis set =      -76.0266327341\n" + \
+         " --------------------------------------------------------------\n" * 20 + \
+         "        *  Thank you very much for using Q-Chem.  Have a nice day.  *\n"
+
+def parse_lines(path):
+    with open(path) as out_file:
+        for line in out_file:
+            if line.find(marker) != -1:
+                return float(line[line.find(marker) + 39:])
+
+def parse_tail(path):
+    with LogFile(path) as log_file:
+        return float(log_file.get_text_after_last(marker.strip()))
+
+def read_whole(path):
+    with open(path, "r") as log_file:
+        return log_file.read()
+
+def read_log_file(path):
+    with LogFile(path) as log_file:
+        return log_file.get_text()
+
+def best_time(function, path):
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        function(path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+print("{:>8} {:>14} {:>14} {:>14} {:>14}".format("size MB", "line parse s", "tail parse s", "read() s", "LogFile s"))
+
+with tempfile.TemporaryDirectory() as directory:
+    size = 1
+    while size <= max_size:
+        path = os.path.join(directory, "{}.out".format(size))
+
+        with open(path, "w") as out_file:
+            block = "".join(line.format(i % 10000) for i in range(10000))
+            for i in range(size * 1024 * 1024 // len(block)):
+                out_file.write(block)
+            out_file.write(footer)
+
+        assert parse_lines(path) == parse_tail(path)
+
+        print("{:>8} {:>14.5f} {:>14.5f} {:>14.5f} {:>14.5f}".format(size, best_time(parse_lines, path),
+                                                                    best_time(parse_tail, path),
+                                                                    best_time(read_whole, path),
+                                                                    best_time(read_log_file, path)))
+
+        os.remove(path)
+        size *= 4
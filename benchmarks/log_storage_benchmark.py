@@ -0,0 +1,88 @@
+"""
+Measures how fast results are entered into the database with Database.set_properties() and how much space their logs
+take, with logs sent uncompressed, compressed with each available codec, and with only failed logs kept.
+
+Logs are synthetic: a fixed header like the one every QM code prints followed by a section of random numbers. One in
+ten calculations fails with the same error log.
+
+The benchmark annihilates the database before every run, so only point it at a test database.
+
+Usage:
+    python benchmarks/log_storage_benchmark.py <database config> confirm [number of calculations]
+
+mbfit must be importable, for example by running from the top of the repository with PYTHONPATH=. set.
+The default is 2000 calculations.
+"""
+
+import sys, time, random
+
+from mbfit.database import Database
+from mbfit.molecule import Atom, Fragment, Molecule
+
+if len(sys.argv) < 3 or len(sys.argv) > 4 or sys.argv[2] != "confirm":
+    print("Usage:")
+    print("{} <database config> confirm [number of calculations]".format(sys.argv[0]))
+    exit(1)
+
+config = sys.argv[1]
+num_calculations = int(sys.argv[3]) if len(sys.argv) == 4 else 2000
+
+header = "".join("  Line {:4d} of the program header, options, basis set and citation information.\n".format(i)
+                 for i in range(200))
+failure_log = header + "  Could not converge SCF iterations in 100 iterations.\n"
+
+def get_water_monomer():
+    return Molecule([Fragment([Atom("H", "A", random.random(), random.random(), random.random()),
+                               Atom("H", "A", random.random(), random.random(), random.random()),
+                               Atom("O", "B", random.random(), random.random(), random.random())],
+                              "H2O", 0, 1, "H1.HO1")])
+
+def get_log():
+    return header + "".join("  @DF-RHF iter {:3d}: {:20.14f} {:12.5e} {:12.5e}\n".format(
+            i, random.uniform(-77, -76), random.random(), random.random()) for i in range(40))
+
+try:
+    import zstandard
+    codecs = [None, "zlib", "zstd"]
+except ModuleNotFoundError:
+    codecs = [None, "zlib"]
+
+runs = [(codec, "all") for codec in codecs] + [("zlib", "failed")]
+
+print("Entering {} calculations per run.".format(num_calculations))
+print("{:>6} {:>9} {:>12} {:>14}".format("codec", "retention", "rows/s", "log bytes"))
+
+for codec, log_retention in runs:
+    with Database(config, log_codec=codec) as database:
+        database.annihilate(confirm="confirm")
+        database.save()
+
+        database.add_calculations([get_water_monomer() for i in range(num_calculations)], "method", "basis", False,
+                                  "log_storage_benchmark")
+        database.save()
+
+        calculation_results = []
+
+        for molecule, method, basis, cp, use_cp, frag_indices in database.get_all_calculations(
+                "benchmark", "log_storage_benchmark", calculations_to_do=num_calculations):
+            if random.random() < 0.1:
+                calculation_results.append((molecule, method, basis, cp, use_cp, frag_indices, False, 0, failure_log))
+            else:
+                calculation_results.append((molecule, method, basis, cp, use_cp, frag_indices, True,
+                                            random.uniform(-77, -76), get_log()))
+
+        database.save()
+
+        start = time.perf_counter()
+
+        database.set_properties(calculation_results, log_retention=log_retention)
+        database.save()
+
+        elapsed = time.perf_counter() - start
+
+        database.cursor.execute("SELECT pg_total_relation_size('log_files') + pg_total_relation_size('log_contents')")
+        size = database.cursor.fetchone()[0]
+
+        print("{:>6} {:>9} {:>12.1f} {:>14d}".format(str(codec), log_retention, num_calculations / elapsed, size))
+
+        database.annihilate(confirm="confirm")
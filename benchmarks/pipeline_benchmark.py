@@ -0,0 +1,95 @@
+"""
+Measures how fast the whole pipeline runs when the QM code is not the bottleneck, by performing every calculation with
+the AnalyticCalculator instead of a real QM code: the water monomer is optimized, that many random water dimers are
+added to the database, their calculations are performed with fill_database(), and a training set is exported with
+generate_training_set(). Each calculation takes the given latency in seconds and fails at the given rate, so the
+overhead of the pipeline can be compared to the time spent in calculations.
+
+Logs and settings are written to a temporary directory, which is removed afterwards.
+
+The database must already be created. The benchmark annihilates it before and after running, so only point it at a
+test database.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py <database config> confirm [number of dimers] [number of workers] [latency] [failure rate]
+
+mbfit must be importable, for example by running from the top of the repository with PYTHONPATH=. set.
+The defaults are 10000 dimers, 1 worker, no latency, and no failures. Each dimer is 3 calculations, so 333334 dimers
+is a million calculations.
+"""
+
+import os, sys, time, random, shutil, tempfile
+
+from mbfit.calculator import get_calculator, Model
+from mbfit.database import Database, fill_database, generate_training_set
+from mbfit.molecule import Atom, Fragment, Molecule
+
+if len(sys.argv) < 3 or len(sys.argv) > 7 or sys.argv[2] != "confirm":
+    print("Usage:")
+    print("{} <database config> confirm [number of dimers] [number of workers] [latency] [failure rate]".format(sys.argv[0]))
+    exit(1)
+
+config = sys.argv[1]
+num_dimers = int(sys.argv[3]) if len(sys.argv) >= 4 else 10000
+num_workers = int(sys.argv[4]) if len(sys.argv) >= 5 else 1
+latency = float(sys.argv[5]) if len(sys.argv) >= 6 else 0
+failure_rate = float(sys.argv[6]) if len(sys.argv) == 7 else 0
+
+directory = tempfile.mkdtemp(prefix="pipeline_benchmark-")
+settings_path = os.path.join(directory, "settings.ini")
+
+with open(settings_path, "w") as settings_file:
+    settings_file.write("[files]\nlog_path = {}\n".format(os.path.join(directory, "logs")))
+    settings_file.write("[molecule]\nnames = H2O,H2O\nSMILES = H1.HO1,H1.HO1\n")
+    settings_file.write("[energy_calculator]\ncode = analytic\n")
+    settings_file.write("[analytic]\nlatency = {}\nfailure_rate = {}\n".format(latency, failure_rate))
+
+model = Model("HF", "STO-3G", False)
+
+def get_water(x, y, z):
+    return Fragment([Atom("H", "A", x + 0.96 + random.uniform(-0.05, 0.05), y, z),
+                     Atom("H", "A", x - 0.24 + random.uniform(-0.05, 0.05), y + 0.93 + random.uniform(-0.05, 0.05), z),
+                     Atom("O", "B", x, y, z)],
+                    "H2O", 0, 1, "H1.HO1")
+
+def get_dimers():
+    for index in range(num_dimers):
+        yield Molecule([get_water(0, 0, 0), get_water(random.uniform(2.5, 6), random.uniform(-1, 1), random.uniform(-1, 1))])
+
+def report(phase, start, count):
+    elapsed = time.perf_counter() - start
+    print("{:>12} {:>12.2f} {:>12d} {:>12.1f}".format(phase, elapsed, count, count / elapsed if elapsed > 0 else 0))
+
+try:
+    with Database(config) as database:
+        database.annihilate(confirm="confirm")
+        database.save()
+
+    print("{:>12} {:>12} {:>12} {:>12}".format("phase", "time (s)", "count", "per second"))
+
+    start = time.perf_counter()
+    monomer, energy, log_path = get_calculator(settings_path, False).optimize_geometry(Molecule([get_water(0, 0, 0)]), model)
+    report("optimize", start, 1)
+
+    start = time.perf_counter()
+    with Database(config) as database:
+        database.add_calculations([monomer], model.get_method(), model.get_basis(), model.get_cp(), "pipeline_benchmark", optimized=True)
+        database.add_calculations(get_dimers(), model.get_method(), model.get_basis(), model.get_cp(), "pipeline_benchmark")
+        database.save()
+        num_calculations = database.count_pending_calculations("pipeline_benchmark")
+    report("initialize", start, num_calculations)
+
+    start = time.perf_counter()
+    fill_database(settings_path, config, "pipeline_benchmark", "pipeline_benchmark", num_workers=num_workers)
+    report("fill", start, num_calculations)
+
+    start = time.perf_counter()
+    generate_training_set(settings_path, config, os.path.join(directory, "training_set.xyz"), model.get_method(),
+                          model.get_basis(), model.get_cp(), "pipeline_benchmark")
+    report("export", start, num_dimers)
+
+    with Database(config) as database:
+        database.annihilate(confirm="confirm")
+        database.save()
+finally:
+    shutil.rmtree(directory, ignore_errors=True)
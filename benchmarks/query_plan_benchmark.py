@@ -0,0 +1,302 @@
+"""
+Checks the query plans of the functions in init.sql that clients call most on a large database, and fails if any of
+them got worse than the saved baseline.
+
+Loads a synthetic dataset of water monomers and dimers, one million calculations by default, then runs
+EXPLAIN (ANALYZE, BUFFERS) on each function and on the statements inside them that read the big tables. Functions that
+change the database are rolled back after they are explained. A function is worse than the baseline if it reads
+noticeably more buffers, a statement is worse if it reads noticeably more buffers or scans a whole table the baseline
+did not.
+
+The statements are copied from the functions in init.sql, keep them the same when changing those functions.
+
+The benchmark annihilates the database before and after running, so only point it at a test database.
+
+Usage:
+    python benchmarks/query_plan_benchmark.py <database config> confirm [number of calculations] [--update-baseline]
+
+mbfit must be importable, for example by running from the top of the repository with PYTHONPATH=. set.
+Run with --update-baseline to save the plans as the new baseline in benchmarks/query_plan_baseline.json after an
+intended change. Baselines are only compared with runs on the same number of calculations.
+"""
+
+import sys, os, json, time, random
+
+from mbfit.database import Database
+from mbfit.molecule import Atom, Fragment, Molecule
+
+args = [arg for arg in sys.argv[1:] if arg != "--update-baseline"]
+update_baseline = len(args) != len(sys.argv) - 1
+
+if len(args) < 2 or len(args) > 3 or args[1] != "confirm":
+    print("Usage:")
+    print("{} <database config> confirm [number of calculations] [--update-baseline]".format(sys.argv[0]))
+    exit(1)
+
+config = args[0]
+num_calculations = int(args[2]) if len(args) == 3 else 1000000
+
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_plan_baseline.json")
+
+# a plan is worse than the baseline if it reads this many times more buffers, plus a few for small plans.
+BUFFER_TOLERANCE = 1.25
+BUFFER_SLACK = 50
+
+# tables that are never small enough to scan whole.
+BIG_TABLES = ["molecule_list", "molecule_properties", "tags", "pending_calculations"]
+
+TAG = "query_plan_benchmark"
+SMALL_TAG = "query_plan_benchmark_small"
+MODEL = "method/basis/False"
+
+def water():
+    return Fragment([Atom("H", "A", random.random(), random.random(), random.random()),
+                     Atom("H", "A", random.random(), random.random(), random.random()),
+                     Atom("O", "B", random.random(), random.random(), random.random())], "H2O", 0, 1, "H1.HO1")
+
+def load_dataset(database):
+    """
+    Fills the database with num_calculations calculations: one tenth water monomers with one calculation each, the
+    rest water dimers with three. 80% of molecules are complete, 10% pending, 5% dispatched and 5% failed. Every
+    molecule has TAG, one in a hundred also has SMALL_TAG.
+    """
+
+    # real calculations create the molecules, model and tags, and are the templates of the synthetic ones.
+    database.add_calculations([Molecule([water()])], "method", "basis", False, TAG, SMALL_TAG, optimized=True)
+    database.add_calculations([Molecule([water()])], "method", "basis", False, TAG, SMALL_TAG)
+    database.add_calculations([Molecule([water(), water()])], "method", "basis", False, TAG, SMALL_TAG)
+
+    database.cursor.execute("UPDATE molecule_properties SET status = 'complete', energies = '{-76.0}'")
+    database.cursor.execute("DELETE FROM pending_calculations")
+
+    num_monomers = num_calculations // 10
+    num_dimers = (num_calculations - num_monomers) // 3
+
+    for mol_name, count in [("H2O", num_monomers), ("H2O-H2O", num_dimers)]:
+        database.cursor.execute("CREATE TEMPORARY TABLE synthetic AS SELECT 'query_plan_benchmark' || %s || i AS mol_hash, "
+                                "(ARRAY['complete', 'complete', 'complete', 'complete', 'complete', 'complete', 'complete', "
+                                "'complete', 'pending', 'pending', 'pending', 'pending', 'dispatched', 'dispatched', "
+                                "'failed', 'failed'])[i %% 16 + 1]::status_enum AS status, "
+                                "CASE WHEN i %% 100 = 0 THEN ARRAY[%s, %s] ELSE ARRAY[%s] END::varchar[] AS tag_names "
+                                "FROM generate_series(1, %s) AS i", (mol_name, TAG, SMALL_TAG, TAG, count))
+
+        database.cursor.execute("SELECT molecule_list.mol_hash FROM molecule_list LEFT JOIN optimized_geometries "
+                                "ON molecule_list.mol_hash = optimized_geometries.mol_hash "
+                                "WHERE molecule_list.mol_name = %s AND optimized_geometries.mol_hash IS NULL", (mol_name,))
+        template_hash = database.cursor.fetchone()[0]
+
+        database.cursor.execute("INSERT INTO molecule_list (mol_hash, mol_name, atom_coordinates) "
+                                "SELECT synthetic.mol_hash, mol_name, atom_coordinates FROM synthetic, molecule_list "
+                                "WHERE molecule_list.mol_hash = %s", (template_hash,))
+        database.cursor.execute("INSERT INTO molecule_properties (mol_hash, model_name, frag_indices, energies, "
+                                "atomic_charges, status, past_log_ids, use_cp) "
+                                "SELECT synthetic.mol_hash, model_name, frag_indices, "
+                                "CASE WHEN synthetic.status = 'complete' THEN energies ELSE '{}' END, atomic_charges, "
+                                "synthetic.status, past_log_ids, use_cp FROM synthetic, molecule_properties "
+                                "WHERE molecule_properties.mol_hash = %s", (template_hash,))
+        database.cursor.execute("INSERT INTO pending_calculations (mol_hash, model_name, frag_indices, use_cp) "
+                                "SELECT mol_hash, model_name, frag_indices, use_cp FROM molecule_properties "
+                                "WHERE mol_hash LIKE 'query_plan_benchmark%%' AND status = 'pending'")
+        database.cursor.execute("INSERT INTO tags (mol_hash, model_name, tag_names) "
+                                "SELECT mol_hash, %s, tag_names FROM synthetic", (MODEL,))
+        database.cursor.execute("DROP TABLE synthetic")
+
+        database.save()
+
+    # VACUUM cannot run inside a transaction. It also sets the visibility map, as autovacuum would on a real database.
+    database.connection.autocommit = True
+    database.cursor.execute("VACUUM ANALYZE")
+    database.connection.autocommit = False
+
+def get_functions(dimer_hash, far_hash):
+    """
+    (name, statement, parameters, changes the database) of each function call to explain.
+    """
+
+    return [
+        ("get_pending_calculations_packed", "SELECT * FROM get_pending_calculations_packed(%s, %s, %s, %s)",
+            ("H2O-H2O", "client", [TAG], 100), True),
+        ("get_pending_calculations_packed small tag", "SELECT * FROM get_pending_calculations_packed(%s, %s, %s, %s)",
+            ("H2O-H2O", "client", [SMALL_TAG], 100), True),
+        ("get_pending_molecule_name small tag", "SELECT * FROM get_pending_molecule_name(%s)", ([SMALL_TAG],), False),
+        ("get_training_set_packed", "SELECT * FROM get_training_set_packed(%s, %s, %s, %s, %s, %s)",
+            ("H2O-H2O", ["H2O", "H2O"], MODEL, [TAG], 0, 1000), False),
+        ("get_training_set_packed far offset", "SELECT * FROM get_training_set_packed(%s, %s, %s, %s, %s, %s)",
+            ("H2O-H2O", ["H2O", "H2O"], MODEL, [TAG], num_calculations // 10, 1000), False),
+        ("get_training_set_page", "SELECT * FROM get_training_set_page(%s, %s, %s, %s, %s, %s)",
+            ("H2O-H2O", ["H2O", "H2O"], MODEL, [TAG], "", 1000), False),
+        ("get_training_set_page far page", "SELECT * FROM get_training_set_page(%s, %s, %s, %s, %s, %s)",
+            ("H2O-H2O", ["H2O", "H2O"], MODEL, [TAG], far_hash, 1000), False),
+        ("get_2b_training_set_page far page", "SELECT * FROM get_2b_training_set_page(%s, %s, %s, %s, %s, %s, %s)",
+            ("H2O-H2O", "H2O", "H2O", MODEL, [TAG], far_hash, 1000), False),
+        ("get_1b_training_set_packed", "SELECT * FROM get_1b_training_set_packed(%s, %s, %s, %s, %s)",
+            ("H2O", MODEL, [TAG], 0, 1000), False),
+        ("export_calculations_packed", "SELECT * FROM export_calculations_packed(%s, %s, %s, %s, %s)",
+            ("H2O-H2O", MODEL, [TAG], 0, 1000), False),
+        ("get_failed_configs_packed", "SELECT * FROM get_failed_configs_packed(%s, %s, %s, %s, %s)",
+            ("H2O", MODEL, [TAG], 0, 1000), False),
+        ("reset_failed small tag", "SELECT * FROM reset_failed(%s)", ([SMALL_TAG],), True),
+        ("reset_dispatched small tag", "SELECT * FROM reset_dispatched(%s)", ([SMALL_TAG],), True),
+    ]
+
+def get_statements(dimer_hash):
+    """
+    (name, statement, parameters) of each statement inside the functions to explain.
+    """
+
+    return [
+        ("get_pending_calculations: pending calculations",
+            "SELECT pending_calculations.mol_hash, pending_calculations.model_name, pending_calculations.frag_indices, "
+            "pending_calculations.use_cp FROM pending_calculations "
+            "INNER JOIN molecule_list ON pending_calculations.mol_hash = molecule_list.mol_hash "
+            "INNER JOIN tags ON pending_calculations.mol_hash = tags.mol_hash AND pending_calculations.model_name = tags.model_name "
+            "WHERE molecule_list.mol_name = %s AND tags.tag_names && %s::varchar[] LIMIT %s",
+            ("H2O-H2O", [SMALL_TAG], 100)),
+        ("get_pending_molecule_name: pending calculation",
+            "SELECT pending_calculations.mol_hash FROM pending_calculations INNER JOIN tags "
+            "ON pending_calculations.mol_hash = tags.mol_hash AND pending_calculations.model_name = tags.model_name "
+            "WHERE tags.tag_names && %s::varchar[] LIMIT 1",
+            ([SMALL_TAG],)),
+        ("get_training_set: complete molecules",
+            "SELECT molecule_list.mol_hash, tags.mol_hash FROM molecule_list INNER JOIN tags "
+            "ON molecule_list.mol_hash = tags.mol_hash "
+            "WHERE molecule_list.mol_name = %s AND tags.model_name = %s AND tags.tag_names && %s::varchar[] "
+            "AND tags.num_incomplete = 0 "
+            "ORDER BY molecule_list.mol_hash OFFSET %s LIMIT %s",
+            ("H2O-H2O", MODEL, [TAG], num_calculations // 10, 1000)),
+        ("get_training_set: monomer energies",
+            "SELECT energies[1], status FROM molecule_properties WHERE mol_hash = %s AND model_name = %s "
+            "AND array_length(frag_indices, 1) = 1 AND use_cp = False ORDER BY frag_indices ASC",
+            (dimer_hash, MODEL)),
+        ("export_calculations: molecules",
+            "SELECT mol_hash FROM molecule_list WHERE mol_name = %s ORDER BY mol_hash OFFSET %s LIMIT %s",
+            ("H2O-H2O", num_calculations // 10, 1000)),
+        ("export_calculations: energies",
+            "SELECT * FROM molecule_properties WHERE mol_hash = %s AND model_name = %s "
+            "ORDER BY array_length(frag_indices, 1) ASC, frag_indices ASC, use_cp DESC",
+            (dimer_hash, MODEL)),
+        ("reset_failed: failed calculations",
+            "SELECT molecule_properties.mol_hash, molecule_properties.model_name, molecule_properties.frag_indices, "
+            "molecule_properties.use_cp FROM molecule_properties INNER JOIN tags "
+            "ON molecule_properties.mol_hash = tags.mol_hash AND molecule_properties.model_name = tags.model_name "
+            "WHERE status = 'failed' and %s::varchar[] && tags.tag_names",
+            ([SMALL_TAG],)),
+        ("count_incomplete_calculations: incomplete calculations",
+            "SELECT COUNT(*) FROM molecule_properties WHERE mol_hash = %s AND model_name = %s AND status != 'complete'",
+            (dimer_hash, MODEL)),
+    ]
+
+def get_scans(plan):
+    """
+    Every table or index scanned by a plan, as "<node type> on <relation> [using <index>]".
+    """
+
+    scans = []
+
+    if "Relation Name" in plan:
+        scan = "{} on {}".format(plan["Node Type"], plan["Relation Name"])
+        if "Index Name" in plan:
+            scan += " using {}".format(plan["Index Name"])
+        scans.append(scan)
+    elif "Index Name" in plan:
+        scans.append("{} using {}".format(plan["Node Type"], plan["Index Name"]))
+
+    for child in plan.get("Plans", []):
+        scans += get_scans(child)
+
+    return scans
+
+def explain(database, statement, params):
+    database.cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, params)
+    result = database.cursor.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    plan = result[0]["Plan"]
+
+    return {"buffers": plan["Shared Hit Blocks"] + plan["Shared Read Blocks"],
+            "time": result[0]["Execution Time"],
+            "scans": sorted(set(get_scans(plan)))}
+
+def get_regressions(name, result, baseline):
+    regressions = []
+
+    if result["buffers"] > baseline["buffers"] * BUFFER_TOLERANCE + BUFFER_SLACK:
+        regressions.append("{}: reads {} buffers, baseline {}".format(name, result["buffers"], baseline["buffers"]))
+
+    for scan in result["scans"]:
+        if scan.startswith("Seq Scan") and scan.split(" on ")[1] in BIG_TABLES and scan not in baseline["scans"]:
+            regressions.append("{}: new {}".format(name, scan))
+
+    return regressions
+
+with Database(config) as database:
+    database.annihilate(confirm="confirm")
+    database.save()
+
+    print("Loading {} calculations.".format(num_calculations))
+
+    start = time.perf_counter()
+    load_dataset(database)
+    print("Loaded in {:.1f} s.".format(time.perf_counter() - start))
+
+    database.cursor.execute("SELECT mol_hash FROM molecule_list WHERE mol_name = 'H2O-H2O' ORDER BY mol_hash LIMIT 1")
+    dimer_hash = database.cursor.fetchone()[0]
+
+    # where the far offset of the functions that page by offset starts.
+    database.cursor.execute("SELECT mol_hash FROM molecule_list WHERE mol_name = 'H2O-H2O' ORDER BY mol_hash OFFSET %s LIMIT 1",
+                            (num_calculations // 10,))
+    far_hash = database.cursor.fetchone()[0]
+
+    results = {}
+
+    for name, statement, params, changes_database in get_functions(dimer_hash, far_hash):
+        results[name] = explain(database, statement, params)
+        if changes_database:
+            database.connection.rollback()
+
+    for name, statement, params in get_statements(dimer_hash):
+        results[name] = explain(database, statement, params)
+
+    database.connection.rollback()
+
+    database.annihilate(confirm="confirm")
+    database.save()
+
+print("{:>56} {:>10} {:>10}".format("", "buffers", "time (ms)"))
+for name, result in results.items():
+    print("{:>56} {:>10d} {:>10.2f}".format(name, result["buffers"], result["time"]))
+    for scan in result["scans"]:
+        print("{:>56}     {}".format("", scan))
+
+if update_baseline:
+    with open(baseline_path, "w") as baseline_file:
+        json.dump({"num_calculations": num_calculations,
+                   "plans": {name: {"buffers": result["buffers"], "scans": result["scans"]}
+                             for name, result in results.items()}}, baseline_file, indent=4)
+        baseline_file.write("\n")
+    print("Saved the baseline to {}.".format(baseline_path))
+    exit(0)
+
+if not os.path.exists(baseline_path):
+    print("No baseline at {}, run with --update-baseline to save one.".format(baseline_path))
+    exit(0)
+
+with open(baseline_path) as baseline_file:
+    baseline = json.load(baseline_file)
+
+if baseline["num_calculations"] != num_calculations:
+    print("The baseline was saved with {} calculations, not comparing.".format(baseline["num_calculations"]))
+    exit(0)
+
+regressions = []
+for name, result in results.items():
+    if name in baseline["plans"]:
+        regressions += get_regressions(name, result, baseline["plans"][name])
+
+if len(regressions) > 0:
+    print("Query plans got worse than the baseline:")
+    for regression in regressions:
+        print("    " + regression)
+    exit(1)
+
+print("No query plan is worse than the baseline.")
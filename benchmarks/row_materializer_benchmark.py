@@ -0,0 +1,77 @@
+"""
+Compares building molecules from database rows with a RowMaterializer against the deepcopy and reorder approach
+the Database used before.
+
+Does not need a database. Rows are random water trimer geometries packed the same way the database sends them.
+
+Usage:
+    python benchmarks/row_materializer_benchmark.py [number of rows]
+
+mbfit must be importable, for example by running from the top of the repository with PYTHONPATH=. set.
+The default is 100000 rows.
+"""
+
+import sys, time, copy, random, struct
+
+from mbfit.database.row_materializer import RowMaterializer
+from mbfit.molecule import Atom, Fragment, Molecule
+
+if len(sys.argv) > 2:
+    print("Usage:")
+    print("{} [number of rows]".format(sys.argv[0]))
+    exit(1)
+
+num_rows = int(sys.argv[1]) if len(sys.argv) == 2 else 100000
+
+# same layout as Database.build_empty_molecule() gives for a water trimer.
+fragments = []
+for i in range(3):
+    fragments.append(Fragment([Atom("H", "A", 0, 0, 0), Atom("H", "A", 0, 0, 0), Atom("O", "B", 0, 0, 0)],
+                              "H2O", 0, 1, "H1.HO1"))
+
+empty_molecule = Molecule(fragments)
+for index, atom in enumerate(empty_molecule.get_atoms()):
+    atom.set_xyz(index, index, index)
+
+names = ["H2O", "H2O", "H2O"]
+SMILES = ["H1.HO1", "H1.HO1", "H1.HO1"]
+
+num_coordinates = empty_molecule.get_num_atoms() * 3
+rows = [struct.pack(">{}d".format(num_coordinates), *[random.uniform(-5, 5) for i in range(num_coordinates)])
+        for j in range(num_rows)]
+
+print("Materializing {} water trimers.".format(num_rows))
+
+start = time.perf_counter()
+
+order, frag_orders = None, None
+
+for row in rows:
+    molecule = copy.deepcopy(empty_molecule)
+
+    atom_coordinates = list(struct.unpack(">{}d".format(num_coordinates), row))
+
+    for atom in molecule.get_atoms():
+        atom.set_xyz(atom_coordinates[0], atom_coordinates[1], atom_coordinates[2])
+        atom_coordinates = atom_coordinates[3:]
+
+    if order is None:
+        order, frag_orders = molecule.get_reorder_order(names, SMILES)
+
+    molecule = molecule.get_reordered_copy(order, frag_orders, SMILES)
+
+deepcopy_time = time.perf_counter() - start
+
+start = time.perf_counter()
+
+order, frag_orders = empty_molecule.get_reorder_order(names, SMILES)
+materializer = RowMaterializer(empty_molecule, order, frag_orders, SMILES)
+
+for row in rows:
+    molecule = materializer.materialize(row)
+
+materializer_time = time.perf_counter() - start
+
+print("deepcopy and reorder: {:8.3f} s ({:7.2f} us per row)".format(deepcopy_time, deepcopy_time / num_rows * 1e6))
+print("RowMaterializer:      {:8.3f} s ({:7.2f} us per row)".format(materializer_time, materializer_time / num_rows * 1e6))
+print("speedup:              {:8.1f}x".format(deepcopy_time / materializer_time))
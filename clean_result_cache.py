@@ -0,0 +1,23 @@
+import sys
+
+from mbfit.calculator import ResultCache
+
+if(len(sys.argv) < 2 or len(sys.argv) > 4):
+    print("Usage:")
+    print("{} <result cache> [max age in days] [max entries]".format(sys.argv[0]))
+    exit(1)
+
+cache = ResultCache(sys.argv[1])
+max_age = float(sys.argv[2]) * 24 * 60 * 60 if len(sys.argv) > 2 and sys.argv[2] != "none" else None
+max_entries = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3] != "none" else None
+
+num_removed = cache.evict(max_age=max_age, max_entries=max_entries)
+
+statistics = cache.get_statistics()
+
+print("Removed {} results, {} results left in {} bytes.".format(num_removed, statistics["entries"], statistics["size"]))
+
+for kind in ResultCache.KINDS:
+    print("{}: {} hits, {} misses.".format(kind, statistics["total_hits"][kind], statistics["total_misses"][kind]))
+
+cache.close()
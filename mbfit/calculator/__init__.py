@@ -1,6 +1,13 @@
 from . import mbdecomp
 from .calculator import Calculator
 from .calculator_utils import get_calculator, fill_energies
+from .calculation_executor import CalculationExecutor
+from .decomposition import ManyBodyDecomposition
+from .screening import DistanceScreen
+from .fill_checkpoint import FillCheckpoint
+from .result_cache import ResultCache, CachedCalculator
 from .psi4_calculator import Psi4Calculator
 from .qchem_calculator import QchemCalculator
+from .qchem_runner import QchemRunner
+from .analytic_calculator import AnalyticCalculator
 from .model import Model
@@ -0,0 +1,422 @@
+# external package imports
+import math, random, time
+import numpy
+
+# absolute module imports
+from mbfit.utils import files, constants
+from mbfit.molecule import Molecule
+from mbfit.exceptions import LibraryCallError
+
+from .calculator import Calculator
+
+class AnalyticCalculator(Calculator):
+    """
+    Calculator that uses a cheap analytic potential instead of a QM code, so the rest of the pipeline can be run and
+    benchmarked end to end without psi4 or qchem installed. Its energies are not meant to be accurate, only smooth,
+    deterministic, and shaped like real ones.
+
+    The potential is a sum over pairs of atoms in the calculation, ghost atoms are ignored:
+        Bonded atoms are held near the sum of their covalent radii by a harmonic spring.
+        Atoms bonded to the same atom are held at the distance that makes a tetrahedral angle by a harmonic spring.
+        All other pairs interact by Lennard-Jones, with a minimum at the sum of their van der Waals radii, and by
+            point charges. Each atom gets an equal share of its fragment's charge, plus a partial charge that makes
+            heavier atoms negative and lighter ones positive.
+    Each atom also adds a constant -Z^2/2 Hartrees, so totals look like total energies.
+
+    It has an [analytic] settings section with:
+        latency             - Seconds each calculation takes. Default: 0.
+        failure_rate        - Chance that a calculation fails, between 0 and 1. Default: 0.
+        log_lines           - Number of extra lines to write to each log file, to make them as large as real ones.
+                Default: 0.
+        epsilon             - Well depth of the Lennard-Jones interactions in Hartrees. Default: 0.0002.
+        bond_force_constant - Force constant of the springs in Hartrees per square angstrom. Default: 0.5.
+        charge_scale        - Partial charge of an atom per unit of atomic number away from its fragment's mean.
+                Default: 0.15.
+    """
+
+    def __init__(self, settings_path, logging = True):
+        """
+        Constructor for an AnalyticCalculator.
+
+        Args:
+            settings_path   - Path to the settings.ini
+            logging         - Whether this calculator should output logging messages.
+                Default: True
+
+        Returns:
+            None
+        """
+
+        super(AnalyticCalculator, self).__init__(settings_path, logging)
+
+        self.latency = self.settings.getfloat("analytic", "latency", 0)
+        self.failure_rate = self.settings.getfloat("analytic", "failure_rate", 0)
+        self.log_lines = self.settings.getint("analytic", "log_lines", 0)
+        self.epsilon = self.settings.getfloat("analytic", "epsilon", 0.0002)
+        self.bond_force_constant = self.settings.getfloat("analytic", "bond_force_constant", 0.5)
+        self.charge_scale = self.settings.getfloat("analytic", "charge_scale", 0.15)
+
+    def is_installed(self):
+        return True
+
+    def is_valid_model(self, model):
+        return True
+
+    def get_parameters(self, molecule, fragment_indicies = None):
+        """
+        Gets the parameters of the potential for the atoms of some fragments of a molecule.
+
+        Args:
+            molecule        - The Molecule to get the parameters for.
+            fragment_indicies - List of the indicies of the fragments to include, or None for all of them.
+                Default: None
+
+        Returns:
+            (atoms, self energy, pairs), where atoms is the list of included atoms, and pairs is a dictionary of
+            numpy arrays with an entry for each pair of them: "i" and "j", the indices of the atoms, "k" and "r0", the
+            force constant and length of the spring between them, "epsilon" and "sigma", their Lennard-Jones
+            parameters, and "qq", the product of their charges.
+        """
+
+        if fragment_indicies is None:
+            fragment_indicies = range(molecule.get_num_fragments())
+
+        atoms = []
+        charges = []
+        springs = {}
+        is_bonded = set()
+
+        for fragment_index in fragment_indicies:
+            fragment = molecule.get_fragments()[fragment_index]
+            offset = len(atoms)
+
+            numbers = [constants.symbol_to_number(atom.get_name()) for atom in fragment.get_atoms()]
+            mean_number = sum(numbers) / len(numbers)
+
+            for number in numbers:
+                charges.append(fragment.get_charge() / len(numbers) - self.charge_scale * (number - mean_number))
+
+            radii = [constants.symbol_to_covalent_radius(atom.get_name()) for atom in fragment.get_atoms()]
+
+            excluded_12, excluded_13 = fragment.get_excluded_pairs(max_exclusion=2)
+            connectivity_matrix = fragment.get_connectivity_matrix()
+
+            for index1, index2 in excluded_12:
+                springs[(offset + index1, offset + index2)] = radii[index1] + radii[index2]
+
+            # the length of a 1-3 spring makes a tetrahedral angle at the atom bonded to both.
+            for index1, index2 in excluded_13:
+                middle = next(index for index in range(len(numbers))
+                              if connectivity_matrix[index1][index] and connectivity_matrix[index][index2])
+                a, b = radii[index1] + radii[middle], radii[middle] + radii[index2]
+                springs[(offset + index1, offset + index2)] = math.sqrt(a ** 2 + b ** 2 - 2 * a * b * math.cos(math.radians(109.47)))
+
+            atoms += fragment.get_atoms()
+
+        self_energy = -sum(constants.symbol_to_number(atom.get_name()) ** 2 / 2 for atom in atoms)
+
+        pairs = {name: [] for name in ["i", "j", "k", "r0", "epsilon", "sigma", "qq"]}
+
+        for index1 in range(len(atoms)):
+            for index2 in range(index1 + 1, len(atoms)):
+                pairs["i"].append(index1)
+                pairs["j"].append(index2)
+
+                if (index1, index2) in springs:
+                    pairs["k"].append(self.bond_force_constant)
+                    pairs["r0"].append(springs[(index1, index2)])
+                    pairs["epsilon"].append(0)
+                    pairs["sigma"].append(1)
+                    pairs["qq"].append(0)
+                else:
+                    r_min = constants.symbol_to_vdw_radius(atoms[index1].get_name()) + constants.symbol_to_vdw_radius(atoms[index2].get_name())
+                    pairs["k"].append(0)
+                    pairs["r0"].append(0)
+                    pairs["epsilon"].append(self.epsilon)
+                    pairs["sigma"].append(r_min / 2 ** (1 / 6))
+                    pairs["qq"].append(charges[index1] * charges[index2])
+
+        return atoms, self_energy, {name: numpy.array(values, dtype=int if name in ["i", "j"] else float)
+                                    for name, values in pairs.items()}
+
+    def get_energy_and_gradient(self, coordinates, self_energy, pairs):
+        """
+        Evaluates the potential.
+
+        Args:
+            coordinates     - numpy array of the coordinates of each atom in angstroms.
+            self_energy     - The constant energy of the atoms, from get_parameters().
+            pairs           - The parameters of each pair of atoms, from get_parameters().
+
+        Returns:
+            (energy in Hartrees, numpy array of its gradient in Hartrees per angstrom)
+        """
+
+        gradient = numpy.zeros(coordinates.shape)
+
+        if len(pairs["i"]) == 0:
+            return self_energy, gradient
+
+        vectors = coordinates[pairs["i"]] - coordinates[pairs["j"]]
+        r = numpy.linalg.norm(vectors, axis=1)
+
+        ratio6 = (pairs["sigma"] / r) ** 6
+
+        energy = self_energy + numpy.sum(pairs["k"] * (r - pairs["r0"]) ** 2
+                                         + 4 * pairs["epsilon"] * (ratio6 ** 2 - ratio6)
+                                         + pairs["qq"] / (r * constants.ang_to_bohr))
+
+        dE_dr = (2 * pairs["k"] * (r - pairs["r0"])
+                 + 4 * pairs["epsilon"] * (-12 * ratio6 ** 2 + 6 * ratio6) / r
+                 - pairs["qq"] / (r ** 2 * constants.ang_to_bohr))
+
+        forces = (dE_dr / r)[:, numpy.newaxis] * vectors
+
+        numpy.add.at(gradient, pairs["i"], forces)
+        numpy.add.at(gradient, pairs["j"], -forces)
+
+        return float(energy), gradient
+
+    def get_coordinates(self, atoms):
+        return numpy.array([[atom.get_x(), atom.get_y(), atom.get_z()] for atom in atoms])
+
+    def write_log(self, log_path, title, molecule, fragment_indicies, lines):
+        """
+        Writes a log file that looks like the output of a QM code.
+
+        Args:
+            log_path        - The path to the log file.
+            title           - Description of the calculation.
+            molecule        - The Molecule the calculation was performed on.
+            fragment_indicies - List of the indicies of the fragments in the calculation, or None for all of them.
+            lines           - Lines with the results of the calculation.
+
+        Returns:
+            None
+        """
+
+        with open(log_path, "w") as log_file:
+            log_file.write("  Analytic potential calculator\n")
+            log_file.write("  {}\n\n".format(title))
+            log_file.write("  Geometry (in Angstrom), charge = {}, multiplicity = {}:\n\n".format(
+                    molecule.get_charge(fragment_indicies), molecule.get_spin_multiplicity(fragment_indicies)))
+            log_file.write(molecule.to_xyz(fragment_indicies) + "\n\n")
+
+            for line_index in range(self.log_lines):
+                log_file.write("  @Iter {:5d}   padding line to make this log file as large as a real one\n".format(line_index))
+
+            for line in lines:
+                log_file.write("  {}\n".format(line))
+
+    def perform_calculation(self, log_path, title, molecule, fragment_indicies, call):
+        """
+        Waits for the latency of a calculation, and fails it at the failure rate.
+
+        Args:
+            log_path        - The path to the log file of the calculation.
+            title           - Description of the calculation.
+            molecule        - The Molecule the calculation is performed on.
+            fragment_indicies - List of the indicies of the fragments in the calculation, or None for all of them.
+            call            - Name of the kind of calculation, used in error messages.
+
+        Returns:
+            None
+        """
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        if random.random() < self.failure_rate:
+            self.write_log(log_path, title, molecule, fragment_indicies, ["*** Calculation failed on purpose. ***"])
+            raise LibraryCallError("analytic", call, "calculation failed on purpose", log_path=log_path)
+
+    def calculate_energy(self, molecule, model, fragment_indicies, qm_options={}):
+        """
+        Calculates the energy of a subset of the fragments of a molecule with the analytic potential.
+
+        Args:
+            molecule        - The Molecule to perform the calculation on.
+            fragment_indicies - List of the indicies of the fragments to include in the calculation.
+            model           - The Model to use for the calculation, does not change the energy.
+            qm_options       - Not used.
+
+        Returns:
+            (calculated energy, path to the log file)
+        """
+
+        if self.logging:
+            print("Beginning energy calculation of {} with model {}/{} and cp = {}".format(molecule.get_name(), model.get_method(), model.get_basis(), model.get_cp()))
+
+        suffix = "".join("_{}".format(index) for index in fragment_indicies)
+        log_path = files.get_energy_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), model.get_cp(), suffix + ".out")
+
+        title = "Energy of fragments {} with {}/{}".format(fragment_indicies, model.get_method(), model.get_basis())
+
+        self.perform_calculation(log_path, title, molecule, fragment_indicies, "energy")
+
+        atoms, self_energy, pairs = self.get_parameters(molecule, fragment_indicies)
+        energy, gradient = self.get_energy_and_gradient(self.get_coordinates(atoms), self_energy, pairs)
+
+        self.write_log(log_path, title, molecule, fragment_indicies, ["Total energy in the final basis set = {:.10f}".format(energy)])
+
+        if self.logging:
+            print("Successfully completed energy calculation.")
+
+        return energy, log_path
+
+    def optimize_geometry(self, molecule, model, qm_options={}):
+        """
+        Optimizes the given input geometry with the analytic potential, by BFGS.
+
+        Args:
+            molecule        - The Molecule to perform the optimization on.
+            model           - The Model to use for the optimization, does not change the result.
+            qm_options       - Not used.
+
+        Returns:
+            (new optimized molecule, energy of the optimized geometry, path to the log file)
+        """
+
+        if self.logging:
+            print("Beginning geometry optimization of {} with model {}/{}".format(molecule.get_name(), model.get_method(), model.get_basis()))
+
+        log_path = files.get_optimization_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), "log")
+
+        title = "Geometry optimization with {}/{}".format(model.get_method(), model.get_basis())
+
+        self.perform_calculation(log_path, title, molecule, None, "optimize")
+
+        atoms, self_energy, pairs = self.get_parameters(molecule)
+
+        coordinates = self.get_coordinates(atoms).flatten()
+        energy, gradient = self.get_energy_and_gradient(coordinates.reshape(-1, 3), self_energy, pairs)
+        gradient = gradient.flatten()
+
+        # BFGS, with a backtracking line search.
+        inverse_hessian = numpy.identity(len(coordinates))
+
+        for iteration in range(1000):
+            if numpy.max(numpy.abs(gradient)) < 1e-6:
+                break
+
+            direction = -inverse_hessian.dot(gradient)
+            if direction.dot(gradient) >= 0:
+                inverse_hessian = numpy.identity(len(coordinates))
+                direction = -gradient
+
+            step = 1.0
+            for halving in range(50):
+                new_coordinates = coordinates + step * direction
+                new_energy, new_gradient = self.get_energy_and_gradient(new_coordinates.reshape(-1, 3), self_energy, pairs)
+                if new_energy <= energy + 1e-4 * step * direction.dot(gradient):
+                    break
+                step /= 2
+
+            new_gradient = new_gradient.flatten()
+
+            s_k, y_k = new_coordinates - coordinates, new_gradient - gradient
+            if s_k.dot(y_k) > 1e-12:
+                rho = 1 / s_k.dot(y_k)
+                update = numpy.identity(len(coordinates)) - rho * numpy.outer(s_k, y_k)
+                inverse_hessian = update.dot(inverse_hessian).dot(update.T) + rho * numpy.outer(s_k, s_k)
+
+            coordinates, energy, gradient = new_coordinates, new_energy, new_gradient
+        else:
+            self.write_log(log_path, title, molecule, None, ["*** Optimization did not converge. ***"])
+            raise LibraryCallError("analytic", "optimize", "optimization did not converge", log_path=log_path)
+
+        coordinates = coordinates.reshape(-1, 3)
+
+        xyz_string = "{}\n\n".format(len(atoms)) + "\n".join("{} {} {} {}".format(atom.get_name(), *position)
+                                                              for atom, position in zip(atoms, coordinates))
+
+        optimized_molecule = Molecule.read_xyz(xyz_string,
+                                               [fragment.get_num_atoms() for fragment in molecule.get_fragments()],
+                                               [fragment.get_name() for fragment in molecule.get_fragments()],
+                                               [fragment.get_charge() for fragment in molecule.get_fragments()],
+                                               [fragment.get_spin_multiplicity() for fragment in molecule.get_fragments()],
+                                               [fragment.get_symmetry() for fragment in molecule.get_fragments()],
+                                               [fragment.get_SMILE() for fragment in molecule.get_fragments()])
+
+        self.write_log(log_path, title, optimized_molecule, None, ["Optimization converged in {} steps.".format(iteration),
+                                                                   "Final energy is {:.10f}".format(energy)])
+
+        if self.logging:
+            print("Completed geometry optimization.")
+
+        return optimized_molecule, energy, log_path
+
+    def calculate_frequencies(self, molecule, model, qm_options={}):
+        """
+        Performs a frequency calculation with the analytic potential to find the normal modes, frequencies, and reduced
+        masses of the molecule, from a hessian found by finite differences of the gradient.
+
+        Args:
+            molecule        - The Molecule to perform the frequency calculation on.
+            model           - The Model to use for the calculation, does not change the result.
+            qm_options       - Not used.
+
+        Returns:
+            (normal modes, frequencies, reduced masses, path to log file)
+        """
+
+        if self.logging:
+            print("Beginning normal modes calculation of {} with {}/{}.".format(molecule.get_name(), model.get_method(), model.get_basis()))
+
+        log_path = files.get_frequencies_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), "log")
+
+        title = "Frequency calculation with {}/{}".format(model.get_method(), model.get_basis())
+
+        self.perform_calculation(log_path, title, molecule, None, "frequency")
+
+        atoms, self_energy, pairs = self.get_parameters(molecule)
+        coordinates = self.get_coordinates(atoms)
+        num_atoms = len(atoms)
+
+        # hessian in Hartrees per square angstrom by central differences of the gradient.
+        displacement = 1e-4
+        hessian = numpy.zeros((3 * num_atoms, 3 * num_atoms))
+
+        for index in range(3 * num_atoms):
+            displaced = coordinates.copy()
+            displaced.flat[index] += displacement
+            plus = self.get_energy_and_gradient(displaced, self_energy, pairs)[1]
+            displaced.flat[index] -= 2 * displacement
+            minus = self.get_energy_and_gradient(displaced, self_energy, pairs)[1]
+            hessian[index] = (plus - minus).flatten() / (2 * displacement)
+
+        hessian = (hessian + hessian.T) / 2 / constants.ang_to_bohr ** 2
+
+        # mass weight with masses in atomic units.
+        masses = numpy.repeat([atom.get_mass() for atom in atoms], 3)
+        eigenvalues, eigenvectors = numpy.linalg.eigh(hessian / numpy.sqrt(numpy.outer(masses, masses)) / constants.mass_electron_per_mass_proton)
+
+        # the smallest modes are translations and rotations, 5 of them if the molecule is linear.
+        centered = coordinates - coordinates.mean(axis=0)
+        is_linear = num_atoms < 3 or numpy.linalg.svd(centered, compute_uv=False)[1] < 1e-6
+        num_modes = max(0, 3 * num_atoms - (5 if is_linear else 6)) if num_atoms > 1 else 0
+
+        vibrations = sorted(numpy.argsort(numpy.abs(eigenvalues))[3 * num_atoms - num_modes:], key=lambda mode: eigenvalues[mode])
+
+        normal_modes = []
+        frequencies = []
+        red_masses = []
+
+        for mode in vibrations:
+            frequencies.append(float(math.copysign(math.sqrt(abs(eigenvalues[mode])), eigenvalues[mode]) * constants.autocm))
+
+            cartesian = eigenvectors[:, mode] / numpy.sqrt(masses)
+            red_mass = 1 / numpy.sum(cartesian ** 2)
+            red_masses.append(float(red_mass))
+
+            normal_modes.append((cartesian * math.sqrt(red_mass)).reshape(num_atoms, 3).tolist())
+
+        self.write_log(log_path, title, molecule, None, ["Frequency: {:12.4f} cm-1  Red. mass: {:8.4f}".format(frequency, red_mass)
+                                                         for frequency, red_mass in zip(frequencies, red_masses)])
+
+        if self.logging:
+            print("Normal mode/frequency analysis complete. {} normal modes found.".format(len(frequencies)))
+
+        self.check_neg_freqs(frequencies)
+
+        return normal_modes, frequencies, red_masses, log_path
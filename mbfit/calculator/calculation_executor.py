@@ -0,0 +1,320 @@
+# external package imports
+import math
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+
+# absolute module imports
+from mbfit.exceptions import InvalidValueError, LibraryCallError
+
+# local module imports
+from . import calculator_utils
+from .worker_pool import WorkerPool
+
+# the Calculator of each worker process of a CalculationExecutor, created once when the process starts.
+worker_calculator = None
+
+def initialize_worker(settings_path, logging):
+    """
+    Creates the Calculator of a worker process of a CalculationExecutor.
+
+    Args:
+        settings_path       - Local path to '.ini' settings file with all relevant settings.
+        logging             - Whether the Calculator should output logging messages.
+
+    Returns:
+        None.
+    """
+
+    global worker_calculator
+
+    worker_calculator = calculator_utils.get_calculator(settings_path, logging)
+
+def calculate_energy_in_worker(molecule, model, fragment_indicies, num_threads, memory, qm_options):
+    """
+    Calculates the energy of a subset of the fragments of a molecule with the Calculator of this worker process.
+
+    Args:
+        molecule            - The Molecule to perform the calculation on.
+        model               - The Model to use for the calculation.
+        fragment_indicies   - List of the indicies of the fragments to include in the calculation.
+        num_threads         - Number of threads to perform the calculation with.
+        memory              - Amount of memory in MB to perform the calculation with, or None to use the settings.
+        qm_options          - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+
+    Returns:
+        (calculated energy, path to the log file), the energy is None if the calculation failed.
+    """
+
+    return calculate_energy(worker_calculator, molecule, model, fragment_indicies, num_threads, memory, qm_options)
+
+def calculate_energy(calc, molecule, model, fragment_indicies, num_threads, memory, qm_options):
+    """
+    Calculates the energy of a subset of the fragments of a molecule with the given number of threads and memory.
+
+    Args:
+        calc                - The Calculator to perform the calculation with.
+        molecule            - The Molecule to perform the calculation on.
+        model               - The Model to use for the calculation.
+        fragment_indicies   - List of the indicies of the fragments to include in the calculation.
+        num_threads         - Number of threads to perform the calculation with, or None to use the settings.
+        memory              - Amount of memory in MB to perform the calculation with, or None to use the settings.
+        qm_options          - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+
+    Returns:
+        (calculated energy, path to the log file), the energy is None if the calculation failed.
+    """
+
+    calc.set_num_threads(num_threads)
+    calc.set_memory(memory)
+
+    try:
+        return calc.calculate_energy(molecule, model, fragment_indicies, qm_options=qm_options)
+    except LibraryCallError as e:
+        return None, e.log_path
+
+class CalculationExecutor:
+    """
+    Performs many energy calculations at the same time in a pool of worker processes, within a budget of cores and
+    memory for all of them.
+
+    Each calculation gets a number of threads that grows with the number of atoms in it, so small calculations do not
+    hold cores they cannot use and large ones are not starved. A calculation only starts once there are enough free
+    cores and memory for it. If the next calculation does not fit yet, smaller calculations after it start ahead of it,
+    but only until max_cores of them have, then it waits for enough cores to free up.
+
+    The worker processes live as long as the CalculationExecutor, so each one sets up its Calculator once. A worker that
+    crashes only fails the calculation it was performing and is replaced.
+
+    Use as a context manager, so the worker processes are shut down when done.
+    """
+
+    def __init__(self, settings_path, max_cores=None, max_threads_per_job=None, atoms_per_thread=3, max_memory=None,
+                 memory_per_thread=None, logging=False):
+        """
+        Constructor for a CalculationExecutor.
+
+        Args:
+            settings_path   - Path to the settings.ini, used by every worker process to create its Calculator.
+            max_cores       - Number of cores all calculations running at the same time may use together. If None,
+                    calculations are performed in this process with the number of threads and memory in the settings,
+                    by Calculator.calculate_energies().
+                Default: None
+            max_threads_per_job - Most threads one calculation may use.
+                Default: max_cores
+            atoms_per_thread - Number of atoms per thread a calculation gets, including ghost atoms.
+                Default: 3
+            max_memory      - Amount of memory in MB all calculations running at the same time may use together, or
+                    None for no limit.
+                Default: None
+            memory_per_thread - Amount of memory in MB a calculation gets per thread, or None to use the amount in
+                    the settings.
+                Default: None
+            logging         - Whether the Calculators should output logging messages.
+                Default: False
+
+        Returns:
+            None
+        """
+
+        if max_cores is not None and max_cores < 1:
+            raise InvalidValueError("max_cores", max_cores, "at least 1 or None.")
+
+        if max_threads_per_job is not None and max_threads_per_job < 1:
+            raise InvalidValueError("max_threads_per_job", max_threads_per_job, "at least 1 or None.")
+
+        if atoms_per_thread < 1:
+            raise InvalidValueError("atoms_per_thread", atoms_per_thread, "at least 1.")
+
+        self.settings_path = settings_path
+        self.max_cores = max_cores
+        self.max_threads_per_job = max_threads_per_job if max_threads_per_job is not None else max_cores
+        if max_cores is not None:
+            self.max_threads_per_job = min(self.max_threads_per_job, max_cores)
+        self.atoms_per_thread = atoms_per_thread
+        self.max_memory = max_memory
+        self.memory_per_thread = memory_per_thread
+        self.logging = logging
+
+        self.calculator = None
+        self.pool = None
+
+        self.cores_in_use = 0
+        self.memory_in_use = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the worker processes.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def get_num_threads(self, molecule, model, fragment_indicies):
+        """
+        Gets the number of threads a calculation gets.
+
+        Args:
+            molecule        - The Molecule the calculation is performed on.
+            model           - The Model the calculation uses. If it has cp enabled, the other fragments are included
+                    as ghost atoms and count towards the size of the calculation.
+            fragment_indicies - List of the indicies of the fragments included in the calculation.
+
+        Returns:
+            Number of atoms in the calculation divided by atoms_per_thread, rounded up and at most
+            max_threads_per_job.
+        """
+
+        if model.get_cp():
+            num_atoms = molecule.get_num_atoms()
+        else:
+            num_atoms = sum(molecule.get_fragments()[index].get_num_atoms() for index in fragment_indicies)
+
+        return max(1, min(self.max_threads_per_job, math.ceil(num_atoms / self.atoms_per_thread)))
+
+    def get_memory(self, num_threads):
+        """
+        Gets the amount of memory a calculation gets.
+
+        Args:
+            num_threads     - Number of threads the calculation gets.
+
+        Returns:
+            Amount of memory in MB, or None if the amount in the settings is used.
+        """
+
+        if self.memory_per_thread is None:
+            return None
+
+        return num_threads * self.memory_per_thread
+
+    def fits(self, num_threads, memory):
+        """
+        Checks whether a calculation can start without going over the budget of cores and memory.
+
+        Args:
+            num_threads     - Number of threads of the calculation.
+            memory          - Amount of memory in MB of the calculation, or None.
+
+        Returns:
+            True if there are enough free cores and memory for the calculation, False otherwise.
+        """
+
+        if self.cores_in_use + num_threads > self.max_cores:
+            return False
+
+        if self.max_memory is not None and memory is not None and self.memory_in_use + memory > self.max_memory:
+            # a calculation that needs more memory than the whole budget may still run alone.
+            return self.memory_in_use == 0
+
+        return True
+
+    def calculate_energies(self, calculations, qm_options={}):
+        """
+        Performs energy calculations, reading them from calculations only as they are about to start, so calculations
+        can be a generator of any length.
+
+        Args:
+            calculations    - Iterable of (key, molecule, model, fragment_indicies) tuples, one for each calculation.
+                    key is not used, only passed back with the result.
+            qm_options      - Dictionary of extra arguments to be passed to the QM code doing the calculations.
+
+        Yields:
+            (key, calculated energy, path to the log file) for each calculation, in the order they finish. The energy
+            is None if the calculation failed.
+        """
+
+        if self.max_cores is None:
+            if self.calculator is None:
+                self.calculator = calculator_utils.get_calculator(self.settings_path, self.logging)
+
+            yield from self.calculator.calculate_energies(calculations, qm_options=qm_options)
+            return
+
+        if self.pool is None:
+            self.pool = WorkerPool(self.max_cores, initializer=initialize_worker,
+                                   initargs=(self.settings_path, self.logging))
+
+        calculations = iter(calculations)
+
+        # calculations read from calculations that have not started yet. Reading ahead lets small calculations start
+        # ahead of one that does not fit.
+        waiting = deque()
+        num_overtaken = 0
+        exhausted = False
+
+        running = {}
+
+        try:
+            while True:
+                while not exhausted and len(waiting) < 2 * self.max_cores:
+                    try:
+                        key, molecule, model, fragment_indicies = next(calculations)
+                    except StopIteration:
+                        exhausted = True
+                        break
+
+                    num_threads = self.get_num_threads(molecule, model, fragment_indicies)
+                    waiting.append((key, molecule, model, fragment_indicies, num_threads, self.get_memory(num_threads)))
+
+                for calculation in list(waiting):
+                    key, molecule, model, fragment_indicies, num_threads, memory = calculation
+
+                    if not self.fits(num_threads, memory):
+                        if calculation is waiting[0] and num_overtaken >= self.max_cores:
+                            break
+                        continue
+
+                    if calculation is waiting[0]:
+                        num_overtaken = 0
+                    else:
+                        num_overtaken += 1
+
+                    waiting.remove(calculation)
+
+                    future = self.pool.submit(calculate_energy_in_worker, molecule, model, fragment_indicies,
+                                              num_threads, memory, qm_options)
+                    running[future] = (key, num_threads, memory)
+
+                    self.cores_in_use += num_threads
+                    self.memory_in_use += memory if memory is not None else 0
+
+                if len(running) == 0:
+                    return
+
+                finished, unfinished = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    key, num_threads, memory = running.pop(future)
+
+                    self.cores_in_use -= num_threads
+                    self.memory_in_use -= memory if memory is not None else 0
+
+                    try:
+                        result = future.result()
+                    except LibraryCallError as e:
+                        # the worker process crashed.
+                        result = None, e.log_path
+
+                    yield (key,) + result
+        finally:
+            # the caller stopped early or a calculation raised, do not start anything that is still queued.
+            for future in running:
+                future.cancel()
+
+            wait(running)
+
+            self.cores_in_use = 0
+            self.memory_in_use = 0
@@ -1,6 +1,6 @@
 # absolute module imports
-from mbfit.utils import SettingsReader, files
-from mbfit.exceptions import NoSuchLibraryError
+from mbfit.utils import SettingsReader, LogFile, files
+from mbfit.exceptions import NoSuchLibraryError, LibraryCallError
 from mbfit.molecule import Molecule
 
 def generate_input(molecule, fragment_indicies, model, cp, settings):
@@ -89,11 +89,12 @@ def retrieve_energy(molecule, fragment_indicies, model, cp, settings):
         qchem_in_path = files.get_energy_log_path(settings.get("files", "log_path"), molecule, method, basis, cp, suffix + ".in")
         qchem_out_path = files.get_energy_log_path(settings.get("files", "log_path"), molecule, method, basis, cp, suffix + ".out")
 
-        # find the energy inside the qchem file output
-        with open(qchem_out_path) as qchem_out_file:
-            for line in qchem_out_file:
-                if line.find("Total energy in the final basis set = ") != -1:
-                    return float(line[line.find("Total energy in the final basis set = ") + 39:])
+        # find the energy inside the qchem file output, it is near the end so search backwards
+        with LogFile(qchem_out_path) as qchem_out_file:
+            energy = qchem_out_file.get_text_after_last("Total energy in the final basis set =")
+
+        if energy is not None:
+            return float(energy)
     
         # if no line with "Total energy in the final basis set = " is found, raise an exception
         raise LibraryCallError("qchem", "energy calculation", "process returned file of incorrect format")
@@ -116,9 +117,40 @@ class Calculator:
         self.settings = SettingsReader(settings_path)
         self.logging = logging
 
+        # set by set_num_threads() and set_memory() to override the settings for the next calculations.
+        self.num_threads = None
+        self.memory = None
+
     def setLogging(self, logging):
         self.logging = logging
 
+    def set_num_threads(self, num_threads):
+        """
+        Sets the number of threads to use for calculations instead of the number in the settings.
+
+        Args:
+            num_threads     - The number of threads to use, or None to use the number in the settings.
+
+        Returns:
+            None
+        """
+
+        self.num_threads = num_threads
+
+    def set_memory(self, memory):
+        """
+        Sets the amount of memory to use for calculations instead of the amount in the settings. Only used by QM codes
+        that take the amount of memory to use, like psi4.
+
+        Args:
+            memory          - The amount of memory to use in MB, or None to use the amount in the settings.
+
+        Returns:
+            None
+        """
+
+        self.memory = memory
+
     def is_installed(self):
         raise NotImplementedError
 
@@ -144,6 +176,28 @@ class Calculator:
 
         raise NotImplementedError
 
+    def calculate_energies(self, calculations, qm_options={}):
+        """
+        Performs many energy calculations. Calculators that can perform several calculations more cheaply together than
+        one at a time override this.
+
+        Args:
+            calculations    - Iterable of (key, molecule, model, fragment_indicies) tuples, one for each calculation.
+                    key is not used, only passed back with the result.
+            qm_options      - Dictionary of extra arguments to be passed to the QM code doing the calculations.
+                Default: {}
+
+        Yields:
+            (key, calculated energy, path to the log file) for each calculation, in the order they finish. The energy
+            is None if the calculation failed.
+        """
+
+        for key, molecule, model, fragment_indicies in calculations:
+            try:
+                yield (key,) + self.calculate_energy(molecule, model, fragment_indicies, qm_options=qm_options)
+            except LibraryCallError as e:
+                yield key, None, e.log_path
+
     def optimize_geometry(self, molecule, model, qm_options={}):
         """
         Optimizes the given input geometry with a provided model.
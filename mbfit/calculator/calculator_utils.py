@@ -1,10 +1,16 @@
-import itertools
+import itertools, os, time
 from .psi4_calculator import Psi4Calculator
 from .qchem_calculator import QchemCalculator
+from .analytic_calculator import AnalyticCalculator
 from mbfit.utils import SettingsReader, files, constants
 from mbfit.exceptions import NoSuchLibraryError, LibraryCallError, PotentialFittingError
 from mbfit.molecule import parse_training_set_file
 from .model import Model
+from .calculation_executor import CalculationExecutor
+from .decomposition import ManyBodyDecomposition
+from .screening import DistanceScreen
+from .fill_checkpoint import FillCheckpoint
+from .result_cache import ResultCache, CachedCalculator
 
 def get_calculator(settings_path, logging = True):
     """
@@ -15,106 +21,224 @@ def get_calculator(settings_path, logging = True):
         logging             - Not used at this time.
 
     Returns:
-        A new Calculator object.
+        A new Calculator object. If the settings have a result_cache in the energy_calculator section, it looks up and
+        adds the results of its calculations in the ResultCache at that path.
     """
     settings = SettingsReader(settings_path)
     if settings.get("energy_calculator", "code") == "psi4":
-        return Psi4Calculator(settings_path, logging)
+        calculator = Psi4Calculator(settings_path, logging)
     elif settings.get("energy_calculator", "code") == "qchem":
-        return QchemCalculator(settings_path, logging)
+        calculator = QchemCalculator(settings_path, logging)
+    elif settings.get("energy_calculator", "code") == "analytic":
+        calculator = AnalyticCalculator(settings_path, logging)
     else:
         raise NoSuchLibraryError(settings.get("energy_calculator", "code"))
 
-def fill_energies(settings_path, input_configs_path, monomer_settings_paths, optimized_geometry_paths, output_configs_path, method, basis, cp):
-    calculator = get_calculator(settings_path)
+    cache_path = settings.get("energy_calculator", "result_cache", "")
 
-    files.init_file(output_configs_path)
-    print("Calculating energies of optimized geometries...")
-    counter = 0
+    if cache_path != "":
+        calculator = CachedCalculator(calculator, ResultCache(cache_path))
 
-    optimized_energies = []
-    for monomer_settings_path, optimized_geometry_path in zip(monomer_settings_paths, optimized_geometry_paths):
-        molecule = list(parse_training_set_file(optimized_geometry_path, SettingsReader(monomer_settings_path)))[0]
-        try:
-            model = Model(method, basis, False)
+    return calculator
 
-            # calculate the missing energy
-            energy, log_path = calculator.calculate_energy(molecule, model, [0])
-            optimized_energies.append(energy * constants.au_to_kcal)
+def fill_energies(settings_path, input_configs_path, monomer_settings_paths, optimized_geometry_paths, output_configs_path, method, basis, cp, max_cores=None, checkpoint_interval=60):
+    """
+    Calculates the binding and interaction energies of each configuration in an xyz file, and writes the configurations
+    whose calculations all succeeded to another xyz file with the energies in their comment lines, in the same order.
 
-        except LibraryCallError as e:
-            raise PotentialFittingError("Energy calculation failed for optimized monomer {} with method {} and basis {}".format(molecule.get_name(), method, basis))
-        counter += 1
-        print("Completed optimized energy calculation for fragment number {}".format(counter))
+    If the settings have cutoffs in the screening section, the calculations of subsets of fragments that are too far
+    apart are skipped and their interaction energies are 0, see DistanceScreen.
 
-    calc_successes, calc_failures = 0, 0
-    total_successes, total_failures = 0, 0
+    Progress is saved in a FillCheckpoint next to the output file, which is removed once every configuration is done.
+    If the run is killed, running it again resumes from the checkpoint: the optimized monomers and the configurations
+    that were written are not calculated again, and neither are the calculations of later configurations that
+    succeeded. Failed calculations are tried again.
 
-    for molecule in parse_training_set_file(input_configs_path, SettingsReader(settings_path)):
+    Args:
+        settings_path       - Local path to '.ini' settings file with all relevant settings.
+        input_configs_path  - Local path to the '.xyz' file with the configurations.
+        monomer_settings_paths - Local path to the '.ini' settings file of each monomer.
+        optimized_geometry_paths - Local path to the '.xyz' file with the optimized geometry of each monomer.
+        output_configs_path - Local path to the '.xyz' file to write the configurations and their energies to.
+        method              - Method to calculate the energies with.
+        basis               - Basis to calculate the energies with.
+        cp                  - Use counterpoise correction?
+        max_cores           - Number of cores to perform calculations on at the same time, see CalculationExecutor.
+                Default is None, to perform one calculation at a time with the number of threads in the settings.
+        checkpoint_interval - Seconds between saves of the checkpoint, the most work that is lost if the run is killed.
+                Default is 60.
 
-        energies_dict = {}
-        success = True
+    Returns:
+        None.
+    """
 
-        for frag_indices, use_cp in get_energies_to_calculate(molecule.get_num_fragments(), cp):
-            try:
-                model = Model(method, basis, use_cp)
+    screen = DistanceScreen.from_settings(SettingsReader(settings_path))
 
-                # calculate the missing energy
-                energy, log_path = calculator.calculate_energy(molecule, model, frag_indices)
-                calc_successes += 1
-                energies_dict[(frag_indices, use_cp)] = energy * constants.au_to_kcal
+    checkpoint = FillCheckpoint(output_configs_path + ".checkpoint", input_configs_path, optimized_geometry_paths, method,
+                                basis, cp, screen)
 
-            except LibraryCallError as e:
-                calc_failures += 1
-                success = False
+    if checkpoint.load(output_configs_path):
+        print("Resuming from checkpoint {}, {} configurations are already done.".format(checkpoint.path, checkpoint.next_index))
+    else:
+        files.init_file(output_configs_path)
+        open(output_configs_path, "w").close()
+
+    counter = 0
+
+    with CalculationExecutor(settings_path, max_cores=max_cores) as executor:
+
+        if checkpoint.optimized_energies is None:
+            print("Calculating energies of optimized geometries...")
 
-        if not success:
-            total_failures += 1
-            continue
+            monomers = [list(parse_training_set_file(optimized_geometry_path, SettingsReader(monomer_settings_path)))[0]
+                        for monomer_settings_path, optimized_geometry_path in zip(monomer_settings_paths, optimized_geometry_paths)]
 
-        total_successes += 1
+            optimized_energies = [None for monomer in monomers]
 
-        deformation_energies = []
+            for index, energy, log_path in executor.calculate_energies((index, molecule, Model(method, basis, False), [0])
+                                                                       for index, molecule in enumerate(monomers)):
+                if energy is None:
+                    raise PotentialFittingError("Energy calculation failed for optimized monomer {} with method {} and basis {}".format(monomers[index].get_name(), method, basis))
 
-        for optimized_energy, deformed_energy in zip(optimized_energies, [item[1] for item in energies_dict.items() if len(item[0][0]) == 1 and item[0][1] is False]):
-            deformation_energies.append(deformed_energy - optimized_energy)
+                optimized_energies[index] = energy * constants.au_to_kcal
 
-        if molecule.get_num_fragments() == 1:
-            interaction_energy = deformation_energies[0]
-            binding_energy = deformation_energies[0]
+                counter += 1
+                print("Completed optimized energy calculation for fragment number {}".format(counter))
+
+            checkpoint.optimized_energies = optimized_energies
+            checkpoint.save()
         else:
+            print("Using the energies of optimized geometries in the checkpoint.")
+            optimized_energies = checkpoint.optimized_energies
+
+        calc_successes, calc_failures = 0, 0
+        total_successes, total_failures = checkpoint.successes, checkpoint.failures
+
+        num_screened = 0
+
+        # the molecule, its decomposition, its kept subsets, the calculations to perform and the energies calculated so
+        # far of each configuration whose calculations are not all done yet or that waits on an earlier configuration
+        # to be written.
+        configurations = {}
+
+        # one decomposition for each number of fragments, shared by all configurations with that many.
+        decompositions = {}
+
+        # energies in the checkpoint of the configurations not reached yet.
+        restored_energies = checkpoint.energies
 
-            interaction_energy = energies_dict[(tuple(range(molecule.get_num_fragments())), False)]
+        def get_calculations():
+            nonlocal num_screened
 
-            for m, energy in [(len(item[0][0]), item[1]) for item in energies_dict.items() if len(item[0][0]) < molecule.get_num_fragments() and item[0][1] is cp]:
-                if (molecule.get_num_fragments() - m) % 2 == 1:
-                    interaction_energy -= energy
+            for index, molecule in enumerate(parse_training_set_file(input_configs_path, SettingsReader(settings_path))):
+                if index < checkpoint.next_index:
+                    continue
+
+                if molecule.get_num_fragments() not in decompositions:
+                    decompositions[molecule.get_num_fragments()] = ManyBodyDecomposition(molecule.get_num_fragments(), cp)
+
+                decomposition = decompositions[molecule.get_num_fragments()]
+
+                if screen is None:
+                    kept = None
+                    calculations = decomposition.get_calculations()
                 else:
-                    interaction_energy += energy
+                    kept = screen.get_kept_subsets(molecule, decomposition.get_subsets())
+                    calculations = [calculation for calculation, is_kept in zip(decomposition.get_calculations(),
+                                                                                decomposition.get_kept_calculations(kept))
+                                    if is_kept]
+                    num_screened += len(decomposition.get_calculations()) - len(calculations)
 
-            binding_energy = interaction_energy
+                energies = restored_energies.pop(index, {})
+                configurations[index] = (molecule, decomposition, kept, calculations, energies)
 
-            for deformed_energy in deformation_energies:
-                binding_energy += deformed_energy
+                for frag_indices, use_cp in calculations:
+                    if (frag_indices, use_cp) not in energies:
+                        yield (index, frag_indices, use_cp), molecule, Model(method, basis, use_cp), frag_indices
 
-        with open(output_configs_path, "a") as output_configs_file:
-            output_configs_file.write("{}\n".format(molecule.get_num_atoms()))
-            output_configs_file.write("{} {}\n".format(binding_energy, interaction_energy))
-            output_configs_file.write(molecule.to_xyz())
-            output_configs_file.write("\n")
+        next_index = checkpoint.next_index
 
-        if (total_successes + total_failures) % 10 == 0:
-            print("{} Geometries complete!".format(total_successes + total_failures))
+        def write_configurations():
+            nonlocal next_index, total_successes, total_failures
+
+            # write configurations in the order of the input as soon as all their calculations are done.
+            while next_index in configurations and len(configurations[next_index][4]) == len(configurations[next_index][3]):
+                molecule, decomposition, kept, calculations, energies = configurations.pop(next_index)
+
+                if None in energies.values():
+                    total_failures += 1
+                else:
+                    total_successes += 1
+
+                    binding_energy, interaction_energy = decomposition.get_binding_and_interaction_energies(
+                            [energies.get(key, 0) for key in decomposition.get_calculations()], optimized_energies, kept)
+
+                    write_configuration(output_configs_path, molecule, binding_energy, interaction_energy)
+
+                next_index += 1
+
+                if (total_successes + total_failures) % 10 == 0:
+                    print("{} Geometries complete!".format(total_successes + total_failures))
+
+        def save_checkpoint():
+            checkpoint.next_index = next_index
+            checkpoint.output_size = os.path.getsize(output_configs_path)
+            checkpoint.successes = total_successes
+            checkpoint.failures = total_failures
+            checkpoint.energies = dict(restored_energies)
+            checkpoint.energies.update({index: {key: energy for key, energy in configuration[4].items() if energy is not None}
+                                        for index, configuration in configurations.items()})
+            checkpoint.save()
+
+        last_save = time.time()
+
+        for (index, frag_indices, use_cp), energy, log_path in executor.calculate_energies(get_calculations()):
+
+            if energy is None:
+                calc_failures += 1
+            else:
+                calc_successes += 1
+                energy *= constants.au_to_kcal
+
+            configurations[index][4][(frag_indices, use_cp)] = energy
+
+            write_configurations()
+
+            if time.time() - last_save >= checkpoint_interval:
+                save_checkpoint()
+                last_save = time.time()
+
+        # configurations whose energies were all in the checkpoint have no calculations to trigger their writing.
+        write_configurations()
+
+    checkpoint.remove()
 
     print("Completed finding energies in training set. {} configurations included in training set, {} configurations not included".format(total_successes, total_failures)
           + " due to at least one failed calculation.")
 
+    if screen is not None:
+        print("Skipped {} calculations of subsets of fragments beyond the screening cutoffs.".format(num_screened))
+
+def write_configuration(output_configs_path, molecule, binding_energy, interaction_energy):
+    """
+    Appends a configuration with its binding and interaction energies in the comment line to an xyz file.
+
+    Args:
+        output_configs_path - Local path to the '.xyz' file to append the configuration to.
+        molecule            - The configuration.
+        binding_energy      - The binding energy of the configuration in kcal/mol.
+        interaction_energy  - The n-body interaction energy of the configuration in kcal/mol.
+
+    Returns:
+        None.
+    """
+
+    with open(output_configs_path, "a") as output_configs_file:
+        output_configs_file.write("{}\n".format(molecule.get_num_atoms()))
+        output_configs_file.write("{} {}\n".format(binding_energy, interaction_energy))
+        output_configs_file.write(molecule.to_xyz())
+        output_configs_file.write("\n")
+
 
 def get_energies_to_calculate(num_bodies, cp):
-    permutations = []
-    for i in range(1, num_bodies + 1):
-        perms = list(itertools.combinations(range(num_bodies), i))
-        for p in perms:
-            if cp and i < num_bodies:
-                yield p, True
-            yield p, False
+    return ManyBodyDecomposition(num_bodies, cp).get_calculations()
@@ -0,0 +1,201 @@
+# external package imports
+import itertools
+import numpy
+
+class ManyBodyDecomposition:
+    """
+    Many-body decomposition of the energies of the subsets of the fragments of a configuration with a fixed number of
+    fragments, by inclusion-exclusion:
+
+        V(S) = sum over the subsets T of S of (-1)^(|S| - |T|) E(T)
+
+    is the |S|-body interaction energy of the fragments in S, and the k-body energy of the configuration is the sum of
+    V(S) over all S with k fragments.
+
+    The coefficients of each V(S) and each k-body energy in the subset energies are computed once for a number of
+    fragments, so decomposing a configuration is one matrix-vector product and decomposing many configurations of the
+    same number of fragments is one matrix product.
+
+    The subset energies are given in the order of get_calculations(), the calculations fill_energies() performs. With
+    counterpoise correction, every subset but the whole configuration is calculated both with and without the other
+    fragments as ghost atoms. The interaction energies use the counterpoise corrected ones, and the deformation
+    energies of the monomers the uncorrected ones.
+
+    Subsets whose calculations were skipped, as by a DistanceScreen, are given by a mask of the subsets that were
+    kept. Every subset of a kept subset must be kept. Screened subsets have an interaction energy of 0, and the
+    energies of their calculations are ignored.
+    """
+
+    def __init__(self, num_fragments, cp=False):
+        """
+        Constructor for a ManyBodyDecomposition.
+
+        Args:
+            num_fragments   - Number of fragments in the configurations to decompose.
+            cp              - Whether the interaction energies are counterpoise corrected.
+                Default: False
+
+        Returns:
+            None
+        """
+
+        self.num_fragments = num_fragments
+        self.cp = cp
+
+        self.calculations = []
+        self.subsets = []
+
+        for size in range(1, num_fragments + 1):
+            for subset in itertools.combinations(range(num_fragments), size):
+                self.subsets.append(subset)
+
+                if cp and size < num_fragments:
+                    self.calculations.append((subset, True))
+                self.calculations.append((subset, False))
+
+        columns = {calculation: column for column, calculation in enumerate(self.calculations)}
+        rows = {subset: row for row, subset in enumerate(self.subsets)}
+
+        # row of the subset of each calculation, to mask the calculations of screened subsets.
+        self.calculation_rows = numpy.array([rows[subset] for subset, use_cp in self.calculations])
+
+        # column of the energy used for each subset in the interaction energies.
+        subset_columns = {subset: columns[(subset, cp and len(subset) < num_fragments)] for subset in self.subsets}
+
+        self.interaction_matrix = numpy.zeros((len(self.subsets), len(self.calculations)))
+
+        for row, subset in enumerate(self.subsets):
+            for size in range(1, len(subset) + 1):
+                for subsubset in itertools.combinations(subset, size):
+                    self.interaction_matrix[row, subset_columns[subsubset]] += (-1) ** (len(subset) - size)
+
+        # sums the interaction energies of the subsets of each size.
+        self.size_matrix = numpy.zeros((num_fragments, len(self.subsets)))
+
+        for row, subset in enumerate(self.subsets):
+            self.size_matrix[len(subset) - 1, row] = 1
+
+        self.nbody_matrix = self.size_matrix.dot(self.interaction_matrix)
+
+        self.monomer_columns = numpy.array([columns[((index,), False)] for index in range(num_fragments)])
+
+    def get_calculations(self):
+        """
+        Gets the calculations whose energies are decomposed, in the order their energies are given.
+
+        Args:
+            None
+
+        Returns:
+            List of (fragment indices, use cp) tuples, in order of the number of fragments and then of the indices.
+        """
+
+        return self.calculations
+
+    def get_subsets(self):
+        """
+        Gets the subsets of fragments that have an interaction energy, in the order of get_interaction_energies().
+
+        Args:
+            None
+
+        Returns:
+            List of tuples of fragment indices, in order of the number of fragments and then of the indices.
+        """
+
+        return self.subsets
+
+    def get_kept_calculations(self, kept):
+        """
+        Finds which calculations are needed when only some subsets are kept.
+
+        Args:
+            kept            - Array with True for each subset that is kept, in the order of get_subsets().
+
+        Returns:
+            numpy array with True for each calculation that is needed, in the order of get_calculations().
+        """
+
+        return numpy.asarray(kept, dtype=bool)[..., self.calculation_rows]
+
+    def get_interaction_energies(self, energies, kept=None):
+        """
+        Gets the interaction energy of each subset of fragments.
+
+        Args:
+            energies        - Array of the energy of each calculation, in the order of get_calculations(). Or a 2D array
+                    with a row like that for each of many configurations.
+            kept            - Array with True for each subset that was kept, in the order of get_subsets(), or a row
+                    like that for each configuration. None if all were kept.
+                Default: None
+
+        Returns:
+            Array of the interaction energy of each subset, in the order of get_subsets(). A row for each configuration
+            if energies has one.
+        """
+
+        if kept is None:
+            return numpy.asarray(energies).dot(self.interaction_matrix.T)
+
+        kept = numpy.asarray(kept, dtype=bool)
+        energies = numpy.where(self.get_kept_calculations(kept), energies, 0)
+
+        return energies.dot(self.interaction_matrix.T) * kept
+
+    def get_nbody_energies(self, energies, kept=None):
+        """
+        Gets the 1-body, 2-body, ... and n-body energies, the sums of the interaction energies of the subsets of each
+        size.
+
+        Args:
+            energies        - Array of the energy of each calculation, in the order of get_calculations(). Or a 2D array
+                    with a row like that for each of many configurations.
+            kept            - Array with True for each subset that was kept, in the order of get_subsets(), or a row
+                    like that for each configuration. None if all were kept.
+                Default: None
+
+        Returns:
+            Array of the k-body energy for each k from 1 to the number of fragments. A row for each configuration if
+            energies has one.
+        """
+
+        if kept is None:
+            return numpy.asarray(energies).dot(self.nbody_matrix.T)
+
+        return self.get_interaction_energies(energies, kept).dot(self.size_matrix.T)
+
+    def get_binding_and_interaction_energies(self, energies, optimized_energies, kept=None):
+        """
+        Gets the binding energy and the n-body interaction energy of configurations, as written to training sets.
+
+        The binding energy is the interaction energy plus the deformation energy of each monomer, its energy in the
+        configuration minus its energy at its optimized geometry. A configuration with a single fragment has only a
+        deformation energy, which is both.
+
+        Args:
+            energies        - Array of the energy of each calculation, in the order of get_calculations(). Or a 2D array
+                    with a row like that for each of many configurations.
+            optimized_energies - Energy of the optimized geometry of each monomer.
+            kept            - Array with True for each subset that was kept, in the order of get_subsets(), or a row
+                    like that for each configuration. None if all were kept.
+                Default: None
+
+        Returns:
+            (binding energies, interaction energies), each a number, or an array with one for each configuration if
+            energies has a row for each.
+        """
+
+        energies = numpy.asarray(energies)
+
+        deformation_energies = energies[..., self.monomer_columns] - numpy.asarray(optimized_energies)
+
+        if self.num_fragments == 1:
+            interaction_energies = deformation_energies[..., 0]
+            return interaction_energies, interaction_energies
+
+        if kept is None:
+            interaction_energies = energies.dot(self.interaction_matrix[-1])
+        else:
+            interaction_energies = self.get_interaction_energies(energies, kept)[..., -1]
+
+        return interaction_energies + deformation_energies.sum(axis=-1), interaction_energies
@@ -0,0 +1,147 @@
+# external package imports
+import json, os
+from hashlib import sha1
+
+class FillCheckpoint:
+    """
+    Record of the progress of fill_energies(), in a JSON file next to its output, so a run that crashed or was killed
+    can resume where it stopped instead of starting over.
+
+    It holds the energies of the optimized monomers, the index of the next configuration to write, the size of the
+    output file once every earlier configuration was written, and the energies of the calculations of later
+    configurations that already succeeded. Configurations are written to the output in order, so everything before
+    that index is done.
+
+    The checkpoint is only used by a run with the same configurations, optimized geometries, model, and screening. It
+    is written to a temporary file that then replaces the checkpoint, so a kill while saving leaves the last one intact.
+    """
+
+    def __init__(self, path, input_configs_path, optimized_geometry_paths, method, basis, cp, screen=None):
+        """
+        Constructor for a FillCheckpoint of a run of fill_energies(). Does not read the checkpoint file, see load().
+
+        Args:
+            path            - Local path to the checkpoint file.
+            input_configs_path - Local path to the '.xyz' file with the configurations.
+            optimized_geometry_paths - Local path to the '.xyz' file with the optimized geometry of each monomer.
+            method          - Method the energies are calculated with.
+            basis           - Basis the energies are calculated with.
+            cp              - Whether counterpoise correction is used.
+            screen          - DistanceScreen of the run, or None if nothing is screened.
+                Default: None
+
+        Returns:
+            None
+        """
+
+        self.path = path
+
+        # identifies the run, a checkpoint of any other run is ignored.
+        digest = sha1()
+
+        for file_path in [input_configs_path] + list(optimized_geometry_paths):
+            with open(file_path, "rb") as input_file:
+                for chunk in iter(lambda: input_file.read(1 << 20), b""):
+                    digest.update(chunk)
+
+        digest.update(json.dumps([method, basis, cp, None if screen is None else [screen.cutoffs, screen.distance]]).encode())
+
+        self.fingerprint = digest.hexdigest()
+
+        self.optimized_energies = None
+        self.next_index = 0
+        self.output_size = 0
+        self.successes = 0
+        self.failures = 0
+
+        # energies of each configuration from next_index on, keyed by (fragment indices, use cp).
+        self.energies = {}
+
+    def load(self, output_configs_path):
+        """
+        Reads the checkpoint file, and truncates the output to the configurations it records as written.
+
+        Args:
+            output_configs_path - Local path to the '.xyz' file fill_energies() writes to.
+
+        Returns:
+            True if the run can resume from the checkpoint, False if there is no usable checkpoint and the run has to
+            start over.
+        """
+
+        try:
+            with open(self.path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return False
+        except ValueError:
+            print("Checkpoint {} is corrupt, starting over.".format(self.path))
+            return False
+
+        if checkpoint["fingerprint"] != self.fingerprint:
+            print("Checkpoint {} is of a different run, starting over.".format(self.path))
+            return False
+
+        if not os.path.isfile(output_configs_path) or os.path.getsize(output_configs_path) < checkpoint["output_size"]:
+            print("Output {} is missing configurations recorded in checkpoint {}, starting over.".format(
+                    output_configs_path, self.path))
+            return False
+
+        self.optimized_energies = checkpoint["optimized_energies"]
+        self.next_index = checkpoint["next_index"]
+        self.output_size = checkpoint["output_size"]
+        self.successes = checkpoint["successes"]
+        self.failures = checkpoint["failures"]
+        self.energies = {int(index): {(tuple(frag_indices), use_cp): energy for frag_indices, use_cp, energy in energies}
+                         for index, energies in checkpoint["energies"].items()}
+
+        # drops anything written after the checkpoint was saved, those configurations are written again.
+        with open(output_configs_path, "r+") as output_configs_file:
+            output_configs_file.truncate(self.output_size)
+
+        return True
+
+    def save(self):
+        """
+        Writes the checkpoint file atomically.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        checkpoint = {
+            "fingerprint": self.fingerprint,
+            "optimized_energies": self.optimized_energies,
+            "next_index": self.next_index,
+            "output_size": self.output_size,
+            "successes": self.successes,
+            "failures": self.failures,
+            "energies": {str(index): [[list(frag_indices), use_cp, energy] for (frag_indices, use_cp), energy in energies.items()]
+                         for index, energies in self.energies.items()}
+        }
+
+        temporary_path = self.path + ".tmp"
+
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+
+        os.replace(temporary_path, self.path)
+
+    def remove(self):
+        """
+        Deletes the checkpoint file, once the run it records is finished.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        if os.path.isfile(self.path):
+            os.remove(self.path)
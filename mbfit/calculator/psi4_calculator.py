@@ -43,25 +43,54 @@ class Psi4Calculator(Calculator):
     def is_valid_model(self, model):
         return model.get_method().lower() in psi4.procedures['energy'].keys()
 
-    def initialize_calculation(self, log_path):
+    def clean_up(self):
         """
-        Sets the log file, number of threads, and memory for psi4 to use.
+        Clears the scratch files, variables, and options psi4 keeps from previous calculations, so they do not leak into
+        the next calculation performed in this process.
+
+        Args:
+            None
+
+        Returns:
+            None.
+        """
+
+        psi4.core.clean()
+        psi4.core.clean_variables()
+        psi4.core.clean_options()
+
+    def initialize_calculation(self, log_path, qm_options={}):
+        """
+        Clears the state of previous calculations, then sets the options, log file, number of threads, and memory for
+        psi4 to use.
 
         Args:
             log_path        - The path to the log file to set.
+            qm_options      - Dictionary of extra arguments to be passed to psi4.
+                Default: {}
 
         Returns:
             None.
         """
 
+        self.clean_up()
+
+        psi4.set_options(qm_options)
+
         # set the log file
         psi4.core.set_output_file(log_path, False)
 
-        # set the number of threads to use to compute based on settings
-        psi4.set_num_threads(self.settings.getint("psi4", "num_threads", 1))
+        # set the number of threads to use to compute based on settings, unless set_num_threads() overrides it
+        if self.num_threads is not None:
+            psi4.set_num_threads(self.num_threads)
+        else:
+            psi4.set_num_threads(self.settings.getint("psi4", "num_threads", 1))
 
-        # set the amount of memory to use based on settings
-        psi4.set_memory(self.settings.get("psi4", "memory", "1000 MB"))
+        # set the amount of memory to use based on settings, unless set_memory() overrides it
+        if self.memory is not None:
+            psi4.set_memory("{} MB".format(self.memory))
+        else:
+            psi4.set_memory(self.settings.get("psi4", "memory", "1000 MB"))
 
     def get_psi4_molecule(self, molecule, model, fragment_indicies = None):
         """
@@ -109,12 +138,12 @@ class Psi4Calculator(Calculator):
         if self.logging:
             print("Beginning energy calculation of {} with model {}/{} and cp = {}".format(molecule.get_name(), model.get_method(), model.get_basis(), model.get_cp()))
         
-        # file to write logs from psi4 calculation
-        log_path = files.get_energy_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), model.get_cp(), "out")
+        # file to write logs from psi4 calculation, calculations of different fragments of the same molecule may run at
+        # the same time, so they need their own files
+        suffix = "".join("_{}".format(index) for index in fragment_indicies)
+        log_path = files.get_energy_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), model.get_cp(), suffix + ".out")
         
-        psi4.set_options(qm_options)
-
-        self.initialize_calculation(log_path)
+        self.initialize_calculation(log_path, qm_options)
 
         psi4_mol = self.get_psi4_molecule(molecule, model, fragment_indicies)
         
@@ -153,9 +182,7 @@ class Psi4Calculator(Calculator):
 
         log_path = files.get_optimization_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), "log")
 
-        psi4.set_options(qm_options)
-
-        self.initialize_calculation(log_path)
+        self.initialize_calculation(log_path, qm_options)
 
         psi4_mol = self.get_psi4_molecule(molecule, model)
 
@@ -209,9 +236,7 @@ class Psi4Calculator(Calculator):
 
         log_path = files.get_frequencies_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), "log")
 
-        psi4.set_options(qm_options)
-
-        self.initialize_calculation(log_path)
+        self.initialize_calculation(log_path, qm_options)
 
         psi4_mol = self.get_psi4_molecule(molecule, model)
 
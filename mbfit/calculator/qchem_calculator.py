@@ -1,10 +1,14 @@
+# external package imports
+import asyncio, itertools, os
+
 # absolute module imports
-from mbfit.utils import files, system
+from mbfit.utils import files, system, LogFile
 from mbfit.molecule import Molecule
-from mbfit.exceptions import (LibraryNotAvailableError, LibraryCallError,
+from mbfit.exceptions import (LibraryNotAvailableError, LibraryCallError, InvalidValueError,
         ConfigMissingSectionError, ConfigMissingPropertyError, CommandExecutionError)
 
 from .calculator import Calculator
+from .qchem_runner import QchemRunner
 
 class QchemCalculator(Calculator):
 
@@ -35,57 +39,137 @@ class QchemCalculator(Calculator):
         except CommandExecutionError:
             return False
 
-    def create_input_file(self, file_path, molecule, model, job, fragment_indicies = None, qm_options={}):
+    def get_num_threads(self):
         """
-        Creates an input file for a Qchem calculation in the given file path.
+        Gets the number of threads to run qchem with.
+
+        Args:
+            None
+
+        Returns:
+            The number set by set_num_threads(), or the number in the settings if it was not set.
+        """
+
+        if self.num_threads is not None:
+            return self.num_threads
+
+        return self.settings.getint("qchem", "num_threads", 1)
+
+    def get_runner(self, max_jobs=None):
+        """
+        Gets a QchemRunner with the timeout, retries, and scratch directory in the settings.
+
+        Args:
+            max_jobs        - Most Qchem processes to run at the same time.
+                Default: max_jobs in the qchem section of the settings, or 1.
+
+        Returns:
+            A new QchemRunner.
+        """
+
+        if max_jobs is None:
+            max_jobs = self.settings.getint("qchem", "max_jobs", 1)
+
+        timeout = self.settings.getfloat("qchem", "timeout", 0)
+        scratch_path = self.settings.get("qchem", "scratch_path", "")
+
+        return QchemRunner(max_jobs=max_jobs,
+                           timeout=timeout if timeout > 0 else None,
+                           max_retries=self.settings.getint("qchem", "max_retries", 0),
+                           retry_delay=self.settings.getfloat("qchem", "retry_delay", 1.0),
+                           scratch_path=scratch_path if scratch_path != "" else None)
+
+    def get_input_string(self, molecule, model, job, fragment_indicies = None, qm_options={}):
+        """
+        Gets the input for one Qchem job.
 
         Args:
-            file_path       - The path to the file to write the input into.
             molecule        - The molecule that will be used in the calculation.
             model           - The model that will be used in the calculation. If the model has cp enabled, then fragments
                     not included in fragment_indicies will be included as ghost atoms.
-            job             - What job this input file should specify. For example: "sp", "opt", or "freq".
-            fragment_indicies - If not None, then only these fragments will be included in the input file.
+            job             - What job this input should specify. For example: "sp", "opt", or "freq".
+            fragment_indicies - If not None, then only these fragments will be included in the input.
                 Defualt: None
             qm_options       - Dictionary of extra arguments to be passed to the QM code doing the calculation.
 
         Returns:
-            None
+            The text of the input.
         """
 
-        with open(file_path, "w") as in_file:
-            in_file.write("$molecule\n")
+        lines = ["$molecule"]
 
-            in_file.write("{} {}\n".format(molecule.get_charge(fragment_indicies), molecule.get_spin_multiplicity(fragment_indicies)))
+        lines.append("{} {}".format(molecule.get_charge(fragment_indicies), molecule.get_spin_multiplicity(fragment_indicies)))
 
-            in_file.write("{}\n".format(molecule.to_xyz(fragment_indicies, model.get_cp())))
+        lines.append(molecule.to_xyz(fragment_indicies, model.get_cp()))
 
-            in_file.write("$end\n")
+        lines.append("$end")
 
-            in_file.write("\n")
+        lines.append("")
 
-            in_file.write("$rem\n")
+        lines.append("$rem")
 
-            in_file.write("jobtype {}\n".format(job))
+        lines.append("jobtype {}".format(job))
 
-            in_file.write("method {}\n".format(model.get_method()))
-            in_file.write("basis {}\n".format(model.get_basis()))
+        lines.append("method {}".format(model.get_method()))
+        lines.append("basis {}".format(model.get_basis()))
 
-            in_file.write("GEOM_OPT_MAX_CYCLES 200\n")
+        lines.append("GEOM_OPT_MAX_CYCLES 200")
 
-            # prevent qchem from reorienting in standard orientation.
-            if job == "freq":
-                in_file.write("SYM_IGNORE TRUE\n")
+        # prevent qchem from reorienting in standard orientation.
+        if job == "freq":
+            lines.append("SYM_IGNORE TRUE")
 
-            try:
-                in_file.write("ecp {}\n".format(self.settings.get("config_generator", "ecp")))
-            except (ConfigMissingSectionError, ConfigMissingPropertyError):
-                pass
+        try:
+            lines.append("ecp {}".format(self.settings.get("config_generator", "ecp")))
+        except (ConfigMissingSectionError, ConfigMissingPropertyError):
+            pass
+
+        for key, value in qm_options.items():
+            lines.append("{} {}".format(key, value))
+
+        lines.append("$end")
+
+        return "\n".join(lines) + "\n"
+
+    def create_input_file(self, file_path, molecule, model, job, fragment_indicies = None, qm_options={}):
+        """
+        Creates an input file for a Qchem calculation in the given file path.
+
+        Args:
+            file_path       - The path to the file to write the input into.
+            molecule        - The molecule that will be used in the calculation.
+            model           - The model that will be used in the calculation. If the model has cp enabled, then fragments
+                    not included in fragment_indicies will be included as ghost atoms.
+            job             - What job this input file should specify. For example: "sp", "opt", or "freq".
+            fragment_indicies - If not None, then only these fragments will be included in the input file.
+                Defualt: None
+            qm_options       - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+
+        Returns:
+            None
+        """
 
-            for key, value in qm_options.items():
-                in_file.write("{} {}\n".format(key, value))
+        with open(file_path, "w") as in_file:
+            in_file.write(self.get_input_string(molecule, model, job, fragment_indicies, qm_options=qm_options))
+
+    def create_multi_job_input_file(self, file_path, jobs, qm_options={}):
+        """
+        Creates an input file for many Qchem energy calculations in the given file path, which Qchem performs one after
+        the other in the same process.
 
-            in_file.write("$end\n")
+        Args:
+            file_path       - The path to the file to write the input into.
+            jobs            - List of (molecule, model, fragment_indicies) tuples, one for each calculation.
+            qm_options      - Dictionary of extra arguments to be passed to the QM code doing the calculations.
+                Default: {}
+
+        Returns:
+            None
+        """
+
+        with open(file_path, "w") as in_file:
+            in_file.write("\n@@@\n\n".join(self.get_input_string(molecule, model, "sp", fragment_indicies, qm_options=qm_options)
+                                            for molecule, model, fragment_indicies in jobs))
 
     def calculate_energy(self, molecule, model, fragment_indicies, qm_options={}):
         """
@@ -104,33 +188,185 @@ class QchemCalculator(Calculator):
             (calculated energy, path to the log file)
         """
 
+        runner = self.get_runner()
+
+        return runner.run(self.calculate_energy_async(runner, molecule, model, fragment_indicies, qm_options=qm_options))
+
+    async def calculate_energy_async(self, runner, molecule, model, fragment_indicies, qm_options={}):
+        """
+        Coroutine that calculates the energy of a subset of the fragments of a molecule with a provided model. The
+        output file is parsed in another thread, so it does not hold up other coroutines.
+
+        Args:
+            runner          - The QchemRunner to run Qchem with.
+            molecule        - The Molecule to perform the calculation on.
+            model           - The Model to use for the calculation.
+            fragment_indicies - List of the indicies of the fragments to include in the calculation.
+            qm_options      - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+                Default: {}
+
+        Returns:
+            (calculated energy, path to the log file)
+        """
+
         if self.logging:
             print("Beginning energy calculation of {} with model {}/{} and cp = {}".format(molecule.get_name(), model.get_method(), model.get_basis(), model.get_cp()))
 
+        # calculations of different fragments of the same molecule may run at the same time, so they need their own files
+        suffix = "".join("_{}".format(index) for index in fragment_indicies)
+
         # file to write qchem input in
-        qchem_in_path = files.get_energy_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), model.get_cp(), "in")
+        qchem_in_path = files.get_energy_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), model.get_cp(), suffix + ".in")
         
         self.create_input_file(qchem_in_path, molecule, model, "sp", fragment_indicies, qm_options=qm_options)
 
         # file to write qchem output in
-        qchem_out_path = files.get_energy_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), model.get_cp(), "out")
+        qchem_out_path = files.get_energy_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), model.get_cp(), suffix + ".out")
 
-        # get number of threads
-        num_threads = self.settings.getint("qchem", "num_threads", 1)
+        # run qchem
+        await runner.run_job(qchem_in_path, qchem_out_path, self.get_num_threads(), "energy calculation")
 
-        # perform system call to run qchem
-        try:
-            system.call("qchem", "-nt", str(num_threads), qchem_in_path, qchem_out_path)
-        except CommandExecutionError as e:
-            raise LibraryCallError("qchem", "energy calculation", str(e), log_path=qchem_out_path)
-
-        energy = self.find_energy_in_energy_calculation_output_file(qchem_out_path)
+        energy = await asyncio.get_running_loop().run_in_executor(None, self.find_energy_in_energy_calculation_output_file, qchem_out_path)
 
         if self.logging:
             print("Successfully completed energy calculation.")
 
         return energy, qchem_out_path
 
+    async def calculate_energies_async(self, runner, jobs, qm_options={}):
+        """
+        Coroutine that performs many energy calculations in one Qchem process, from a multi-job input file, so they
+        pay for starting Qchem once. The output is split into a log file for each calculation.
+
+        Args:
+            runner          - The QchemRunner to run Qchem with.
+            jobs            - List of (molecule, model, fragment_indicies) tuples, one for each calculation.
+            qm_options      - Dictionary of extra arguments to be passed to the QM code doing the calculations.
+                Default: {}
+
+        Returns:
+            List of (calculated energy, path to the log file), one for each calculation. The energy is None if the
+            calculation failed.
+        """
+
+        if len(jobs) == 1:
+            try:
+                return [await self.calculate_energy_async(runner, *jobs[0], qm_options=qm_options)]
+            except LibraryCallError as e:
+                return [(None, e.log_path)]
+
+        if self.logging:
+            print("Beginning {} energy calculations in one Qchem process.".format(len(jobs)))
+
+        log_path = self.settings.get("files", "log_path")
+
+        job_out_paths = [files.get_energy_log_path(log_path, molecule, model.get_method(), model.get_basis(), model.get_cp(),
+                                                   "".join("_{}".format(index) for index in fragment_indicies) + ".out")
+                         for molecule, model, fragment_indicies in jobs]
+
+        # the combined files are named after the first calculation.
+        qchem_in_path = job_out_paths[0][:-len(".out")] + "_batch.in"
+        qchem_out_path = job_out_paths[0][:-len(".out")] + "_batch.out"
+
+        self.create_multi_job_input_file(qchem_in_path, jobs, qm_options=qm_options)
+
+        try:
+            await runner.run_job(qchem_in_path, qchem_out_path, self.get_num_threads(), "energy calculation")
+        except LibraryCallError:
+            # the calculations that finished before qchem failed still have their energies in the output.
+            pass
+
+        return await asyncio.get_running_loop().run_in_executor(None, self.find_energies_in_multi_job_output_file, qchem_out_path, job_out_paths)
+
+    def find_energies_in_multi_job_output_file(self, qchem_out_path, job_out_paths):
+        """
+        Splits the output file of a multi-job Qchem input into the output file of each job, and retrieves the energy of
+        each job from them.
+
+        Args:
+            qchem_out_path  - The path to the output file to parse.
+            job_out_paths   - The path to write the output of each job to.
+
+        Returns:
+            List of (calculated energy, path to the log file), one for each job. The energy is None if the job failed,
+            and the log file is qchem_out_path if the job did not start.
+        """
+
+        sections = []
+
+        if os.path.isfile(qchem_out_path):
+            with LogFile(qchem_out_path) as log_file:
+                # qchem prints 'Running Job i of n' at the start of each job.
+                sections = log_file.split("Running Job")
+
+        if len(sections) > len(job_out_paths):
+            sections = []
+
+        results = []
+
+        for index, job_out_path in enumerate(job_out_paths):
+            if index >= len(sections):
+                results.append((None, qchem_out_path))
+                continue
+
+            with open(job_out_path, "w") as job_out_file:
+                job_out_file.write(sections[index])
+
+            try:
+                results.append((self.find_energy_in_energy_calculation_output_file(job_out_path), job_out_path))
+            except LibraryCallError as e:
+                results.append((None, e.log_path))
+
+        return results
+
+    def calculate_energies(self, calculations, qm_options={}, max_jobs=None, jobs_per_input=None):
+        """
+        Performs energy calculations with many Qchem processes running at the same time, reading them from
+        calculations only as they are about to start, so calculations can be a generator of any length.
+
+        Consecutive calculations are grouped into multi-job inputs of jobs_per_input calculations, so each group pays
+        for starting Qchem once. This is worth it for small calculations, where starting Qchem takes longer than
+        calculating the energy, like the monomers, dimers and ghost atom calculations of the same configuration.
+
+        Args:
+            calculations    - Iterable of (key, molecule, model, fragment_indicies) tuples, one for each calculation.
+                    key is not used, only passed back with the result.
+            qm_options      - Dictionary of extra arguments to be passed to the QM code doing the calculations.
+                Default: {}
+            max_jobs        - Most Qchem processes to run at the same time.
+                Default: max_jobs in the qchem section of the settings, or 1.
+            jobs_per_input  - Most calculations to perform in one Qchem process.
+                Default: jobs_per_input in the qchem section of the settings, or 1.
+
+        Yields:
+            (key, calculated energy, path to the log file) for each calculation, in the order they finish. The energy
+            is None if the calculation failed.
+        """
+
+        if jobs_per_input is None:
+            jobs_per_input = self.settings.getint("qchem", "jobs_per_input", 1)
+
+        if jobs_per_input < 1:
+            raise InvalidValueError("jobs_per_input", jobs_per_input, "at least 1.")
+
+        runner = self.get_runner(max_jobs)
+
+        def get_jobs():
+            iterator = iter(calculations)
+
+            while True:
+                group = list(itertools.islice(iterator, jobs_per_input))
+
+                if len(group) == 0:
+                    return
+
+                yield ([key for key, molecule, model, fragment_indicies in group],
+                       self.calculate_energies_async(runner, [(molecule, model, fragment_indicies) for key, molecule, model, fragment_indicies in group], qm_options=qm_options))
+
+        for keys, task in runner.as_completed(get_jobs()):
+            for key, (energy, log_path) in zip(keys, task.result()):
+                yield key, energy, log_path
+
     def find_energy_in_energy_calculation_output_file(self, qchem_out_path):
         """
         Parses the output file of a Qchem energy calculation and retrieves the energy that
@@ -143,11 +379,17 @@ class QchemCalculator(Calculator):
             The energy result in the output file.
         """
 
-        # find the energy inside the qchem file output
-        with open(qchem_out_path) as qchem_out_file:
-            for line in qchem_out_file:
-                if line.find("Total energy in the final basis set = ") != -1:
-                    return float(line[line.find("Total energy in the final basis set = ") + 39:])
+        # find the energy inside the qchem file output, it is near the end so search backwards
+        with LogFile(qchem_out_path) as log_file:
+            energy = log_file.get_text_after_last("Total energy in the final basis set =")
+
+            if energy is not None:
+                return float(energy)
+
+            error = log_file.get_text_after_last("Q-Chem fatal error occurred")
+
+        if error is not None:
+            raise LibraryCallError("qchem", "energy calculation", "Q-Chem fatal error occurred{}".format(error.rstrip()), log_path=qchem_out_path)
 
         # if no line with "Total energy in the final basis set = " is found, raise an exception
         raise LibraryCallError("qchem", "energy calculation", "output file is of incorrect format", log_path=qchem_out_path)
@@ -175,13 +417,11 @@ class QchemCalculator(Calculator):
 
         qchem_out_path = files.get_optimization_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), "out")
 
-        num_threads = self.settings.getint("qchem", "num_threads", 1)
+        num_threads = self.get_num_threads()
 
-        # make the qchem system call
-        try:
-            system.call("qchem", "-nt", str(num_threads), qchem_in_path, qchem_out_path)
-        except CommandExecutionError as e:
-            raise LibraryCallError("qchem", "optimize", str(e), log_path=qchem_out_path)
+        # run qchem
+        runner = self.get_runner()
+        runner.run(runner.run_job(qchem_in_path, qchem_out_path, num_threads, "optimize"))
 
         atoms_per_fragment = []
         name_per_fragment = []
@@ -223,21 +463,21 @@ class QchemCalculator(Calculator):
             (optimized geometry Molecule, optimized energy) from the output file.
         """
 
-        # parse the molecule's geometry out of the output file
-        found = False
-        # found is set to true when the keyword 'Final energy is' is found. If found is true, it then looks for the keyword
-        # 'ATOM' to look for the optimized geometry
-        qchem_out_string = ""
-        with open(qchem_out_path, "r") as qchem_out_file:
-            for line in qchem_out_file:
-                if found:
+        # parse the molecule's geometry out of the output file. It follows the last line with the keyword
+        # 'Final energy is', after the keyword 'ATOM', so search backwards for it
+        with LogFile(qchem_out_path) as log_file:
+            offset = log_file.find_last("Final energy is")
+
+            if offset != -1:
+                lines = log_file.read_lines(offset)
+                energy = float(next(lines).split()[3])
+
+                for line in lines:
                     if "ATOM" in line:
+                        qchem_out_string = ""
                         for atom_index in range(sum(atoms_per_fragment)):
-                            qchem_out_string += " ".join(qchem_out_file.readline().split()[1:]) + "\n"
+                            qchem_out_string += " ".join(next(lines).split()[1:]) + "\n"
                         return Molecule.read_xyz("{}\n\n".format(sum(atoms_per_fragment)) + qchem_out_string, atoms_per_fragment, name_per_fragment, charge_per_fragment, spin_multiplicity_per_fragment, symmetry_per_fragment, SMILE_per_fragment), energy
-                elif "Final energy is" in line:
-                    energy = float(line.split()[3])
-                    found = True
 
         # if we didn't find a geometry to parse, raise an exception.
         raise LibraryCallError("qchem", "optimize", "output file is of incorrect format", log_path=qchem_out_path)
@@ -264,12 +504,10 @@ class QchemCalculator(Calculator):
 
         qchem_out_path = files.get_frequencies_log_path(self.settings.get("files", "log_path"), molecule, model.get_method(), model.get_basis(), "out")
 
-        num_threads = self.settings.getint("qchem", "num_threads", 1)
+        num_threads = self.get_num_threads()
 
-        try:
-            system.call("qchem", "-nt", str(num_threads), qchem_in_path, qchem_out_path)
-        except CommandExecutionError as e:
-            raise LibraryCallError("qchem", "frequency", str(e), log_path=qchem_out_path)
+        runner = self.get_runner()
+        runner.run(runner.run_job(qchem_in_path, qchem_out_path, num_threads, "frequency"))
 
 
         normal_modes, frequencies, red_masses = self.find_normal_modes_frequencies_and_reduced_masses_in_frequency_output_file(qchem_out_path, molecule.get_num_atoms())
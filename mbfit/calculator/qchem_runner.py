@@ -0,0 +1,179 @@
+# external package imports
+import asyncio, os, shutil, signal, tempfile
+
+# absolute module imports
+from mbfit.exceptions import InvalidValueError, LibraryCallError, CommandNotFoundError
+
+class QchemRunner:
+    """
+    Runs Qchem processes with asyncio, so many of them can run at the same time from one thread.
+
+    Each job gets its own scratch directory, which is removed when it is done. A job that runs longer than timeout is
+    killed, and a job that fails or is killed is run again up to max_retries times, waiting twice as long before each
+    retry as before the last.
+    """
+
+    def __init__(self, max_jobs=1, timeout=None, max_retries=0, retry_delay=1.0, scratch_path=None):
+        """
+        Constructor for a QchemRunner.
+
+        Args:
+            max_jobs        - Most Qchem processes as_completed() runs at the same time.
+                Default: 1
+            timeout         - Seconds a Qchem process may run before it is killed, or None for no limit.
+                Default: None
+            max_retries     - Number of times a failed job is run again before giving up.
+                Default: 0
+            retry_delay     - Seconds to wait before the first retry of a job.
+                Default: 1.0
+            scratch_path    - Directory to create the scratch directory of each job in.
+                Default: $QCSCRATCH if it is set, otherwise the system's temporary directory.
+
+        Returns:
+            None
+        """
+
+        if max_jobs < 1:
+            raise InvalidValueError("max_jobs", max_jobs, "at least 1.")
+
+        if timeout is not None and timeout <= 0:
+            raise InvalidValueError("timeout", timeout, "greater than 0 or None.")
+
+        if max_retries < 0:
+            raise InvalidValueError("max_retries", max_retries, "at least 0.")
+
+        if retry_delay < 0:
+            raise InvalidValueError("retry_delay", retry_delay, "at least 0.")
+
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.scratch_path = scratch_path if scratch_path is not None else os.environ.get("QCSCRATCH")
+
+    async def run_job(self, in_path, out_path, num_threads, call):
+        """
+        Runs Qchem on an input file, retrying if it fails.
+
+        Args:
+            in_path         - Path to the Qchem input file.
+            out_path        - Path to write the Qchem output file to.
+            num_threads     - Number of threads to run Qchem with.
+            call            - Name of the kind of calculation, used in error messages.
+
+        Returns:
+            None.
+        """
+
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+            if self.scratch_path is not None:
+                os.makedirs(self.scratch_path, exist_ok=True)
+
+            scratch_path = tempfile.mkdtemp(prefix="qchem-", dir=self.scratch_path)
+
+            try:
+                try:
+                    # qchem is a script that starts other processes, put them all in a new process group so they can
+                    # be killed together.
+                    process = await asyncio.create_subprocess_exec("qchem", "-nt", str(num_threads), in_path, out_path,
+                                                                   stdout=asyncio.subprocess.PIPE,
+                                                                   stderr=asyncio.subprocess.PIPE,
+                                                                   env=dict(os.environ, QCSCRATCH=scratch_path),
+                                                                   start_new_session=True)
+                except FileNotFoundError:
+                    raise CommandNotFoundError("qchem") from None
+
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+                except asyncio.TimeoutError:
+                    message = "process timed out after {} seconds".format(self.timeout)
+                    continue
+                finally:
+                    if process.returncode is None:
+                        try:
+                            os.killpg(process.pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                        await process.wait()
+            finally:
+                shutil.rmtree(scratch_path, ignore_errors=True)
+
+            if process.returncode == 0:
+                return
+
+            if process.returncode == 127:
+                raise CommandNotFoundError("qchem")
+
+            message = "process returned exit code {}: {}".format(process.returncode, stderr.decode().strip())
+
+        raise LibraryCallError("qchem", call, "{} (after {} attempts)".format(message, self.max_retries + 1),
+                               log_path=out_path)
+
+    def run(self, coroutine):
+        """
+        Runs a coroutine, such as one returned by run_job(), and waits for it to finish.
+
+        Args:
+            coroutine       - The coroutine to run.
+
+        Returns:
+            The result of the coroutine.
+        """
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def as_completed(self, jobs):
+        """
+        Runs coroutines, at most max_jobs at a time, reading them from jobs only as they are about to start, so jobs
+        can be a generator of any length.
+
+        Args:
+            jobs            - Iterable of (key, coroutine) tuples. key is not used, only passed back with the result.
+
+        Yields:
+            (key, finished asyncio.Task) for each job, in the order they finish.
+        """
+
+        loop = asyncio.new_event_loop()
+
+        jobs = iter(jobs)
+        exhausted = False
+
+        running = {}
+
+        try:
+            while True:
+                while not exhausted and len(running) < self.max_jobs:
+                    try:
+                        key, coroutine = next(jobs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+
+                    running[loop.create_task(coroutine)] = key
+
+                if len(running) == 0:
+                    return
+
+                finished, unfinished = loop.run_until_complete(asyncio.wait(running,
+                                                                            return_when=asyncio.FIRST_COMPLETED))
+
+                for task in finished:
+                    yield running.pop(task), task
+        finally:
+            # the caller stopped early or a job raised, kill the processes that are still running.
+            for task in running:
+                task.cancel()
+
+            if len(running) > 0:
+                loop.run_until_complete(asyncio.wait(running))
+
+            loop.close()
@@ -0,0 +1,380 @@
+# external package imports
+import json, os, pickle, sqlite3, time, zlib
+from hashlib import sha1
+
+# absolute module imports
+from mbfit.exceptions import InvalidValueError, PotentialFittingError
+from mbfit.utils import files
+
+# local module imports
+from .calculator import Calculator
+
+class ResultCache:
+    """
+    Persistent cache of the results of QM calculations, in an SQLite file that any number of processes can share.
+
+    Results are keyed by their contents: the geometry of the fragments included in the calculation along with any
+    ghost atoms, its charge and spin multiplicity, the method, basis, and cp of the model, and the extra options passed
+    to the QM code. The same calculation is found in the cache no matter which molecule, training set, or run it came
+    from.
+    """
+
+    # the kinds of calculations that can be cached.
+    KINDS = ["energy", "optimization", "frequencies"]
+
+    def __init__(self, path):
+        """
+        Constructor for a ResultCache.
+
+        Args:
+            path            - Local path to the cache file. Created if it does not exist yet.
+
+        Returns:
+            None
+        """
+
+        self.path = path
+
+        # the connection of the process that opened it, worker processes open their own.
+        self.connection = None
+        self.pid = None
+
+        # hits and misses of this ResultCache for each kind of calculation, the totals of every process are kept in
+        # the statistics table.
+        self.hits = {kind: 0 for kind in ResultCache.KINDS}
+        self.misses = {kind: 0 for kind in ResultCache.KINDS}
+
+    def get_connection(self):
+        """
+        Gets the connection to the cache file of this process, opening it and creating the tables if needed.
+
+        Args:
+            None
+
+        Returns:
+            An open sqlite3 connection.
+        """
+
+        if self.connection is None or self.pid != os.getpid():
+            files.init_file(self.path, overwrite_method=files.OverwriteMethod.NONE)
+
+            try:
+                self.connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("PRAGMA synchronous=NORMAL")
+                self.connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, kind TEXT NOT NULL, "
+                                        "result BLOB NOT NULL, log_path TEXT, log BLOB, created REAL NOT NULL, "
+                                        "last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)")
+                self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used_index ON results (last_used)")
+                self.connection.execute("CREATE TABLE IF NOT EXISTS statistics (kind TEXT PRIMARY KEY, "
+                                        "hits INTEGER NOT NULL, misses INTEGER NOT NULL)")
+            except sqlite3.Error as e:
+                raise PotentialFittingError("Could not open result cache '{}': {}".format(self.path, e)) from None
+
+            self.pid = os.getpid()
+
+        return self.connection
+
+    def close(self):
+        """
+        Closes the connection to the cache file.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        if self.connection is not None and self.pid == os.getpid():
+            self.connection.close()
+
+        self.connection = None
+        self.pid = None
+
+    @staticmethod
+    def get_key(kind, molecule, model, fragment_indicies=None, qm_options={}):
+        """
+        Gets the key of a calculation in the cache.
+
+        Args:
+            kind            - The kind of calculation, one of ResultCache.KINDS.
+            molecule        - The Molecule the calculation is performed on.
+            model           - The Model of the calculation. If it has cp enabled, the fragments not included in
+                    fragment_indicies are part of the calculation as ghost atoms.
+            fragment_indicies - List of the indicies of the fragments included in the calculation, or None for all
+                    of them.
+                Default: None
+            qm_options      - Dictionary of extra arguments passed to the QM code doing the calculation.
+                Default: {}
+
+        Returns:
+            SHA1 hash of everything the result of the calculation depends on.
+        """
+
+        key_lines = [kind, molecule.to_xyz(fragment_indicies, model.get_cp()), str(molecule.get_charge(fragment_indicies)),
+                     str(molecule.get_spin_multiplicity(fragment_indicies)), model.get_method(), model.get_basis(),
+                     str(model.get_cp()), json.dumps(qm_options, sort_keys=True, default=str)]
+
+        # optimizations and frequency calculations return results that are built from the fragments of the molecule.
+        if kind != "energy":
+            key_lines += ["{} {} {} {} {}".format(fragment.get_name(), fragment.get_charge(),
+                                                 fragment.get_spin_multiplicity(), fragment.get_symmetry(),
+                                                 fragment.get_SMILE()) for fragment in molecule.get_fragments()]
+
+        return sha1("\n".join(key_lines).encode()).hexdigest()
+
+    def get(self, key, kind):
+        """
+        Gets the result of a calculation from the cache. If the log file of the calculation does not exist anymore,
+        it is written again from the cache.
+
+        Args:
+            key             - The key of the calculation, from get_key().
+            kind            - The kind of calculation, one of ResultCache.KINDS.
+
+        Returns:
+            The cached result of the calculation, or None if it is not in the cache.
+        """
+
+        connection = self.get_connection()
+
+        try:
+            row = connection.execute("SELECT result, log_path, log FROM results WHERE key = ?", (key,)).fetchone()
+
+            if row is None:
+                self.misses[kind] += 1
+                connection.execute("INSERT INTO statistics (kind, hits, misses) VALUES (?, 0, 1) "
+                                   "ON CONFLICT (kind) DO UPDATE SET misses = misses + 1", (kind,))
+                return None
+
+            self.hits[kind] += 1
+            connection.execute("UPDATE results SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            connection.execute("INSERT INTO statistics (kind, hits, misses) VALUES (?, 1, 0) "
+                               "ON CONFLICT (kind) DO UPDATE SET hits = hits + 1", (kind,))
+        except sqlite3.Error as e:
+            raise PotentialFittingError("Could not read result cache '{}': {}".format(self.path, e)) from None
+
+        result, log_path, log = row
+
+        if log_path is not None and log is not None and not os.path.isfile(log_path):
+            with open(files.init_file(log_path, overwrite_method=files.OverwriteMethod.NONE), "w") as log_file:
+                log_file.write(zlib.decompress(log).decode())
+
+        return pickle.loads(result)
+
+    def put(self, key, kind, result, log_path):
+        """
+        Adds the result of a calculation to the cache, along with its log file.
+
+        Args:
+            key             - The key of the calculation, from get_key().
+            kind            - The kind of calculation, one of ResultCache.KINDS.
+            result          - The result of the calculation, anything that can be pickled.
+            log_path        - Path to the log file of the calculation, or None if it has none.
+
+        Returns:
+            None
+        """
+
+        log = None
+
+        if log_path is not None and os.path.isfile(log_path):
+            with open(log_path, "r") as log_file:
+                log = zlib.compress(log_file.read().encode())
+
+        now = time.time()
+
+        try:
+            self.get_connection().execute("INSERT OR REPLACE INTO results (key, kind, result, log_path, log, created, "
+                                          "last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                          (key, kind, pickle.dumps(result), log_path, log, now, now))
+        except sqlite3.Error as e:
+            raise PotentialFittingError("Could not write result cache '{}': {}".format(self.path, e)) from None
+
+    def get_statistics(self):
+        """
+        Gets statistics of the cache.
+
+        Args:
+            None
+
+        Returns:
+            Dictionary with "entries", the number of results in the cache, "size", the size of the cache file in
+            bytes, "hits" and "misses", the hits and misses of this ResultCache, and "total_hits" and "total_misses",
+            the hits and misses of every process that ever used the cache. Hits and misses are dictionaries from the
+            kind of calculation to the count.
+        """
+
+        connection = self.get_connection()
+
+        try:
+            entries = connection.execute("SELECT count(*) FROM results").fetchone()[0]
+            totals = {kind: (hits, misses) for kind, hits, misses in
+                      connection.execute("SELECT kind, hits, misses FROM statistics")}
+        except sqlite3.Error as e:
+            raise PotentialFittingError("Could not read result cache '{}': {}".format(self.path, e)) from None
+
+        return {"entries": entries,
+                "size": os.path.getsize(self.path),
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "total_hits": {kind: totals.get(kind, (0, 0))[0] for kind in ResultCache.KINDS},
+                "total_misses": {kind: totals.get(kind, (0, 0))[1] for kind in ResultCache.KINDS}}
+
+    def evict(self, max_age=None, max_entries=None):
+        """
+        Removes results from the cache.
+
+        Args:
+            max_age         - Remove results that were last used more than this many seconds ago. None to keep
+                    results of any age.
+                Default: None
+            max_entries     - Remove the least recently used results until at most this many are left. None to keep
+                    any number of results.
+                Default: None
+
+        Returns:
+            The number of results removed.
+        """
+
+        if max_age is not None and max_age < 0:
+            raise InvalidValueError("max_age", max_age, "at least 0 or None.")
+
+        if max_entries is not None and max_entries < 0:
+            raise InvalidValueError("max_entries", max_entries, "at least 0 or None.")
+
+        connection = self.get_connection()
+
+        num_removed = 0
+
+        try:
+            if max_age is not None:
+                num_removed += connection.execute("DELETE FROM results WHERE last_used < ?",
+                                                  (time.time() - max_age,)).rowcount
+
+            if max_entries is not None:
+                num_removed += connection.execute("DELETE FROM results WHERE key NOT IN (SELECT key FROM results "
+                                                  "ORDER BY last_used DESC LIMIT ?)", (max_entries,)).rowcount
+
+            connection.execute("VACUUM")
+        except sqlite3.Error as e:
+            raise PotentialFittingError("Could not evict from result cache '{}': {}".format(self.path, e)) from None
+
+        return num_removed
+
+class CachedCalculator(Calculator):
+    """
+    Calculator that looks up the results of calculations in a ResultCache before performing them with another
+    Calculator, and adds the results of those it performs to the cache. Failed calculations are not cached.
+    """
+
+    def __init__(self, calculator, cache):
+        """
+        Constructor for a CachedCalculator.
+
+        Args:
+            calculator      - The Calculator to perform calculations that are not in the cache with.
+            cache           - The ResultCache to look up and add results in.
+
+        Returns:
+            None
+        """
+
+        self.calculator = calculator
+        self.cache = cache
+
+        self.settings = calculator.settings
+        self.logging = calculator.logging
+        self.num_threads = calculator.num_threads
+        self.memory = calculator.memory
+
+    def setLogging(self, logging):
+        self.logging = logging
+        self.calculator.setLogging(logging)
+
+    def set_num_threads(self, num_threads):
+        self.num_threads = num_threads
+        self.calculator.set_num_threads(num_threads)
+
+    def set_memory(self, memory):
+        self.memory = memory
+        self.calculator.set_memory(memory)
+
+    def is_installed(self):
+        return self.calculator.is_installed()
+
+    def is_valid_model(self, model):
+        return self.calculator.is_valid_model(model)
+
+    def calculate_energy(self, molecule, model, fragment_indicies, qm_options={}):
+        """
+        Calculates the energy of a subset of the fragments of a molecule with a provided model, unless it is in the
+        cache.
+
+        Args:
+            molecule        - The Molecule to perform the calculation on.
+            fragment_indicies - List of the indicies of the fragments to include in the calculation.
+            model           - The Model to use for the calculation.
+            qm_options       - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+
+        Returns:
+            (calculated energy, path to the log file)
+        """
+
+        key = ResultCache.get_key("energy", molecule, model, fragment_indicies, qm_options)
+
+        result = self.cache.get(key, "energy")
+
+        if result is None:
+            result = self.calculator.calculate_energy(molecule, model, fragment_indicies, qm_options=qm_options)
+            self.cache.put(key, "energy", result, result[-1])
+
+        return result
+
+    def optimize_geometry(self, molecule, model, qm_options={}):
+        """
+        Optimizes the given input geometry with a provided model, unless it is in the cache.
+
+        Args:
+            molecule        - The Molecule to perform the optimization on.
+            model           - The Model to use for the optimization.
+            qm_options       - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+
+        Returns:
+            (new optimized molecule, energy of the optimized geometry, path to the log file)
+        """
+
+        key = ResultCache.get_key("optimization", molecule, model, qm_options=qm_options)
+
+        result = self.cache.get(key, "optimization")
+
+        if result is None:
+            result = self.calculator.optimize_geometry(molecule, model, qm_options=qm_options)
+            self.cache.put(key, "optimization", result, result[-1])
+
+        return result
+
+    def calculate_frequencies(self, molecule, model, qm_options={}):
+        """
+        Performs a frequency calculation to find the normal modes, frequencies, and reduced masses of the molecule,
+        unless it is in the cache.
+
+        Args:
+            molecule        - The Molecule to perform the frequency calculation on.
+            model           - The Model to use for the claculation.
+            qm_options       - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+
+        Returns:
+            (normal modes, frequencies, reduced masses, path to log file)
+        """
+
+        key = ResultCache.get_key("frequencies", molecule, model, qm_options=qm_options)
+
+        result = self.cache.get(key, "frequencies")
+
+        if result is None:
+            result = self.calculator.calculate_frequencies(molecule, model, qm_options=qm_options)
+            self.cache.put(key, "frequencies", result, result[-1])
+
+        return result
@@ -0,0 +1,157 @@
+# external package imports
+import itertools
+import numpy
+
+# absolute module imports
+from mbfit.exceptions import InvalidValueError
+
+class DistanceScreen:
+    """
+    Screening policy that skips the calculations of subsets of fragments that are too far apart for their interaction
+    energy to matter. In large clusters most subsets of 3 or more fragments are spread out, and they are the most
+    expensive calculations.
+
+    A subset of k fragments is kept if every pair of its fragments is within the cutoff for subsets of k fragments,
+    measured between their centers of mass or between their closest atoms. Subsets of 1 fragment are always kept. The
+    cutoffs may not grow with k, so every subset of a kept subset is kept too, and the interaction energy of a kept
+    subset only needs energies that are calculated. Screened subsets have an interaction energy of 0.
+
+    Set by the screening section of the settings:
+        cutoffs             - Comma separated cutoffs in angstroms for subsets of 2, 3, 4, ... fragments. Larger
+                subsets use the last cutoff. Without cutoffs, nothing is screened.
+        distance            - "center_of_mass" or "minimum", how distances between fragments are measured.
+                Default: center_of_mass
+    """
+
+    DISTANCES = ["center_of_mass", "minimum"]
+
+    def __init__(self, cutoffs, distance="center_of_mass"):
+        """
+        Constructor for a DistanceScreen.
+
+        Args:
+            cutoffs         - List of the cutoffs in angstroms for subsets of 2, 3, 4, ... fragments. Larger subsets use
+                    the last cutoff.
+            distance        - How distances between fragments are measured, "center_of_mass" or "minimum".
+                Default: center_of_mass
+
+        Returns:
+            None
+        """
+
+        if len(cutoffs) == 0 or any(cutoff <= 0 for cutoff in cutoffs):
+            raise InvalidValueError("cutoffs", cutoffs, "a non-empty list of positive distances.")
+
+        if any(larger < smaller for larger, smaller in zip(cutoffs, cutoffs[1:])):
+            raise InvalidValueError("cutoffs", cutoffs, "in order from largest to smallest.")
+
+        if distance not in DistanceScreen.DISTANCES:
+            raise InvalidValueError("distance", distance, "one of {}.".format(DistanceScreen.DISTANCES))
+
+        self.cutoffs = cutoffs
+        self.distance = distance
+
+    @staticmethod
+    def from_settings(settings):
+        """
+        Gets the screening policy in the screening section of some settings.
+
+        Args:
+            settings        - SettingsReader of the settings.
+
+        Returns:
+            A new DistanceScreen, or None if the settings have no cutoffs.
+        """
+
+        cutoffs = settings.get("screening", "cutoffs", "")
+
+        if cutoffs.strip() == "":
+            return None
+
+        return DistanceScreen([float(cutoff) for cutoff in cutoffs.split(",")],
+                              settings.get("screening", "distance", "center_of_mass"))
+
+    def get_cutoff(self, num_fragments):
+        """
+        Gets the cutoff for subsets of a number of fragments.
+
+        Args:
+            num_fragments   - Number of fragments in the subsets, at least 2.
+
+        Returns:
+            The cutoff in angstroms.
+        """
+
+        return self.cutoffs[min(num_fragments - 2, len(self.cutoffs) - 1)]
+
+    def get_fragment_distances(self, molecule):
+        """
+        Gets the distance between each pair of fragments of a molecule.
+
+        Args:
+            molecule        - The Molecule to get the distances in.
+
+        Returns:
+            Symmetric numpy array with the distance in angstroms between fragments i and j in row i and column j.
+        """
+
+        fragments = molecule.get_fragments()
+
+        if self.distance == "center_of_mass":
+            centers = numpy.array([numpy.average([[atom.get_x(), atom.get_y(), atom.get_z()] for atom in fragment.get_atoms()],
+                                                 axis=0, weights=[atom.get_mass() for atom in fragment.get_atoms()])
+                                   for fragment in fragments])
+
+            return numpy.linalg.norm(centers[:, numpy.newaxis] - centers[numpy.newaxis], axis=2)
+
+        positions = numpy.array([[atom.get_x(), atom.get_y(), atom.get_z()] for fragment in fragments for atom in fragment.get_atoms()])
+        starts = numpy.cumsum([0] + [fragment.get_num_atoms() for fragment in fragments[:-1]])
+
+        atom_distances = numpy.linalg.norm(positions[:, numpy.newaxis] - positions[numpy.newaxis], axis=2)
+
+        return numpy.minimum.reduceat(numpy.minimum.reduceat(atom_distances, starts, axis=0), starts, axis=1)
+
+    def get_kept_subsets(self, molecule, subsets):
+        """
+        Finds which subsets of the fragments of a molecule are kept.
+
+        Args:
+            molecule        - The Molecule the subsets are of.
+            subsets         - List of tuples of fragment indices, such as ManyBodyDecomposition.get_subsets().
+
+        Returns:
+            numpy array with True for each subset that is kept and False for each that is screened.
+        """
+
+        distances = self.get_fragment_distances(molecule)
+
+        sizes = numpy.array([len(subset) for subset in subsets])
+        kept = numpy.ones(len(subsets), dtype=bool)
+
+        for size in numpy.unique(sizes):
+            if size < 2:
+                continue
+
+            rows = numpy.flatnonzero(sizes == size)
+            indices = numpy.array([subsets[row] for row in rows])
+            first, second = numpy.array(list(itertools.combinations(range(size), 2))).T
+
+            kept[rows] = distances[indices[:, first], indices[:, second]].max(axis=1) <= self.get_cutoff(size)
+
+        return kept
+
+    def get_screened_subsets(self, molecule):
+        """
+        Gets the subsets of the fragments of a molecule that are screened.
+
+        Args:
+            molecule        - The Molecule to screen.
+
+        Returns:
+            List of tuples of the fragment indices of each screened subset.
+        """
+
+        subsets = [subset for size in range(2, molecule.get_num_fragments() + 1)
+                   for subset in itertools.combinations(range(molecule.get_num_fragments()), size)]
+
+        return [subset for subset, kept in zip(subsets, self.get_kept_subsets(molecule, subsets)) if not kept]
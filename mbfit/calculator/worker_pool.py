@@ -0,0 +1,226 @@
+# external package imports
+import multiprocessing, pickle, queue, threading, traceback
+from concurrent.futures import Future
+
+# absolute module imports
+from mbfit.exceptions import InvalidValueError, LibraryCallError
+
+def run_worker(connection, initializer, initargs):
+    """
+    Main loop of a worker process of a WorkerPool. Performs the jobs received over connection one at a time and sends
+    back their results, until the pool closes connection.
+
+    Args:
+        connection          - The worker's end of the pipe to the pool.
+        initializer         - Function called once when the worker starts, or None.
+        initargs            - Arguments to call initializer with.
+
+    Returns:
+        None.
+    """
+
+    if initializer is not None:
+        initializer(*initargs)
+
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+
+        if job is None:
+            return
+
+        function, args = job
+
+        try:
+            reply = (True, function(*args))
+        except Exception as e:
+            # most of our exceptions cannot be rebuilt from their arguments, so send their traceback instead.
+            try:
+                pickle.loads(pickle.dumps(e))
+            except Exception:
+                e = RuntimeError(traceback.format_exc())
+
+            reply = (False, e)
+
+        connection.send(reply)
+
+class WorkerPool:
+    """
+    Pool of long-lived worker processes, each of which performs one job at a time sent to it over a pipe.
+
+    Every worker runs initializer once when it starts, so the cost of importing a QM code and setting up a Calculator
+    is paid once per worker instead of once per job. A worker that crashes only fails the job it was performing, with
+    a LibraryCallError, and is replaced by a new one for the next job.
+
+    submit() and shutdown() work like those of concurrent.futures.ProcessPoolExecutor.
+    """
+
+    def __init__(self, max_workers, initializer=None, initargs=()):
+        """
+        Constructor for a WorkerPool.
+
+        Args:
+            max_workers     - Number of worker processes. They are started as jobs are submitted.
+            initializer     - Function called once by each worker process when it starts, or None.
+                Default: None
+            initargs        - Arguments to call initializer with.
+                Default: ()
+
+        Returns:
+            None
+        """
+
+        if max_workers < 1:
+            raise InvalidValueError("max_workers", max_workers, "at least 1.")
+
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.initargs = initargs
+
+        # jobs that have not been sent to a worker yet, each is (future, function, args).
+        self.jobs = queue.Queue()
+
+        # one thread for each worker process, which sends it jobs and waits for their results.
+        self.threads = []
+
+        self.lock = threading.Lock()
+        self.num_crashes = 0
+        self.is_shut_down = False
+
+    def submit(self, function, *args):
+        """
+        Submits a job to be performed by one of the worker processes.
+
+        Args:
+            function        - The function to call, must be defined at the top level of a module.
+            args            - Arguments to call function with.
+
+        Returns:
+            A concurrent.futures.Future with the result of the job.
+        """
+
+        if self.is_shut_down:
+            raise RuntimeError("Cannot submit jobs to a WorkerPool that has been shut down.")
+
+        future = Future()
+        self.jobs.put((future, function, args))
+
+        if len(self.threads) < self.max_workers:
+            thread = threading.Thread(target=self.run_thread, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+        return future
+
+    def shutdown(self, wait=True):
+        """
+        Stops the worker processes once all submitted jobs are done.
+
+        Args:
+            wait            - If True, wait for the worker processes to stop before returning.
+                Default: True
+
+        Returns:
+            None
+        """
+
+        self.is_shut_down = True
+
+        for thread in self.threads:
+            self.jobs.put(None)
+
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+    def start_worker(self):
+        """
+        Starts a new worker process.
+
+        Args:
+            None
+
+        Returns:
+            (the worker process, the pool's end of the pipe to it)
+        """
+
+        connection, worker_connection = multiprocessing.Pipe()
+
+        # workers are started by several threads, and forking while another thread forks is not safe.
+        with self.lock:
+            process = multiprocessing.Process(target=run_worker,
+                                              args=(worker_connection, self.initializer, self.initargs), daemon=True)
+            process.start()
+
+        worker_connection.close()
+
+        return process, connection
+
+    def run_thread(self):
+        """
+        Main loop of a thread of the pool. Sends jobs to its worker process and sets the results of their futures,
+        starting a new worker process whenever the last one crashed.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        process, connection = None, None
+
+        try:
+            while True:
+                job = self.jobs.get()
+
+                if job is None:
+                    return
+
+                future, function, args = job
+
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                if process is None:
+                    process, connection = self.start_worker()
+
+                try:
+                    connection.send((function, args))
+                except (EOFError, OSError):
+                    pass
+                except Exception as e:
+                    # the arguments could not be pickled, the worker never saw the job.
+                    future.set_exception(e)
+                    continue
+
+                try:
+                    success, value = connection.recv()
+                except (EOFError, OSError):
+                    process.join()
+                    connection.close()
+
+                    with self.lock:
+                        self.num_crashes += 1
+
+                    future.set_exception(LibraryCallError("worker", function.__name__,
+                                                          "worker process exited with code {}".format(process.exitcode)))
+
+                    process, connection = None, None
+                    continue
+
+                if success:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        finally:
+            if process is not None:
+                try:
+                    connection.send(None)
+                except (EOFError, OSError):
+                    pass
+
+                process.join()
+                connection.close()
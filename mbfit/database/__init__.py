@@ -1,4 +1,6 @@
 from .database import Database
+from .database_pool import DatabasePool
+from .sqlite_database import SQLiteDatabase
 from .database_cleaner import clean_database
 from .database_cleaner import reset_database
 from .database_cleaner import delete_calculations
@@ -7,7 +9,7 @@ from .database_filler import fill_database
 from .database_filler import generate_inputs_from_database 
 from .database_filler import run_missing_calculations
 from .database_filler import retrieve_energies
-from .database_initializer import initialize_database
+from .database_initializer import initialize_database, import_calculations, parse_calculations_file
 from .training_set_generator import generate_1b_training_set, generate_2b_training_set, generate_training_set
 from .job_handler import JobHandler
 from .psi4_job_handler import Psi4JobHandler
@@ -1,5 +1,6 @@
 # external package imports
-import itertools, numpy as np, copy, sys, os
+import io, itertools, numpy as np, sys, os
+from contextlib import contextmanager
 
 # absolute module imports
 from mbfit.molecule import Atom, Fragment, Molecule
@@ -8,9 +9,13 @@ from mbfit.exceptions import PotentialFittingError, NoSuchMoleculeError, Databas
         NoPendingCalculationsError, StandardOrderError, LibraryNotAvailableError
 from mbfit.utils import SettingsReader
 
+# local module imports
+from .row_materializer import RowMaterializer
+from . import log_compression
+
 # only import psycopg2 if it is installed.
 try:
-    import psycopg2
+    import psycopg2, psycopg2.extras
 except ModuleNotFoundError:
     pass
 
@@ -20,16 +25,60 @@ class Database():
     Database class. Allows one to access a database and perform operations on it.
     """
     
-    def __init__(self, config_file, batch_size=100):
+    def __new__(cls, config_file, batch_size=100, pool=None, *args, **kwargs):
+        """
+        Creates a database object of the class for the backend named in the config file. Database(config_file) gives
+        a SQLiteDatabase if the database section of config_file has backend = sqlite, and a PostgreSQL Database
+        otherwise.
+
+        Args:
+            config_file     - .ini file describing the database.
+            batch_size      - Passed on to the initializer.
+            pool            - DatabasePool to borrow a connection from. If specified, the pool's backend is used
+                    instead of config_file's. Default is None.
+
+        Returns:
+            A new Database or SQLiteDatabase object, not yet initialized.
+        """
+
+        if cls is Database:
+            if pool is not None:
+                backend = pool.backend
+            else:
+                backend = SettingsReader(config_file).get("database", "backend", "postgresql")
+
+            if backend == "sqlite":
+                from .sqlite_database import SQLiteDatabase
+                cls = SQLiteDatabase
+            elif backend != "postgresql":
+                raise InvalidValueError("backend", backend, "must be 'postgresql' or 'sqlite'.")
+
+        return super().__new__(cls)
+
+    def __init__(self, config_file, batch_size=100, pool=None, packed_coordinates=None, max_batch_bytes=16777216, log_codec="zlib"):
         """
         Initializer for database object. Opens connection and sets up cursor.
 
         Args:
-            config_file     - .ini file containing host, port, database, username, and password.
+            config_file     - .ini file containing host, port, database, username, and password. Or backend = sqlite
+                    and the path of a SQLite database file, which gives a SQLiteDatabase instead.
                     Make sure only you have access to this file or your password will be compromised!
             batch_size      - number of operations to perfrom on the database per round trip to the server.
                     larger numbers will be more efficient, but you should not exceed a couple thousand.
                     Default is 100.
+            pool            - DatabasePool to borrow a connection from instead of opening a new one. The
+                    connection is given back to the pool when this Database is closed. If specified, the login
+                    info in config_file is ignored in favor of the pool's. Default is None.
+            packed_coordinates - True to fetch coordinates as packed binary blocks instead of array text,
+                    False to always fetch array text. None to use packed coordinates whenever the database
+                    supports them. Default is None.
+            max_batch_bytes - maximum number of bytes of log text to send to the database per round trip when
+                    setting properties. Batches are sent early if they reach this size before batch_size.
+                    Default is 16 MiB.
+            log_codec       - Codec to compress logs with before sending them to the database, "zlib" or "zstd".
+                    Compressed logs are stored once per distinct log text. None to send logs uncompressed. Logs
+                    are always sent uncompressed to databases that do not support compressed logs.
+                    Default is "zlib".
 
         Returns:
             A new Database object.
@@ -44,6 +93,30 @@ class Database():
         self.batch_size = 0
         self.set_batch_size(batch_size)
 
+        self.max_batch_bytes = 0
+        self.set_max_batch_bytes(max_batch_bytes)
+
+        if log_codec is not None:
+            log_compression.check_codec(log_codec)
+
+        self.log_codec = log_codec
+        self.compressed_logs = None
+
+        self.pool = pool
+        self.packed_coordinates = packed_coordinates
+        self.training_set_pages = None
+        self.bulk_tagging = None
+        self.bulk_import = None
+        self.bulk_delete = None
+        self.screening = None
+        self.row_materializers = {}
+
+        if pool is not None:
+            self.name = pool.name
+            self.connection = pool.get_connection()
+            self.cursor = self.connection.cursor()
+            return
+
         # parse the user's config file to get their login info
 
         config = SettingsReader(config_file)
@@ -124,13 +197,22 @@ class Database():
         Always close the database after you are done using it.
         Closing the database does NOT automatically save it.
         Any non-saved changes will be lost.
+        If this Database borrowed its connection from a DatabasePool, the connection is given back to the pool
+        instead of being closed.
         Args:
             None.
         Returns:
             None.
         """
 
-        self.connection.close()
+        if self.pool is not None:
+            # the connection may already be back in the pool if close() was called twice.
+            if self.connection is not None:
+                self.cursor.close()
+                self.pool.put_connection(self.connection)
+                self.connection = None
+        else:
+            self.connection.close()
 
     def set_batch_size(self, batch_size):
         """
@@ -158,6 +240,33 @@ class Database():
 
         return self.batch_size
 
+    def set_max_batch_bytes(self, max_batch_bytes):
+        """
+        Sets the maximum number of bytes of log text to send to the database per server round trip when setting
+        properties. A single calculation whose log is larger than this is sent on its own.
+        Args:
+            max_batch_bytes - The maximum number of bytes of log text to send per server round trip.
+        Returns:
+            None.
+        """
+
+        if max_batch_bytes < 1:
+            raise InvalidValueError("max_batch_bytes", max_batch_bytes, "must be at least 1.")
+
+        self.max_batch_bytes = max_batch_bytes
+
+    def get_max_batch_bytes(self):
+        """
+        Gets the maximum number of bytes of log text sent to the database per server round trip when setting
+        properties.
+        Args:
+            None.
+        Returns:
+            max_batch_bytes
+        """
+
+        return self.max_batch_bytes
+
     def get_notices(self):
         """
         Gets a list of all notices received from the Database. A notice is a logging message or warning that does
@@ -284,10 +393,41 @@ class Database():
             None.
         """
 
-        try:
+        with self.operation_errors():
             self.cursor.execute(
                 command,
                 params)
+
+    def execute_values(self, command, params, template=None):
+        """
+        Executes a PostgreSQL command once for many rows of values in a single round trip.
+        The String command must contain a single '%s' substring, which will be substituted for a VALUES list
+        with one entry per item in params.
+        Args:
+            command         - The command to run.
+            params          - List of tuples, one per row of values.
+            template        - Template for each row of values, such as "(%s, %s::integer[])". Use it to cast the
+                    values to the types the command expects. Default is None.
+        Returns:
+            None.
+        """
+
+        with self.operation_errors():
+            psycopg2.extras.execute_values(self.cursor, command, params, template=template, page_size=len(params))
+
+    @contextmanager
+    def operation_errors(self):
+        """
+        Context manager that turns errors raised by psycopg2 while running a command into DatabaseOperationErrors.
+        Rolls back the current transaction if the error left it unusable.
+        Args:
+            None.
+        Returns:
+            None.
+        """
+
+        try:
+            yield
         except psycopg2.OperationalError as e:
             raise DatabaseOperationError(self.name, str(e.diag.message_primary)) from None
         except psycopg2.InternalError as e:
@@ -297,6 +437,129 @@ class Database():
             self.connection.rollback()
             raise DatabaseOperationError(self.name, str(e.diag.message_primary)) from None
 
+    def get_coordinates_function(self, function_name):
+        """
+        Gets the name of the version of a function that should be used to fetch coordinates from the database.
+        Databases created with packed coordinate support have a version of every function that returns coordinates
+        whose name ends with _packed and returns the coordinates as a packed binary block instead of array text.
+        Args:
+            function_name   - Name of the function that returns coordinates as array text.
+        Returns:
+            The name of the function to call.
+        """
+
+        if self.packed_coordinates is None:
+            self.packed_coordinates = self.has_function("get_pending_calculations_packed")
+
+        if self.packed_coordinates:
+            return function_name + "_packed"
+
+        return function_name
+
+    def has_training_set_pages(self):
+        """
+        Checks whether the database can assemble training sets a page at a time in a single query. Databases created by
+        older versions of init.sql assemble them one configuration at a time instead.
+        Args:
+            None.
+        Returns:
+            True if the database has the get_training_set_page functions, False otherwise.
+        """
+
+        if self.training_set_pages is None:
+            self.training_set_pages = self.has_function("get_training_set_page")
+
+        return self.training_set_pages
+
+    def has_bulk_tagging(self):
+        """
+        Checks whether the database can tag a batch of calculations that are already in it in a single call, so
+        add_calculations() does not need to send them again. Databases created by older versions of init.sql add every
+        calculation with add_calculation instead.
+        Args:
+            None.
+        Returns:
+            True if the database has the tag_calculations function, False otherwise.
+        """
+
+        if self.bulk_tagging is None:
+            self.bulk_tagging = self.has_function("tag_calculations")
+
+        return self.bulk_tagging
+
+    def has_bulk_import(self):
+        """
+        Checks whether the database can merge a whole batch of imported calculations staged with COPY in a single call.
+        Databases created by older versions of init.sql import calculations one molecule at a time instead.
+        Args:
+            None.
+        Returns:
+            True if the database has the import_staged_calculations function, False otherwise.
+        """
+
+        if self.bulk_import is None:
+            self.bulk_import = self.has_function("import_staged_calculations")
+
+        return self.bulk_import
+
+    def has_bulk_delete(self):
+        """
+        Checks whether the database can reset and delete calculations a batch of molecules at a time with one statement
+        per table. Databases created by older versions of init.sql reset and delete them one molecule at a time instead.
+        Args:
+            None.
+        Returns:
+            True if the database has the delete_calculations_batch function, False otherwise.
+        """
+
+        if self.bulk_delete is None:
+            self.bulk_delete = self.has_function("delete_calculations_batch")
+
+        return self.bulk_delete
+
+    def has_screening(self):
+        """
+        Checks whether the database can skip the calculations of screened subsets of fragments. Databases created by
+        older versions of init.sql always calculate every subset.
+        Args:
+            None.
+        Returns:
+            True if the database has the screen_calculations function, False otherwise.
+        """
+
+        if self.screening is None:
+            self.screening = self.has_function("screen_calculations")
+
+        return self.screening
+
+    def has_function(self, function_name):
+        """
+        Checks whether the database has a function. Used to find out which features a database created by an older
+        version of init.sql supports.
+        Args:
+            function_name   - Name of the function.
+        Returns:
+            True if the database has a function with this name, False otherwise.
+        """
+
+        self.single_execute("SELECT EXISTS(SELECT 1 FROM pg_proc WHERE proname = %s)", (function_name,))
+        return self.cursor.fetchone()[0]
+
+    @staticmethod
+    def unpack_coordinates(atom_coordinates):
+        """
+        Turns coordinates received from the database into a list of floats.
+        Args:
+            atom_coordinates - Either a packed binary block of big-endian float64 values or a list of floats.
+        Returns:
+            List of the coordinates as floats.
+        """
+
+        if isinstance(atom_coordinates, (bytes, bytearray, memoryview)):
+            return np.frombuffer(atom_coordinates, dtype=">f8").tolist()
+
+        return atom_coordinates
+
     def create_postgres_array(self, *values):
         """
         Creates a postgres array with an arbitrary number of values.
@@ -312,7 +575,7 @@ class Database():
 
         return "{" + ",".join([str(i) for i in values]) + "}"
 
-    def add_calculations(self, molecule_list, method, basis, cp, *tags, optimized=False):
+    def add_calculations(self, molecule_list, method, basis, cp, *tags, optimized=False, screen=None):
         """
         Adds new calculations to the database.
         Will queue the database to calculate the energies of each molecule in the list
@@ -325,14 +588,14 @@ class Database():
             cp              - True if counterpoise correction should be used in the calculation of the molecules' energies.
             tags            - Set of tags to label these calculations in the database.
             optimized       - True if all molecules represent optimized geometries.
+            screen          - DistanceScreen whose screened subsets of fragments are not calculated, their interaction
+                    energies are 0 in training sets. Default is None, to calculate every subset.
         Returns:
-            None.
+            The number of calculations that were skipped because they were screened.
         """
 
-        command_string = ""
-        params = []
-
-        batch_count = 0
+        batch = []
+        num_screened = 0
 
         order, frag_order, SMILES = None, None, None
 
@@ -341,7 +604,58 @@ class Database():
                 order, frag_order = molecule.get_standard_order_order()
                 SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
 
-            molecule = molecule.get_reordered_copy(order, frag_order, SMILES)
+            batch.append(molecule.get_reordered_copy(order, frag_order, SMILES))
+
+            if len(batch) == self.batch_size:
+                num_screened += self.add_calculations_batch(batch, method, basis, cp, tags, optimized, screen)
+                batch = []
+
+        if len(batch) != 0:
+            num_screened += self.add_calculations_batch(batch, method, basis, cp, tags, optimized, screen)
+
+        return num_screened
+
+    def add_calculations_batch(self, molecule_list, method, basis, cp, tags, optimized, screen=None):
+        """
+        Adds the calculations of one batch of molecules in a single round trip.
+        If the database supports it, the calculations already in the database are looked up first, and are only
+        given the tags instead of being sent again.
+        Args:
+            molecule_list   - List of molecules in standard order, all of the same type.
+            method          - Method to use to calculate the molecules' energies.
+            basis           - Basis to use to calculate the molecules' energies.
+            cp              - True if counterpoise correction should be used in the calculation of the molecules' energies.
+            tags            - Set of tags to label these calculations in the database.
+            optimized       - True if all molecules represent optimized geometries.
+            screen          - DistanceScreen whose screened subsets of fragments are not calculated, or None.
+                Default: None
+        Returns:
+            The number of calculations that were skipped because they were screened.
+        """
+
+        if screen is not None and not self.has_screening():
+            raise DatabaseOperationError(self.name, "database has no screen_calculations function, recreate it with the "
+                                                    "current init.sql to screen calculations")
+
+        command_string = ""
+        params = []
+        num_screened = 0
+
+        existing_hashes = set()
+
+        if self.has_bulk_tagging():
+            existing_hashes = self.get_existing_hashes([molecule.get_SHA1() for molecule in molecule_list],
+                                                       "{}/{}/{}".format(method, basis, cp))
+
+        if len(existing_hashes) != 0:
+            command_string += "PERFORM tag_calculations(%s, %s, %s, %s, %s);"
+            params += (self.create_postgres_array(*existing_hashes), molecule_list[0].get_name(),
+                       "{}/{}/{}".format(method, basis, cp), self.create_postgres_array(*tags), optimized)
+
+        for molecule in molecule_list:
+            if molecule.get_SHA1() in existing_hashes:
+                continue
+
             coordinates = []
             for fragment in molecule.get_fragments():
                 for atom in fragment.get_atoms():
@@ -388,16 +702,33 @@ class Database():
             params += (
             fragment_counts, coordinates, method, basis, cp, self.create_postgres_array(*tags), optimized)
 
-            batch_count += 1
+            if screen is not None:
+                screened_subsets = screen.get_screened_subsets(molecule)
 
-            if batch_count == self.batch_size:
-                self.execute(command_string, params)
-                command_string = ""
-                params = []
-                batch_count = 0
+                if len(screened_subsets) != 0:
+                    command_string += "PERFORM screen_calculations(%s, %s, %s::varchar[], %s);"
+                    params += (molecule.get_SHA1(), "{}/{}/{}".format(method, basis, cp),
+                               [self.create_postgres_array(*subset) for subset in screened_subsets],
+                               self.create_postgres_array(*tags))
+                    num_screened += len(screened_subsets)
 
-        if batch_count != 0:
-            self.execute(command_string, params)
+        self.execute(command_string, params)
+
+        return num_screened
+
+    def get_existing_hashes(self, hashes, model_name):
+        """
+        Looks up which molecules already have calculations in a model, in one query.
+        Args:
+            hashes          - Hashes of the molecules.
+            model_name      - Name of the model.
+        Returns:
+            Set of the hashes of the molecules that already have calculations in the model.
+        """
+
+        self.single_execute("SELECT * FROM get_existing_hashes(%s, %s)", (self.create_postgres_array(*hashes), model_name))
+
+        return set(row[0] for row in self.cursor.fetchall())
 
     def build_empty_molecule(self, mol_name):
         """
@@ -413,9 +744,7 @@ class Database():
 
         next_start_symmetry = 'A'
 
-        self.single_execute("SELECT * FROM get_empty_molecule(%s)", (mol_name,))
-
-        frag_info = sorted(self.cursor.fetchall(), key = lambda x: x[0])
+        frag_info = sorted(self.get_empty_molecule(mol_name), key = lambda x: x[0])
 
         for frag_name, charge, spin, atomic_symbols, atomic_symmetries, atomic_counts, SMILE, frag_count in frag_info:
 
@@ -451,6 +780,54 @@ class Database():
 
         return molecule
 
+    def get_empty_molecule(self, mol_name):
+        """
+        Gets a description of each type of fragment in the mol_name molecule from inside the database.
+        Params:
+            mol_name        - The name of the molecule to describe.
+        Returns:
+            A list of (frag_name, charge, spin, atomic_symbols, atomic_symmetries, atomic_counts, SMILE, frag_count)
+            tuples, one for each type of fragment in the molecule.
+        """
+
+        self.single_execute("SELECT * FROM get_empty_molecule(%s)", (mol_name,))
+
+        return self.cursor.fetchall()
+
+    def get_row_materializer(self, mol_name, names=None, SMILES=None):
+        """
+        Gets a RowMaterializer that turns coordinates of mol_name molecules fetched from the database into
+        Molecule objects. RowMaterializers are built once per molecule name and order, then reused.
+        Params:
+            mol_name        - The name of the molecule to materialize.
+            names           - Names of the fragments in the order the molecules should have them. Default is None,
+                    which means standard order.
+            SMILES          - SMILE strings of the fragments in the order the molecules should have them. Must be
+                    specified if names is. Default is None.
+        Returns:
+            A RowMaterializer for mol_name molecules.
+        """
+
+        key = (mol_name, None if names is None else tuple(names), None if SMILES is None else tuple(SMILES))
+
+        try:
+            return self.row_materializers[key]
+        except KeyError:
+            pass
+
+        empty_molecule = self.build_empty_molecule(mol_name)
+
+        if names is None:
+            empty_molecule = empty_molecule.get_standard_copy()
+            order, frag_orders = empty_molecule.get_standard_order_order()
+            SMILES = [frag.get_standard_SMILE() for frag in empty_molecule.get_standard_order()]
+        else:
+            order, frag_orders = empty_molecule.get_reorder_order(names, SMILES)
+
+        self.row_materializers[key] = RowMaterializer(empty_molecule, order, frag_orders, SMILES)
+
+        return self.row_materializers[key]
+
     def count_pending_calculations(self, *tags):
         self.single_execute("SELECT * FROM count_pending_calculations(%s)", (self.create_postgres_array(*tags),))
 
@@ -465,6 +842,39 @@ class Database():
 
         return count
 
+    def check_counters(self):
+        """
+        Compares the cached calculation and training set counts kept by the triggers in the database with the counts
+        found by scanning the calculations themselves.
+
+        Args:
+            None.
+
+        Returns:
+            A list of (counter, key, stored count, actual count) tuples, one for each count that is wrong. An empty list
+            means every count is correct.
+        """
+
+        self.single_execute("SELECT * FROM check_counters()", ())
+
+        return [tuple(row) for row in self.cursor.fetchall()]
+
+    def rebuild_counters(self):
+        """
+        Recomputes all the cached calculation and training set counts from the calculations in the database. Only
+        needed if check_counters() finds a wrong count, for example after the counter tables were modified by hand.
+
+        Calculations cannot be changed by other users until this Database is saved.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+
+        self.execute("PERFORM rebuild_counters();", ())
+
     def get_all_calculations(self, client_name, *tags, calculations_to_do=sys.maxsize):
         """
         Gets uncalculaed energies from the database so that the user can calculate them.
@@ -486,8 +896,6 @@ class Database():
             use cp for some of their energies.
         """
 
-        name_to_order_dict = {}
-
         while True:
 
             self.single_execute("SELECT * FROM get_pending_molecule_name(%s)", (self.create_postgres_array(*tags),))
@@ -497,7 +905,7 @@ class Database():
             if molecule_name == "":
                 break
 
-            self.single_execute("SELECT * FROM get_pending_calculations(%s, %s, %s, %s)", (
+            self.single_execute("SELECT * FROM {}(%s, %s, %s, %s)".format(self.get_coordinates_function("get_pending_calculations")), (
             molecule_name, client_name, self.create_postgres_array(*tags),
             min(self.batch_size, calculations_to_do)))
 
@@ -505,38 +913,28 @@ class Database():
 
             calculations_to_do -= len(pending_calcs)
 
-            empty_molecule = self.build_empty_molecule(molecule_name)
-            empty_molecule = empty_molecule.get_standard_copy()
+            materializer = self.get_row_materializer(molecule_name)
 
             for atom_coordinates, model, frag_indices, use_cp in pending_calcs:
-                molecule = copy.deepcopy(empty_molecule)
-
-                for atom in molecule.get_atoms():
-                    atom.set_xyz(atom_coordinates[0], atom_coordinates[1], atom_coordinates[2])
-                    atom_coordinates = atom_coordinates[3:]
+                molecule = materializer.materialize(atom_coordinates)
 
                 method = model[:model.index("/")]
                 model = model[model.index("/") + 1:]
                 basis = model[:model.index("/")]
                 cp = model[model.index("/") + 1:] == "True"
 
-                try:
-                    order, frag_orders, SMILES = name_to_order_dict[molecule.get_name()]
-                except KeyError:
-                    order, frag_orders = molecule.get_standard_order_order()
-                    SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
-                    name_to_order_dict[molecule.get_name()] = order, frag_orders, SMILES
-
-                molecule = molecule.get_reordered_copy(order, frag_orders, SMILES)
-
                 yield molecule, method, basis, cp, use_cp, frag_indices
 
             if calculations_to_do < 1:
                 return
 
-    def set_properties(self, calculation_results, overwrite=False):
+    def set_properties(self, calculation_results, overwrite=False, log_retention="all"):
         """
         Sets newly calculated energies in the database.
+        Results are sent to the database in batches of at most batch_size calculations. A batch is sent early if
+        its log files add up to max_batch_bytes.
+        Logs are compressed with log_codec if the database supports it, and the content of each distinct log is
+        only sent once per batch.
         Args:
             calculation_results - List of tuples of format
                     (molecule, method, basis, cp, use_cp, frag_indices, result, energy, log_text)
@@ -549,14 +947,22 @@ class Database():
                     result      - True if the calculation succeeded.
                     energy      - The calculated energy in atomic units. Not used in result is False.
                     log_text    - The text of the log file for this calculation.
+            overwrite           - If True, replace the energies of calculations that are already complete or
+                    failed. Otherwise, results for those calculations are ignored. Default is False.
+            log_retention       - Which logs to store. "all" to store every log, "failed" to only store the logs of
+                    failed calculations, "none" to store no logs. Default is "all".
         Returns:
             None.
         """
 
-        command_string = ""
-        params = []
+        log_compression.check_retention(log_retention)
 
-        batch_count = 0
+        if self.compressed_logs is None:
+            self.compressed_logs = self.log_codec is not None and self.has_function("set_properties_compressed")
+
+        params = []
+        batch_bytes = 0
+        batch_log_hashes = set()
 
         name_to_order_dict = {}
 
@@ -572,20 +978,95 @@ class Database():
 
             model_name = method + "/" + basis + "/" + str(cp)
 
-            command_string += "PERFORM set_properties(%s, %s, %s, %s, %s, %s, %s, %s);"
-            params += [molecule.get_SHA1(), model_name, use_cp, self.create_postgres_array(*frag_indices), result,
-                       energy, log_text, overwrite]
+            if log_retention == "none" or (log_retention == "failed" and result):
+                log_text = None
 
-            batch_count += 1
+            if not self.compressed_logs:
+                params.append((molecule.get_SHA1(), model_name, use_cp, self.create_postgres_array(*frag_indices),
+                               result, energy, log_text, overwrite))
 
-            if batch_count == self.batch_size:
-                self.execute(command_string, params)
-                command_string = ""
+                if log_text is not None:
+                    batch_bytes += len(log_text.encode("utf-8"))
+            else:
+                log_hash = None
+                content = None
+
+                if log_text is not None:
+                    log_hash = log_compression.get_log_hash(log_text)
+
+                    if log_hash not in batch_log_hashes:
+                        content = log_compression.compress_log(log_text, self.log_codec)
+                        batch_log_hashes.add(log_hash)
+                        batch_bytes += len(content)
+
+                params.append((molecule.get_SHA1(), model_name, use_cp, self.create_postgres_array(*frag_indices),
+                               result, energy, log_hash, self.log_codec, content, overwrite))
+
+            if len(params) == self.batch_size or batch_bytes >= self.max_batch_bytes:
+                self.set_properties_batch(params)
                 params = []
-                batch_count = 0
+                batch_bytes = 0
+                batch_log_hashes = set()
 
-        if batch_count != 0:
-            self.execute(command_string, params)
+        if len(params) != 0:
+            self.set_properties_batch(params)
+
+    def set_properties_batch(self, params):
+        """
+        Sets the properties of one batch of calculations in a single round trip.
+        Args:
+            params          - List of tuples of format
+                    (hash, model_name, use_cp, frag_indices, result, energy, log_text, overwrite), the arguments
+                    of the set_properties sql function. Or if the database supports compressed logs, tuples of
+                    format (hash, model_name, use_cp, frag_indices, result, energy, log_hash, codec, content,
+                    overwrite), the arguments of the set_properties_compressed sql function.
+        Returns:
+            None.
+        """
+
+        if self.compressed_logs:
+            self.execute_values("SELECT set_properties_compressed(v.hash, v.model, v.use_cp, v.indices, v.result, v.energy, v.log_hash, v.codec, v.content, v.overwrite) "
+                                "FROM (VALUES %s) AS v(hash, model, use_cp, indices, result, energy, log_hash, codec, content, overwrite)",
+                                params, template="(%s, %s, %s, %s::integer[], %s, %s::double precision, %s, %s, %s::bytea, %s)")
+            return
+
+        self.execute_values("SELECT set_properties(v.hash, v.model, v.use_cp, v.indices, v.result, v.energy, v.log_txt, v.overwrite) "
+                            "FROM (VALUES %s) AS v(hash, model, use_cp, indices, result, energy, log_txt, overwrite)",
+                            params, template="(%s, %s, %s, %s::integer[], %s, %s::double precision, %s, %s)")
+
+    def get_log(self, molecule, method, basis, cp, use_cp, frag_indices):
+        """
+        Gets the log of the most recent attempt at a calculation.
+        Args:
+            molecule        - Molecule of the calculation.
+            method          - Method of the calculation.
+            basis           - Basis of the calculation.
+            cp              - True if the model for this calculation includes counterpoise correction.
+            use_cp          - True if counterpoise correction was used for this calculation.
+            frag_indices    - Fragments included in this calculation.
+        Returns:
+            The text of the log, or None if the calculation is not in the database or its log was not stored.
+        """
+
+        order, frag_orders = molecule.get_standard_order_order()
+        SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
+        molecule = molecule.get_reordered_copy(order, frag_orders, SMILES)
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        self.single_execute("SELECT * FROM get_log(%s, %s, %s, %s)", (molecule.get_SHA1(), model_name, use_cp,
+                                                                       self.create_postgres_array(*frag_indices)))
+        row = self.cursor.fetchone()
+
+        if row is None:
+            return None
+
+        log_text, codec, content = row
+
+        if content is not None:
+            return log_compression.decompress_log(content, codec)
+
+        return log_text
 
     def get_1B_training_set(self, molecule_name, names, SMILES, method, basis, cp, *tags):
         """
@@ -613,26 +1094,15 @@ class Database():
         self.single_execute("SELECT * FROM count_entries(%s)", (molecule_name,))
         max_count = self.cursor.fetchone()[0]
 
-        empty_molecule = self.build_empty_molecule(molecule_name)
-
-        order, frag_orders = None, None
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
 
         while True:
-            self.single_execute("SELECT * FROM get_1B_training_set(%s, %s, %s, %s, %s)", (
+            self.single_execute("SELECT * FROM {}(%s, %s, %s, %s, %s)".format(self.get_coordinates_function("get_1B_training_set")), (
             molecule_name, model_name, self.create_postgres_array(*tags), batch_offset, self.batch_size))
             training_set = self.cursor.fetchall()
 
             for atom_coordinates, energy in training_set:
-                molecule = copy.deepcopy(empty_molecule)
-
-                for atom in molecule.get_atoms():
-                    atom.set_xyz(atom_coordinates[0], atom_coordinates[1], atom_coordinates[2])
-                    atom_coordinates = atom_coordinates[3:]
-
-                if order is None:
-                    order, frag_orders = molecule.get_reorder_order(names, SMILES)
-
-                yield molecule.get_reordered_copy(order, frag_orders, SMILES), energy
+                yield materializer.materialize(atom_coordinates), energy
 
             batch_offset += self.batch_size
 
@@ -653,45 +1123,67 @@ class Database():
 
         return count
 
-    def get_training_set(self, names, SMILES, method, basis, cp, *tags):
+    def get_training_set(self, names, SMILES, method, basis, cp, *tags, hash_range=None):
+
+        # hash_range is a (first, last) pair that limits the training set to the configurations whose hashes come
+        # after first and before last, so several connections can each read part of the same training set. last may
+        # be None for no limit. Only databases with training set pages support it.
 
         self.clear_notices()
 
         model_name = "{}/{}/{}".format(method, basis, cp)
         batch_offset = 0
 
-        order, frag_orders, energies_order = None, None, None
-
         standard_names = sorted(names)
 
         molecule_name = "-".join(standard_names)
 
-        max_count = self.get_training_set_size(names, method, basis, cp, *tags)
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
+        energies_order = Database.get_energies_order(materializer.order, len(names), False)
+
+        if self.has_training_set_pages():
+            # each page starts after the last configuration of the previous page, so no page rescans the ones before it.
+            after_hash, last_hash = ("", None) if hash_range is None else hash_range
+
+            while True:
+                self.single_execute("SELECT * FROM get_training_set_page(%s, %s, %s, %s, %s, %s)", (
+                    molecule_name, self.create_postgres_array(*standard_names), model_name,
+                    self.create_postgres_array(*tags), after_hash, self.batch_size))
+                training_set = self.cursor.fetchall()
+
+                if last_hash is not None and len(training_set) > 0 and training_set[-1][0] >= last_hash:
+                    training_set = [row for row in training_set if row[0] < last_hash]
+                    last_page = True
+                else:
+                    last_page = len(training_set) < self.batch_size
+
+                for after_hash, atom_coordinates, binding_energy, nb_energy, deformation_energies in training_set:
+                    deformation_energies = [deformation_energies[i] for i in energies_order[:len(deformation_energies)]]
+
+                    yield materializer.materialize(atom_coordinates), binding_energy, nb_energy, deformation_energies
 
-        empty_molecule = self.build_empty_molecule(molecule_name)
+                if last_page:
+                    if self.get_last_notice() is not None and "Multiple optimized geometries" in self.get_last_notice():
+                        print(self.get_last_notice(), "Using the lowest energy optimized geometry to calculate deformation"
+                                                      " energies for this training set.")
+                    return
+
+        if hash_range is not None:
+            raise InvalidValueError("hash_range", hash_range, "is only supported by databases with training set pages.")
+
+        max_count = self.get_training_set_size(names, method, basis, cp, *tags)
 
         while True:
-            self.single_execute("SELECT * FROM get_training_set(%s, %s, %s, %s, %s, %s)", (
+            self.single_execute("SELECT * FROM {}(%s, %s, %s, %s, %s, %s)".format(self.get_coordinates_function("get_training_set")), (
                 molecule_name, self.create_postgres_array(*standard_names), model_name,
                 self.create_postgres_array(*tags), batch_offset,
                 self.batch_size))
             training_set = self.cursor.fetchall()
 
             for atom_coordinates, binding_energy, nb_energy, deformation_energies in training_set:
-                molecule = copy.deepcopy(empty_molecule)
-
-                for atom in molecule.get_atoms():
-                    atom.set_xyz(atom_coordinates[0], atom_coordinates[1], atom_coordinates[2])
-                    atom_coordinates = atom_coordinates[3:]
-
-                if order is None:
-                    order, frag_orders = molecule.get_reorder_order(names, SMILES)
-                    energies_order = Database.get_energies_order(order, molecule.get_num_fragments(), False)
-
                 deformation_energies = [deformation_energies[i] for i in energies_order[:len(deformation_energies)]]
 
-                yield molecule.get_reordered_copy(order, frag_orders,
-                                                  SMILES), binding_energy, nb_energy, deformation_energies
+                yield materializer.materialize(atom_coordinates), binding_energy, nb_energy, deformation_energies
 
             batch_offset += self.batch_size
 
@@ -728,8 +1220,6 @@ class Database():
         model_name = "{}/{}/{}".format(method, basis, cp)
         batch_offset = 0
 
-        order, frag_orders = None, None
-
         monomer1_name, monomer2_name = sorted([names[0], names[1]])
 
         molecule_name = monomer1_name + "-" + monomer2_name
@@ -737,29 +1227,37 @@ class Database():
         self.single_execute("SELECT * FROM count_entries(%s)", (molecule_name,))
         max_count = self.cursor.fetchone()[0]
 
-        empty_molecule = self.build_empty_molecule(molecule_name)
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
+
+        if self.has_training_set_pages():
+            after_hash = ""
+
+            while True:
+                self.single_execute("SELECT * FROM get_2B_training_set_page(%s, %s, %s, %s, %s, %s, %s)", (
+                    molecule_name, monomer1_name, monomer2_name, model_name, self.create_postgres_array(*tags),
+                    after_hash, self.batch_size))
+                training_set = self.cursor.fetchall()
+
+                for after_hash, atom_coordinates, binding_energy, interaction_energy, monomer1_energy, monomer2_energy in training_set:
+                    if materializer.order == [1, 0]:
+                        monomer1_energy, monomer2_energy = monomer2_energy, monomer1_energy
+
+                    yield materializer.materialize(atom_coordinates), binding_energy, interaction_energy, monomer1_energy, monomer2_energy
+
+                if len(training_set) < self.batch_size:
+                    return
 
         while True:
-            self.single_execute("SELECT * FROM get_2B_training_set(%s, %s, %s, %s, %s, %s, %s)", (
+            self.single_execute("SELECT * FROM {}(%s, %s, %s, %s, %s, %s, %s)".format(self.get_coordinates_function("get_2B_training_set")), (
             molecule_name, monomer1_name, monomer2_name, model_name, self.create_postgres_array(*tags),
             batch_offset, self.batch_size))
             training_set = self.cursor.fetchall()
 
             for atom_coordinates, binding_energy, interaction_energy, monomer1_energy, monomer2_energy in training_set:
-                molecule = copy.deepcopy(empty_molecule)
-
-                for atom in molecule.get_atoms():
-                    atom.set_xyz(atom_coordinates[0], atom_coordinates[1], atom_coordinates[2])
-                    atom_coordinates = atom_coordinates[3:]
-
-                if order is None:
-                    order, frag_orders = molecule.get_reorder_order(names, SMILES)
-
-                if order == [1, 0]:
+                if materializer.order == [1, 0]:
                     monomer1_energy, monomer2_energy = monomer2_energy, monomer1_energy
 
-                yield molecule.get_reordered_copy(order, frag_orders,
-                                                  SMILES), binding_energy, interaction_energy, monomer1_energy, monomer2_energy
+                yield materializer.materialize(atom_coordinates), binding_energy, interaction_energy, monomer1_energy, monomer2_energy
 
             batch_offset += self.batch_size
 
@@ -771,33 +1269,21 @@ class Database():
         model_name = "{}/{}/{}".format(method, basis, cp)
         batch_offset = 0
 
-        order, frag_orders, energies_order = None, None, None
-
         molecule_name = "-".join(sorted(names))
 
         self.single_execute("SELECT * FROM count_entries(%s)", (molecule_name,))
         max_count = self.cursor.fetchone()[0]
 
-        empty_molecule = self.build_empty_molecule(molecule_name)
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
+        energies_order = self.get_energies_order(materializer.order, len(names), cp)
 
         while True:
-            self.single_execute("SELECT * FROM export_calculations(%s, %s, %s, %s, %s)", (
+            self.single_execute("SELECT * FROM {}(%s, %s, %s, %s, %s)".format(self.get_coordinates_function("export_calculations")), (
                 molecule_name, model_name, self.create_postgres_array(*tags), batch_offset, self.batch_size))
             calculations = self.cursor.fetchall()
 
             for atom_coordinates, energies in calculations:
-                molecule = copy.deepcopy(empty_molecule)
-
-                for atom in molecule.get_atoms():
-                    atom.set_xyz(atom_coordinates[0], atom_coordinates[1], atom_coordinates[2])
-                    atom_coordinates = atom_coordinates[3:]
-
-                if order is None:
-                    order, frag_orders = molecule.get_reorder_order(names, SMILES)
-                    energies_order = self.get_energies_order(order, molecule.get_num_fragments(), cp)
-
-                yield molecule.get_reordered_copy(order, frag_orders,
-                                                  SMILES), [energies[i] for i in energies_order]
+                yield materializer.materialize(atom_coordinates), [energies[i] for i in energies_order]
 
             batch_offset += self.batch_size
 
@@ -819,10 +1305,8 @@ class Database():
                     the given method and basis.
         """
 
-        command_string = ""
-        params = []
+        batch = []
 
-        batch_count = 0
         order, frag_order, SMILES, energies_order = None, None, None, None
 
         for molecule, energies in molecule_energies_pairs:
@@ -831,10 +1315,70 @@ class Database():
                 SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
                 energies_order = Database.get_energies_order(order, molecule.get_num_fragments(), cp)
 
-            molecule = molecule.get_reordered_copy(order, frag_order, SMILES)
+            batch.append((molecule.get_reordered_copy(order, frag_order, SMILES), [energies[index] for index in energies_order]))
+
+            if len(batch) == self.batch_size:
+                self.import_calculations_batch(batch, method, basis, cp, tags, optimized)
+                batch = []
+
+        if len(batch) != 0:
+            self.import_calculations_batch(batch, method, basis, cp, tags, optimized)
+
+    def import_calculations_batch(self, molecule_energies_pairs, method, basis, cp, tags, optimized):
+        """
+        Imports the calculations of one batch of molecules.
+        If the database supports it, the batch is copied into a temporary staging table and merged into the database
+        by a single call to import_staged_calculations. Otherwise each molecule is imported with import_calculation.
+        Args:
+            molecule_energies_pairs - List of 2-tuples (molecule, nmer_energies), each molecule in standard order and
+                    its energies in the order of Database.get_permutations().
+            method              - Method used to calculate these energies.
+            basis               - Basis used to calculate these energies.
+            cp                  - True if counterpoise correction was used for these energies.
+            tags                - Tags to mark these energies with.
+            optimized           - True if all geometries in molecule_energy_pairs are optimized in
+                    the given method and basis.
+        Returns:
+            None.
+        """
+
+        if self.has_bulk_import():
+            self.single_execute("CREATE TEMP TABLE IF NOT EXISTS staged_calculations (mol_hash character varying, "
+                                "coordinates double precision[], energies double precision[])", ())
+
+            rows = io.StringIO()
+
+            for molecule, energies in molecule_energies_pairs:
+                coordinates = [coordinate for fragment in molecule.get_fragments() for atom in fragment.get_atoms()
+                               for coordinate in (atom.get_x(), atom.get_y(), atom.get_z())]
+
+                rows.write("{}\t{}\t{}\n".format(molecule.get_SHA1(), self.create_postgres_array(*coordinates),
+                                                 self.create_postgres_array(*energies)))
+
+            rows.seek(0)
+
+            with self.operation_errors():
+                self.cursor.copy_expert("COPY staged_calculations (mol_hash, coordinates, energies) FROM STDIN", rows)
 
-            energies = [energies[index] for index in energies_order]
+            calculations = Database.get_calculations(molecule_energies_pairs[0][0].get_num_fragments(), cp)
 
+            fragments_string, fragments_params, fragment_counts = self.get_import_fragments(molecule_energies_pairs[0][0])
+
+            self.single_execute("SELECT import_staged_calculations(%s, " + fragments_string + ", %s, %s, %s, %s, %s, %s, "
+                                "%s, %s, array_agg(mol_hash ORDER BY mol_hash), array_agg(coordinates ORDER BY mol_hash), "
+                                "array_agg(energies ORDER BY mol_hash)) FROM staged_calculations",
+                                [molecule_energies_pairs[0][0].get_name()] + fragments_params +
+                                [fragment_counts, method, basis, cp, self.create_postgres_array(*tags), optimized,
+                                 [self.create_postgres_array(*frag_indices) for frag_indices, use_cp in calculations],
+                                 [use_cp for frag_indices, use_cp in calculations]])
+
+            self.single_execute("TRUNCATE staged_calculations", ())
+            return
+
+        command_string = ""
+        params = []
+
+        for molecule, energies in molecule_energies_pairs:
             coordinates = []
             for fragment in molecule.get_fragments():
                 for atom in fragment.get_atoms():
@@ -842,52 +1386,60 @@ class Database():
                     coordinates.append(atom.get_y())
                     coordinates.append(atom.get_z())
 
-            command_string += "PERFORM import_calculation(%s, %s, ARRAY["
-            params += (molecule.get_SHA1(), molecule.get_name())
+            fragments_string, fragments_params, fragment_counts = self.get_import_fragments(molecule)
 
-            fragments = [fragment.get_name() for fragment in molecule.get_fragments()]
+            command_string += "PERFORM import_calculation(%s, %s, " + fragments_string + ", %s, %s, %s, %s, %s, %s, %s, %s);"
+            params += [molecule.get_SHA1(), molecule.get_name()] + fragments_params + [
+            fragment_counts, coordinates, method, basis, cp, self.create_postgres_array(*tags), optimized,
+            self.create_postgres_array(*energies)]
 
-            frag_names, counts = np.unique(fragments, return_counts=True, axis=0)
-            fragment_counts = [int(i) for i in counts]
+        self.execute(command_string, params)
 
-            for frag_name in frag_names:
+    def get_import_fragments(self, molecule):
+        """
+        Gets the description of each type of fragment in a molecule, to import its calculations with.
+        Args:
+            molecule            - The molecule to describe.
+        Returns:
+            (fragments_string, fragments_params, fragment_counts)
+            fragments_string    - SQL array of a construct_fragment() call for each type of fragment.
+            fragments_params    - Parameters of fragments_string.
+            fragment_counts     - Number of fragments of each type.
+        """
 
-                fragment = None
+        fragments_string = "ARRAY["
+        fragments_params = []
 
-                for frag in molecule.get_fragments():
-                    if frag.get_name() == frag_name:
-                        fragment = frag
+        fragments = [fragment.get_name() for fragment in molecule.get_fragments()]
 
-                atoms = [[atom.get_name(), atom.get_symmetry_class()] for atom in fragment.get_atoms()]
+        frag_names, counts = np.unique(fragments, return_counts=True, axis=0)
+        fragment_counts = [int(i) for i in counts]
 
-                symbol_symmetry_pairs, counts = np.unique(atoms, return_counts=True, axis=0)
-                atom_counts = [int(i) for i in counts]
+        for frag_name in frag_names:
 
-                symbols = [symbol for symbol, symmetry in symbol_symmetry_pairs]
-                symmetries = [symmetry for symbol, symmetry in symbol_symmetry_pairs]
+            fragment = None
 
-                command_string += "construct_fragment(%s, %s, %s, %s, %s, %s, %s)"
-                if not frag_name == frag_names[-1]:
-                    command_string += ", "
-                params += (frag_name, fragment.get_charge(), fragment.get_spin_multiplicity(), fragment.get_SMILE(),
-                           self.create_postgres_array(*symbols),
-                           self.create_postgres_array(*symmetries), self.create_postgres_array(*counts))
+            for frag in molecule.get_fragments():
+                if frag.get_name() == frag_name:
+                    fragment = frag
 
-            command_string += "], %s, %s, %s, %s, %s, %s, %s, %s);"
-            params += (
-            fragment_counts, coordinates, method, basis, cp, self.create_postgres_array(*tags), optimized,
-            self.create_postgres_array(*energies))
+            atoms = [[atom.get_name(), atom.get_symmetry_class()] for atom in fragment.get_atoms()]
 
-            batch_count += 1
+            symbol_symmetry_pairs, counts = np.unique(atoms, return_counts=True, axis=0)
 
-            if batch_count == self.batch_size:
-                self.execute(command_string, params)
-                command_string = ""
-                params = []
-                batch_count = 0
+            symbols = [symbol for symbol, symmetry in symbol_symmetry_pairs]
+            symmetries = [symmetry for symbol, symmetry in symbol_symmetry_pairs]
 
-        if batch_count != 0:
-            self.execute(command_string, params)
+            fragments_string += "construct_fragment(%s, %s, %s, %s, %s, %s, %s)"
+            if not frag_name == frag_names[-1]:
+                fragments_string += ", "
+            fragments_params += [frag_name, fragment.get_charge(), fragment.get_spin_multiplicity(), fragment.get_SMILE(),
+                                 self.create_postgres_array(*symbols),
+                                 self.create_postgres_array(*symmetries), self.create_postgres_array(*counts)]
+
+        fragments_string += "]"
+
+        return fragments_string, fragments_params, fragment_counts
 
     def get_failed(self, molecule_name, names, SMILES, method, basis, cp, *tags, optimized=False):
         """
@@ -918,26 +1470,15 @@ class Database():
         self.single_execute("SELECT * FROM count_entries(%s)", (molecule_name,))
         max_count = self.cursor.fetchone()[0]
 
-        empty_molecule = self.build_empty_molecule(molecule_name)
-
-        order, frag_orders = None, None
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
 
         while True:
-            self.single_execute("SELECT * FROM get_failed_configs(%s, %s, %s, %s, %s)", (
+            self.single_execute("SELECT * FROM {}(%s, %s, %s, %s, %s)".format(self.get_coordinates_function("get_failed_configs")), (
                 molecule_name, model_name, self.create_postgres_array(*tags), batch_offset, self.batch_size))
             training_set = self.cursor.fetchall()
 
             for atom_coordinates, frag_indices, used_cp in training_set:
-                molecule = copy.deepcopy(empty_molecule)
-
-                for atom in molecule.get_atoms():
-                    atom.set_xyz(atom_coordinates[0], atom_coordinates[1], atom_coordinates[2])
-                    atom_coordinates = atom_coordinates[3:]
-
-                if order is None:
-                    order, frag_orders = molecule.get_reorder_order(names, SMILES)
-
-                yield molecule.get_reordered_copy(order, frag_orders, SMILES), frag_indices, used_cp
+                yield materializer.materialize(atom_coordinates), frag_indices, used_cp
 
             batch_offset += self.batch_size
 
@@ -949,10 +1490,16 @@ class Database():
         Resets all dispatched, complete, and failed calculations in the database back to pending. Their
         energies are queued for recalculation.
         Args:
-            tags            - Currently unused.
+            tags            - Only reset calculations marked with at least one of these tags. If no tags are given,
+                    every calculation is reset.
         Returns:
             None.
         """
+
+        if self.has_bulk_delete():
+            self.reset_calculations(["dispatched", "complete", "failed"], tags if len(tags) != 0 else None)
+            return
+
         self.single_execute("UPDATE molecule_properties SET status=%s WHERE status=%s", ("pending", "dispatched"))
         self.single_execute("UPDATE molecule_properties SET status=%s WHERE status=%s", ("pending", "complete"))
         self.single_execute("UPDATE molecule_properties SET status=%s WHERE status=%s", ("pending", "failed"))
@@ -962,10 +1509,15 @@ class Database():
         Resets all dispatched calculations in the database back to pending. Their
         energies are queued for recalculation.
         Args:
-            tags            - Currently unused.
+            tags            - Only reset calculations marked with at least one of these tags.
         Returns:
             None.
         """
+
+        if self.has_bulk_delete():
+            self.reset_calculations(["dispatched"], tags)
+            return
+
         self.execute("PERFORM reset_dispatched(%s);", [self.create_postgres_array(*tags)])
 
     def reset_failed(self, *tags):
@@ -973,12 +1525,40 @@ class Database():
         Resets all failed calculations in the database back to pending. Their
         energies are queued for recalculation.
         Args:
-            tags            - Currently unused.
+            tags            - Only reset calculations marked with at least one of these tags.
         Returns:
             None.
         """
+
+        if self.has_bulk_delete():
+            self.reset_calculations(["failed"], tags)
+            return
+
         self.execute("PERFORM reset_failed(%s);", [self.create_postgres_array(*tags)])
 
+    def reset_calculations(self, statuses, tags):
+        """
+        Resets calculations back to pending a batch of molecules at a time, with reset_calculations_batch. Each batch is
+        committed as soon as it is reset, so no batch waits on the locks of another.
+        Args:
+            statuses        - Reset calculations with one of these statuses.
+            tags            - Only reset calculations marked with at least one of these tags. If None, reset
+                    calculations regardless of their tags.
+        Returns:
+            None.
+        """
+
+        tags_array = self.create_postgres_array(*tags) if tags is not None else None
+
+        after_hash = ""
+
+        while after_hash is not None:
+            self.single_execute("SELECT reset_calculations_batch(%s, %s, %s, %s)", (
+                    tags_array, self.create_postgres_array(*statuses), after_hash, self.batch_size))
+            after_hash = self.cursor.fetchone()[0]
+
+            self.save()
+
     def delete_calculations(self, molecule_list, method, basis, cp, *tags, delete_complete_calculations=False):
         """
         Removes the specified tags from any calculations in the database that matches one of the molecules in
@@ -997,6 +1577,10 @@ class Database():
             None.
         """
 
+        if self.has_bulk_delete():
+            self.delete_calculations_bulk(molecule_list, method, basis, cp, tags, delete_complete_calculations)
+            return
+
         command_string = ""
         params = []
 
@@ -1040,9 +1624,66 @@ class Database():
             delete_complete_calculations - If True, delete calculations even if their energy is already
                 calculated.
         """
+
+        if self.has_bulk_delete():
+            # each call removes the tags from one batch of molecules, so once a call finds less than a full batch
+            # no molecule has the tags anymore.
+            while True:
+                self.single_execute("SELECT delete_all_calculations_batch(%s, %s, %s, %s, %s, %s, %s)", (
+                        molecule_name, method, basis, cp, self.create_postgres_array(*tags),
+                        delete_complete_calculations, self.batch_size))
+                num_deleted = self.cursor.fetchone()[0]
+
+                self.save()
+
+                if num_deleted < self.batch_size:
+                    return
+
         self.execute("PERFORM delete_all_calculations(%s, %s, %s, %s, %s, %s);", (
         molecule_name, method, basis, cp, self.create_postgres_array(*tags), delete_complete_calculations))
 
+    def delete_calculations_bulk(self, molecule_list, method, basis, cp, tags, delete_complete_calculations):
+        """
+        Removes tags from the calculations of molecules and deletes those left without tags a batch of molecules at a
+        time, with delete_calculations_batch. Each batch is committed as soon as it is deleted, so no batch waits on the
+        locks of another.
+        Args:
+            molecule_list - Remove tags from calculations involving these molecules.
+            method  - Remove tags from calculations with this method.
+            basis   - Remove tags from calculations with this basis.
+            cp      - Remove tags from calculations with this cp.
+            tags    - The tags to remove.
+            delete_complete_calculations - If True, delete calculations even if their energy is already
+                calculated.
+        Returns:
+            None.
+        """
+
+        hashes = []
+
+        order, frag_order, SMILES, name = None, None, None, None
+
+        for molecule in molecule_list:
+            if order is None:
+                order, frag_order = molecule.get_standard_order_order()
+                SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
+                name = molecule.get_name()
+
+            hashes.append(molecule.get_reordered_copy(order, frag_order, SMILES).get_SHA1())
+
+            if len(hashes) == self.batch_size:
+                self.single_execute("SELECT delete_calculations_batch(%s, %s, %s, %s, %s, %s, %s)", (
+                        self.create_postgres_array(*hashes), name, method, basis, cp, self.create_postgres_array(*tags),
+                        delete_complete_calculations))
+                self.save()
+                hashes = []
+
+        if len(hashes) != 0:
+            self.single_execute("SELECT delete_calculations_batch(%s, %s, %s, %s, %s, %s, %s)", (
+                    self.create_postgres_array(*hashes), name, method, basis, cp, self.create_postgres_array(*tags),
+                    delete_complete_calculations))
+            self.save()
+
     def grant_admin_privilege(self, username, *tags):
         """
         Grants admin privileges on a training set to user username.
@@ -1241,6 +1882,22 @@ class Database():
         if batch_count != 0:
             self.execute(command_string, params)
 
+    @staticmethod
+    def get_calculations(num_bodies, cp):
+        """
+        Gets the frag indices and use_cp of each calculation of a molecule, as they are stored in the database.
+        Like add_calculation in init.sql, models with counterpoise correction use it for every calculation except
+        the one with all the fragments, and also calculate each monomer without it.
+        Args:
+            num_bodies      - Number of fragments in the molecule.
+            cp              - True if the model uses counterpoise correction.
+        Returns:
+            List of (frag_indices, use_cp) tuples, in the order of Database.get_permutations().
+        """
+
+        return [(frag_indices, use_cp or (cp and 1 < len(frag_indices) < num_bodies))
+                for frag_indices, use_cp in Database.get_permutations(num_bodies, cp)]
+
     @staticmethod
     def get_energies_order(order, num_bodies, cp):
         pre_energy_order = list(range(len(Database.get_permutations(num_bodies, cp))))
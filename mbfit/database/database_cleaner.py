@@ -4,7 +4,7 @@ from mbfit.utils import SettingsReader
 from mbfit.molecule import parse_training_set_file
 
 
-def clean_database(settings_path, database_config_path, *tags):
+def clean_database(settings_path, database_config_path, *tags, pool=None):
     """
     Sets all dispatched calculations back to pending in the given database.
 
@@ -13,17 +13,18 @@ def clean_database(settings_path, database_config_path, *tags):
         database_config_path - .ini file containing host, port, database, username, and password.
                     Make sure only you have access to this file or your password will be compromised!
         tags                - Reset calculations with one of these tags.
+        pool                - DatabasePool to borrow a connection from instead of opening a new one. Default is None.
 
     Returns:
         None.
     """
 
-    with Database(database_config_path) as database:
+    with Database(database_config_path, pool=pool) as database:
 
         database.reset_dispatched(*tags)
 
 
-def reset_database(settings_path, database_config_path, *tags):
+def reset_database(settings_path, database_config_path, *tags, pool=None):
     """
     Sets all failed calculations back to pending in the given database.
 
@@ -32,17 +33,18 @@ def reset_database(settings_path, database_config_path, *tags):
         database_config_path - .ini file containing host, port, database, username, and password.
                     Make sure only you have access to this file or your password will be compromised!
         tags                - Reset calculations with one of these tags.
+        pool                - DatabasePool to borrow a connection from instead of opening a new one. Default is None.
 
     Returns:
         None.
     """
 
-    with Database(database_config_path) as database:
+    with Database(database_config_path, pool=pool) as database:
 
         database.reset_failed(*tags)
 
 
-def delete_calculations(settings_path, database_config_path, configurations_path, method, basis, cp, *tags, delete_complete_calculations = False):
+def delete_calculations(settings_path, database_config_path, configurations_path, method, basis, cp, *tags, delete_complete_calculations = False, pool=None):
     """
     Removes the specified tags from any calculations in the database that matches one of the molecules in
     the configurations file and the given method, basis, and cp.
@@ -62,18 +64,19 @@ def delete_calculations(settings_path, database_config_path, configurations_path
         tags    - The tags to remove.
         delete_complete_calculations - If True, delete calculations even if their energy is already
                 calculated.
+        pool                - DatabasePool to borrow a connection from instead of opening a new one. Default is None.
 
     Returns:
         None.
     """
     molecules = parse_training_set_file(configurations_path, SettingsReader(settings_path))
 
-    with Database(database_config_path) as database:
+    with Database(database_config_path, pool=pool) as database:
 
         database.delete_calculations(molecules, method, basis, cp, *tags, delete_complete_calculations=delete_complete_calculations)
 
 
-def delete_all_calculations(settings_path, database_config_path, molecule_name, method, basis, cp, *tags, delete_complete_calculations = False):
+def delete_all_calculations(settings_path, database_config_path, molecule_name, method, basis, cp, *tags, delete_complete_calculations = False, pool=None):
     """
     Removes the specified tags from any calculations in the database that matches one of the molecules in
     the configurations file and the given method, basis, and cp.
@@ -93,12 +96,13 @@ def delete_all_calculations(settings_path, database_config_path, molecule_name,
         tags    - The tags to remove.
         delete_complete_calculations - If True, delete calculations even if their energy is already
                 calculated.
+        pool                - DatabasePool to borrow a connection from instead of opening a new one. Default is None.
 
     Returns:
         None.
     """
 
-    with Database(database_config_path) as database:
+    with Database(database_config_path, pool=pool) as database:
 
         database.delete_all_calculations(molecule_name, method, basis, cp, *tags, delete_complete_calculations=delete_complete_calculations)
 
@@ -1,23 +1,30 @@
 # external package imports
-import sys
+import sys, threading
+from queue import Queue, Empty, Full
 
 # absolute module imports
 from mbfit import calculator
 from mbfit.calculator import Model
-from mbfit.exceptions import LibraryCallError
-from mbfit.utils import SettingsReader, files, system
+from mbfit.exceptions import LibraryCallError, InvalidValueError
+from mbfit.utils import SettingsReader, LogFile, files, system
 
 # local module imports
 from .database import Database
+from .database_pool import DatabasePool
+from . import log_compression
 
 
-def fill_database(settings_path, database_config_path, client_name, *tags, calculation_count=sys.maxsize, qm_options={}):
+def fill_database(settings_path, database_config_path, client_name, *tags, calculation_count=sys.maxsize, qm_options={}, pool=None, num_workers=1, log_retention="all", max_cores=None):
     """
     Loops over uncalculated energies in a database and calculates them.
 
-    Results are submitted to the database in batches. If interrupted
-    all results since the last batch will be stuck on "running".
-    call clean_database() to set them back to pending.
+    Calculations are fetched from the database by one thread, performed by num_workers worker threads, and their
+    results are submitted to the database in batches by another thread, so that waiting on the database and
+    performing calculations overlap. At most one batch of calculations waits to be performed and at most one batch of
+    results waits to be submitted at any time.
+
+    If interrupted or if an error occurs, the results that were already calculated are submitted, then all calculations
+    that were fetched but not calculated will be stuck on "running". call clean_database() to set them back to pending.
 
     Args:
         settings_path       - Local path to the file with all relevant settings information.
@@ -26,68 +33,244 @@ def fill_database(settings_path, database_config_path, client_name, *tags, calcu
         client_name         - Name of the client performing these calculations.
         calculation_count   - Maximum number of calculations to perform. Default is unlimited.
         qm_options           - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+        pool                - DatabasePool to borrow connections from instead of opening new ones. Two connections are
+                    used at the same time. Default is None.
+        num_workers         - Number of calculations to perform at the same time. Only use more than 1 with a QM code
+                    that runs in its own process, like qchem. Default is 1.
+        log_retention       - Which logs to store in the database. "all" to store every log, "failed" to only store
+                    the logs of failed calculations, "none" to store no logs. Default is "all".
+        max_cores           - Number of cores to perform calculations on at the same time in worker processes, with a
+                    number of threads for each calculation that depends on its size, see CalculationExecutor. num_workers
+                    must be 1 if given. Default is None, to perform calculations with the number of threads in the
+                    settings.
 
     Returns:
         None.
     """
 
-    # open the database
-    with Database(database_config_path) as database:
+    if num_workers < 1:
+        raise InvalidValueError("num_workers", num_workers, "must be at least 1.")
+
+    if max_cores is not None and num_workers != 1:
+        raise InvalidValueError("num_workers", num_workers, "1 when max_cores is given.")
+
+    log_compression.check_retention(log_retention)
 
+    if pool is None:
+        with DatabasePool(database_config_path, max_connections=2) as pool:
+            fill_database(settings_path, database_config_path, client_name, *tags, calculation_count=calculation_count,
+                          qm_options=qm_options, pool=pool, num_workers=num_workers,
+                          log_retention=log_retention, max_cores=max_cores)
+        return
+
+    with Database(database_config_path, pool=pool) as database:
         total_pending = database.count_pending_calculations(*tags)
-        system.format_print("Beginning calculations. {} total calculations with tags {} pending in database. Calculating {} of them.".format(total_pending, tags, min(calculation_count, total_pending)),
-                bold=True, color=system.Color.YELLOW)
+        batch_size = database.get_batch_size()
 
+    system.format_print("Beginning calculations. {} total calculations with tags {} pending in database. Calculating {} of them.".format(total_pending, tags, min(calculation_count, total_pending)),
+            bold=True, color=system.Color.YELLOW)
 
-        calc = calculator.get_calculator(settings_path)
+    calculations = Queue(maxsize=batch_size)
+    results = Queue(maxsize=batch_size)
 
-        counter = 0
-        successes = 0
-        failures = 0
+    # set when any thread fails, so the others stop as soon as possible.
+    stop = threading.Event()
+    errors = []
 
-        calculation_results = []
-        
-        for molecule, method, basis, cp, use_cp, frag_indices in database.get_all_calculations(client_name, *tags, calculations_to_do=calculation_count):
-            
-            counter += 1
+    counts = {"performed": 0, "successes": 0, "failures": 0}
 
+    def put(queue, item):
+        while not stop.is_set():
             try:
-                model = Model(method, basis, use_cp)
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def fetch_calculations():
+        try:
+            with Database(database_config_path, pool=pool) as database:
+                calculations_to_do = calculation_count
+
+                while calculations_to_do > 0 and not stop.is_set():
+                    batch = list(database.get_all_calculations(client_name, *tags,
+                                                               calculations_to_do=min(batch_size, calculations_to_do)))
+
+                    # save right away so the calculations are marked dispatched for other clients and the rows are
+                    # not locked while the results are submitted.
+                    database.save()
+
+                    if len(batch) == 0:
+                        break
+
+                    calculations_to_do -= len(batch)
+
+                    for calculation in batch:
+                        if not put(calculations, calculation):
+                            return
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            for i in range(num_workers):
+                put(calculations, None)
+
+    def get_calculations():
+        while not stop.is_set():
+            try:
+                calculation = calculations.get(timeout=0.1)
+            except Empty:
+                continue
+
+            if calculation is None:
+                return
+
+            molecule, method, basis, cp, use_cp, frag_indices = calculation
+
+            yield calculation, molecule, Model(method, basis, use_cp), frag_indices
+
+    def perform_calculations():
+        try:
+            with calculator.CalculationExecutor(settings_path, max_cores=max_cores) as executor:
+                for calculation, energy, log_path in executor.calculate_energies(get_calculations(), qm_options=qm_options):
+                    if not put(results, get_result(*calculation, energy, log_path)):
+                        break
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            put(results, None)
+
+    def submit_results():
+        finished_workers = 0
+        calculation_results = []
 
-                # calculate the missing energy
-                energy, log_path = calc.calculate_energy(molecule, model, frag_indices, qm_options=qm_options)
-                with open(log_path, "r") as log_file:
-                    log_text = log_file.read()
-                calculation_results.append((molecule, method, basis, cp, use_cp, frag_indices, True, energy, log_text))
-                successes += 1
-            
-            except LibraryCallError as e:
-                if e.log_path is not None:
-                    with open(e.log_path, "r") as log_file:
-                        log_text = log_file.read()
-                    if log_text is "":
-                        log_text = "<Log file was empty.>"
-                    calculation_results.append((molecule, method, basis, cp, use_cp, frag_indices, False, 0, log_text))
-                else:
-                    log_text = "<Error occurred without producing log file.>"
-                    calculation_results.append((molecule, method, basis, cp, use_cp, frag_indices, False, 0, log_text))
-                failures += 1
-
-
-            if len(calculation_results) >= database.get_batch_size():
-                database.set_properties(calculation_results)
-                calculation_results = []
-                # save changes to the database
-                database.save()
-
-            if counter % 10 == 0:
-                system.format_print("Performed {} calculations so far. {} Successes and {} Failures so far.".format(counter, successes, failures),
-                        italics=True)
-
-        database.set_properties(calculation_results)
-
-        system.format_print("Done! Performed {} calculations. {} Successes and {} Failures. {} calculations with tags {} remain pending in database.".format(counter, successes, failures, total_pending - counter, tags),
-                bold=True, color=system.Color.GREEN)
+        try:
+            with Database(database_config_path, pool=pool) as database:
+                while finished_workers < num_workers:
+                    try:
+                        calculation_result = results.get(timeout=0.1)
+                    except Empty:
+                        if stop.is_set():
+                            break
+                        continue
+
+                    if calculation_result is None:
+                        finished_workers += 1
+                        continue
+
+                    calculation_results.append(calculation_result)
+
+                    counts["performed"] += 1
+                    if calculation_result[6]:
+                        counts["successes"] += 1
+                    else:
+                        counts["failures"] += 1
+
+                    if len(calculation_results) >= batch_size:
+                        database.set_properties(calculation_results, log_retention=log_retention)
+                        calculation_results = []
+                        # save changes to the database
+                        database.save()
+
+                    if counts["performed"] % 10 == 0:
+                        system.format_print("Performed {} calculations so far. {} Successes and {} Failures so far.".format(counts["performed"], counts["successes"], counts["failures"]),
+                                italics=True)
+
+                # results that were already calculated are kept even if another thread failed.
+                database.set_properties(calculation_results, log_retention=log_retention)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=fetch_calculations, name="fill_database fetcher")]
+    threads += [threading.Thread(target=perform_calculations, name="fill_database worker {}".format(i)) for i in range(num_workers)]
+    threads += [threading.Thread(target=submit_results, name="fill_database writer")]
+
+    for thread in threads:
+        thread.start()
+
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.1)
+    except BaseException:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        raise
+
+    if len(errors) > 0:
+        raise errors[0]
+
+    system.format_print("Done! Performed {} calculations. {} Successes and {} Failures. {} calculations with tags {} remain pending in database.".format(counts["performed"], counts["successes"], counts["failures"], total_pending - counts["performed"], tags),
+            bold=True, color=system.Color.GREEN)
+
+
+def calculate(calc, molecule, method, basis, cp, use_cp, frag_indices, qm_options={}):
+    """
+    Performs one calculation fetched from a database.
+
+    Args:
+        calc                - The Calculator to perform the calculation with.
+        molecule            - The molecule whose energy should be calculated.
+        method              - Method to do the calculation.
+        basis               - Basis to do the calculation.
+        cp                  - True if the model uses counterpoise correction.
+        use_cp              - True if counterpoise correction should be used for this calculation.
+        frag_indices        - List of indices of fragments that should be included in the calculation.
+        qm_options          - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+
+    Returns:
+        Tuple (molecule, method, basis, cp, use_cp, frag_indices, result, energy, log_text) ready to be passed to
+        Database.set_properties().
+    """
+
+    try:
+        model = Model(method, basis, use_cp)
+
+        # calculate the missing energy
+        energy, log_path = calc.calculate_energy(molecule, model, frag_indices, qm_options=qm_options)
+
+    except LibraryCallError as e:
+        energy, log_path = None, e.log_path
+
+    return get_result(molecule, method, basis, cp, use_cp, frag_indices, energy, log_path)
+
+
+def get_result(molecule, method, basis, cp, use_cp, frag_indices, energy, log_path):
+    """
+    Gets the result of one calculation fetched from a database, with the text of its log.
+
+    Args:
+        molecule            - The molecule whose energy was calculated.
+        method              - Method of the calculation.
+        basis               - Basis of the calculation.
+        cp                  - True if the model uses counterpoise correction.
+        use_cp              - True if counterpoise correction was used for this calculation.
+        frag_indices        - List of indices of fragments that were included in the calculation.
+        energy              - The calculated energy, or None if the calculation failed.
+        log_path            - Path to the log file of the calculation, or None if it failed without producing one.
+
+    Returns:
+        Tuple (molecule, method, basis, cp, use_cp, frag_indices, result, energy, log_text) ready to be passed to
+        Database.set_properties().
+    """
+
+    if energy is not None:
+        with LogFile(log_path) as log_file:
+            log_text = log_file.get_text()
+        return molecule, method, basis, cp, use_cp, frag_indices, True, energy, log_text
+
+    if log_path is not None:
+        with LogFile(log_path) as log_file:
+            log_text = log_file.get_text()
+        if log_text == "":
+            log_text = "<Log file was empty.>"
+    else:
+        log_text = "<Error occurred without producing log file.>"
+    return molecule, method, basis, cp, use_cp, frag_indices, False, 0, log_text
 
 
 def generate_inputs_from_database(settings_path, database_path):
@@ -1,5 +1,7 @@
 # absolute module imports
-from mbfit.molecule import parse_training_set_file
+from mbfit.calculator import DistanceScreen
+from mbfit.exceptions import XYZFormatError
+from mbfit.molecule import Molecule, parse_training_set_file
 from mbfit.utils import SettingsReader, system
 
 # local module imports
@@ -26,12 +28,97 @@ def initialize_database(settings_path, database_config_path, training_set_path,
     
     system.format_print("Adding configurations from xyz file {} into database.".format(training_set_path), bold=True, color=system.Color.YELLOW)
 
-    molecules = parse_training_set_file(training_set_path, SettingsReader(settings_path))
+    settings = SettingsReader(settings_path)
 
+    molecules = parse_training_set_file(training_set_path, settings)
+    screen = DistanceScreen.from_settings(settings)
 
     with Database(database_config_path) as database:
         pre_pending = database.count_pending_calculations(*tags)
-        database.add_calculations(molecules, method, basis, cp, *tags, optimized = optimized)
+        num_screened = database.add_calculations(molecules, method, basis, cp, *tags, optimized = optimized, screen = screen)
         post_pending = database.count_pending_calculations(*tags)
 
     system.format_print("Configurations added successfully! {} new calculations with tags {} to perform.".format(post_pending - pre_pending, tags), bold=True, color=system.Color.GREEN)
+
+    if screen is not None:
+        system.format_print("Skipped {} calculations of subsets of fragments beyond the screening cutoffs.".format(num_screened), italics=True)
+
+def parse_calculations_file(calculations_path, settings):
+    """
+    Reads the molecules in an ".xyz" file along with their already calculated energies, one molecule at a time, so that
+    even very large files are never held in memory all at once.
+
+    The comment line of each molecule holds its energies, separated by whitespace, in the order expected by
+    Database.import_calculations().
+
+    Args:
+        calculations_path   - Local path to the ".xyz" file with energies in its comment lines.
+        settings            - SettingsReader containing information about the molecule.
+
+    Yields:
+        2-tuples (molecule, nmer_energies), one for each molecule in the file.
+    """
+
+    atoms_per_fragment = [int(atom_count) for atom_count in settings.get("molecule", "fragments").split(",")]
+    charge_per_fragment = [int(charge) for charge in settings.get("molecule", "charges").split(",")]
+    spin_per_fragment = [int(spin) for spin in settings.get("molecule", "spins").split(",")]
+    name_per_fragment = settings.get("molecule", "names").split(",")
+    symmetry_per_fragment = settings.get("molecule", "symmetry").split(",")
+    SMILE_per_fragment = settings.get("molecule", "SMILES").split(",")
+
+    with open(calculations_path, "r") as xyz_file:
+
+        while True:
+            position = xyz_file.tell()
+
+            line = xyz_file.readline()
+
+            # EOF, there are no more molecules in this file.
+            if line == "":
+                break
+
+            # skip blank lines between molecules.
+            if line.strip() == "":
+                continue
+
+            comment = xyz_file.readline()
+
+            try:
+                energies = [float(energy) for energy in comment.split()]
+            except ValueError:
+                raise XYZFormatError(comment.strip(), "the energies of the molecule, separated by whitespace.") from None
+
+            # rewind to the atom count line so the molecule can be parsed as usual.
+            xyz_file.seek(position)
+
+            yield Molecule.read_xyz_file(xyz_file, atoms_per_fragment, name_per_fragment, charge_per_fragment,
+                                         spin_per_fragment, symmetry_per_fragment, SMILE_per_fragment), energies
+
+def import_calculations(settings_path, database_config_path, calculations_path, method, basis, cp, *tags, optimized = False):
+    """
+    Imports already completed calculations from an ".xyz" file into a database.
+
+    Args:
+        settings_path       - Local path to the ".ini" file with all relevant settings.
+        database_config_path - .ini file containing host, port, database, username, and password.
+                    Make sure only you have access to this file or your password will be compromised!
+        calculations_path   - Local path to the ".xyz" file with the energies of each configuration in its comment line,
+                    see parse_calculations_file().
+        method              - QM method used to calculate the energies of these configurations.
+        basis               - QM basis used to calculate the energies of these configurations.
+        cp                  - Was counterpoise correction used for these configurations?
+        tags                - Label these calculations with these tags.
+        optimized           - Are these configurations optimized geometries? Default is False.
+
+    Returns:
+        None.
+    """
+
+    system.format_print("Importing calculations from xyz file {} into database.".format(calculations_path), bold=True, color=system.Color.YELLOW)
+
+    molecule_energies_pairs = parse_calculations_file(calculations_path, SettingsReader(settings_path))
+
+    with Database(database_config_path) as database:
+        database.import_calculations(molecule_energies_pairs, method, basis, cp, *tags, optimized = optimized)
+
+    system.format_print("Calculations imported successfully with tags {}!".format(tags), bold=True, color=system.Color.GREEN)
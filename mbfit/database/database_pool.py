@@ -0,0 +1,206 @@
+# external package imports
+import threading
+from contextlib import contextmanager
+
+# absolute module imports
+from mbfit.exceptions import DatabaseConnectionError, InvalidValueError, LibraryNotAvailableError
+from mbfit.utils import SettingsReader
+
+# local module imports
+from . import sqlite_database
+
+# only import psycopg2 if it is installed.
+try:
+    import psycopg2, psycopg2.pool
+except ModuleNotFoundError:
+    pass
+
+
+class DatabasePool():
+
+    """
+    Pool of open connections to a database. Database objects constructed with a pool borrow one of its connections
+    instead of opening a new one, and give it back when they are closed.
+
+    Connections are checked out by one thread at a time, so a single pool can be shared by all the threads of a
+    program. When every connection is checked out, the next checkout waits until one is returned.
+    """
+
+    def __init__(self, config_file, min_connections=1, max_connections=8):
+        """
+        Initializer for database pool object. Opens min_connections connections to the database.
+
+        Args:
+            config_file     - .ini file containing host, port, database, username, and password, or backend = sqlite
+                    and the path of a SQLite database file.
+                    Make sure only you have access to this file or your password will be compromised!
+            min_connections - Number of connections to open right away and to keep open while the pool is in use.
+                    Default is 1.
+            max_connections - Maximum number of connections this pool will open. Default is 8.
+
+        Returns:
+            A new DatabasePool object.
+        """
+
+        if min_connections < 0:
+            raise InvalidValueError("min_connections", min_connections, "must be at least 0.")
+        if max_connections < max(min_connections, 1):
+            raise InvalidValueError("max_connections", max_connections, "must be at least 1 and at least min_connections.")
+
+        self.config_file = config_file
+
+        # parse the user's config file to get their login info
+
+        config = SettingsReader(config_file)
+
+        self.backend = config.get("database", "backend", "postgresql")
+
+        # checkouts are counted with a semaphore that makes threads wait their turn, ThreadedConnectionPool raises an
+        # error instead of waiting when it runs out of connections.
+        self.available = threading.BoundedSemaphore(max_connections)
+
+        if self.backend == "sqlite":
+            # SQLite connections are only a file handle, so one is opened for each checkout instead of kept open.
+            self.path = sqlite_database.get_path(config)
+            self.name = self.path
+            self.pool = None
+            return
+
+        # Check if psycopg2 is installed.
+        try:
+            import psycopg2, psycopg2.pool
+        except ModuleNotFoundError:
+            raise LibraryNotAvailableError("psycopg2")
+
+        host = config.get("database", "host")
+        port = config.get("database", "port")
+        database = config.get("database", "database")
+        username = config.get("database", "username")
+        password = config.get("database", "password")
+
+        self.name = host + " " + database
+
+        try:
+            self.pool = psycopg2.pool.ThreadedConnectionPool(min_connections, max_connections,
+                    "host='{}' port={} dbname='{}' user='{}' password='{}'".format(host, port, database, username, password))
+        except psycopg2.OperationalError as e:
+            raise DatabaseConnectionError(self.name, str(e))
+
+    def __enter__(self):
+        """
+        Simply returns self. Called when entering the context manager.
+        Args:
+            None.
+        Returns:
+            self.
+        """
+
+        return self
+
+    def __exit__(self, exception, value, traceback):
+        """
+        Closes all connections in the pool. Called when exiting the context manager.
+        Args:
+            None.
+        Returns:
+            None.
+        """
+
+        self.close()
+
+        return False
+
+    def get_connection(self):
+        """
+        Checks out a connection from this pool. Waits for another thread to return a connection if all of them are
+        checked out.
+        Always give the connection back with put_connection() once you are done with it.
+        Args:
+            None.
+        Returns:
+            An open psycopg2 connection, or sqlite3 connection for SQLite databases.
+        """
+
+        self.available.acquire()
+
+        if self.pool is None:
+            try:
+                return sqlite_database.connect(self.path)
+            except:
+                self.available.release()
+                raise
+
+        try:
+            connection = self.pool.getconn()
+        except psycopg2.OperationalError as e:
+            self.available.release()
+            raise DatabaseConnectionError(self.name, str(e))
+        except:
+            self.available.release()
+            raise
+
+        # notices from whoever used this connection last are not interesting to the new borrower.
+        del connection.notices[:]
+
+        return connection
+
+    def put_connection(self, connection):
+        """
+        Gives a connection back to this pool.
+        Any changes made on the connection that were not saved are rolled back.
+        Args:
+            connection      - A connection checked out from this pool with get_connection().
+        Returns:
+            None.
+        """
+
+        if self.pool is None:
+            try:
+                connection.rollback()
+                connection.close()
+            finally:
+                self.available.release()
+            return
+
+        try:
+            if not connection.closed:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    # a connection that cannot even be rolled back is broken, close it instead of reusing it.
+                    connection.close()
+
+            self.pool.putconn(connection, close=connection.closed != 0)
+        finally:
+            self.available.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks out a connection for the duration of a with block.
+        Changes are saved if the block finishes without error and rolled back otherwise.
+        Args:
+            None.
+        Returns:
+            An open psycopg2 connection, or sqlite3 connection for SQLite databases.
+        """
+
+        connection = self.get_connection()
+
+        try:
+            yield connection
+            connection.commit()
+        finally:
+            self.put_connection(connection)
+
+    def close(self):
+        """
+        Closes all connections in this pool, including ones that are currently checked out.
+        Args:
+            None.
+        Returns:
+            None.
+        """
+
+        if self.pool is not None and not self.pool.closed:
+            self.pool.closeall()
@@ -22,6 +22,24 @@ create type fragment as
 
 create type status_enum as enum ('pending', 'dispatched', 'complete', 'failed');
 
+create type property_count_change as
+(
+	mol_hash varchar,
+	model_name varchar,
+	status status_enum,
+	change integer
+);
+
+create type tags_count_change as
+(
+	mol_hash varchar,
+	model_name varchar,
+	tag_names character varying[],
+	complete boolean,
+	count_calculations boolean,
+	change integer
+);
+
 create table molecule_info
 (
 	name varchar not null
@@ -40,14 +58,17 @@ create table molecule_list
 	mol_name varchar not null
 		constraint molecule_list_molecule_name_fk
 			references molecule_info,
-	atom_coordinates double precision[] not null
+	atom_coordinates double precision[] not null,
+	packed_coordinates bytea
 );
 
+comment on column molecule_list.packed_coordinates is 'atom_coordinates packed into consecutive big-endian float64 values, so they can be sent to clients without formatting and parsing array text. Filled in by the molecule_list_pack_coordinates trigger.';
+
 create unique index molecule_list_mol_hash_uindex
 	on molecule_list (mol_hash);
 
-create index molecule_list_mol_name_index
-	on molecule_list (mol_name);
+create index molecule_list_mol_name_mol_hash_index
+	on molecule_list (mol_name, mol_hash);
 
 create table atom_info
 (
@@ -117,6 +138,21 @@ create table model_info
 create unique index models_info_name_uindex
 	on model_info (name);
 
+create table log_contents
+(
+	log_hash varchar not null
+		constraint log_contents_pk
+			primary key,
+	codec varchar not null,
+	content bytea not null
+);
+
+comment on table log_contents is 'Compressed log texts, stored once per distinct log and shared by every log file with the same text.';
+
+comment on column log_contents.log_hash is 'SHA1 of the uncompressed log text.';
+
+comment on column log_contents.codec is 'Compression used for content, zlib or zstd.';
+
 create table log_files
 (
 	log_id serial not null
@@ -125,9 +161,14 @@ create table log_files
 	start_time timestamp with time zone not null,
 	end_time timestamp with time zone,
 	log_text varchar,
-	client_name varchar not null
+	client_name varchar not null,
+	log_hash varchar
+		constraint log_files_log_contents_log_hash_fk
+			references log_contents
 );
 
+comment on column log_files.log_hash is 'Compressed log text in log_contents. Used instead of log_text by clients that compress their logs.';
+
 create unique index log_files_log_id_uindex
 	on log_files (log_id);
 
@@ -150,23 +191,26 @@ create table molecule_properties
 	use_cp boolean not null
 );
 
-create index energies_list_mol_hash_model_name_index
-	on molecule_properties (mol_hash, model_name);
-
 create unique index energies_list_most_recent_log_id_uindex
 	on molecule_properties (most_recent_log_id);
 
-create index molecule_properties_mol_hash_index
-	on molecule_properties (mol_hash);
-
 create index molecule_properties_frag_indices_index
 	on molecule_properties (frag_indices);
 
 create index molecule_properties_mol_hash_model_name_frag_indices_index
 	on molecule_properties (mol_hash, model_name, frag_indices);
 
-create index molecule_properties_status_index
-	on molecule_properties (status);
+create index molecule_properties_dispatched_index
+	on molecule_properties (mol_hash, model_name)
+	where status = 'dispatched';
+
+create index molecule_properties_failed_index
+	on molecule_properties (mol_hash, model_name)
+	where status = 'failed';
+
+create index molecule_properties_incomplete_index
+	on molecule_properties (mol_hash, model_name)
+	where status != 'complete';
 
 create table tags
 (
@@ -176,12 +220,66 @@ create table tags
 	model_name varchar not null
 		constraint tags_models_info_name_fk
 			references model_info,
-	tag_names character varying[] not null
+	tag_names character varying[] not null,
+	num_incomplete integer default 0 not null
 );
 
+comment on column tags.num_incomplete is 'Number of calculations of this molecule and model that are not complete. Kept current by the molecule_properties_count_* triggers.';
+
 create unique index tags_mol_hash_model_name_uindex
 	on tags (mol_hash, model_name);
 
+create index tags_tag_names_index
+	on tags using gin (tag_names);
+
+create index tags_complete_index
+	on tags (model_name, mol_hash)
+	where num_incomplete = 0;
+
+create table calculation_counts
+(
+	model_name varchar not null,
+	tag_name varchar not null,
+	status status_enum not null,
+	count bigint not null
+);
+
+comment on table calculation_counts is 'Number of rows of molecule_properties with each model and status whose row in tags has each tag. Kept current by the molecule_properties_count_* and tags_count_* triggers.';
+
+comment on column calculation_counts.count is 'Change to the count. Changes are only ever inserted, so concurrent transactions never wait on each other to update a count. The count is the sum of all changes with the same key, fold_counters() merges them.';
+
+create index calculation_counts_tag_name_status_index
+	on calculation_counts (tag_name, status);
+
+create table status_counts
+(
+	model_name varchar not null,
+	status status_enum not null,
+	count bigint not null
+);
+
+comment on table status_counts is 'Number of rows of molecule_properties with each model and status. Kept current by the molecule_properties_count_* triggers.';
+
+comment on column status_counts.count is 'Change to the count. The count is the sum of all changes with the same key, fold_counters() merges them.';
+
+create index status_counts_status_index
+	on status_counts (status);
+
+create table training_set_counts
+(
+	mol_name varchar not null,
+	model_name varchar not null,
+	tag_name varchar not null,
+	count bigint not null
+);
+
+comment on table training_set_counts is 'Number of rows of tags with each molecule name, model and tag whose calculations are all complete. Kept current by the tags_count_* triggers.';
+
+comment on column training_set_counts.count is 'Change to the count. The count is the sum of all changes with the same key, fold_counters() merges them.';
+
+create index training_set_counts_mol_name_model_name_tag_name_index
+	on training_set_counts (mol_name, model_name, tag_name);
+
 create table optimized_geometries
 (
 	mol_name varchar not null
@@ -356,6 +454,351 @@ DECLARE
 
 $$;
 
+create function pack_coordinates(coordinates double precision[]) returns bytea
+	immutable
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    -- float8send() gives the binary wire format of a double, which is big-endian.
+    RETURN (SELECT coalesce(string_agg(float8send(coordinate), ''::bytea ORDER BY index), ''::bytea)
+      FROM unnest(coordinates) WITH ORDINALITY AS u(coordinate, index));
+  END;
+
+$$;
+
+create function pack_molecule_coordinates() returns trigger
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    NEW.packed_coordinates := pack_coordinates(NEW.atom_coordinates);
+    RETURN NEW;
+  END;
+
+$$;
+
+create trigger molecule_list_pack_coordinates
+	before insert or update of atom_coordinates
+	on molecule_list
+	for each row
+	execute procedure pack_molecule_coordinates();
+
+create function count_property_changes(changes property_count_change[]) returns void
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+    incomplete_changes property_count_change[];
+  BEGIN
+    -- statements that do not change the status of any calculation change no counts.
+    changes := ARRAY(SELECT ROW(c.mol_hash, c.model_name, c.status, SUM(c.change))::property_count_change FROM unnest(changes) AS c
+                       GROUP BY c.mol_hash, c.model_name, c.status
+                       HAVING SUM(c.change) != 0);
+
+    IF cardinality(changes) = 0 THEN
+      RETURN;
+    END IF;
+
+    INSERT INTO status_counts (model_name, status, count)
+      SELECT c.model_name, c.status, SUM(c.change) FROM unnest(changes) AS c
+        GROUP BY c.model_name, c.status
+        HAVING SUM(c.change) != 0;
+
+    INSERT INTO calculation_counts (model_name, tag_name, status, count)
+      SELECT c.model_name, tag_name, c.status, SUM(c.change) FROM unnest(changes) AS c
+        INNER JOIN tags ON tags.mol_hash = c.mol_hash AND tags.model_name = c.model_name
+        CROSS JOIN unnest(tags.tag_names) AS tag_name
+        GROUP BY c.model_name, tag_name, c.status
+        HAVING SUM(c.change) != 0;
+
+    incomplete_changes := ARRAY(SELECT ROW(c.mol_hash, c.model_name, NULL, SUM(c.change))::property_count_change FROM unnest(changes) AS c
+                                  WHERE c.status != 'complete'
+                                  GROUP BY c.mol_hash, c.model_name
+                                  HAVING SUM(c.change) != 0);
+
+    -- calculations moving between pending, dispatched and failed do not change num_incomplete, so tags is only updated
+    -- when calculations become complete or stop being complete.
+    IF cardinality(incomplete_changes) != 0 THEN
+      UPDATE tags SET num_incomplete = tags.num_incomplete + d.change
+        FROM unnest(incomplete_changes) AS d
+        WHERE tags.mol_hash = d.mol_hash AND tags.model_name = d.model_name;
+    END IF;
+  END;
+
+$$;
+
+create function molecule_properties_count_changes() returns trigger
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+    changes property_count_change[];
+  BEGIN
+    -- each operation has its own trigger, because transition tables only exist for the operations they were declared for.
+    IF TG_OP = 'INSERT' THEN
+      changes := ARRAY(SELECT ROW(mol_hash, model_name, status, 1)::property_count_change FROM new_properties);
+    ELSIF TG_OP = 'UPDATE' THEN
+      changes := ARRAY(SELECT ROW(mol_hash, model_name, status, 1)::property_count_change FROM new_properties
+                       UNION ALL
+                       SELECT ROW(mol_hash, model_name, status, -1)::property_count_change FROM old_properties);
+    ELSE
+      changes := ARRAY(SELECT ROW(mol_hash, model_name, status, -1)::property_count_change FROM old_properties);
+    END IF;
+
+    PERFORM count_property_changes(changes);
+
+    RETURN NULL;
+  END;
+
+$$;
+
+create trigger molecule_properties_count_inserts
+	after insert
+	on molecule_properties
+	referencing new table as new_properties
+	for each statement
+	execute procedure molecule_properties_count_changes();
+
+create trigger molecule_properties_count_updates
+	after update
+	on molecule_properties
+	referencing old table as old_properties new table as new_properties
+	for each statement
+	execute procedure molecule_properties_count_changes();
+
+create trigger molecule_properties_count_deletes
+	after delete
+	on molecule_properties
+	referencing old table as old_properties
+	for each statement
+	execute procedure molecule_properties_count_changes();
+
+create function count_tags_changes(changes tags_count_change[]) returns void
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    INSERT INTO calculation_counts (model_name, tag_name, status, count)
+      SELECT c.model_name, tag_name, molecule_properties.status, SUM(c.change) FROM unnest(changes) AS c
+        CROSS JOIN unnest(c.tag_names) AS tag_name
+        INNER JOIN molecule_properties ON molecule_properties.mol_hash = c.mol_hash AND molecule_properties.model_name = c.model_name
+        WHERE c.count_calculations
+        GROUP BY c.model_name, tag_name, molecule_properties.status
+        HAVING SUM(c.change) != 0;
+
+    INSERT INTO training_set_counts (mol_name, model_name, tag_name, count)
+      SELECT molecule_list.mol_name, c.model_name, tag_name, SUM(c.change) FROM unnest(changes) AS c
+        CROSS JOIN unnest(c.tag_names) AS tag_name
+        INNER JOIN molecule_list ON molecule_list.mol_hash = c.mol_hash
+        WHERE c.complete
+        GROUP BY molecule_list.mol_name, c.model_name, tag_name
+        HAVING SUM(c.change) != 0;
+  END;
+
+$$;
+
+create function tags_count_changes() returns trigger
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+    changes tags_count_change[];
+  BEGIN
+    IF TG_OP = 'INSERT' THEN
+      changes := ARRAY(SELECT ROW(mol_hash, model_name, tag_names, num_incomplete = 0, True, 1)::tags_count_change FROM new_tags);
+    ELSIF TG_OP = 'UPDATE' THEN
+      -- most updates only change num_incomplete without making the row complete or incomplete, they change no counts.
+      changes := ARRAY(SELECT ROW(o.mol_hash, o.model_name, o.tag_names, o.num_incomplete = 0, o.tag_names IS DISTINCT FROM n.tag_names, -1)::tags_count_change
+                         FROM old_tags AS o INNER JOIN new_tags AS n ON o.mol_hash = n.mol_hash AND o.model_name = n.model_name
+                         WHERE o.tag_names IS DISTINCT FROM n.tag_names OR (o.num_incomplete = 0) != (n.num_incomplete = 0)
+                       UNION ALL
+                       SELECT ROW(n.mol_hash, n.model_name, n.tag_names, n.num_incomplete = 0, o.tag_names IS DISTINCT FROM n.tag_names, 1)::tags_count_change
+                         FROM old_tags AS o INNER JOIN new_tags AS n ON o.mol_hash = n.mol_hash AND o.model_name = n.model_name
+                         WHERE o.tag_names IS DISTINCT FROM n.tag_names OR (o.num_incomplete = 0) != (n.num_incomplete = 0));
+    ELSE
+      changes := ARRAY(SELECT ROW(mol_hash, model_name, tag_names, num_incomplete = 0, True, -1)::tags_count_change FROM old_tags);
+    END IF;
+
+    IF cardinality(changes) != 0 THEN
+      PERFORM count_tags_changes(changes);
+    END IF;
+
+    RETURN NULL;
+  END;
+
+$$;
+
+create trigger tags_count_inserts
+	after insert
+	on tags
+	referencing new table as new_tags
+	for each statement
+	execute procedure tags_count_changes();
+
+create trigger tags_count_updates
+	after update
+	on tags
+	referencing old table as old_tags new table as new_tags
+	for each statement
+	execute procedure tags_count_changes();
+
+create trigger tags_count_deletes
+	after delete
+	on tags
+	referencing old table as old_tags
+	for each statement
+	execute procedure tags_count_changes();
+
+create function count_incomplete_calculations() returns trigger
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    -- calculations are added to molecule_properties before their row in tags, so they have to be counted here.
+    SELECT COUNT(*) FROM molecule_properties WHERE mol_hash = NEW.mol_hash AND model_name = NEW.model_name AND status != 'complete'
+      INTO NEW.num_incomplete;
+    RETURN NEW;
+  END;
+
+$$;
+
+create trigger tags_count_incomplete
+	before insert
+	on tags
+	for each row
+	execute procedure count_incomplete_calculations();
+
+create function check_counters() returns TABLE(counter character varying, counter_key character varying, stored bigint, actual bigint)
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    RETURN QUERY
+      SELECT 'status_counts'::varchar, concat_ws(', ', coalesce(a.model_name, s.model_name), coalesce(a.status, s.status))::varchar,
+          coalesce(s.count, 0)::bigint, coalesce(a.count, 0)
+        FROM (SELECT model_name, status, COUNT(*) AS count FROM molecule_properties GROUP BY model_name, status) AS a
+        FULL OUTER JOIN (SELECT status_counts.model_name, status_counts.status, SUM(status_counts.count) AS count FROM status_counts
+                           GROUP BY status_counts.model_name, status_counts.status HAVING SUM(status_counts.count) != 0) AS s
+          ON a.model_name = s.model_name AND a.status = s.status
+        WHERE coalesce(s.count, 0) != coalesce(a.count, 0);
+
+    RETURN QUERY
+      SELECT 'calculation_counts'::varchar, concat_ws(', ', coalesce(a.model_name, s.model_name), coalesce(a.tag_name, s.tag_name), coalesce(a.status, s.status))::varchar,
+          coalesce(s.count, 0)::bigint, coalesce(a.count, 0)
+        FROM (SELECT molecule_properties.model_name, tag_name, molecule_properties.status, COUNT(*) AS count FROM molecule_properties
+                INNER JOIN tags ON tags.mol_hash = molecule_properties.mol_hash AND tags.model_name = molecule_properties.model_name
+                CROSS JOIN unnest(tags.tag_names) AS tag_name
+                GROUP BY molecule_properties.model_name, tag_name, molecule_properties.status) AS a
+        FULL OUTER JOIN (SELECT calculation_counts.model_name, calculation_counts.tag_name, calculation_counts.status, SUM(calculation_counts.count) AS count FROM calculation_counts
+                           GROUP BY calculation_counts.model_name, calculation_counts.tag_name, calculation_counts.status HAVING SUM(calculation_counts.count) != 0) AS s
+          ON a.model_name = s.model_name AND a.tag_name = s.tag_name AND a.status = s.status
+        WHERE coalesce(s.count, 0) != coalesce(a.count, 0);
+
+    RETURN QUERY
+      SELECT 'training_set_counts'::varchar, concat_ws(', ', coalesce(a.mol_name, s.mol_name), coalesce(a.model_name, s.model_name), coalesce(a.tag_name, s.tag_name))::varchar,
+          coalesce(s.count, 0)::bigint, coalesce(a.count, 0)
+        FROM (SELECT molecule_list.mol_name, tags.model_name, tag_name, COUNT(*) AS count FROM tags
+                INNER JOIN molecule_list ON molecule_list.mol_hash = tags.mol_hash
+                CROSS JOIN unnest(tags.tag_names) AS tag_name
+                WHERE NOT EXISTS(SELECT 1 FROM molecule_properties WHERE molecule_properties.mol_hash = tags.mol_hash
+                                   AND molecule_properties.model_name = tags.model_name AND molecule_properties.status != 'complete')
+                GROUP BY molecule_list.mol_name, tags.model_name, tag_name) AS a
+        FULL OUTER JOIN (SELECT training_set_counts.mol_name, training_set_counts.model_name, training_set_counts.tag_name, SUM(training_set_counts.count) AS count FROM training_set_counts
+                           GROUP BY training_set_counts.mol_name, training_set_counts.model_name, training_set_counts.tag_name HAVING SUM(training_set_counts.count) != 0) AS s
+          ON a.mol_name = s.mol_name AND a.model_name = s.model_name AND a.tag_name = s.tag_name
+        WHERE coalesce(s.count, 0) != coalesce(a.count, 0);
+
+    RETURN QUERY
+      SELECT 'num_incomplete'::varchar, concat_ws(', ', tags.mol_hash, tags.model_name)::varchar, tags.num_incomplete::bigint, a.count
+        FROM tags CROSS JOIN LATERAL (SELECT COUNT(*) AS count FROM molecule_properties WHERE molecule_properties.mol_hash = tags.mol_hash
+                                        AND molecule_properties.model_name = tags.model_name AND molecule_properties.status != 'complete') AS a
+        WHERE tags.num_incomplete != a.count;
+  END;
+
+$$;
+
+create function fold_counters() returns void
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    -- changes inserted by transactions that have not committed yet are not deleted, so they are kept as they are.
+
+    WITH folded AS (DELETE FROM status_counts RETURNING *)
+    INSERT INTO status_counts (model_name, status, count)
+      SELECT model_name, status, SUM(count) FROM folded GROUP BY model_name, status HAVING SUM(count) != 0;
+
+    WITH folded AS (DELETE FROM calculation_counts RETURNING *)
+    INSERT INTO calculation_counts (model_name, tag_name, status, count)
+      SELECT model_name, tag_name, status, SUM(count) FROM folded GROUP BY model_name, tag_name, status HAVING SUM(count) != 0;
+
+    WITH folded AS (DELETE FROM training_set_counts RETURNING *)
+    INSERT INTO training_set_counts (mol_name, model_name, tag_name, count)
+      SELECT mol_name, model_name, tag_name, SUM(count) FROM folded GROUP BY mol_name, model_name, tag_name HAVING SUM(count) != 0;
+  END;
+
+$$;
+
+create function rebuild_counters() returns void
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    -- keep calculations from changing until the counters are rebuilt and saved.
+    LOCK TABLE molecule_properties, tags IN SHARE ROW EXCLUSIVE MODE;
+
+    UPDATE tags SET num_incomplete = a.count
+      FROM (SELECT tags.mol_hash, tags.model_name, COUNT(molecule_properties.status) AS count FROM tags
+              LEFT JOIN molecule_properties ON molecule_properties.mol_hash = tags.mol_hash
+                AND molecule_properties.model_name = tags.model_name AND molecule_properties.status != 'complete'
+              GROUP BY tags.mol_hash, tags.model_name) AS a
+      WHERE tags.mol_hash = a.mol_hash AND tags.model_name = a.model_name AND tags.num_incomplete != a.count;
+
+    DELETE FROM status_counts;
+    INSERT INTO status_counts (model_name, status, count)
+      SELECT model_name, status, COUNT(*) FROM molecule_properties GROUP BY model_name, status;
+
+    DELETE FROM calculation_counts;
+    INSERT INTO calculation_counts (model_name, tag_name, status, count)
+      SELECT molecule_properties.model_name, tag_name, molecule_properties.status, COUNT(*) FROM molecule_properties
+        INNER JOIN tags ON tags.mol_hash = molecule_properties.mol_hash AND tags.model_name = molecule_properties.model_name
+        CROSS JOIN unnest(tags.tag_names) AS tag_name
+        GROUP BY molecule_properties.model_name, tag_name, molecule_properties.status;
+
+    DELETE FROM training_set_counts;
+    INSERT INTO training_set_counts (mol_name, model_name, tag_name, count)
+      SELECT molecule_list.mol_name, tags.model_name, tag_name, COUNT(*) FROM tags
+        INNER JOIN molecule_list ON molecule_list.mol_hash = tags.mol_hash
+        CROSS JOIN unnest(tags.tag_names) AS tag_name
+        WHERE tags.num_incomplete = 0
+        GROUP BY molecule_list.mol_name, tags.model_name, tag_name;
+  END;
+
+$$;
+
 create function combinations(arr integer[]) returns TABLE(perm integer[], l integer)
 	security definer
 	SET search_path=public, pg_temp
@@ -528,6 +971,41 @@ DECLARE
 
 $$;
 
+create function get_pending_calculations_packed(molecule_name character varying, input_client_name character varying, input_tags character varying[], batch_size integer) returns TABLE(coords bytea, model character varying, indices integer[], use_cp boolean)
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+    molecule_hash VARCHAR;
+    id INTEGER;
+
+  BEGIN
+
+    FOR molecule_hash, model, indices, get_pending_calculations_packed.use_cp IN SELECT pending_calculations.mol_hash, pending_calculations.model_name, pending_calculations.frag_indices, pending_calculations.use_cp FROM
+      pending_calculations INNER JOIN molecule_list ON pending_calculations.mol_hash = molecule_list.mol_hash
+      INNER JOIN tags ON pending_calculations.mol_hash = tags.mol_hash AND pending_calculations.model_name = tags.model_name WHERE
+      molecule_list.mol_name = molecule_name AND tags.tag_names && input_tags LIMIT batch_size
+    LOOP
+
+      INSERT INTO log_files(start_time, client_name) VALUES (clock_timestamp(), input_client_name) RETURNING log_id
+        INTO id;
+
+      UPDATE molecule_properties SET status='dispatched', most_recent_log_id=id WHERE mol_hash = molecule_hash AND model_name = model AND frag_indices = indices AND molecule_properties.use_cp = get_pending_calculations_packed.use_cp;
+
+      DELETE FROM pending_calculations WHERE mol_hash = molecule_hash AND model_name = model AND frag_indices = indices AND pending_calculations.use_cp = get_pending_calculations_packed.use_cp;
+
+      SELECT packed_coordinates from molecule_list WHERE mol_hash = molecule_hash
+        INTO coords;
+
+      RETURN NEXT;
+
+    END LOOP;
+
+  END;
+
+$$;
+
 create function delete_atom_info(atomic_symbol character varying) returns boolean
 	security definer
 	SET search_path=public, pg_temp
@@ -819,7 +1297,7 @@ as $$
 DECLARE
 
   BEGIN
-    TRUNCATE atom_info, fragment_contents, fragment_info, log_files, model_info, molecule_contents, molecule_info, molecule_list, molecule_properties, pending_calculations, optimized_geometries, tags, training_sets;
+    TRUNCATE atom_info, calculation_counts, fragment_contents, fragment_info, log_contents, log_files, model_info, molecule_contents, molecule_info, molecule_list, molecule_properties, pending_calculations, optimized_geometries, status_counts, tags, training_set_counts, training_sets;
   END;
 
 $$;
@@ -933,17 +1411,303 @@ DECLARE
       END IF;
     END LOOP;
 
-    IF optimized = True THEN
-      IF NOT EXISTS(SELECT mol_hash FROM optimized_geometries WHERE mol_name=name AND mol_hash=hash AND model_name=model) THEN
-        INSERT INTO optimized_geometries VALUES (name, hash, model);
+    IF optimized = True THEN
+      IF NOT EXISTS(SELECT mol_hash FROM optimized_geometries WHERE mol_name=name AND mol_hash=hash AND model_name=model) THEN
+        INSERT INTO optimized_geometries VALUES (name, hash, model);
+      END IF;
+    END IF;
+
+    RETURN new_config;
+  END;
+
+$$;
+
+create function get_existing_hashes(hashes character varying[], model character varying) returns TABLE(hash character varying)
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+  BEGIN
+
+    -- Gets which of the molecules already have calculations in the model, so clients only send the new ones.
+
+    RETURN QUERY SELECT tags.mol_hash FROM tags WHERE tags.model_name = model AND tags.mol_hash = ANY(hashes);
+
+  END;
+
+$$;
+
+create function tag_calculations(hashes character varying[], name character varying, model character varying, tags character varying[], optimized boolean) returns void
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+  tag_name VARCHAR;
+  BEGIN
+
+    -- Does what add_calculation does for calculations that are already in the database, for a whole batch at once.
+
+    FOREACH tag_name IN ARRAY tags
+    LOOP
+      IF NOT training_set_exists(tag_name)
+      THEN
+        -- If the training set does not exist, create it giving current user all privileges
+        INSERT INTO training_sets (admins, tag_name, read_users, write_users)
+            VALUES (ARRAY[get_user_id()], tag_name, ARRAY[get_user_id()], ARRAY[get_user_id()]);
+      ELSIF NOT has_write_privilege(tag_name)
+      THEN
+        -- If training set does exist and current user doesn't have write privileges, Error.
+        raise EXCEPTION 'User %% does not have write privileges on training set %%', session_user, tag_name;
+      END IF;
+
+      UPDATE tags SET tag_names=(tag_name || tag_names)
+          WHERE mol_hash = ANY(hashes) AND model_name=model AND NOT tag_name = ANY(tag_names);
+    END LOOP;
+
+    IF optimized = True THEN
+      INSERT INTO optimized_geometries
+          SELECT DISTINCT name, hash, model FROM unnest(hashes) AS hash
+          WHERE NOT EXISTS(SELECT mol_hash FROM optimized_geometries
+                           WHERE mol_name=name AND mol_hash=hash AND model_name=model);
+    END IF;
+
+  END;
+
+$$;
+
+create function screen_calculations(hash character varying, model character varying, screened character varying[], tags character varying[]) returns integer
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+  tag_name VARCHAR;
+  counter INTEGER;
+  BEGIN
+
+    -- Removes the pending calculations of the screened subsets of fragments of a molecule added by add_calculation,
+    -- each given as the text of its fragment indices. Their interaction energies are 0, so they are never calculated.
+
+    FOREACH tag_name IN ARRAY tags
+    LOOP
+      IF NOT has_write_privilege(tag_name)
+      THEN
+        raise EXCEPTION 'User %% does not have write privileges on training set %%', session_user, tag_name;
+      END IF;
+    END LOOP;
+
+    DELETE FROM pending_calculations
+        WHERE mol_hash = hash AND model_name = model AND frag_indices::text = ANY(screened);
+
+    DELETE FROM molecule_properties
+        WHERE mol_hash = hash AND model_name = model AND status = 'pending' AND frag_indices::text = ANY(screened);
+
+    GET DIAGNOSTICS counter = ROW_COUNT;
+
+    RETURN counter;
+  END;
+
+$$;
+
+create function import_staged_calculations(name character varying, fragments fragment[], counts integer[], method character varying, basis character varying, cp boolean, tags character varying[], optimized boolean, calculation_indices character varying[], calculation_use_cps boolean[], hashes character varying[], coordinates double precision[], nmer_energies double precision[]) returns void
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+  model varchar;
+  new_indices INTEGER[];
+  BEGIN
+    model := concat(method, '/', basis, '/');
+    IF cp THEN
+      model := concat(model, 'True');
+    ELSE
+      model := concat(model, 'False');
+    end if;
+
+    -- Does what import_calculation does for a whole batch of molecules at once. coordinates and nmer_energies have one
+    -- row per molecule, and calculation_indices and calculation_use_cps describe the calculation of each column of
+    -- nmer_energies. Clients stage the batch with COPY and aggregate it into these arrays.
+
+    PERFORM add_model_info(method, basis, cp);
+    PERFORM add_molecule_info(name, fragments, counts);
+
+    -- the first row of each molecule that has no calculations in this model yet.
+    SELECT array_agg(staged.i) FROM (SELECT DISTINCT ON (hashes[i]) i FROM generate_subscripts(hashes, 1) AS i ORDER BY hashes[i], i) AS staged
+        WHERE NOT EXISTS(SELECT molecule_properties.mol_hash FROM molecule_properties WHERE molecule_properties.mol_hash = hashes[staged.i] AND molecule_properties.model_name = model)
+      INTO new_indices;
+
+    IF new_indices IS NOT NULL THEN
+      INSERT INTO molecule_list (mol_hash, mol_name, atom_coordinates)
+          SELECT hashes[i], name, ARRAY(SELECT unnest(coordinates[i:i][:])) FROM unnest(new_indices) AS i
+          WHERE NOT EXISTS(SELECT molecule_list.mol_hash FROM molecule_list WHERE molecule_list.mol_hash = hashes[i]);
+
+      INSERT INTO molecule_properties (mol_hash, model_name, frag_indices, energies, atomic_charges, status, past_log_ids, use_cp)
+          SELECT hashes[i], model, calculation_indices[j]::integer[], ARRAY[nmer_energies[i][j]], '{}', 'complete', '{}', calculation_use_cps[j]
+          FROM unnest(new_indices) AS i CROSS JOIN generate_subscripts(calculation_indices, 1) AS j;
+
+      INSERT INTO tags (mol_hash, model_name, tag_names)
+          SELECT hashes[i], model, '{}' FROM unnest(new_indices) AS i;
+    END IF;
+
+    -- checks the privileges on the tags, raising an exception that rolls back the whole batch if the user lacks them.
+    PERFORM tag_calculations(hashes, name, model, tags, optimized);
+
+  END;
+
+$$;
+
+create function reset_calculations_batch(ts character varying[], statuses character varying[], after_hash character varying, batch_size integer) returns character varying
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+  hashes VARCHAR[];
+  BEGIN
+
+    -- Resets the calculations with one of the statuses of the next batch_size molecules after after_hash with one of
+    -- the tags back to pending, with one statement for the whole batch. If ts is NULL, the tags are not checked.
+    -- Returns the hash of the last molecule in the batch, to pass as after_hash for the next batch, or NULL if there
+    -- are no more molecules to reset.
+
+    SELECT array_agg(batch.mol_hash ORDER BY batch.mol_hash) FROM (
+        SELECT DISTINCT molecule_properties.mol_hash FROM molecule_properties
+            INNER JOIN tags ON molecule_properties.mol_hash = tags.mol_hash AND molecule_properties.model_name = tags.model_name
+            WHERE molecule_properties.mol_hash > after_hash AND status::varchar = ANY(statuses) AND (ts IS NULL OR ts && tags.tag_names)
+            ORDER BY molecule_properties.mol_hash LIMIT batch_size) AS batch
+      INTO hashes;
+
+    IF hashes IS NULL THEN
+      RETURN NULL;
+    END IF;
+
+    WITH reset AS (
+        UPDATE molecule_properties SET status = 'pending' FROM tags
+            WHERE molecule_properties.mol_hash = ANY(hashes) AND molecule_properties.mol_hash = tags.mol_hash
+              AND molecule_properties.model_name = tags.model_name AND status::varchar = ANY(statuses)
+              AND (ts IS NULL OR ts && tags.tag_names)
+            RETURNING molecule_properties.mol_hash, molecule_properties.model_name, molecule_properties.frag_indices, molecule_properties.use_cp)
+    INSERT INTO pending_calculations (mol_hash, model_name, frag_indices, use_cp)
+        SELECT reset.mol_hash, reset.model_name, reset.frag_indices, reset.use_cp FROM reset;
+
+    RETURN hashes[array_length(hashes, 1)];
+  END;
+
+$$;
+
+create function delete_calculations_batch(hashes character varying[], name character varying, method character varying, basis character varying, cp boolean, tags character varying[], delete_complete_calculations boolean) returns integer
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+  model varchar;
+  tag_name VARCHAR;
+  tagged_hashes VARCHAR[];
+  untagged_hashes VARCHAR[];
+  deleted_hashes VARCHAR[];
+  BEGIN
+    model := concat(method, '/', basis, '/');
+    IF cp THEN
+      model := concat(model, 'True');
+    ELSE
+      model := concat(model, 'False');
+    end if;
+
+    -- Does what delete_calculation does for a whole batch of molecules at once, with one statement per table.
+
+    FOREACH tag_name IN ARRAY tags
+    LOOP
+      IF NOT training_set_exists(tag_name)
+      THEN
+        -- If the training set does not exist, Error
+        raise EXCEPTION 'Training set %% does not exist', tag_name;
+      ELSIF NOT has_write_privilege(tag_name)
+      THEN
+        -- If training set does exist and current user doesn't have write privileges, Error.
+        raise EXCEPTION 'User %% does not have write privileges on training set %%', session_user, tag_name;
+      END IF;
+    END LOOP;
+
+    SELECT array_agg(tags.mol_hash) FROM tags
+        WHERE tags.mol_hash = ANY(hashes) AND model_name = model AND delete_calculations_batch.tags && tags.tag_names
+      INTO tagged_hashes;
+
+    IF tagged_hashes IS NULL THEN
+      RETURN 0;
+    END IF;
+
+    FOREACH tag_name in ARRAY tags LOOP
+      UPDATE tags SET tag_names=array_remove(tag_names, tag_name) WHERE mol_hash = ANY(tagged_hashes) AND model_name=model;
+    END LOOP;
+
+    SELECT array_agg(tags.mol_hash) FROM tags WHERE tags.mol_hash = ANY(tagged_hashes) AND model_name = model AND tag_names = '{}'
+      INTO untagged_hashes;
+
+    IF untagged_hashes IS NOT NULL THEN
+
+      DELETE FROM optimized_geometries WHERE mol_hash = ANY(untagged_hashes) AND mol_name = name AND model_name = model;
+
+      SELECT array_agg(untagged.mol_hash) FROM unnest(untagged_hashes) AS untagged(mol_hash)
+          WHERE delete_complete_calculations OR NOT EXISTS(SELECT molecule_properties.mol_hash FROM molecule_properties
+              WHERE molecule_properties.mol_hash = untagged.mol_hash AND molecule_properties.model_name = model AND status != 'pending')
+        INTO deleted_hashes;
+
+      IF deleted_hashes IS NOT NULL THEN
+        DELETE FROM tags WHERE mol_hash = ANY(deleted_hashes) AND model_name = model;
+        DELETE FROM molecule_properties WHERE mol_hash = ANY(deleted_hashes) AND model_name = model;
+        DELETE FROM pending_calculations WHERE mol_hash = ANY(deleted_hashes) AND model_name = model;
+        DELETE FROM molecule_list WHERE mol_hash = ANY(deleted_hashes)
+            AND NOT EXISTS(SELECT molecule_properties.mol_hash FROM molecule_properties WHERE molecule_properties.mol_hash = molecule_list.mol_hash);
+        PERFORM delete_molecule_info(name);
+        PERFORM delete_model_info(method, basis, cp);
       END IF;
+
     END IF;
 
-    RETURN new_config;
+    RETURN array_length(tagged_hashes, 1);
   END;
 
 $$;
 
+create function delete_all_calculations_batch(molecule_name character varying, method character varying, basis character varying, cp boolean, input_tags character varying[], delete_complete_calculations boolean, batch_size integer) returns integer
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+  model   varchar;
+  hashes  VARCHAR[];
+BEGIN
+
+  model := concat(method, '/', basis, '/');
+  IF cp THEN
+    model := concat(model, 'True');
+  ELSE
+    model := concat(model, 'False');
+  end if;
+
+  -- Removes the tags from the next batch_size molecules that have them, so calling this again until it returns less
+  -- than batch_size does what delete_all_calculations does, one batch at a time.
+
+  SELECT array_agg(batch.mol_hash) FROM (
+      SELECT molecule_list.mol_hash FROM tags
+          INNER JOIN molecule_list ON tags.mol_hash = molecule_list.mol_hash
+          WHERE molecule_list.mol_name = molecule_name AND model_name = model AND tag_names && input_tags
+          LIMIT batch_size) AS batch
+    INTO hashes;
+
+  IF hashes IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  RETURN delete_calculations_batch(hashes, molecule_name, method, basis, cp, input_tags, delete_complete_calculations);
+END;
+
+$$;
+
 create function get_1b_training_set(molecule_name character varying, model character varying, input_tags character varying[], batch_offset integer, batch_size integer) returns TABLE(coords double precision[], energy double precision)
 	security definer
 	SET search_path=public, pg_temp
@@ -1053,6 +1817,143 @@ DECLARE
 
 $$;
 
+create function get_1b_training_set_packed(molecule_name character varying, model character varying, input_tags character varying[], batch_offset integer, batch_size integer) returns TABLE(coords bytea, energy double precision)
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    RETURN QUERY SELECT pack_coordinates(t.coords), t.energy FROM get_1b_training_set(molecule_name, model, input_tags, batch_offset, batch_size) AS t;
+  END;
+
+$$;
+
+create function get_optimized_energies(monomer_names character varying[], model character varying, input_tags character varying[], allow_multiple boolean) returns double precision[]
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+        monomer_name varchar;
+        optimized_energies FLOAT[];
+        optimized_index INT;
+        hash VARCHAR;
+        energy FLOAT;
+        stat VARCHAR;
+        tag_name varchar;
+      BEGIN
+
+        -- Check to make sure the current user has read priveleges on all training sets before allowing them to get
+        -- the optimized energies.
+
+        FOREACH tag_name IN ARRAY input_tags
+        LOOP
+          IF NOT training_set_exists(tag_name)
+          THEN
+            -- If the training set does not exist, Error
+            raise EXCEPTION 'Training set %% does not exist', tag_name;
+          ELSIF NOT has_read_privilege(tag_name)
+          THEN
+            -- If training set does exist and current user doesn't have read privileges, Error.
+            raise EXCEPTION 'User %% does not have read privileges on training set %%', session_user, tag_name;
+          END IF;
+        END LOOP;
+
+        optimized_energies := '{}';
+        optimized_index := 1;
+
+        FOREACH monomer_name IN ARRAY monomer_names
+        LOOP
+
+          optimized_energies = optimized_energies || NULL;
+
+          FOR hash IN SELECT optimized_geometries.mol_hash
+              FROM optimized_geometries INNER JOIN tags
+              ON optimized_geometries.mol_hash = tags.mol_hash AND optimized_geometries.model_name = tags.model_name
+              WHERE optimized_geometries.mol_name = monomer_name AND optimized_geometries.model_name = model AND tags.tag_names && input_tags
+          LOOP
+
+            SELECT energies[1], status FROM molecule_properties WHERE mol_hash = hash AND model_name = model AND frag_indices = '{0}'
+              INTO energy, stat;
+
+            IF stat != 'complete'
+            THEN
+              RAISE EXCEPTION 'Optimized energy for %% uncalculated in database.', monomer_name;
+            END IF;
+
+            IF optimized_energies[optimized_index] ISNULL
+            THEN
+              optimized_energies[optimized_index] := energy;
+            ELSIF NOT allow_multiple
+            THEN
+              RAISE EXCEPTION 'Multiple optimized geometries in database.';
+            ELSE
+              IF energy < optimized_energies[optimized_index]
+              THEN
+                optimized_energies[optimized_index] := energy;
+              END IF;
+
+              RAISE WARNING 'Multiple optimized geometries for %% in database.', monomer_name;
+            END IF;
+
+          END LOOP;
+
+          IF optimized_energies[optimized_index] ISNULL
+          THEN
+            RAISE EXCEPTION 'No optimized energy in database for %%.', monomer_name;
+          END IF;
+
+          optimized_index = optimized_index + 1;
+
+        END LOOP;
+
+        RETURN optimized_energies;
+      END;
+
+$$;
+
+create function get_2b_training_set_page(molecule_name character varying, monomer1_name character varying, monomer2_name character varying, model character varying, input_tags character varying[], after_hash character varying, batch_size integer) returns TABLE(hash character varying, coords bytea, binding_energy double precision, interaction_energy double precision, monomer1_deformation_energy double precision, monomer2_deformation_energy double precision)
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+        optimized_energies FLOAT[];
+        cp BOOLEAN;
+      BEGIN
+
+        optimized_energies := get_optimized_energies(ARRAY[monomer1_name, monomer2_name], model, input_tags, False);
+
+        cp := substring(model, char_length(model) - 3, 4) = 'True';
+
+        -- Gets the next batch_size configurations with a complete dimer energy after after_hash, and all their
+        -- energies in one query.
+
+        RETURN QUERY
+          SELECT page.mol_hash, page.packed_coordinates, e.interaction + e.deformation1 + e.deformation2, e.interaction,
+              e.deformation1, e.deformation2
+            FROM (SELECT molecule_list.mol_hash, molecule_list.packed_coordinates FROM molecule_list
+                    INNER JOIN tags ON molecule_list.mol_hash = tags.mol_hash
+                    INNER JOIN molecule_properties AS dimer ON dimer.mol_hash = molecule_list.mol_hash AND dimer.model_name = model
+                      AND dimer.frag_indices = '{0, 1}' AND dimer.use_cp = False
+                    WHERE molecule_list.mol_name = molecule_name AND tags.model_name = model AND tags.tag_names && input_tags
+                    AND dimer.status = 'complete' AND molecule_list.mol_hash > after_hash
+                    ORDER BY molecule_list.mol_hash
+                    LIMIT batch_size) AS page
+            CROSS JOIN LATERAL (
+              SELECT MAX(p.energies[1]) FILTER (WHERE p.frag_indices = '{0, 1}' AND p.use_cp = False)
+                       - MAX(p.energies[1]) FILTER (WHERE p.frag_indices = '{0}' AND p.use_cp = cp)
+                       - MAX(p.energies[1]) FILTER (WHERE p.frag_indices = '{1}' AND p.use_cp = cp) AS interaction,
+                     MAX(p.energies[1]) FILTER (WHERE p.frag_indices = '{0}' AND p.use_cp = False) - optimized_energies[1] AS deformation1,
+                     MAX(p.energies[1]) FILTER (WHERE p.frag_indices = '{1}' AND p.use_cp = False) - optimized_energies[2] AS deformation2
+                FROM molecule_properties AS p WHERE p.mol_hash = page.mol_hash AND p.model_name = model) AS e
+            ORDER BY page.mol_hash;
+      END;
+
+$$;
+
 create function get_2b_training_set(molecule_name character varying, monomer1_name character varying, monomer2_name character varying, model character varying, input_tags character varying[], batch_offset integer, batch_size integer) returns TABLE(coords double precision[], binding_energy double precision, interaction_energy double precision, monomer1_deformation_energy double precision, monomer2_deformation_energy double precision)
 	security definer
 	SET search_path=public, pg_temp
@@ -1228,6 +2129,19 @@ DECLARE
 
 $$;
 
+create function get_2b_training_set_packed(molecule_name character varying, monomer1_name character varying, monomer2_name character varying, model character varying, input_tags character varying[], batch_offset integer, batch_size integer) returns TABLE(coords bytea, binding_energy double precision, interaction_energy double precision, monomer1_deformation_energy double precision, monomer2_deformation_energy double precision)
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    RETURN QUERY SELECT pack_coordinates(t.coords), t.binding_energy, t.interaction_energy, t.monomer1_deformation_energy, t.monomer2_deformation_energy FROM get_2b_training_set(molecule_name, monomer1_name, monomer2_name, model, input_tags, batch_offset, batch_size) AS t;
+  END;
+
+$$;
+
 create function get_failed_configs(molecule_name character varying, model character varying, input_tags character varying[], batch_offset integer, batch_size integer) returns TABLE(coords double precision[], frags integer[], used_cp boolean)
 	security definer
 	SET search_path=public, pg_temp
@@ -1293,6 +2207,19 @@ DECLARE
 
 $$;
 
+create function get_failed_configs_packed(molecule_name character varying, model character varying, input_tags character varying[], batch_offset integer, batch_size integer) returns TABLE(coords bytea, frags integer[], used_cp boolean)
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    RETURN QUERY SELECT pack_coordinates(t.coords), t.frags, t.used_cp FROM get_failed_configs(molecule_name, model, input_tags, batch_offset, batch_size) AS t;
+  END;
+
+$$;
+
 create function get_user_id() returns integer
 	security definer
 	SET search_path=public, pg_temp
@@ -1724,6 +2651,7 @@ create function count_training_set_size(molecule_name character varying, model c
 as $$
 DECLARE
     count integer;
+    num_changes integer;
     tag_name varchar;
   BEGIN
 
@@ -1744,11 +2672,24 @@ DECLARE
       END IF;
     END LOOP;
 
+    -- a molecule with several of the tags would be counted once per tag by the counters, so they are only used for one tag.
+    IF array_length(input_tags, 1) = 1 THEN
+      SELECT coalesce(SUM(training_set_counts.count), 0), COUNT(*) FROM training_set_counts
+              WHERE training_set_counts.mol_name = molecule_name AND training_set_counts.model_name = model
+              AND training_set_counts.tag_name = input_tags[1]
+        into count, num_changes;
+
+      IF num_changes > 1000 THEN
+        PERFORM fold_counters();
+      END IF;
+
+      RETURN count;
+    END IF;
+
     SELECT COUNT(*) FROM molecule_list INNER JOIN tags
             ON molecule_list.mol_hash = tags.mol_hash
             WHERE molecule_list.mol_name = molecule_name AND tags.model_name = model AND tags.tag_names && input_tags
-            AND 'complete'=ALL(SELECT status FROM molecule_properties WHERE molecule_properties.mol_hash = molecule_list.mol_hash AND molecule_properties.model_name
-            = model)
+            AND tags.num_incomplete = 0
       into count;
     RETURN count;
   END;
@@ -1833,6 +2774,19 @@ DECLARE
 
 $$;
 
+create function export_calculations_packed(molecule_name character varying, model character varying, input_tags character varying[], batch_offset integer, batch_size integer) returns TABLE(coords bytea, energies double precision[])
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    RETURN QUERY SELECT pack_coordinates(t.coords), t.energies FROM export_calculations(molecule_name, model, input_tags, batch_offset, batch_size) AS t;
+  END;
+
+$$;
+
 create function count_pending_calculations(input_tags character varying[]) returns integer
 	security definer
 	SET search_path=public, pg_temp
@@ -1840,10 +2794,26 @@ create function count_pending_calculations(input_tags character varying[]) retur
 as $$
 DECLARE
     count integer;
+    num_changes integer;
   BEGIN
 
+    -- a calculation with several of the tags would be counted once per tag by the counters, so they are only used for
+    -- one tag.
+    IF array_length(input_tags, 1) = 1 THEN
+      SELECT coalesce(SUM(calculation_counts.count), 0), COUNT(*) FROM calculation_counts
+              WHERE calculation_counts.tag_name = input_tags[1] AND calculation_counts.status = 'pending'
+        into count, num_changes;
+
+      -- every statement that changes calculations adds a change to the counts, merge them once there are many.
+      IF num_changes > 1000 THEN
+        PERFORM fold_counters();
+      END IF;
+
+      RETURN count;
+    END IF;
+
     SELECT COUNT(*) FROM pending_calculations INNER JOIN tags
-            ON pending_calculations.mol_hash = tags.mol_hash
+            ON pending_calculations.mol_hash = tags.mol_hash AND pending_calculations.model_name = tags.model_name
             WHERE tags.tag_names && input_tags
       into count;
     RETURN count;
@@ -1966,8 +2936,7 @@ DECLARE
             FROM molecule_list INNER JOIN tags
             ON molecule_list.mol_hash = tags.mol_hash
             WHERE molecule_list.mol_name = molecule_name AND tags.model_name = model AND tags.tag_names && input_tags
-            AND 'complete'=ALL(SELECT status FROM molecule_properties WHERE molecule_properties.mol_hash = molecule_list.mol_hash AND molecule_properties.model_name
-            = model)
+            AND tags.num_incomplete = 0
             ORDER BY molecule_list.mol_hash
             OFFSET batch_offset LIMIT batch_size
         LOOP
@@ -2050,6 +3019,70 @@ DECLARE
       END;
 $$;
 
+create function get_training_set_packed(molecule_name character varying, monomer_names character varying[], model character varying, input_tags character varying[], batch_offset integer, batch_size integer) returns TABLE(coords bytea, binding_energy double precision, nb_energy double precision, deformation_energies double precision[])
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+
+  BEGIN
+    RETURN QUERY SELECT pack_coordinates(t.coords), t.binding_energy, t.nb_energy, t.deformation_energies FROM get_training_set(molecule_name, monomer_names, model, input_tags, batch_offset, batch_size) AS t;
+  END;
+
+$$;
+
+create function get_training_set_page(molecule_name character varying, monomer_names character varying[], model character varying, input_tags character varying[], after_hash character varying, batch_size integer) returns TABLE(hash character varying, coords bytea, binding_energy double precision, nb_energy double precision, deformation_energies double precision[])
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+        optimized_energies FLOAT[];
+        num_bodies INT;
+        cp BOOLEAN;
+      BEGIN
+
+        -- monomer_names must be passed in in standard order!
+
+        optimized_energies := get_optimized_energies(monomer_names, model, input_tags, True);
+
+        num_bodies := array_length(monomer_names, 1);
+        cp := substring(model, char_length(model) - 3, 4) = 'True';
+
+        -- Gets the next batch_size complete configurations after after_hash, and combines all their energies in one
+        -- query. The nb_energy adds each k-body energy with sign (-1)^(n-k), for monomers it is the deformation energy.
+        -- It is 0 if the calculation of all the fragments was screened by screen_calculations.
+
+        RETURN QUERY
+          SELECT page.mol_hash, page.packed_coordinates,
+              CASE WHEN num_bodies = 1 THEN e.deformations[1] ELSE e.nb + e.deformation_sum END,
+              CASE WHEN num_bodies = 1 THEN e.deformations[1] ELSE e.nb END,
+              e.deformations
+            FROM (SELECT molecule_list.mol_hash, molecule_list.packed_coordinates FROM molecule_list
+                    INNER JOIN tags ON molecule_list.mol_hash = tags.mol_hash
+                    WHERE molecule_list.mol_name = molecule_name AND tags.model_name = model AND tags.tag_names && input_tags
+                    AND tags.num_incomplete = 0 AND molecule_list.mol_hash > after_hash
+                    ORDER BY molecule_list.mol_hash
+                    LIMIT batch_size) AS page
+            CROSS JOIN LATERAL (
+              SELECT *, CASE WHEN has_nb THEN nb_sum ELSE 0 END AS nb FROM (
+              SELECT array_agg(p.energies[1] - optimized_energies[p.frag_indices[1] + 1] ORDER BY p.frag_indices)
+                       FILTER (WHERE array_length(p.frag_indices, 1) = 1 AND p.use_cp = False) AS deformations,
+                     SUM(p.energies[1] - optimized_energies[p.frag_indices[1] + 1])
+                       FILTER (WHERE array_length(p.frag_indices, 1) = 1 AND p.use_cp = False) AS deformation_sum,
+                     SUM(CASE WHEN array_length(p.frag_indices, 1) = num_bodies THEN p.energies[1]
+                              WHEN (num_bodies - array_length(p.frag_indices, 1)) %% 2 = 1 THEN -p.energies[1]
+                              ELSE p.energies[1] END)
+                       FILTER (WHERE array_length(p.frag_indices, 1) = num_bodies
+                               OR p.use_cp = cp AND array_length(p.frag_indices, 1) < num_bodies) AS nb_sum,
+                     bool_or(array_length(p.frag_indices, 1) = num_bodies) AS has_nb
+                FROM molecule_properties AS p WHERE p.mol_hash = page.mol_hash AND p.model_name = model)) AS e
+            ORDER BY page.mol_hash;
+      END;
+
+$$;
+
 create function count_dispatched_calculations() returns integer
 	security definer
 	SET search_path=public, pg_temp
@@ -2057,12 +3090,16 @@ create function count_dispatched_calculations() returns integer
 as $$
 DECLARE
     count integer;
+    num_changes integer;
   BEGIN
 
-    SELECT COUNT(*) FROM molecule_properties INNER JOIN tags
-            ON molecule_properties.mol_hash = tags.mol_hash
-            WHERE molecule_properties.status = 'dispatched'
-      into count;
+    SELECT coalesce(SUM(status_counts.count), 0), COUNT(*) FROM status_counts WHERE status_counts.status = 'dispatched'
+      into count, num_changes;
+
+    IF num_changes > 1000 THEN
+      PERFORM fold_counters();
+    END IF;
+
     RETURN count;
   END;
 
@@ -2109,3 +3146,84 @@ DECLARE
   END;
 
 $$;
+
+create function set_properties_compressed(hash character varying, model character varying, use_cp boolean, indices integer[], result boolean, energy double precision, hash_of_log character varying, log_codec character varying, log_content bytea, overwrite boolean) returns void
+  security definer
+  SET search_path=public, pg_temp
+  language plpgsql
+as $$
+DECLARE
+    id INTEGER;
+    cur_status VARCHAR;
+  BEGIN
+
+    SELECT status FROM molecule_properties WHERE  mol_hash=hash AND model_name=model AND frag_indices=indices AND molecule_properties.use_cp = set_properties_compressed.use_cp
+      INTO cur_status;
+
+    IF cur_status = 'complete' OR cur_status = 'failed' THEN
+      IF overwrite THEN
+        UPDATE molecule_properties SET energies = '{}', status='dispatched' WHERE mol_hash=hash AND model_name=model AND frag_indices=indices AND molecule_properties.use_cp = set_properties_compressed.use_cp;
+        cur_status = 'dispatched';
+      END IF;
+    END IF;
+
+    IF NOT cur_status = 'dispatched' THEN
+      IF cur_status = 'complete' OR cur_status = 'failed' THEN
+        RETURN;
+      END IF;
+      RAISE EXCEPTION 'Trying to set energy of calculation that does not have status = "dispatched" or status = "complete" or status = "failed"';
+    END IF;
+
+    -- clients send the content of a log only once per batch, later calculations with the same log only send its hash.
+    IF log_content IS NOT NULL THEN
+      INSERT INTO log_contents (log_hash, codec, content) VALUES (hash_of_log, log_codec, log_content) ON CONFLICT (log_hash) DO NOTHING;
+    END IF;
+
+    IF result THEN
+      UPDATE molecule_properties SET energies = energy || energies, status='complete' WHERE mol_hash=hash AND model_name=model AND frag_indices=indices AND molecule_properties.use_cp = set_properties_compressed.use_cp RETURNING most_recent_log_id
+        INTO id;
+    ELSE
+      UPDATE molecule_properties SET energies = energies || energy, status='failed' WHERE mol_hash=hash AND model_name=model AND frag_indices=indices AND molecule_properties.use_cp = set_properties_compressed.use_cp RETURNING most_recent_log_id
+        INTO id;
+    END IF;
+
+    UPDATE log_files SET end_time=clock_timestamp(), log_hash=hash_of_log WHERE log_id=id;
+
+  END;
+
+$$;
+
+create function get_log(hash character varying, model character varying, use_cp boolean, indices integer[]) returns TABLE(log_txt character varying, codec character varying, content bytea)
+	security definer
+	SET search_path=public, pg_temp
+	language plpgsql
+as $$
+DECLARE
+    mol_tags VARCHAR[];
+    tag_name VARCHAR;
+  BEGIN
+
+    SELECT tag_names FROM tags WHERE mol_hash = hash AND model_name = model LIMIT 1
+      INTO mol_tags;
+
+    IF mol_tags IS NULL THEN
+      RETURN;
+    END IF;
+
+    -- the user may read the log if they may read any training set this calculation is part of.
+    FOREACH tag_name IN ARRAY mol_tags
+    LOOP
+      IF has_read_privilege(tag_name) THEN
+        RETURN QUERY SELECT log_files.log_text, log_contents.codec, log_contents.content FROM molecule_properties
+          INNER JOIN log_files ON molecule_properties.most_recent_log_id = log_files.log_id
+          LEFT JOIN log_contents ON log_files.log_hash = log_contents.log_hash
+          WHERE molecule_properties.mol_hash = hash AND molecule_properties.model_name = model
+            AND molecule_properties.frag_indices = indices AND molecule_properties.use_cp = get_log.use_cp;
+        RETURN;
+      END IF;
+    END LOOP;
+
+    RAISE EXCEPTION 'User %% does not have read privileges on any training set containing this calculation', session_user;
+  END;
+
+$$;
@@ -1,12 +1,13 @@
 import sys, os
 from glob import glob
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha1
 
 from mbfit.calculator import Model
 from mbfit.utils import SettingsReader, system, files
 from mbfit.molecule import Molecule
 from mbfit.exceptions import ConfigMissingPropertyError
-from . import Database
+from . import Database, DatabasePool, log_compression
 
 
 class JobHandler(object):
@@ -67,7 +68,7 @@ class JobHandler(object):
                                                                                                                 tags),
             bold=True, color=system.Color.GREEN)
 
-    def read_all_jobs(self, database_config_path, job_dir, overwrite=False):
+    def read_all_jobs(self, database_config_path, job_dir, overwrite=False, num_threads=4, log_retention="all"):
         """
         Searches the given directory for completed job directories and enters
         the results into the database.
@@ -80,47 +81,65 @@ class JobHandler(object):
             database_config_path - .ini file containing host, port, database, username, and password.
                         Make sure only you have access to this file or your password will be compromised!
             job_dir             - Local path the the directory to search.
+            num_threads         - Number of threads to read job files with. Results are entered into the database
+                        while the next jobs are being read. Default is 4.
+            log_retention       - Which logs to store in the database. "all" to store every log, "failed" to only
+                        store the logs of failed calculations, "none" to store no logs. Default is "all".
 
         Returns:
             None.
         """
 
-        with Database(database_config_path) as db:
-            pre_num_dispatched = db.count_dispatched_calculations()
+        log_compression.check_retention(log_retention)
 
-        system.format_print("Reading jobs from directory {} into database.".format(job_dir),
-                            bold=True, color=system.Color.YELLOW)
+        directories = [directory for directory in glob(job_dir + "/job_*") if not directory.endswith("done")
+                       and os.path.isdir(directory) and os.path.isfile(directory + "/output.ini")]
 
-        counter = 0
+        # one connection is shared by all the batches instead of opening a new one for each of them.
+        with DatabasePool(database_config_path, max_connections=1) as pool:
 
-        calculation_results = []
-        for directory in glob(job_dir + "/job_*"):
-            if directory.endswith("done"):
-                continue
-            if not os.path.isdir(directory):
-                continue
-            if not os.path.isfile(directory + "/output.ini"):
-                continue
-            calculation_results.append(self.read_job(directory + "/output.ini", directory + "/output.log"))
+            with Database(database_config_path, pool=pool) as db:
+                pre_num_dispatched = db.count_dispatched_calculations()
+
+            system.format_print("Reading jobs from directory {} into database.".format(job_dir),
+                                bold=True, color=system.Color.YELLOW)
+
+            counter = 0
+
+            def read_job_directory(directory):
+                return self.read_job(directory + "/output.ini", directory + "/output.log")
+
+            def submit_results(calculation_results):
+                with Database(database_config_path, pool=pool) as db:
+                    db.set_properties(calculation_results, overwrite=overwrite, log_retention=log_retention)
+
+            with ThreadPoolExecutor(max_workers=num_threads + 1) as executor:
+                submission = None
+
+                for batch_start in range(0, len(directories), 1000):
+                    calculation_results = []
+
+                    for calculation_result in executor.map(read_job_directory, directories[batch_start:batch_start + 1000]):
+                        calculation_results.append(calculation_result)
 
-            if len(calculation_results) > 1000:
-                with Database(database_config_path) as db:
-                    db.set_properties(calculation_results, overwrite=overwrite)
-                calculation_results = []
+                        counter += 1
 
-            counter += 1
+                        if counter % 100 == 0:
+                            system.format_print("Read {} jobs so far.".format(counter), italics=True)
 
-            if counter % 100 == 0:
-                system.format_print("Read {} jobs so far.".format(counter), italics=True)
+                    # wait for the previous batch to be entered before entering this one.
+                    if submission is not None:
+                        submission.result()
+                    submission = executor.submit(submit_results, calculation_results)
 
-        with Database(database_config_path) as db:
-            db.set_properties(calculation_results, overwrite=overwrite)
+                if submission is not None:
+                    submission.result()
 
-        system.format_print("Completed reading jobs. Read {} in total.".format(counter), bold=True,
-                            color=system.Color.GREEN)
+            system.format_print("Completed reading jobs. Read {} in total.".format(counter), bold=True,
+                                color=system.Color.GREEN)
 
-        with Database(database_config_path) as db:
-            post_num_dispatched = db.count_dispatched_calculations()
+            with Database(database_config_path, pool=pool) as db:
+                post_num_dispatched = db.count_dispatched_calculations()
 
         num_new = pre_num_dispatched - post_num_dispatched
 
@@ -0,0 +1,108 @@
+# external package imports
+import zlib
+from hashlib import sha1
+
+# absolute module imports
+from mbfit.exceptions import InvalidValueError, LibraryNotAvailableError
+
+# only import zstandard if it is installed.
+try:
+    import zstandard
+except ModuleNotFoundError:
+    pass
+
+LOG_CODECS = ["zlib", "zstd"]
+LOG_RETENTIONS = ["all", "failed", "none"]
+
+
+def check_codec(codec):
+    """
+    Checks that logs can be compressed and decompressed with the given codec.
+
+    Args:
+        codec               - Name of the codec, one of LOG_CODECS.
+
+    Returns:
+        None.
+    """
+
+    if codec not in LOG_CODECS:
+        raise InvalidValueError("log codec", codec, "must be one of {}.".format(LOG_CODECS))
+
+    if codec == "zstd":
+        try:
+            import zstandard
+        except ModuleNotFoundError:
+            raise LibraryNotAvailableError("zstandard")
+
+
+def check_retention(log_retention):
+    """
+    Checks that the given log retention policy exists.
+
+    Args:
+        log_retention       - Which logs to keep. "all" to keep every log, "failed" to only keep logs of failed
+                calculations, "none" to keep no logs.
+
+    Returns:
+        None.
+    """
+
+    if log_retention not in LOG_RETENTIONS:
+        raise InvalidValueError("log_retention", log_retention, "must be one of {}.".format(LOG_RETENTIONS))
+
+
+def get_log_hash(log_text):
+    """
+    Gets the hash that identifies a log in the database. Logs with the same text have the same hash.
+
+    Args:
+        log_text            - The text of the log.
+
+    Returns:
+        The SHA1 hash of the log text as a hexadecimal string.
+    """
+
+    return sha1(log_text.encode("utf-8")).hexdigest()
+
+
+def compress_log(log_text, codec):
+    """
+    Compresses the text of a log.
+
+    Args:
+        log_text            - The text of the log.
+        codec               - Name of the codec to compress with, one of LOG_CODECS.
+
+    Returns:
+        The compressed log as bytes.
+    """
+
+    check_codec(codec)
+
+    if codec == "zstd":
+        return zstandard.ZstdCompressor().compress(log_text.encode("utf-8"))
+
+    return zlib.compress(log_text.encode("utf-8"))
+
+
+def decompress_log(content, codec):
+    """
+    Decompresses a log compressed by compress_log().
+
+    Args:
+        content             - The compressed log.
+        codec               - Name of the codec the log was compressed with, one of LOG_CODECS.
+
+    Returns:
+        The text of the log.
+    """
+
+    check_codec(codec)
+
+    content = bytes(content)
+
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(content).decode("utf-8")
+
+    return zlib.decompress(content).decode("utf-8")
@@ -0,0 +1,107 @@
+# external package imports
+import copy, numpy as np
+
+# absolute module imports
+from mbfit.molecule import Atom
+
+
+class RowMaterializer():
+
+    """
+    Turns rows of coordinates fetched from the database into Molecule objects.
+
+    Every molecule with the same name has the same fragments, atoms, charges, spins, and SMILE strings. Only the
+    coordinates differ from row to row. The RowMaterializer reorders a template molecule once, then builds each new
+    molecule by permuting the row's coordinates and cloning the template around them. Fragments are copied without
+    parsing their SMILE strings again.
+    """
+
+    def __init__(self, empty_molecule, order, frag_orders, SMILES):
+        """
+        Initializer for a row materializer.
+
+        Args:
+            empty_molecule  - Molecule with the fragments and atoms in the order of the coordinates in the database,
+                    usually from Database.build_empty_molecule().
+            order           - New order of the fragments, as from Molecule.get_reorder_order().
+            frag_orders     - New order of the atoms within each fragment, as from Molecule.get_reorder_order().
+            SMILES          - SMILE strings of each fragment in the new order.
+
+        Returns:
+            A new RowMaterializer object.
+        """
+
+        self.order = order
+        self.frag_orders = frag_orders
+
+        self.template = empty_molecule.get_reordered_copy(order, frag_orders, SMILES)
+
+        # index of the first atom of each fragment in the coordinates from the database.
+        offsets = []
+        num_atoms = 0
+        for fragment in empty_molecule.get_fragments():
+            offsets.append(num_atoms)
+            num_atoms += fragment.get_num_atoms()
+
+        # permutation[i] = index in the database coordinates of the atom at index i of the reordered molecule.
+        self.permutation = np.array([offsets[index] + atom_index for index, frag_order in zip(order, frag_orders)
+                                     for atom_index in frag_order], dtype=int)
+
+        self.atom_templates = [[(atom.get_name(), atom.get_symmetry_class()) for atom in fragment.get_atoms()]
+                               for fragment in self.template.get_fragments()]
+
+    def get_template(self):
+        """
+        Gets the reordered molecule that all the materialized molecules are copies of. Do not modify it.
+
+        Args:
+            None.
+
+        Returns:
+            The template Molecule.
+        """
+
+        return self.template
+
+    def materialize(self, atom_coordinates):
+        """
+        Builds the molecule with the given coordinates.
+
+        Args:
+            atom_coordinates - Coordinates of the atoms in the order they are stored in the database, either as a
+                    packed binary block of big-endian float64 values or as a flat list of x, y, z values.
+
+        Returns:
+            A new Molecule, reordered the same way as the template.
+        """
+
+        if isinstance(atom_coordinates, (bytes, bytearray, memoryview)):
+            coordinates = np.frombuffer(atom_coordinates, dtype=">f8")
+        else:
+            coordinates = np.asarray(atom_coordinates, dtype=float)
+
+        coordinates = coordinates.reshape(-1, 3)[self.permutation].tolist()
+
+        fragments = []
+        index = 0
+
+        for template_fragment, atom_templates in zip(self.template.get_fragments(), self.atom_templates):
+            atoms = []
+
+            for name, symmetry_class in atom_templates:
+                x, y, z = coordinates[index]
+                atoms.append(Atom(name, symmetry_class, x, y, z))
+                index += 1
+
+            # the shallow copy shares the connectivity matrix and SMILE of the template, which never change.
+            fragment = copy.copy(template_fragment)
+            fragment.atoms = atoms
+            fragments.append(fragment)
+
+        molecule = copy.copy(self.template)
+        molecule.fragments = fragments
+        molecule.energies = {}
+        molecule.nmer_energies = []
+        molecule.mb_energies = []
+
+        return molecule
@@ -0,0 +1,1436 @@
+# external package imports
+import os, sys, sqlite3, numpy as np
+from contextlib import contextmanager
+
+# absolute module imports
+from mbfit.exceptions import DatabaseOperationError, DatabaseInitializationError, DatabaseNotEmptyError, \
+        DatabaseConnectionError
+from mbfit.utils import SettingsReader
+
+# local module imports
+from .database import Database
+from . import log_compression
+
+# every table in sqlite_init.sql, in an order that deletes rows before the rows they reference.
+TABLES = ["optimized_geometries", "tags", "molecule_properties", "log_files", "log_contents", "molecule_list",
+          "molecule_contents", "fragment_contents", "fragment_info", "molecule_info", "model_info", "training_sets"]
+
+def get_path(config):
+    """
+    Gets the path of the SQLite database file named in a database config file.
+
+    Args:
+        config          - SettingsReader of the database config file. The path is the path property of its
+                database section. Relative paths are relative to the directory of the config file.
+
+    Returns:
+        The path of the database file.
+    """
+
+    path = os.path.expanduser(config.get("database", "path"))
+
+    return os.path.join(os.path.dirname(os.path.abspath(config.get_file_path())), path)
+
+def connect(path):
+    """
+    Opens a connection to a SQLite database file in write-ahead log mode, so readers never wait for the writer and
+    the writer never waits for readers. Writers wait up to a minute for each other.
+
+    Args:
+        path            - Path of the database file. It is created if it does not exist.
+
+    Returns:
+        An open sqlite3 connection.
+    """
+
+    try:
+        # connections are shared between the threads of a DatabasePool, one thread at a time.
+        connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+    except sqlite3.Error as e:
+        raise DatabaseConnectionError(path, str(e))
+
+    return connection
+
+class SQLiteDatabase(Database):
+
+    """
+    Database stored in a single SQLite file instead of on a PostgreSQL server. Has the same methods as Database, with
+    the procedures of init.sql done in python against the tables of sqlite_init.sql.
+
+    Database(config_file) gives a SQLiteDatabase if the database section of config_file has backend = sqlite and the
+    path of the database file in its path property.
+
+    A SQLite database has a single user, anyone who can open the file can read and change every training set.
+    """
+
+    def __init__(self, config_file, batch_size=100, pool=None, packed_coordinates=None, max_batch_bytes=16777216, log_codec="zlib"):
+        """
+        Initializer for SQLite database object. Opens the database file and sets up cursor.
+
+        Args:
+            config_file     - .ini file with backend = sqlite and path = <path of the database file> in its
+                    database section.
+            batch_size      - number of calculations to fetch or read from the database per query.
+                    Default is 100.
+            pool            - DatabasePool to borrow a connection from instead of opening a new one. Default is None.
+            packed_coordinates - Ignored, coordinates are always stored packed.
+            max_batch_bytes - maximum number of bytes of log text to write to the database per batch when setting
+                    properties. Default is 16 MiB.
+            log_codec       - Codec to compress logs with before storing them, "zlib" or "zstd". Compressed logs are
+                    stored once per distinct log text. None to store logs uncompressed. Default is "zlib".
+
+        Returns:
+            A new SQLiteDatabase object.
+        """
+
+        self.batch_size = 0
+        self.set_batch_size(batch_size)
+
+        self.max_batch_bytes = 0
+        self.set_max_batch_bytes(max_batch_bytes)
+
+        if log_codec is not None:
+            log_compression.check_codec(log_codec)
+
+        self.log_codec = log_codec
+        self.compressed_logs = log_codec is not None
+
+        self.pool = pool
+        self.packed_coordinates = True
+        self.training_set_pages = True
+        self.bulk_tagging = False
+        self.bulk_import = False
+        self.bulk_delete = False
+        self.screening = True
+        self.row_materializers = {}
+
+        # warnings raised while assembling training sets, like the notices of a PostgreSQL connection.
+        self.notices = []
+
+        if pool is not None:
+            self.name = pool.name
+            self.connection = pool.get_connection()
+        else:
+            self.name = get_path(SettingsReader(config_file))
+            self.connection = connect(self.name)
+
+        self.cursor = self.connection.cursor()
+
+    def get_notices(self):
+        """
+        Gets a list of all warnings raised by this Database.
+        Args:
+            None.
+        Returns:
+            A list of all warnings that have been raised since this Database object was created.
+        """
+
+        return self.notices
+
+    def get_last_notice(self):
+        """
+        Gets the last warning raised by this Database.
+        Args:
+            None.
+        Returns:
+            The last warning raised by this Database.
+        """
+
+        if len(self.notices) > 0:
+            return self.notices[-1]
+        else:
+            return None
+
+    def clear_notices(self):
+        """
+        Clears the list of warnings for this Database.
+        Args:
+            None.
+        Returns:
+            None.
+        """
+
+        self.notices = []
+
+    def create(self):
+        """
+        Creates all the tables and indexes in the database file.
+        Args:
+            None.
+        Returns:
+            None.
+        """
+
+        self.single_execute("SELECT name FROM sqlite_master WHERE type = 'table'", ())
+
+        table_names = [table[0] for table in self.cursor.fetchall()]
+
+        if len(table_names) > 0:
+            raise DatabaseNotEmptyError(self.name, table_names)
+
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "sqlite_init.sql")) as sql_initilizer:
+            sql_script = sql_initilizer.read()
+            try:
+                self.connection.executescript(sql_script)
+            except sqlite3.Error as e:
+                raise DatabaseInitializationError(self.name, str(e))
+
+    def annihilate(self, confirm="no way"):
+        """
+        DELETES ALL CONTENT IN ALL TABLES IN THE DATABASE.
+        In order to protect users, confirm must be specified as
+        "confirm" or the content will not be deleted.
+        Args:
+            confirm         - set to "confirm" if deletion of all content in the database is desired.
+        Returns:
+            None
+        """
+
+        if confirm == "confirm":
+            with self.operation_errors():
+                for table in TABLES:
+                    self.cursor.execute("DELETE FROM {}".format(table))
+        else:
+            print(
+                "annihilate failed. specify confirm = \"confirm\" if deletion of all content in the database is desired.")
+
+    def execute(self, command, params):
+        """
+        Executes a SQLite command in the database.
+        The String command can contain '?' substrings, each ? will be substituted for an item in params.
+        SQLite has no function blocks, so this is the same as single_execute().
+        Args:
+            command         - The command to run.
+            params          - Parameters for the command.
+        Returns:
+            None.
+        """
+
+        self.single_execute(command, params)
+
+    def single_execute(self, command, params):
+        """
+        Executes a SQLite command in the database.
+        The String command can contain '?' substrings, each ? will be substituted for an item in params.
+        Args:
+            command         - The command to run.
+            params          - Parameters for the command.
+        Returns:
+            None.
+        """
+
+        with self.operation_errors():
+            self.cursor.execute(command, params)
+
+    def execute_values(self, command, params, template=None):
+        """
+        Executes a SQLite command once for each row of values.
+        Args:
+            command         - The command to run, with one '?' substring for each value in a row.
+            params          - List of tuples, one per row of values.
+            template        - Ignored, SQLite does not need values to be cast.
+        Returns:
+            None.
+        """
+
+        with self.operation_errors():
+            self.cursor.executemany(command, params)
+
+    @contextmanager
+    def operation_errors(self):
+        """
+        Context manager that turns errors raised by sqlite3 while running a command into DatabaseOperationErrors.
+        Rolls back the current transaction, like a PostgreSQL database does when a command fails.
+        Args:
+            None.
+        Returns:
+            None.
+        """
+
+        try:
+            yield
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            raise DatabaseOperationError(self.name, str(e)) from None
+
+    def operation_error(self, message):
+        """
+        Rolls back the current transaction and gets a DatabaseOperationError to raise, for operations that fail for
+        reasons sqlite3 cannot detect.
+        Args:
+            message         - Description of the problem.
+        Returns:
+            A DatabaseOperationError with the message.
+        """
+
+        self.connection.rollback()
+
+        return DatabaseOperationError(self.name, message)
+
+    def has_function(self, function_name):
+        """
+        Checks whether the database has a function. SQLite databases have no functions.
+        Args:
+            function_name   - Name of the function.
+        Returns:
+            False.
+        """
+
+        return False
+
+    @staticmethod
+    def get_tags_condition(hash_column, model_column, tags):
+        """
+        Gets a SQL condition that is true for calculations with at least one of the tags.
+        Args:
+            hash_column     - Column with the hash of the calculation's molecule.
+            model_column    - Column with the name of the calculation's model, or '?' to pass the model as a
+                    parameter before the tags.
+            tags            - The tags, passed as parameters after the model.
+        Returns:
+            The condition as a string.
+        """
+
+        return "EXISTS(SELECT 1 FROM tags WHERE tags.mol_hash = {} AND tags.model_name = {} AND tags.tag_name IN ({}))".format(
+                hash_column, model_column, ", ".join(["?"] * len(tags)))
+
+    @staticmethod
+    def parse_indices(frag_indices):
+        """
+        Turns frag indices stored as array text into a list.
+        Args:
+            frag_indices    - Frag indices as array text, like '{0,1}'.
+        Returns:
+            List of the frag indices as ints.
+        """
+
+        return [int(index) for index in frag_indices.strip("{}").split(",")]
+
+    def check_training_sets(self, tags):
+        """
+        Raises a DatabaseOperationError if any of the tags is not the name of a training set in the database.
+        Args:
+            tags            - The tags to check.
+        Returns:
+            None.
+        """
+
+        for tag in tags:
+            self.single_execute("SELECT EXISTS(SELECT 1 FROM training_sets WHERE tag_name = ?)", (tag,))
+
+            if not self.cursor.fetchone()[0]:
+                raise self.operation_error("Training set {} does not exist".format(tag))
+
+    def add_calculations(self, molecule_list, method, basis, cp, *tags, optimized=False, screen=None):
+        """
+        Adds new calculations to the database.
+        Will queue the database to calculate the energies of each molecule in the list
+        with the given model. Does not calculate the energies.
+        All molecules must be of the same type.
+        Args:
+            molecule_list   - List of molecules whose energies are wanted.
+            method          - Method to use to calculate the molecules' energies.
+            basis           - Basis to use to calculate the molecules' energies.
+            cp              - True if counterpoise correction should be used in the calculation of the molecules' energies.
+            tags            - Set of tags to label these calculations in the database.
+            optimized       - True if all molecules represent optimized geometries.
+            screen          - DistanceScreen whose screened subsets of fragments are not calculated, their interaction
+                    energies are 0 in training sets. Default is None, to calculate every subset.
+        Returns:
+            The number of calculations that were skipped because they were screened.
+        """
+
+        order, frag_order, SMILES = None, None, None
+
+        def get_molecule_energies_pairs():
+            nonlocal order, frag_order, SMILES
+
+            for molecule in molecule_list:
+                if order is None:
+                    order, frag_order = molecule.get_standard_order_order()
+                    SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
+
+                yield molecule.get_reordered_copy(order, frag_order, SMILES), None
+
+        return self.insert_calculations(get_molecule_energies_pairs(), method, basis, cp, tags, optimized, True, screen)
+
+    def import_calculations(self, molecule_energies_pairs, method, basis, cp, *tags, optimized=False):
+        """
+        Imports already completed calculations into the database.
+        Args:
+            molecule_energies_pairs - Array of 2-tuples (molecule, nmer_energies)
+                    each pair being a molecule and its energies in the numeric order
+                    by fragment index. If cp is true, cp energies should come before non-cp energies.
+            method              - Method used to calculate these energies.
+            basis               - Basis used to calculate these energies.
+            cp                  - True if counterpoise correction was used for these energies.
+            tags                - Tags to mark these energies with.
+            optimized           - True if all geometries in molecule_energy_pairs are optimized in
+                    the given method and basis.
+        """
+
+        order, frag_order, SMILES, energies_order = None, None, None, None
+
+        def get_molecule_energies_pairs():
+            nonlocal order, frag_order, SMILES, energies_order
+
+            for molecule, energies in molecule_energies_pairs:
+                if order is None:
+                    order, frag_order = molecule.get_standard_order_order()
+                    SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
+                    energies_order = Database.get_energies_order(order, molecule.get_num_fragments(), cp)
+
+                yield molecule.get_reordered_copy(order, frag_order, SMILES), [energies[index] for index in energies_order]
+
+        self.insert_calculations(get_molecule_energies_pairs(), method, basis, cp, tags, optimized, False)
+
+    def insert_calculations(self, molecule_energies_pairs, method, basis, cp, tags, optimized, relabel_symmetries, screen=None):
+        """
+        Inserts calculations of molecules already in standard order into the database, batch_size molecules per
+        bulk insert. Molecules that already have calculations in this model are only given the tags.
+        Args:
+            molecule_energies_pairs - Iterable of 2-tuples (molecule, energies), energies in the order of
+                    get_calculations(), or None to queue the calculations instead.
+            method          - Method of the calculations.
+            basis           - Basis of the calculations.
+            cp              - True if the model uses counterpoise correction.
+            tags            - Tags to mark these calculations with.
+            optimized       - True if all molecules represent optimized geometries.
+            relabel_symmetries - True to store the symmetry classes of each fragment's atoms relabelled
+                    alphabetically from A, as add_calculations() does.
+            screen          - DistanceScreen whose screened subsets of fragments are not queued, or None. Completed
+                    calculations are always inserted.
+                Default: None
+        Returns:
+            The number of calculations that were skipped because they were screened.
+        """
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+        num_screened = 0
+
+        with self.operation_errors():
+            self.cursor.executemany("INSERT OR IGNORE INTO training_sets (tag_name) VALUES (?)", [(tag,) for tag in tags])
+            self.cursor.execute("INSERT OR IGNORE INTO model_info (name) VALUES (?)", (model_name,))
+
+        molecule_names = set()
+        batch = []
+
+        for molecule, energies in molecule_energies_pairs:
+            if molecule.get_name() not in molecule_names:
+                self.add_molecule_info(molecule, relabel_symmetries)
+                molecule_names.add(molecule.get_name())
+
+            batch.append((molecule, energies))
+
+            if len(batch) == self.batch_size:
+                num_screened += self.insert_calculations_batch(batch, model_name, cp, tags, optimized, screen)
+                batch = []
+
+        if len(batch) != 0:
+            num_screened += self.insert_calculations_batch(batch, model_name, cp, tags, optimized, screen)
+
+        return num_screened
+
+    def insert_calculations_batch(self, batch, model_name, cp, tags, optimized, screen=None):
+        """
+        Inserts the calculations of one batch of molecules with executemany().
+        Args:
+            batch           - List of 2-tuples (molecule, energies), as for insert_calculations().
+            model_name      - Name of the model of the calculations.
+            cp              - True if the model uses counterpoise correction.
+            tags            - Tags to mark these calculations with.
+            optimized       - True if all molecules represent optimized geometries.
+            screen          - DistanceScreen whose screened subsets of fragments are not queued, or None.
+                Default: None
+        Returns:
+            The number of calculations that were skipped because they were screened.
+        """
+
+        molecules = {}
+        num_screened = 0
+
+        for molecule, energies in batch:
+            molecules.setdefault(molecule.get_SHA1(), (molecule, energies))
+
+        existing_hashes = self.get_existing_hashes(list(molecules), model_name)
+
+        molecule_rows = []
+        property_rows = []
+
+        for mol_hash, (molecule, energies) in molecules.items():
+            if mol_hash in existing_hashes:
+                continue
+
+            coordinates = [[atom.get_x(), atom.get_y(), atom.get_z()] for fragment in molecule.get_fragments()
+                           for atom in fragment.get_atoms()]
+
+            molecule_rows.append((mol_hash, molecule.get_name(), np.array(coordinates, dtype=">f8").tobytes()))
+
+            screened_subsets = set(screen.get_screened_subsets(molecule)) if screen is not None and energies is None else set()
+
+            for index, (frag_indices, use_cp) in enumerate(self.get_calculations(molecule.get_num_fragments(), cp)):
+                if tuple(frag_indices) in screened_subsets:
+                    num_screened += 1
+                elif energies is None:
+                    property_rows.append((mol_hash, model_name, self.create_postgres_array(*frag_indices), use_cp,
+                                          None, "pending"))
+                else:
+                    property_rows.append((mol_hash, model_name, self.create_postgres_array(*frag_indices), use_cp,
+                                          energies[index], "complete"))
+
+        with self.operation_errors():
+            self.cursor.executemany("INSERT OR IGNORE INTO molecule_list (mol_hash, mol_name, packed_coordinates) VALUES (?, ?, ?)",
+                                    molecule_rows)
+            self.cursor.executemany("INSERT INTO molecule_properties (mol_hash, model_name, frag_indices, use_cp, energy, status) "
+                                    "VALUES (?, ?, ?, ?, ?, ?)", property_rows)
+            self.cursor.executemany("INSERT OR IGNORE INTO tags (mol_hash, model_name, tag_name) VALUES (?, ?, ?)",
+                                    [(mol_hash, model_name, tag) for mol_hash in molecules for tag in tags])
+
+            if optimized:
+                self.cursor.executemany("INSERT OR IGNORE INTO optimized_geometries (mol_name, mol_hash, model_name) VALUES (?, ?, ?)",
+                                        [(molecule.get_name(), mol_hash, model_name) for mol_hash, (molecule, energies) in molecules.items()])
+
+        return num_screened
+
+    def get_existing_hashes(self, hashes, model_name):
+        """
+        Looks up which molecules already have calculations in a model, in one query.
+        Args:
+            hashes          - Hashes of the molecules.
+            model_name      - Name of the model.
+        Returns:
+            Set of the hashes of the molecules that already have calculations in the model.
+        """
+
+        self.single_execute("SELECT DISTINCT mol_hash FROM molecule_properties WHERE model_name = ? AND mol_hash IN ({})".format(
+                ", ".join(["?"] * len(hashes))), [model_name] + list(hashes))
+
+        return set(row[0] for row in self.cursor.fetchall())
+
+    def add_molecule_info(self, molecule, relabel_symmetries):
+        """
+        Adds the description of a molecule and its fragments to the database, if there is none with the same name
+        yet.
+        Args:
+            molecule        - The molecule to describe.
+            relabel_symmetries - True to store the symmetry classes of each fragment's atoms relabelled
+                    alphabetically from A.
+        Returns:
+            None.
+        """
+
+        self.single_execute("SELECT EXISTS(SELECT 1 FROM molecule_info WHERE name = ?)", (molecule.get_name(),))
+
+        if self.cursor.fetchone()[0]:
+            return
+
+        self.single_execute("INSERT INTO molecule_info (name) VALUES (?)", (molecule.get_name(),))
+
+        fragments = [fragment.get_name() for fragment in molecule.get_fragments()]
+
+        frag_names, counts = np.unique(fragments, return_counts=True, axis=0)
+
+        for frag_name, count in zip(frag_names, counts):
+            fragment = [frag for frag in molecule.get_fragments() if frag.get_name() == frag_name][-1]
+
+            atoms = [[atom.get_name(), atom.get_symmetry_class()] for atom in fragment.get_atoms()]
+
+            symbol_symmetry_pairs, atom_counts = np.unique(atoms, return_counts=True, axis=0)
+
+            contents = [(str(symbol), str(symmetry), int(atom_count)) for (symbol, symmetry), atom_count
+                        in zip(symbol_symmetry_pairs, atom_counts)]
+
+            if relabel_symmetries:
+                contents.sort(key=lambda x: x[1])
+                contents = [(symbol, chr(65 + index), atom_count) for index, (symbol, symmetry, atom_count)
+                            in enumerate(contents)]
+
+            self.single_execute("SELECT EXISTS(SELECT 1 FROM fragment_info WHERE name = ? AND charge = ? AND spin = ? AND smile = ?)",
+                                (str(frag_name), fragment.get_charge(), fragment.get_spin_multiplicity(), fragment.get_SMILE()))
+
+            if not self.cursor.fetchone()[0]:
+                with self.operation_errors():
+                    self.cursor.execute("INSERT INTO fragment_info (name, charge, spin, smile) VALUES (?, ?, ?, ?)",
+                                        (str(frag_name), fragment.get_charge(), fragment.get_spin_multiplicity(),
+                                         fragment.get_SMILE()))
+                    self.cursor.executemany("INSERT INTO fragment_contents (frag_name, atom_symbol, count, symmetry) VALUES (?, ?, ?, ?)",
+                                            [(str(frag_name), symbol, atom_count, symmetry) for symbol, symmetry, atom_count in contents])
+
+            self.single_execute("INSERT INTO molecule_contents (mol_name, frag_name, count) VALUES (?, ?, ?)",
+                                (molecule.get_name(), str(frag_name), int(count)))
+
+    def get_empty_molecule(self, mol_name):
+        """
+        Gets a description of each type of fragment in the mol_name molecule from inside the database.
+        Params:
+            mol_name        - The name of the molecule to describe.
+        Returns:
+            A list of (frag_name, charge, spin, atomic_symbols, atomic_symmetries, atomic_counts, SMILE, frag_count)
+            tuples, one for each type of fragment in the molecule.
+        """
+
+        self.single_execute("SELECT molecule_contents.frag_name, fragment_info.charge, fragment_info.spin, fragment_info.smile, "
+                            "molecule_contents.count FROM molecule_contents "
+                            "INNER JOIN fragment_info ON molecule_contents.frag_name = fragment_info.name "
+                            "WHERE molecule_contents.mol_name = ? ORDER BY molecule_contents.rowid", (mol_name,))
+
+        frag_info = []
+
+        for frag_name, charge, spin, SMILE, frag_count in self.cursor.fetchall():
+            self.single_execute("SELECT atom_symbol, symmetry, count FROM fragment_contents WHERE frag_name = ? ORDER BY rowid",
+                                (frag_name,))
+
+            contents = self.cursor.fetchall()
+
+            frag_info.append((frag_name, charge, spin, [content[0] for content in contents],
+                              [content[1] for content in contents], [content[2] for content in contents], SMILE,
+                              frag_count))
+
+        return frag_info
+
+    def count_pending_calculations(self, *tags):
+        self.single_execute("SELECT COUNT(*) FROM molecule_properties WHERE molecule_properties.status = 'pending' AND " +
+                            self.get_tags_condition("molecule_properties.mol_hash", "molecule_properties.model_name", tags),
+                            tags)
+
+        return self.cursor.fetchone()[0]
+
+    def count_dispatched_calculations(self):
+        self.single_execute("SELECT COUNT(*) FROM molecule_properties WHERE status = 'dispatched'", ())
+
+        return self.cursor.fetchone()[0]
+
+    def check_counters(self):
+        """
+        SQLite databases count calculations with their indexes instead of keeping counters, so there are no counts
+        that can be wrong.
+
+        Args:
+            None.
+
+        Returns:
+            An empty list.
+        """
+
+        return []
+
+    def rebuild_counters(self):
+        """
+        SQLite databases count calculations with their indexes instead of keeping counters, so this does nothing.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+
+        pass
+
+    def get_all_calculations(self, client_name, *tags, calculations_to_do=sys.maxsize):
+        """
+        Gets uncalculaed energies from the database so that the user can calculate them.
+        Pass the output into set_properties to update the energies in the database.
+        Other connections cannot fetch calculations until this Database is saved.
+        Args:
+            client_name     - The name of the client that will perform these calculations.
+            tags            - Only fetch calculations with these tags.
+            calculations_to_do - Maximum number of calculations to fetch. Defualt is unlimited.
+        Yields:
+            (molecule, method, basis, cp, use_cp, frag_indices)
+            molecule        - The molecule whose energy should be calculated.
+            method          - Method to do the calculation.
+            basis           - Basis to do the calculation.
+            cp              - True if the model uses counterpoise correction.
+            use_cp          - True if counterpoise correction should be used for this calculation.
+            frag_indices    - List of indices of fragments that should be included in the calculation.
+                    If use_cp is True, then include other fragments as ghost atoms.
+            cp is not the same as use_cp. Some models have cp, but should not
+            use cp for some of their energies.
+        """
+
+        tags_condition = self.get_tags_condition("molecule_properties.mol_hash", "molecule_properties.model_name", tags)
+
+        while calculations_to_do > 0:
+
+            with self.operation_errors():
+                # take the write lock before looking for pending calculations, so no other connection can dispatch the
+                # same ones.
+                if not self.connection.in_transaction:
+                    self.cursor.execute("BEGIN IMMEDIATE")
+
+                self.cursor.execute("SELECT molecule_list.mol_name FROM molecule_properties "
+                                    "INNER JOIN molecule_list ON molecule_properties.mol_hash = molecule_list.mol_hash "
+                                    "WHERE molecule_properties.status = 'pending' AND " + tags_condition + " LIMIT 1", tags)
+
+                row = self.cursor.fetchone()
+
+                if row is None:
+                    return
+
+                molecule_name = row[0]
+
+                self.cursor.execute("SELECT molecule_properties.mol_hash, molecule_properties.model_name, "
+                                    "molecule_properties.frag_indices, molecule_properties.use_cp, "
+                                    "molecule_list.packed_coordinates FROM molecule_properties "
+                                    "INNER JOIN molecule_list ON molecule_properties.mol_hash = molecule_list.mol_hash "
+                                    "WHERE molecule_properties.status = 'pending' AND molecule_list.mol_name = ? AND "
+                                    + tags_condition + " LIMIT ?",
+                                    [molecule_name] + list(tags) + [min(self.batch_size, calculations_to_do)])
+
+                pending_calcs = self.cursor.fetchall()
+
+                self.cursor.execute("SELECT coalesce(MAX(log_id), 0) FROM log_files")
+                first_log_id = self.cursor.fetchone()[0] + 1
+
+                self.cursor.executemany("INSERT INTO log_files (log_id, start_time, client_name) "
+                                        "VALUES (?, strftime('%Y-%m-%d %H:%M:%f', 'now'), ?)",
+                                        [(first_log_id + index, client_name) for index in range(len(pending_calcs))])
+
+                self.cursor.executemany("UPDATE molecule_properties SET status = 'dispatched', most_recent_log_id = ? "
+                                        "WHERE mol_hash = ? AND model_name = ? AND frag_indices = ? AND use_cp = ?",
+                                        [(first_log_id + index, mol_hash, model, frag_indices, use_cp)
+                                         for index, (mol_hash, model, frag_indices, use_cp, atom_coordinates)
+                                         in enumerate(pending_calcs)])
+
+            calculations_to_do -= len(pending_calcs)
+
+            materializer = self.get_row_materializer(molecule_name)
+
+            for mol_hash, model, frag_indices, use_cp, atom_coordinates in pending_calcs:
+                molecule = materializer.materialize(atom_coordinates)
+
+                method, basis, cp = model.split("/")
+
+                yield molecule, method, basis, cp == "True", bool(use_cp), self.parse_indices(frag_indices)
+
+    def set_properties_batch(self, params):
+        """
+        Sets the properties of one batch of calculations with executemany().
+        Args:
+            params          - List of tuples of format
+                    (hash, model_name, use_cp, frag_indices, result, energy, log_text, overwrite). Or if logs are
+                    compressed, tuples of format
+                    (hash, model_name, use_cp, frag_indices, result, energy, log_hash, codec, content, overwrite).
+        Returns:
+            None.
+        """
+
+        contents = []
+        properties = []
+        logs = []
+
+        # status and energy of calculations set earlier in this batch, which are not in the database yet.
+        batch_properties = {}
+
+        for param in params:
+            if self.compressed_logs:
+                mol_hash, model_name, use_cp, frag_indices, result, energy, log_hash, codec, content, overwrite = param
+                log_text = None
+            else:
+                mol_hash, model_name, use_cp, frag_indices, result, energy, log_text, overwrite = param
+                log_hash, codec, content = None, None, None
+
+            key = (mol_hash, model_name, frag_indices, use_cp)
+
+            self.single_execute("SELECT status, energy, most_recent_log_id FROM molecule_properties "
+                                "WHERE mol_hash = ? AND model_name = ? AND frag_indices = ? AND use_cp = ?", key)
+
+            row = self.cursor.fetchone()
+
+            if row is None:
+                continue
+
+            status, previous_energy, log_id = row
+            status, previous_energy = batch_properties.get(key, (status, previous_energy))
+
+            if status == "complete" or status == "failed":
+                if not overwrite:
+                    continue
+                previous_energy = None
+            elif status != "dispatched":
+                raise self.operation_error('Trying to set energy of calculation that does not have status = "dispatched" '
+                                           'or status = "complete" or status = "failed"')
+
+            if content is not None:
+                contents.append((log_hash, codec, content))
+
+            if result:
+                status = "complete"
+            else:
+                # like init.sql, a failed calculation keeps its previous energy if it has one.
+                status = "failed"
+                if previous_energy is not None:
+                    energy = previous_energy
+
+            batch_properties[key] = (status, energy)
+            properties.append((energy, status) + key)
+            logs.append((log_text, log_hash, log_id))
+
+        with self.operation_errors():
+            self.cursor.executemany("INSERT OR IGNORE INTO log_contents (log_hash, codec, content) VALUES (?, ?, ?)", contents)
+            self.cursor.executemany("UPDATE molecule_properties SET energy = ?, status = ? "
+                                    "WHERE mol_hash = ? AND model_name = ? AND frag_indices = ? AND use_cp = ?", properties)
+            self.cursor.executemany("UPDATE log_files SET end_time = strftime('%Y-%m-%d %H:%M:%f', 'now'), log_text = ?, log_hash = ? "
+                                    "WHERE log_id = ?", logs)
+
+    def get_log(self, molecule, method, basis, cp, use_cp, frag_indices):
+        """
+        Gets the log of the most recent attempt at a calculation.
+        Args:
+            molecule        - Molecule of the calculation.
+            method          - Method of the calculation.
+            basis           - Basis of the calculation.
+            cp              - True if the model for this calculation includes counterpoise correction.
+            use_cp          - True if counterpoise correction was used for this calculation.
+            frag_indices    - Fragments included in this calculation.
+        Returns:
+            The text of the log, or None if the calculation is not in the database or its log was not stored.
+        """
+
+        order, frag_orders = molecule.get_standard_order_order()
+        SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
+        molecule = molecule.get_reordered_copy(order, frag_orders, SMILES)
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        self.single_execute("SELECT log_files.log_text, log_contents.codec, log_contents.content FROM molecule_properties "
+                            "INNER JOIN log_files ON molecule_properties.most_recent_log_id = log_files.log_id "
+                            "LEFT JOIN log_contents ON log_files.log_hash = log_contents.log_hash "
+                            "WHERE molecule_properties.mol_hash = ? AND molecule_properties.model_name = ? "
+                            "AND molecule_properties.frag_indices = ? AND molecule_properties.use_cp = ?",
+                            (molecule.get_SHA1(), model_name, self.create_postgres_array(*frag_indices), use_cp))
+        row = self.cursor.fetchone()
+
+        if row is None:
+            return None
+
+        log_text, codec, content = row
+
+        if content is not None:
+            return log_compression.decompress_log(content, codec)
+
+        return log_text
+
+    def get_optimized_energies(self, monomer_names, model_name, tags, allow_multiple):
+        """
+        Gets the energy of the optimized geometry of each monomer, to calculate deformation energies from.
+        Args:
+            monomer_names   - Names of the monomers.
+            model_name      - Name of the model of the energies.
+            tags            - Only use optimized geometries marked with at least one of these tags.
+            allow_multiple  - If True, use the lowest energy when a monomer has several optimized geometries and add a
+                    warning to the notices. If False, raise a DatabaseOperationError instead.
+        Returns:
+            List of the optimized energies, one for each monomer.
+        """
+
+        self.check_training_sets(tags)
+
+        optimized_energies = []
+
+        for monomer_name in monomer_names:
+            self.single_execute("SELECT molecule_properties.energy, molecule_properties.status FROM optimized_geometries "
+                                "INNER JOIN molecule_properties ON optimized_geometries.mol_hash = molecule_properties.mol_hash "
+                                "AND optimized_geometries.model_name = molecule_properties.model_name "
+                                "WHERE optimized_geometries.mol_name = ? AND optimized_geometries.model_name = ? "
+                                "AND molecule_properties.frag_indices = '{0}' AND molecule_properties.use_cp = 0 AND "
+                                + self.get_tags_condition("optimized_geometries.mol_hash", "?", tags),
+                                [monomer_name, model_name, model_name] + list(tags))
+
+            rows = self.cursor.fetchall()
+
+            if any(status != "complete" for energy, status in rows):
+                raise self.operation_error("Optimized energy for {} uncalculated in database.".format(monomer_name))
+
+            if len(rows) == 0:
+                raise self.operation_error("No optimized energy in database for {}.".format(monomer_name))
+
+            if len(rows) > 1:
+                if not allow_multiple:
+                    raise self.operation_error("Multiple optimized geometries in database.")
+
+                self.notices.append("WARNING:  Multiple optimized geometries for {} in database.\n".format(monomer_name))
+
+            optimized_energies.append(min(energy for energy, status in rows))
+
+        return optimized_energies
+
+    def get_page(self, molecule_name, model_name, tags, after_hash, condition, condition_params):
+        """
+        Gets the next batch_size molecules with one of the tags that meet a condition, in order of their hashes.
+        Args:
+            molecule_name   - Name of the molecules.
+            model_name      - Name of the model of the calculations the tags are on.
+            tags            - Only get molecules with calculations marked with at least one of these tags.
+            after_hash      - Only get molecules whose hash comes after this one, the last hash of the previous
+                    page. Empty for the first page.
+            condition       - SQL condition on the molecule_list row of each molecule.
+            condition_params - Parameters of the condition.
+        Returns:
+            A list of (mol_hash, packed_coordinates) tuples.
+        """
+
+        self.single_execute("SELECT molecule_list.mol_hash, molecule_list.packed_coordinates FROM molecule_list "
+                            "WHERE molecule_list.mol_name = ? AND molecule_list.mol_hash > ? AND "
+                            + self.get_tags_condition("molecule_list.mol_hash", "?", tags) + " AND " + condition +
+                            " ORDER BY molecule_list.mol_hash LIMIT ?",
+                            [molecule_name, after_hash, model_name] + list(tags) + list(condition_params) + [self.batch_size])
+
+        return self.cursor.fetchall()
+
+    def get_complete_page(self, molecule_name, model_name, tags, after_hash):
+        """
+        Gets the next batch_size molecules with one of the tags whose calculations are all complete.
+        Args:
+            molecule_name   - Name of the molecules.
+            model_name      - Name of the model of the calculations.
+            tags            - Only get molecules with calculations marked with at least one of these tags.
+            after_hash      - The last hash of the previous page. Empty for the first page.
+        Returns:
+            A list of (mol_hash, packed_coordinates) tuples.
+        """
+
+        return self.get_page(molecule_name, model_name, tags, after_hash,
+                             "NOT EXISTS(SELECT 1 FROM molecule_properties WHERE molecule_properties.mol_hash = molecule_list.mol_hash "
+                             "AND molecule_properties.model_name = ? AND molecule_properties.status != 'complete')", (model_name,))
+
+    def get_page_properties(self, model_name, page):
+        """
+        Gets the energy and status of every calculation of the molecules in a page in one query.
+        Args:
+            model_name      - Name of the model of the calculations.
+            page            - List of (mol_hash, packed_coordinates) tuples.
+        Returns:
+            Dictionary from each hash to a dictionary from (frag_indices, use_cp) to (energy, status), with
+            frag_indices a tuple, like the entries of get_calculations().
+        """
+
+        properties = {mol_hash: {} for mol_hash, atom_coordinates in page}
+
+        if len(page) == 0:
+            return properties
+
+        self.single_execute("SELECT mol_hash, frag_indices, use_cp, energy, status FROM molecule_properties "
+                            "WHERE model_name = ? AND mol_hash IN ({})".format(", ".join(["?"] * len(page))),
+                            [model_name] + [mol_hash for mol_hash, atom_coordinates in page])
+
+        for mol_hash, frag_indices, use_cp, energy, status in self.cursor.fetchall():
+            properties[mol_hash][(tuple(self.parse_indices(frag_indices)), bool(use_cp))] = (energy, status)
+
+        return properties
+
+    def get_1B_training_set(self, molecule_name, names, SMILES, method, basis, cp, *tags):
+        """
+        Gets a 1B training set from the calculated energies in the database.
+        All complete calculations which match the given method, basis, cp, and tags
+        will be included.
+        Args:
+            molecule_name   - Name of the molecule for which a training set is desired.
+            names           - List of name of the monomer.
+            SMILES          - List of SMILE string of the monomer, the atoms in the training set will
+                    be in this order.
+            method          - Method of this training set.
+            basis           - Basis of this training set.
+            cp              - Counterpoise correction of this training set.
+            tags            - Only include calculations marked with at least one of these tags.
+        Yields:
+            (molecule, energy)
+            molecule        - One molecule in the training set.
+            energy          - Its 1B deformation energy.
+        """
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        optimized_energy = self.get_optimized_energies([molecule_name], model_name, tags, False)[0]
+
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
+
+        after_hash = ""
+
+        while True:
+            self.single_execute("SELECT molecule_list.mol_hash, molecule_list.packed_coordinates, molecule_properties.energy "
+                                "FROM molecule_list INNER JOIN molecule_properties ON molecule_list.mol_hash = molecule_properties.mol_hash "
+                                "WHERE molecule_list.mol_name = ? AND molecule_properties.model_name = ? "
+                                "AND molecule_properties.frag_indices = '{0}' AND molecule_properties.use_cp = 0 "
+                                "AND molecule_properties.status = 'complete' AND molecule_list.mol_hash > ? AND "
+                                + self.get_tags_condition("molecule_list.mol_hash", "?", tags) +
+                                " ORDER BY molecule_list.mol_hash LIMIT ?",
+                                [molecule_name, model_name, after_hash, model_name] + list(tags) + [self.batch_size])
+            training_set = self.cursor.fetchall()
+
+            for after_hash, atom_coordinates, energy in training_set:
+                yield materializer.materialize(atom_coordinates), energy - optimized_energy
+
+            if len(training_set) < self.batch_size:
+                return
+
+    def get_training_set_size(self, names, method, basis, cp, *tags):
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        molecule_name = "-".join(sorted(names))
+
+        self.check_training_sets(tags)
+
+        self.single_execute("SELECT COUNT(*) FROM molecule_list WHERE molecule_list.mol_name = ? AND "
+                            + self.get_tags_condition("molecule_list.mol_hash", "?", tags) +
+                            " AND NOT EXISTS(SELECT 1 FROM molecule_properties WHERE molecule_properties.mol_hash = molecule_list.mol_hash "
+                            "AND molecule_properties.model_name = ? AND molecule_properties.status != 'complete')",
+                            [molecule_name, model_name] + list(tags) + [model_name])
+
+        return self.cursor.fetchone()[0]
+
+    def get_training_set(self, names, SMILES, method, basis, cp, *tags, hash_range=None):
+
+        self.clear_notices()
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        standard_names = sorted(names)
+
+        molecule_name = "-".join(standard_names)
+
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
+        energies_order = Database.get_energies_order(materializer.order, len(names), False)
+
+        optimized_energies = self.get_optimized_energies(standard_names, model_name, tags, True)
+
+        num_bodies = len(standard_names)
+
+        after_hash, last_hash = ("", None) if hash_range is None else hash_range
+
+        while True:
+            training_set = self.get_complete_page(molecule_name, model_name, tags, after_hash)
+
+            if last_hash is not None and len(training_set) > 0 and training_set[-1][0] >= last_hash:
+                training_set = [row for row in training_set if row[0] < last_hash]
+                last_page = True
+            else:
+                last_page = len(training_set) < self.batch_size
+
+            properties = self.get_page_properties(model_name, training_set)
+
+            for after_hash, atom_coordinates in training_set:
+                energies = properties[after_hash]
+
+                deformation_energies = [energies[((index,), False)][0] - optimized_energies[index]
+                                        for index in range(num_bodies)]
+
+                if num_bodies == 1:
+                    # For monomers, the nb_energy energy and binding energy are both the monomer deformation energy.
+                    nb_energy = deformation_energies[0]
+                    binding_energy = nb_energy
+                elif (tuple(range(num_bodies)), False) not in energies:
+                    # the calculation of all the fragments was screened, so their interaction energy is 0.
+                    nb_energy = 0
+                    binding_energy = nb_energy + sum(deformation_energies)
+                else:
+                    # each k-body energy is added with sign (-1)^(n-k).
+                    nb_energy = sum(energy if (num_bodies - len(frag_indices)) % 2 == 0 else -energy
+                                    for (frag_indices, use_cp), (energy, status) in energies.items()
+                                    if len(frag_indices) == num_bodies or use_cp == cp)
+                    binding_energy = nb_energy + sum(deformation_energies)
+
+                deformation_energies = [deformation_energies[i] for i in energies_order[:len(deformation_energies)]]
+
+                yield materializer.materialize(atom_coordinates), binding_energy, nb_energy, deformation_energies
+
+            if last_page:
+                if self.get_last_notice() is not None and "Multiple optimized geometries" in self.get_last_notice():
+                    print(self.get_last_notice(), "Using the lowest energy optimized geometry to calculate deformation"
+                                                  " energies for this training set.")
+                return
+
+    def get_2B_training_set(self, molecule_name, names, SMILES, method, basis, cp, *tags):
+        """
+        Gets a 2B training set from the calculated energies in the database.
+        All complete calculations which match the given method, basis, cp, and tags
+        will be included.
+        Args:
+            molecule_name   - Name of the molecule for which a training set is desired.
+            names           - List of names of the two monomers, the training set will have the monomers
+                    in this order.
+            SMILES          - List of SMILE strings of each monomer, the atoms in the training set will
+                    be in this order.
+            method          - Method of this training set.
+            basis           - Basis of this training set.
+            cp              - Counterpoise correction of this training set.
+            tags            - Only include calculations marked with at least one of these tags.
+        Yields:
+            (molecule, binding_energy, interaction_energy, monomer1_energy, monomer2_energy)
+            molecule        - One molecule in the training set.
+            binding_energy  - Its 2B binding energy.
+            interaction_energy - Its 2B interaction energy.
+            monomer1_energy - Its first monomer's deformation energy.
+            monomer2_energy - Its second monomer's deformation energy.
+        """
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        monomer1_name, monomer2_name = sorted([names[0], names[1]])
+
+        molecule_name = monomer1_name + "-" + monomer2_name
+
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
+
+        optimized_energies = self.get_optimized_energies([monomer1_name, monomer2_name], model_name, tags, False)
+
+        after_hash = ""
+
+        while True:
+            training_set = self.get_page(molecule_name, model_name, tags, after_hash,
+                                         "EXISTS(SELECT 1 FROM molecule_properties WHERE molecule_properties.mol_hash = molecule_list.mol_hash "
+                                         "AND molecule_properties.model_name = ? AND molecule_properties.frag_indices = '{0,1}' "
+                                         "AND molecule_properties.use_cp = 0 AND molecule_properties.status = 'complete')",
+                                         (model_name,))
+            properties = self.get_page_properties(model_name, training_set)
+
+            for after_hash, atom_coordinates in training_set:
+                energies = {key: energy for key, (energy, status) in properties[after_hash].items()}
+
+                # like init.sql, energies of monomers that were never calculated are None.
+                dimer_energy = energies[((0, 1), False)]
+                monomer_energies = [energies.get(((index,), False)) for index in range(2)]
+                cp_monomer_energies = [energies.get(((index,), cp)) for index in range(2)]
+
+                interaction_energy = None
+                if None not in cp_monomer_energies:
+                    interaction_energy = dimer_energy - sum(cp_monomer_energies)
+
+                monomer1_energy, monomer2_energy = [None if energy is None else energy - optimized_energy
+                                                    for energy, optimized_energy in zip(monomer_energies, optimized_energies)]
+
+                binding_energy = None
+                if None not in (interaction_energy, monomer1_energy, monomer2_energy):
+                    binding_energy = interaction_energy + monomer1_energy + monomer2_energy
+
+                if materializer.order == [1, 0]:
+                    monomer1_energy, monomer2_energy = monomer2_energy, monomer1_energy
+
+                yield materializer.materialize(atom_coordinates), binding_energy, interaction_energy, monomer1_energy, monomer2_energy
+
+            if len(training_set) < self.batch_size:
+                return
+
+    def export_calculations(self, names, SMILES, method, basis, cp, *tags):
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        molecule_name = "-".join(sorted(names))
+
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
+        energies_order = self.get_energies_order(materializer.order, len(names), cp)
+
+        calculations = self.get_calculations(len(names), cp)
+
+        self.check_training_sets(tags)
+
+        after_hash = ""
+
+        while True:
+            page = self.get_complete_page(molecule_name, model_name, tags, after_hash)
+            properties = self.get_page_properties(model_name, page)
+
+            for after_hash, atom_coordinates in page:
+                energies = [properties[after_hash][calculation][0] for calculation in calculations]
+
+                yield materializer.materialize(atom_coordinates), [energies[i] for i in energies_order]
+
+            if len(page) < self.batch_size:
+                return
+
+    def get_failed(self, molecule_name, names, SMILES, method, basis, cp, *tags, optimized=False):
+        """
+        Gets geometries of energy caclulations that have failed.
+        All failed calculations which match the given method, basis, cp, and tags
+        will be included.
+        Args:
+            molecule_name   - Name of the molecule to find failed calculations for.
+            names           - List of names of the two monomers, the molecules will have the monomers
+                    in this order.
+            SMILES          - List of SMILE strings of each monomer, the atoms in the fragments will
+                    be in this order.
+            method          - Method for the failed calculations.
+            basis           - Basis for the failed calculations.
+            cp              - Counterpoise correction for the failed calculations.
+            tags            - Only include calculations marked with at least one of these tags.
+        Yields:
+            (molecule, energy, used_cp)
+            molecule        - One molecule in the training set.
+            frag_indices    - The indices of the fragments used in the failed calculation.
+            used_cp         - True of fragments not in frag_indices where included as ghost
+                    atoms in this failed calculation.
+        """
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        materializer = self.get_row_materializer(molecule_name, names, SMILES)
+
+        self.check_training_sets(tags)
+
+        after_hash = ""
+
+        while True:
+            failed = self.get_page(molecule_name, model_name, tags, after_hash,
+                                   "EXISTS(SELECT 1 FROM molecule_properties WHERE molecule_properties.mol_hash = molecule_list.mol_hash "
+                                   "AND molecule_properties.model_name = ? AND molecule_properties.frag_indices = '{0}' "
+                                   "AND molecule_properties.status = 'failed')", (model_name,))
+            properties = self.get_page_properties(model_name, failed)
+
+            for after_hash, atom_coordinates in failed:
+                for (frag_indices, used_cp), (energy, status) in properties[after_hash].items():
+                    if frag_indices == (0,) and status == "failed":
+                        yield materializer.materialize(atom_coordinates), list(frag_indices), used_cp
+
+            if len(failed) < self.batch_size:
+                return
+
+    def reset_all_calculations(self, *tags):
+        """
+        Resets all dispatched, complete, and failed calculations in the database back to pending. Their
+        energies are queued for recalculation.
+        Args:
+            tags            - Only reset calculations marked with at least one of these tags. If no tags are given,
+                    every calculation is reset.
+        Returns:
+            None.
+        """
+
+        if len(tags) != 0:
+            self.single_execute("UPDATE molecule_properties SET status = 'pending' WHERE status != 'pending' AND "
+                                + self.get_tags_condition("molecule_properties.mol_hash", "molecule_properties.model_name", tags),
+                                tags)
+            return
+
+        self.single_execute("UPDATE molecule_properties SET status = 'pending' WHERE status != 'pending'", ())
+
+    def reset_dispatched(self, *tags):
+        """
+        Resets all dispatched calculations with any of the tags back to pending. Their
+        energies are queued for recalculation.
+        Args:
+            tags            - Only reset calculations marked with at least one of these tags.
+        Returns:
+            None.
+        """
+
+        self.single_execute("UPDATE molecule_properties SET status = 'pending' WHERE status = 'dispatched' AND "
+                            + self.get_tags_condition("molecule_properties.mol_hash", "molecule_properties.model_name", tags),
+                            tags)
+
+    def reset_failed(self, *tags):
+        """
+        Resets all failed calculations with any of the tags back to pending. Their
+        energies are queued for recalculation.
+        Args:
+            tags            - Only reset calculations marked with at least one of these tags.
+        Returns:
+            None.
+        """
+
+        self.single_execute("UPDATE molecule_properties SET status = 'pending' WHERE status = 'failed' AND "
+                            + self.get_tags_condition("molecule_properties.mol_hash", "molecule_properties.model_name", tags),
+                            tags)
+
+    def delete_calculations(self, molecule_list, method, basis, cp, *tags, delete_complete_calculations=False):
+        """
+        Removes the specified tags from any calculations in the database that matches one of the molecules in
+        molecule_list and the given method, basis, and cp.
+        Will never delete completed or dispatched energies unless delete_complete_calculations is True, only remove tags from them.
+        Will fully delete uncomplete calculations from the database.
+        Args:
+            molecule_list - Remove tags from calculations involving these molecules.
+            method  - Remove tags from calculations with this method.
+            basis   - Remove tags from calculations with this basis.
+            cp      - Remove tags from calculations with this cp.
+            tags    - The tags to remove.
+            delete_complete_calculations - If True, delete calculations even if their energy is already
+                calculated.
+        Returns:
+            None.
+        """
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        self.check_training_sets(tags)
+
+        order, frag_order, SMILES = None, None, None
+
+        for molecule in molecule_list:
+            if order is None:
+                order, frag_order = molecule.get_standard_order_order()
+                SMILES = [frag.get_standard_SMILE() for frag in molecule.get_standard_order()]
+
+            molecule = molecule.get_reordered_copy(order, frag_order, SMILES)
+
+            self.delete_calculation(molecule.get_SHA1(), molecule.get_name(), model_name, tags,
+                                    delete_complete_calculations)
+
+    def delete_all_calculations(self, molecule_name, method, basis, cp, *tags, delete_complete_calculations=False):
+        """
+        Removes tags from molecules in the database that match the molecule_name.
+        Will never delete completed or dispatched energies unless delete_complete_calculations is True, only remove tags from them.
+        Will fully delete uncomplete calculations from the database.
+        Args:
+            molecule_name - Only delete molecules with this name.
+            method  - Remove tags from calculations with this method.
+            basis   - Remove tags from calculations with this basis.
+            cp      - Remove tags from calculations with this cp.
+            tags    - The tags to remove.
+            delete_complete_calculations - If True, delete calculations even if their energy is already
+                calculated.
+        """
+
+        model_name = "{}/{}/{}".format(method, basis, cp)
+
+        self.check_training_sets(tags)
+
+        self.single_execute("SELECT molecule_list.mol_hash FROM molecule_list WHERE molecule_list.mol_name = ? AND "
+                            + self.get_tags_condition("molecule_list.mol_hash", "?", tags),
+                            [molecule_name, model_name] + list(tags))
+
+        for mol_hash, in self.cursor.fetchall():
+            self.delete_calculation(mol_hash, molecule_name, model_name, tags, delete_complete_calculations)
+
+    def delete_calculation(self, mol_hash, mol_name, model_name, tags, delete_complete_calculations):
+        """
+        Removes tags from the calculations of one molecule, then deletes the calculations if they have no tags left
+        and are all pending or delete_complete_calculations is True. Molecules, fragments and models no calculation
+        uses anymore are deleted with them.
+        Args:
+            mol_hash        - Hash of the molecule.
+            mol_name        - Name of the molecule.
+            model_name      - Name of the model of the calculations.
+            tags            - The tags to remove.
+            delete_complete_calculations - If True, delete calculations even if their energy is already
+                calculated.
+        Returns:
+            True if the calculations had any of the tags, False otherwise.
+        """
+
+        with self.operation_errors():
+            self.cursor.executemany("DELETE FROM tags WHERE mol_hash = ? AND model_name = ? AND tag_name = ?",
+                                    [(mol_hash, model_name, tag) for tag in tags])
+
+            if self.cursor.rowcount < 1:
+                return False
+
+            self.cursor.execute("SELECT EXISTS(SELECT 1 FROM tags WHERE mol_hash = ? AND model_name = ?)",
+                                (mol_hash, model_name))
+
+            if self.cursor.fetchone()[0]:
+                return True
+
+            self.cursor.execute("DELETE FROM optimized_geometries WHERE mol_hash = ? AND mol_name = ? AND model_name = ?",
+                                (mol_hash, mol_name, model_name))
+
+            if not delete_complete_calculations:
+                self.cursor.execute("SELECT EXISTS(SELECT 1 FROM molecule_properties WHERE mol_hash = ? AND model_name = ? "
+                                    "AND status != 'pending')", (mol_hash, model_name))
+
+                if self.cursor.fetchone()[0]:
+                    return True
+
+            self.cursor.execute("DELETE FROM molecule_properties WHERE mol_hash = ? AND model_name = ?", (mol_hash, model_name))
+
+            self.cursor.execute("DELETE FROM molecule_list WHERE mol_hash = ? "
+                                "AND NOT EXISTS(SELECT 1 FROM molecule_properties WHERE mol_hash = ?)", (mol_hash, mol_hash))
+
+            self.cursor.execute("DELETE FROM model_info WHERE name = ? "
+                                "AND NOT EXISTS(SELECT 1 FROM molecule_properties WHERE model_name = ?)", (model_name, model_name))
+
+            self.cursor.execute("SELECT EXISTS(SELECT 1 FROM molecule_list WHERE mol_name = ?)", (mol_name,))
+
+            if not self.cursor.fetchone()[0]:
+                self.cursor.execute("SELECT frag_name FROM molecule_contents WHERE mol_name = ?", (mol_name,))
+                frag_names = [row[0] for row in self.cursor.fetchall()]
+
+                self.cursor.execute("DELETE FROM molecule_contents WHERE mol_name = ?", (mol_name,))
+                self.cursor.execute("DELETE FROM molecule_info WHERE name = ?", (mol_name,))
+
+                for frag_name in frag_names:
+                    self.cursor.execute("SELECT EXISTS(SELECT 1 FROM molecule_contents WHERE frag_name = ?)", (frag_name,))
+
+                    if not self.cursor.fetchone()[0]:
+                        self.cursor.execute("DELETE FROM fragment_contents WHERE frag_name = ?", (frag_name,))
+                        self.cursor.execute("DELETE FROM fragment_info WHERE name = ?", (frag_name,))
+
+        return True
+
+    # A SQLite database has a single user, who has every privilege on every training set, so the privilege methods
+    # do nothing.
+
+    def grant_admin_privilege(self, username, *tags):
+        """
+        Does nothing, a SQLite database has a single user with every privilege.
+        Args:
+            username    - Username to grant admin privileges to.
+            tags        - All training sets to grant admin privileges on.
+        Returns:
+            None.
+        """
+
+        pass
+
+    def grant_write_privilege(self, username, *tags):
+        """
+        Does nothing, a SQLite database has a single user with every privilege.
+        Args:
+            username    - Username to grant write privileges to.
+            tags        - All training sets to grant write privileges on.
+        Returns:
+            None.
+        """
+
+        pass
+
+    def grant_read_privilege(self, username, *tags):
+        """
+        Does nothing, a SQLite database has a single user with every privilege.
+        Args:
+            username    - Username to grant read privileges to.
+            tags        - All training sets to grant read privileges on.
+        Returns:
+            None.
+        """
+
+        pass
+
+    def revoke_admin_privilege(self, username, *tags):
+        """
+        Does nothing, a SQLite database has a single user with every privilege.
+        Args:
+            username    - Username to revoke admin privileges from.
+            tags        - All training sets to revoke admin privileges from.
+        Returns:
+            None.
+        """
+
+        pass
+
+    def revoke_write_privilege(self, username, *tags):
+        """
+        Does nothing, a SQLite database has a single user with every privilege.
+        Args:
+            username    - Username to revoke write privileges from.
+            tags        - All training sets to revoke write privileges from.
+        Returns:
+            None.
+        """
+
+        pass
+
+    def revoke_read_privilege(self, username, *tags):
+        """
+        Does nothing, a SQLite database has a single user with every privilege.
+        Args:
+            username    - Username to revoke read privileges from.
+            tags        - All training sets to revoke read privileges from.
+        Returns:
+            None.
+        """
+
+        pass
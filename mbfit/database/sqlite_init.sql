@@ -0,0 +1,177 @@
+-- Schema of the embedded SQLite backend, the same tables as init.sql without the stored procedures, which are done
+-- by SQLiteDatabase in python instead. Frag indices are stored as postgres array text, like '{0,1}', and coordinates
+-- as packed big-endian float64 values, like molecule_list.packed_coordinates in init.sql.
+
+create table molecule_info
+(
+	name text not null
+		constraint molecule_info_pk
+			primary key
+);
+
+create table fragment_info
+(
+	name text not null
+		constraint fragment_info_pk
+			primary key,
+	charge integer not null,
+	spin integer not null,
+	smile text default 'no smile specified' not null
+);
+
+create table fragment_contents
+(
+	frag_name text not null
+		constraint fragment_contents_fragment_info_name_fk
+			references fragment_info,
+	atom_symbol text not null,
+	count integer not null,
+	symmetry text not null
+);
+
+create index fragment_contents_frag_name_index
+	on fragment_contents (frag_name);
+
+create table molecule_contents
+(
+	mol_name text not null
+		constraint molecule_contents_molecule_info_name_fk
+			references molecule_info,
+	frag_name text not null
+		constraint molecule_contents_fragment_info_name_fk
+			references fragment_info,
+	count integer not null
+);
+
+create index molecule_contents_mol_name_index
+	on molecule_contents (mol_name);
+
+create index molecule_contents_frag_name_index
+	on molecule_contents (frag_name);
+
+create table molecule_list
+(
+	mol_hash text not null
+		constraint molecule_list_pk
+			primary key,
+	mol_name text not null
+		constraint molecule_list_molecule_info_name_fk
+			references molecule_info,
+	packed_coordinates blob not null
+);
+
+create index molecule_list_mol_name_mol_hash_index
+	on molecule_list (mol_name, mol_hash);
+
+create table model_info
+(
+	name text not null
+		constraint model_info_pk
+			primary key
+);
+
+create table log_contents
+(
+	log_hash text not null
+		constraint log_contents_pk
+			primary key,
+	codec text not null,
+	content blob not null
+);
+
+create table log_files
+(
+	log_id integer not null
+		constraint log_files_pk
+			primary key,
+	start_time text not null,
+	end_time text,
+	log_text text,
+	client_name text not null,
+	log_hash text
+		constraint log_files_log_contents_log_hash_fk
+			references log_contents
+);
+
+-- energy is the most recent energy of the calculation, the first element of energies in init.sql.
+create table molecule_properties
+(
+	mol_hash text not null
+		constraint molecule_properties_molecule_list_mol_hash_fk
+			references molecule_list,
+	model_name text not null
+		constraint molecule_properties_model_info_name_fk
+			references model_info,
+	frag_indices text not null,
+	use_cp integer not null,
+	energy real,
+	status text not null
+		constraint molecule_properties_status_check
+			check (status in ('pending', 'dispatched', 'complete', 'failed')),
+	most_recent_log_id integer
+		constraint molecule_properties_log_files_log_id_fk
+			references log_files,
+	constraint molecule_properties_pk
+		primary key (mol_hash, model_name, frag_indices, use_cp)
+);
+
+create index molecule_properties_model_name_index
+	on molecule_properties (model_name);
+
+create index molecule_properties_pending_index
+	on molecule_properties (mol_hash, model_name)
+	where status = 'pending';
+
+create index molecule_properties_dispatched_index
+	on molecule_properties (mol_hash, model_name)
+	where status = 'dispatched';
+
+create index molecule_properties_failed_index
+	on molecule_properties (mol_hash, model_name)
+	where status = 'failed';
+
+create index molecule_properties_incomplete_index
+	on molecule_properties (mol_hash, model_name)
+	where status != 'complete';
+
+-- one row per tag of each calculation instead of an array of tags.
+create table tags
+(
+	mol_hash text not null
+		constraint tags_molecule_list_mol_hash_fk
+			references molecule_list,
+	model_name text not null
+		constraint tags_model_info_name_fk
+			references model_info,
+	tag_name text not null,
+	constraint tags_pk
+		primary key (mol_hash, model_name, tag_name)
+);
+
+create index tags_tag_name_model_name_index
+	on tags (tag_name, model_name);
+
+create table optimized_geometries
+(
+	mol_name text not null
+		constraint optimized_geometries_molecule_info_name_fk
+			references molecule_info,
+	mol_hash text not null
+		constraint optimized_geometries_molecule_list_mol_hash_fk
+			references molecule_list,
+	model_name text not null
+		constraint optimized_geometries_model_info_name_fk
+			references model_info,
+	constraint optimized_geometries_pk
+		primary key (mol_name, model_name, mol_hash)
+);
+
+create index optimized_geometries_mol_hash_index
+	on optimized_geometries (mol_hash);
+
+create table training_sets
+(
+	tag_name text not null
+		constraint training_sets_pk
+			primary key
+);
@@ -1,14 +1,18 @@
-import warnings
+# external package imports
+import itertools, numpy as np, os, shutil, warnings
+from concurrent.futures import ProcessPoolExecutor
+
 # absolute module imports
 from mbfit.utils import constants, SettingsReader, files
-from mbfit.exceptions import NoEnergiesError, NoOptimizedEnergyError, MultipleOptimizedEnergiesError, NoEnergyInRangeError
+from mbfit.exceptions import NoEnergiesError, NoOptimizedEnergyError, MultipleOptimizedEnergiesError, NoEnergyInRangeError, \
+        InvalidValueError
 
 # local module imports
 from .database import Database
 from mbfit.utils import system
 
 
-def generate_1b_training_set(settings_path, database_config_path, training_set_path, molecule_name, method, basis, cp, *tags, e_min=0, e_max=float('inf')):
+def generate_1b_training_set(settings_path, database_config_path, training_set_path, molecule_name, method, basis, cp, *tags, e_min=0, e_max=float('inf'), pool=None):
     """
     Writes a 1b training set to the given file from the calculated energies in a database.
 
@@ -26,6 +30,7 @@ def generate_1b_training_set(settings_path, database_config_path, training_set_p
         tags                - Use energies marked with one or more of these tags. Use % for any tag.
         e_min               - The minimum (inclusive) energy of any configuration to include in the training set.
         e_max               - The maximum (exclusive) energy of any configuration to include in the training set.
+        pool                - DatabasePool to borrow a connection from instead of opening a new one. Default is None.
 
     Return:
         None.
@@ -40,7 +45,7 @@ def generate_1b_training_set(settings_path, database_config_path, training_set_p
     SMILES = settings.get("molecule", "SMILES").split(",")
     
     # open the database
-    with Database(database_config_path) as database:
+    with Database(database_config_path, pool=pool) as database:
 
         print("Creating a fitting input file from database into file {}".format(training_set_path))
 
@@ -71,7 +76,7 @@ def generate_1b_training_set(settings_path, database_config_path, training_set_p
 
 
 def generate_2b_training_set(settings_path, database_config_path, training_set_path, molecule_name, method, basis,
-        cp, *tags, e_bind_max=float('inf'), e_mon_max=float('inf')):
+        cp, *tags, e_bind_max=float('inf'), e_mon_max=float('inf'), pool=None):
     """"
     Creates a 2b training set file from the calculated energies in a database.
 
@@ -89,6 +94,7 @@ def generate_2b_training_set(settings_path, database_config_path, training_set_p
         tags                - Use energies marked with at least one of these tags. Use % for any tag.
         e_bind_max          - Maximum binding energy allowed
         e_mon_max           - Maximum monomer deformation energy allowed
+        pool                - DatabasePool to borrow a connection from instead of opening a new one. Default is None.
 
     Return:
         None.
@@ -103,7 +109,7 @@ def generate_2b_training_set(settings_path, database_config_path, training_set_p
     SMILES = settings.get("molecule", "SMILES").split(",")
     
     # open the database
-    with Database(database_config_path) as database:
+    with Database(database_config_path, pool=pool) as database:
 
         print("Creating a fitting input file from database into file {}".format(training_set_path))
 
@@ -144,7 +150,7 @@ def generate_2b_training_set(settings_path, database_config_path, training_set_p
 
 def generate_training_set(settings_path, database_config_path, training_set_path, method, basis,
         cp, *tags, e_bind_min=-float('inf'), e_bind_max=float('inf'), e_mon_min=-float('inf'), e_mon_max=float('inf'),
-        deprecated_fitcode=False):
+        deprecated_fitcode=False, pool=None, num_workers=1):
     """"
     Creates a training set file from the calculated energies in a database.
 
@@ -163,71 +169,185 @@ def generate_training_set(settings_path, database_config_path, training_set_path
         e_mon_max           - Maximum monomer deformation energy allowed, exclusive.
         deprecated_fitcode  - Is this function being called to be used with the deprecated fitcode?
                 The output of the 1b and 2b training sets will be different.
+        pool                - DatabasePool to borrow a connection from instead of opening a new one. Default is None.
+        num_workers         - Number of processes to export the training set with. Each process reads a range of
+                configurations over its own connection into a shard file, and the shards are joined once all are
+                written. The training set is the same for any number of workers. Databases created by older
+                versions are always exported with one process. Default is 1.
 
     Return:
         None.
     """
 
+    if num_workers < 1:
+        raise InvalidValueError("num_workers", num_workers, "must be at least 1.")
+
     settings = SettingsReader(settings_path)
 
     names = settings.get("molecule", "names").split(",")
     SMILES = settings.get("molecule", "SMILES").split(",")
 
+    training_set_path = files.init_file(training_set_path, files.OverwriteMethod.get_from_settings(settings))
+
     # open the database
-    with Database(database_config_path) as database:
+    with Database(database_config_path, pool=pool) as database:
 
         training_set_size = database.get_training_set_size(names, method, basis, cp, *tags)
         system.format_print("Creating a fitting input file from database into file {} with up to {} geometries.".format(training_set_path, training_set_size),
                 bold=True, color=system.Color.YELLOW)
 
-        # initializing a counter
-        count_configs = 0
-        filtered_configs = 0
+        if num_workers > 1 and not database.has_training_set_pages():
+            system.format_print("Database cannot split training sets into ranges of configurations, exporting with one process.",
+                    italics=True)
+            num_workers = 1
 
-        with open(files.init_file(training_set_path, files.OverwriteMethod.get_from_settings(settings)), "w") as output:
-            for molecule, binding_energy, nb_energy, deformation_energies in database.get_training_set(names, SMILES, method, basis, cp, *tags):
+        if num_workers == 1:
+            with open(training_set_path, "w") as output:
+                count_configs, filtered_configs = write_training_set(database, output, names, SMILES, method, basis,
+                        cp, tags, e_bind_min, e_bind_max, e_mon_min, e_mon_max, deprecated_fitcode)
 
-                binding_energy *= constants.au_to_kcal
-                nb_energy *= constants.au_to_kcal
-                deformation_energies = [d * constants.au_to_kcal for d in deformation_energies]
+    if num_workers > 1:
+        shard_paths = ["{}.shard-{}".format(training_set_path, index) for index in range(num_workers)]
 
-                # skip this config if the binding energy is >= the maximum.
-                if binding_energy < e_bind_min or binding_energy >= e_bind_max:
-                    filtered_configs += 1
-                    continue
+        try:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                futures = [executor.submit(write_training_set_shard, database_config_path, shard_path, names, SMILES,
+                                           method, basis, cp, tags, e_bind_min, e_bind_max, e_mon_min, e_mon_max,
+                                           deprecated_fitcode, hash_range)
+                           for shard_path, hash_range in zip(shard_paths, get_hash_ranges(num_workers))]
 
-                # skip this config if any binding energy is >= the maximum.
-                if any([d < e_mon_min or d >= e_mon_max for d in deformation_energies]):
-                    filtered_configs += 1
-                    continue
+                counts = [future.result() for future in futures]
 
-                # write the number of atoms to the output file
-                output.write(str(molecule.get_num_atoms()) + "\n")
+            count_configs = sum(count for count, filtered in counts)
+            filtered_configs = sum(filtered for count, filtered in counts)
 
-                if deprecated_fitcode:
-                    if molecule.get_num_fragments() == 1:
-                        output.write("{}".format(binding_energy))
-                    elif molecule.get_num_fragments() == 2:
-                        output.write("{} {} {} {}".format(binding_energy, nb_energy, deformation_energies[0], deformation_energies[1]))
-                    else:
-                        output.write("{} {}".format(binding_energy, nb_energy))
-                else:
-                    output.write("{} {}".format(binding_energy, nb_energy))
+            # the ranges are in order of hash, so joining the shards in order gives the same file as one process.
+            with open(training_set_path, "w") as output:
+                for shard_path in shard_paths:
+                    with open(shard_path, "r") as shard:
+                        shutil.copyfileobj(shard, output)
+        finally:
+            for shard_path in shard_paths:
+                if os.path.isfile(shard_path):
+                    os.remove(shard_path)
 
-                output.write("\n")
+    if count_configs == 0:
+        raise Exception
 
-                # write the molecule's atoms' coordinates to the xyz file
-                output.write(molecule.to_xyz() + "\n")
+    system.format_print("Generated training set with {} configurations. {} configurations filtered out due to binding or deformation energies outside of specified range.".format(count_configs, filtered_configs),
+            bold=True, color=system.Color.GREEN)
 
-                # increment the counter
-                count_configs += 1
 
-                if count_configs + filtered_configs % 100 == 0:
-                    system.format_print("Considered {} geometries so far. Included {} and filtered {} out.".format(count_configs + filtered_configs, count_configs, filtered_configs),
-                            italics=True)
+def get_hash_ranges(num_ranges):
+    """
+    Splits the hashes of configurations into ranges that each hold about the same number of configurations.
 
-        if count_configs == 0:
-            raise Exception
+    Args:
+        num_ranges          - Number of ranges to split the hashes into.
 
-        system.format_print("Generated training set with {} configurations. {} configurations filtered out due to binding or deformation energies outside of specified range.".format(count_configs, filtered_configs),
-                bold=True, color=system.Color.GREEN)
+    Return:
+        List of (first, last) pairs in order, for the hash_range argument of Database.get_training_set(). Every hash
+        is in exactly one range.
+    """
+
+    # hashes are hex SHA1 digests, so they are spread evenly over the values of their first 8 digits.
+    boundaries = ["{:08x}".format(index * 16 ** 8 // num_ranges) for index in range(1, num_ranges)]
+
+    return list(zip([""] + boundaries, boundaries + [None]))
+
+
+def write_training_set(database, output, names, SMILES, method, basis, cp, tags, e_bind_min, e_bind_max, e_mon_min,
+        e_mon_max, deprecated_fitcode, hash_range=None):
+    """
+    Writes the configurations of a training set that are within the energy ranges to a file.
+
+    Args:
+        database            - Database to read the training set from.
+        output              - Open file to write the training set to.
+        names               - Names of the monomers, the training set will have the monomers in this order.
+        SMILES              - SMILE strings of the monomers, the atoms in the training set will be in this order.
+        method              - Use energies calculated with this method.
+        basis               - Use energies calculated with this basis.
+        cp                  - Use energies calculated with this cp.
+        tags                - Use energies marked with at least one of these tags.
+        e_bind_min          - Minimum binding energy allowed, inclusive.
+        e_bind_max          - Maximum binding energy allowed, exclusive.
+        e_mon_max           - Minimum monomer deformation energy allowed, inclusive.
+        e_mon_max           - Maximum monomer deformation energy allowed, exclusive.
+        deprecated_fitcode  - Is this function being called to be used with the deprecated fitcode?
+                The output of the 1b and 2b training sets will be different.
+        hash_range          - Only write the configurations in this range of hashes, see get_hash_ranges().
+                Default is None, which writes every configuration.
+
+    Return:
+        (count_configs, filtered_configs), the number of configurations written and filtered out.
+    """
+
+    # initializing a counter
+    count_configs = 0
+    filtered_configs = 0
+
+    training_set = database.get_training_set(names, SMILES, method, basis, cp, *tags, hash_range=hash_range)
+
+    while True:
+        # convert and filter the energies of a whole page of configurations at once.
+        page = list(itertools.islice(training_set, database.get_batch_size()))
+
+        if len(page) == 0:
+            break
+
+        binding_energies = np.array([row[1] for row in page]) * constants.au_to_kcal
+        nb_energies = np.array([row[2] for row in page]) * constants.au_to_kcal
+        deformation_energies = np.array([row[3] for row in page]).reshape(len(page), -1) * constants.au_to_kcal
+
+        # skip configs whose binding energy or any deformation energy is outside of its range.
+        included = (binding_energies >= e_bind_min) & (binding_energies < e_bind_max) \
+                & np.all((deformation_energies >= e_mon_min) & (deformation_energies < e_mon_max), axis=1)
+
+        blocks = []
+
+        for (molecule, *energies), binding_energy, nb_energy, deformations in zip(
+                [row for row, include in zip(page, included) if include], binding_energies[included].tolist(),
+                nb_energies[included].tolist(), deformation_energies[included].tolist()):
+
+            if deprecated_fitcode and molecule.get_num_fragments() == 1:
+                energy_line = "{}".format(binding_energy)
+            elif deprecated_fitcode and molecule.get_num_fragments() == 2:
+                energy_line = "{} {} {} {}".format(binding_energy, nb_energy, deformations[0], deformations[1])
+            else:
+                energy_line = "{} {}".format(binding_energy, nb_energy)
+
+            # the number of atoms, the energies, then the molecule's atoms' coordinates.
+            blocks.append("{}\n{}\n{}\n".format(molecule.get_num_atoms(), energy_line, molecule.to_xyz()))
+
+        output.write("".join(blocks))
+
+        count_configs += len(blocks)
+        filtered_configs += len(page) - len(blocks)
+
+        system.format_print("Considered {} geometries so far. Included {} and filtered {} out.".format(count_configs + filtered_configs, count_configs, filtered_configs),
+                italics=True)
+
+    return count_configs, filtered_configs
+
+
+def write_training_set_shard(database_config_path, shard_path, names, SMILES, method, basis, cp, tags, e_bind_min,
+        e_bind_max, e_mon_min, e_mon_max, deprecated_fitcode, hash_range):
+    """
+    Writes the configurations of a training set in a range of hashes to a shard file, over a new connection. Run by
+    each worker process of generate_training_set().
+
+    Args:
+        database_config_path - .ini file containing host, port, database, username, and password.
+        shard_path          - Local path to the shard file to write.
+        hash_range          - Only write the configurations in this range of hashes, see get_hash_ranges().
+        Other arguments are the same as for write_training_set().
+
+    Return:
+        (count_configs, filtered_configs), the number of configurations written and filtered out.
+    """
+
+    with Database(database_config_path) as database:
+        with open(shard_path, "w") as output:
+            return write_training_set(database, output, names, SMILES, method, basis, cp, tags, e_bind_min,
+                    e_bind_max, e_mon_min, e_mon_max, deprecated_fitcode, hash_range=hash_range)
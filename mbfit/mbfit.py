@@ -358,7 +358,7 @@ def init_database(settings_path, database_config_path, configurations_path, meth
     database.initialize_database(settings_path, database_config_path, configurations_path, method, basis, cp, *tags, optimized = optimized)
 
 
-def fill_database(settings_path, database_config_path, client_name, *tags, calculation_count = sys.maxsize, qm_options={}):
+def fill_database(settings_path, database_config_path, client_name, *tags, calculation_count = sys.maxsize, qm_options={}, num_workers=1, log_retention="all"):
     """
     Goes through all the uncalculated energies in a database and calculates them. Will take a while. May be interrupted
     and restarted.
@@ -371,6 +371,10 @@ def fill_database(settings_path, database_config_path, client_name, *tags, calcu
         tags                - Only perform calculations marked with at least one of these tags.
         calculation_count   - Maximum number of calculations to perform. Unlimited if None.
         qm_options           - Dictionary of extra arguments to be passed to the QM code doing the calculation.
+        num_workers         - Number of calculations to perform at the same time. Only use more than 1 with a QM code
+                    that runs in its own process, like qchem. Default is 1.
+        log_retention       - Which logs to store in the database. "all" to store every log, "failed" to only store
+                    the logs of failed calculations, "none" to store no logs. Default is "all".
 
     Returns:
         None.
@@ -379,7 +383,7 @@ def fill_database(settings_path, database_config_path, client_name, *tags, calcu
     if calculation_count is None:
         calculation_count = sys.maxsize
 
-    database.fill_database(settings_path, database_config_path, client_name, *tags, calculation_count=calculation_count, qm_options=qm_options)
+    database.fill_database(settings_path, database_config_path, client_name, *tags, calculation_count=calculation_count, qm_options=qm_options, num_workers=num_workers, log_retention=log_retention)
 
 def make_jobs(settings_path, database_config_path, client_name, job_dir, *tags, num_jobs=sys.maxsize, qm_options={}):
     """
@@ -403,7 +407,7 @@ def make_jobs(settings_path, database_config_path, client_name, job_dir, *tags,
 
     job_handler.make_all_jobs(database_config_path, client_name, job_dir, *tags, num_jobs=num_jobs, qm_options=qm_options)
 
-def read_jobs(settings_path, database_config_path, job_dir, overwrite=False):
+def read_jobs(settings_path, database_config_path, job_dir, overwrite=False, log_retention="all"):
     """
     Searches the given directory for completed job directories and enters
     the results into the database.
@@ -417,6 +421,9 @@ def read_jobs(settings_path, database_config_path, job_dir, overwrite=False):
         database_config_path - .ini file containing host, port, database, username, and password.
                     Make sure only you have access to this file or your password will be compromised!
         job_dir             - Local path the the directory to search.
+        overwrite           - If True, replace energies that are already in the database. Default is False.
+        log_retention       - Which logs to store in the database. "all" to store every log, "failed" to only store
+                    the logs of failed calculations, "none" to store no logs. Default is "all".
 
     Returns:
         None.
@@ -424,7 +431,7 @@ def read_jobs(settings_path, database_config_path, job_dir, overwrite=False):
 
     job_handler = database.get_job_handler(settings_path)
 
-    job_handler.read_all_jobs(database_config_path, job_dir, overwrite=overwrite)
+    job_handler.read_all_jobs(database_config_path, job_dir, overwrite=overwrite, log_retention=log_retention)
 
 def generate_training_set(settings_path, database_config_path, training_set_path, method, basis,
         cp, *tags, e_bind_min=-float('inf'), e_bind_max=float('inf'), e_mon_min=-float('inf'), e_mon_max=float('inf'),
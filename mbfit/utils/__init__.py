@@ -2,4 +2,5 @@ from . import files, system, constants, math
 from .settings_reader import SettingsReader
 from .quaternion import Quaternion
 from .progress_bar import ProgressBar
+from .log_file import LogFile
 from . import distribution_function
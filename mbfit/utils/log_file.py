@@ -0,0 +1,164 @@
+# external package imports
+import mmap
+
+class LogFile:
+    """
+    Read-only view of the output file of a QM calculation, memory mapped so parsers can search it backwards from the end
+    for the markers they need. Only the pages of the file that are searched are read from disk, which matters for the
+    large outputs of big basis sets and optimizations, where the results are at the end.
+
+    Use as a context manager, so the file is closed when done.
+    """
+
+    def __init__(self, path):
+        """
+        Constructor for a LogFile.
+
+        Args:
+            path            - Local path to the file.
+
+        Returns:
+            None
+        """
+
+        self.path = path
+        self.file = open(path, "rb")
+
+        # empty files cannot be memory mapped.
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.data = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the file.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+        self.file.close()
+
+    def get_size(self):
+        """
+        Gets the size of the file.
+
+        Args:
+            None
+
+        Returns:
+            The size of the file in bytes.
+        """
+
+        return len(self.data)
+
+    def find_last(self, marker, end=None):
+        """
+        Finds the last occurrence of a marker in the file, searching backwards from the end.
+
+        Args:
+            marker          - The string to look for.
+            end             - Only look before this offset, or None to look in the whole file.
+                Default: None
+
+        Returns:
+            The offset of the start of the last occurrence of marker, or -1 if it does not occur.
+        """
+
+        return self.data.rfind(marker.encode(), 0, end if end is not None else len(self.data))
+
+    def get_text_after_last(self, marker):
+        """
+        Gets the rest of the line after the last occurrence of a marker in the file.
+
+        Args:
+            marker          - The string to look for.
+
+        Returns:
+            The text between marker and the end of its line, or None if marker does not occur.
+        """
+
+        offset = self.find_last(marker)
+
+        if offset == -1:
+            return None
+
+        offset += len(marker.encode())
+        end = self.data.find(b"\n", offset)
+
+        return self.data[offset:end if end != -1 else len(self.data)].decode(errors="replace")
+
+    def read_lines(self, offset=0):
+        """
+        Reads the lines of the file from the line that contains an offset to the end of the file, one at a time.
+
+        Args:
+            offset          - An offset in the line to start from, such as one from find_last().
+                Default: 0
+
+        Yields:
+            Each line, with its newline.
+        """
+
+        start = self.data.rfind(b"\n", 0, offset) + 1
+
+        while start < len(self.data):
+            end = self.data.find(b"\n", start)
+            end = end + 1 if end != -1 else len(self.data)
+
+            yield self.data[start:end].decode(errors="replace")
+
+            start = end
+
+    def split(self, marker):
+        """
+        Splits the file into sections, each starting at the start of a line that contains marker.
+
+        Args:
+            marker          - The string that starts each section.
+
+        Returns:
+            List of the text of each section. Any text before the first marker is part of the first section. Empty if
+            marker does not occur.
+        """
+
+        starts = []
+
+        offset = self.find_last(marker)
+        while offset != -1:
+            starts.append(self.data.rfind(b"\n", 0, offset) + 1)
+            offset = self.find_last(marker, starts[-1])
+
+        if len(starts) == 0:
+            return []
+
+        starts.reverse()
+        starts[0] = 0
+
+        return [self.data[start:end].decode(errors="replace") for start, end in zip(starts, starts[1:] + [len(self.data)])]
+
+    def get_text(self):
+        """
+        Reads the whole file in one read.
+
+        Args:
+            None
+
+        Returns:
+            The text of the file. Bytes that are not valid utf-8 are replaced.
+        """
+
+        return self.data[:].decode(errors="replace")
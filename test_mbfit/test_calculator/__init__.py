@@ -1,8 +1,17 @@
 import unittest
-from . import test_model, test_calculator, test_psi4_calculator, test_qchem_calculator, test_calculator_utils
+from . import test_model, test_calculator, test_psi4_calculator, test_qchem_calculator, test_calculator_utils, \
+        test_calculation_executor, test_result_cache, test_worker_pool, \
+        test_qchem_runner, test_analytic_calculator, test_decomposition, test_screening
 
 suite = unittest.TestSuite([test_model.suite,
                             test_calculator.suite,
                             test_psi4_calculator.suite,
                             test_qchem_calculator.suite,
-                            test_calculator_utils.suite])
+                            test_calculator_utils.suite,
+                            test_calculation_executor.suite,
+                            test_result_cache.suite,
+                            test_worker_pool.suite,
+                            test_qchem_runner.suite,
+                            test_analytic_calculator.suite,
+                            test_decomposition.suite,
+                            test_screening.suite])
@@ -0,0 +1,147 @@
+import unittest, os, shutil, time
+import numpy
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.calculator import get_calculator, AnalyticCalculator, Model
+from mbfit.exceptions import LibraryCallError
+from mbfit.molecule import Molecule
+
+class TestAnalyticCalculator(TestCaseWithId):
+    def __init__(self, *args, **kwargs):
+        super(TestAnalyticCalculator, self).__init__(*args, **kwargs)
+        self.test_folder = os.path.dirname(os.path.abspath(__file__))
+
+    def setUp(self):
+        self.output_folder = os.path.join(self.test_folder, "output", "analytic_calculator")
+
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+        os.makedirs(self.output_folder)
+
+        # bent, so the optimization finds the linear minimum instead of staying on the symmetric line.
+        self.CO2 = Molecule.read_xyz("3\n\nC 0 0 0\nO 1 0.1 0\nO -1 0 0.05", [3], ["CO2"], [0], [1], ["A1B2"], ["C(O)O"])
+        self.model = Model("HF", "STO-3G", False)
+
+    def get_calculator(self, **settings):
+        settings_path = os.path.join(self.output_folder, "settings.ini")
+
+        with open(settings_path, "w") as settings_file:
+            settings_file.write("[files]\nlog_path = {}\n".format(os.path.join(self.output_folder, "logs")))
+            settings_file.write("[energy_calculator]\ncode = analytic\n")
+            settings_file.write("[analytic]\n")
+
+            for prop, value in settings.items():
+                settings_file.write("{} = {}\n".format(prop, value))
+
+        return get_calculator(settings_path, False)
+
+    def get_dimer(self, distance):
+        return Molecule(self.CO2.get_fragments()
+                        + Molecule.read_xyz("3\n\nC 0 {0} 0\nO 1 {0} 0\nO -1 {0} 0".format(distance), [3], ["CO2"], [0],
+                                            [1], ["A1B2"], ["C(O)O"]).get_fragments())
+
+    def test_get_calculator(self):
+
+        self.assertIsInstance(self.get_calculator(), AnalyticCalculator)
+
+        self.test_passed = True
+
+    def test_calculate_energy(self):
+
+        calculator = self.get_calculator()
+
+        energy, log_path = calculator.calculate_energy(self.CO2, self.model, [0])
+
+        self.assertEqual(calculator.calculate_energy(self.CO2, self.model, [0])[0], energy)
+
+        with open(log_path) as log_file:
+            self.assertIn("Total energy in the final basis set = {:.10f}".format(energy), log_file.read())
+
+        # fragments bind at van der Waals distances and stop interacting far apart.
+        for distance, is_bound in [(3.5, True), (100, False)]:
+            dimer = self.get_dimer(distance)
+            energies = [calculator.calculate_energy(dimer, self.model, fragment_indicies)[0]
+                        for fragment_indicies in [[0], [1], [0, 1]]]
+
+            interaction_energy = energies[2] - energies[0] - energies[1]
+
+            if is_bound:
+                self.assertLess(interaction_energy, 0)
+            else:
+                self.assertAlmostEqual(interaction_energy, 0, places=5)
+
+        self.test_passed = True
+
+    def test_gradient(self):
+
+        calculator = self.get_calculator()
+
+        atoms, self_energy, pairs = calculator.get_parameters(self.get_dimer(3.5))
+        coordinates = calculator.get_coordinates(atoms)
+
+        energy, gradient = calculator.get_energy_and_gradient(coordinates, self_energy, pairs)
+
+        numerical_gradient = numpy.zeros(coordinates.shape)
+
+        for index in range(coordinates.size):
+            displaced = coordinates.copy()
+            displaced.flat[index] += 1e-5
+            plus = calculator.get_energy_and_gradient(displaced, self_energy, pairs)[0]
+            displaced.flat[index] -= 2e-5
+            minus = calculator.get_energy_and_gradient(displaced, self_energy, pairs)[0]
+            numerical_gradient.flat[index] = (plus - minus) / 2e-5
+
+        numpy.testing.assert_allclose(gradient, numerical_gradient, atol=1e-6)
+
+        self.test_passed = True
+
+    def test_optimize_and_frequencies(self):
+
+        calculator = self.get_calculator()
+
+        optimized, energy, log_path = calculator.optimize_geometry(self.CO2, self.model)
+
+        self.assertLess(energy, calculator.calculate_energy(self.CO2, self.model, [0])[0])
+        self.assertAlmostEqual(calculator.calculate_energy(optimized, self.model, [0])[0], energy)
+        self.assertEqual(optimized.get_fragments()[0].get_SMILE(), self.CO2.get_fragments()[0].get_SMILE())
+
+        normal_modes, frequencies, red_masses, log_path = calculator.calculate_frequencies(optimized, self.model)
+
+        # a bent triatomic has 3 vibrations, all real at a minimum.
+        self.assertEqual(len(frequencies), 3)
+        self.assertEqual(frequencies, sorted(frequencies))
+        self.assertTrue(all(frequency > 0 for frequency in frequencies))
+
+        for normal_mode, red_mass in zip(normal_modes, red_masses):
+            self.assertEqual(numpy.array(normal_mode).shape, (3, 3))
+            self.assertAlmostEqual(numpy.sum(numpy.array(normal_mode) ** 2), 1)
+            self.assertGreater(red_mass, 12)
+            self.assertLess(red_mass, 16)
+
+        self.test_passed = True
+
+    def test_latency_and_failures(self):
+
+        calculator = self.get_calculator(latency=0.2, log_lines=100)
+
+        start = time.time()
+        energy, log_path = calculator.calculate_energy(self.CO2, self.model, [0])
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+        with open(log_path) as log_file:
+            self.assertGreater(len(log_file.read().splitlines()), 100)
+
+        calculator = self.get_calculator(failure_rate=1)
+
+        with self.assertRaises(LibraryCallError) as context:
+            calculator.calculate_energy(self.CO2, self.model, [0])
+
+        with open(context.exception.log_path) as log_file:
+            self.assertIn("failed on purpose", log_file.read())
+
+        # failed calculations are reported by calculate_energies(), not raised.
+        self.assertEqual([energy for key, energy, log_path in calculator.calculate_energies([(0, self.CO2, self.model, [0])])],
+                         [None])
+
+        self.test_passed = True
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestAnalyticCalculator)
@@ -0,0 +1,191 @@
+import unittest, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.calculator import Calculator, CalculationExecutor, Model, calculation_executor
+from mbfit.exceptions import InvalidValueError, LibraryCallError
+from mbfit.molecule import Molecule
+
+class CountingCalculator(Calculator):
+    """
+    Calculator that waits a little instead of calculating and keeps track of how many threads and how much memory the
+    calculations running at the same time use.
+    """
+
+    def __init__(self, settings_path):
+        super(CountingCalculator, self).__init__(settings_path, False)
+
+        self.lock = threading.Lock()
+        self.threads = threading.local()
+
+        self.cores_in_use = 0
+        self.memory_in_use = 0
+        self.max_cores_in_use = 0
+        self.max_memory_in_use = 0
+
+    def set_num_threads(self, num_threads):
+        self.threads.num_threads = num_threads
+
+    def set_memory(self, memory):
+        self.threads.memory = memory
+
+    def calculate_energy(self, molecule, model, fragment_indicies, qm_options={}):
+        num_threads, memory = self.threads.num_threads, self.threads.memory or 0
+
+        with self.lock:
+            self.cores_in_use += num_threads
+            self.memory_in_use += memory
+            self.max_cores_in_use = max(self.max_cores_in_use, self.cores_in_use)
+            self.max_memory_in_use = max(self.max_memory_in_use, self.memory_in_use)
+
+        time.sleep(0.02)
+
+        with self.lock:
+            self.cores_in_use -= num_threads
+            self.memory_in_use -= memory
+
+        if qm_options.get("fail", False) and fragment_indicies == [1]:
+            raise LibraryCallError("counting", "energy", "failed on purpose", log_path="some/log/path")
+
+        return float(num_threads), "log/path/{}".format(num_threads)
+
+class TestCalculationExecutor(TestCaseWithId):
+    def __init__(self, *args, **kwargs):
+        super(TestCalculationExecutor, self).__init__(*args, **kwargs)
+        self.test_folder = os.path.dirname(os.path.abspath(__file__))
+
+    def setUp(self):
+        self.settings_path = os.path.join(self.test_folder, "resources", "CO2monomer.ini")
+
+        self.CO2 = Molecule.read_xyz_path(os.path.join(self.test_folder, "resources", "CO2monomer.xyz"), [3], ["CO2"], [0], [1], ["A1B2"], ["C(O)O"])
+        self.dimer = Molecule(self.CO2.get_fragments() + self.CO2.get_fragments())
+
+        self.calculator = CountingCalculator(self.settings_path)
+
+        # calculations are performed by threads of this process with the counting calculator, instead of worker processes.
+        self.worker_calculator = calculation_executor.worker_calculator
+        calculation_executor.worker_calculator = self.calculator
+
+    def tearDown(self):
+        calculation_executor.worker_calculator = self.worker_calculator
+
+        super(TestCalculationExecutor, self).tearDown()
+
+    def get_executor(self, max_cores, **kwargs):
+        executor = CalculationExecutor(self.settings_path, max_cores=max_cores, **kwargs)
+        executor.pool = ThreadPoolExecutor(max_workers=max_cores)
+
+        return executor
+
+    def test_invalid_values(self):
+
+        with self.assertRaises(InvalidValueError):
+            CalculationExecutor(self.settings_path, max_cores=0)
+
+        with self.assertRaises(InvalidValueError):
+            CalculationExecutor(self.settings_path, max_cores=4, max_threads_per_job=0)
+
+        with self.assertRaises(InvalidValueError):
+            CalculationExecutor(self.settings_path, max_cores=4, atoms_per_thread=0)
+
+        self.test_passed = True
+
+    def test_get_num_threads(self):
+
+        executor = CalculationExecutor(self.settings_path, max_cores=4, atoms_per_thread=2)
+
+        self.assertEqual(executor.get_num_threads(self.CO2, Model("HF", "STO-3G", False), [0]), 2)
+        self.assertEqual(executor.get_num_threads(self.dimer, Model("HF", "STO-3G", False), [1]), 2)
+
+        # ghost atoms count towards the size of the calculation.
+        self.assertEqual(executor.get_num_threads(self.dimer, Model("HF", "STO-3G", True), [1]), 3)
+
+        # never more than max_threads_per_job or max_cores.
+        executor = CalculationExecutor(self.settings_path, max_cores=4, max_threads_per_job=2, atoms_per_thread=1)
+        self.assertEqual(executor.get_num_threads(self.dimer, Model("HF", "STO-3G", False), [0, 1]), 2)
+
+        executor = CalculationExecutor(self.settings_path, max_cores=2, max_threads_per_job=8, atoms_per_thread=1)
+        self.assertEqual(executor.get_num_threads(self.dimer, Model("HF", "STO-3G", False), [0, 1]), 2)
+
+        self.assertEqual(executor.get_memory(2), None)
+        self.assertEqual(CalculationExecutor(self.settings_path, max_cores=2, memory_per_thread=500).get_memory(2), 1000)
+
+        self.test_passed = True
+
+    def test_calculate_energies(self):
+
+        calculations = [(index, self.dimer, Model("HF", "STO-3G", False), frag_indices)
+                        for index, frag_indices in enumerate([[0], [1], [0, 1]] * 10)]
+
+        with self.get_executor(4, atoms_per_thread=2) as executor:
+            results = list(executor.calculate_energies(iter(calculations)))
+
+        self.assertEqual(sorted(key for key, energy, log_path in results), list(range(30)))
+
+        for key, energy, log_path in results:
+            self.assertEqual(energy, executor.get_num_threads(*calculations[key][1:]))
+
+        self.assertLessEqual(self.calculator.max_cores_in_use, 4)
+        self.assertGreater(self.calculator.max_cores_in_use, 2)
+        self.assertEqual(executor.cores_in_use, 0)
+
+        # failed calculations come back without an energy.
+        with self.get_executor(4, atoms_per_thread=2) as executor:
+            results = list(executor.calculate_energies(calculations, qm_options={"fail": True}))
+
+        self.assertEqual(len(results), 30)
+
+        for key, energy, log_path in results:
+            if calculations[key][3] == [1]:
+                self.assertEqual((energy, log_path), (None, "some/log/path"))
+            else:
+                self.assertIsNotNone(energy)
+
+        self.test_passed = True
+
+    def test_serial(self):
+
+        calculations = [(index, self.dimer, Model("HF", "STO-3G", False), frag_indices)
+                        for index, frag_indices in enumerate([[0], [1], [0, 1]])]
+
+        # without max_cores, the calculations are performed by the calculator's calculate_energies().
+        with CalculationExecutor(self.settings_path) as executor:
+            executor.calculator = self.calculator
+            self.calculator.set_num_threads(1)
+            self.calculator.set_memory(None)
+
+            results = list(executor.calculate_energies(calculations, qm_options={"fail": True}))
+
+        self.assertEqual(results, [(0, 1.0, "log/path/1"), (1, None, "some/log/path"), (2, 1.0, "log/path/1")])
+        self.assertEqual(self.calculator.max_cores_in_use, 1)
+
+        self.test_passed = True
+
+    def test_memory_budget(self):
+
+        calculations = [(index, self.CO2, Model("HF", "STO-3G", False), [0]) for index in range(20)]
+
+        with self.get_executor(8, max_memory=250, memory_per_thread=100) as executor:
+            results = list(executor.calculate_energies(calculations))
+
+        self.assertEqual(len(results), 20)
+        self.assertLessEqual(self.calculator.max_memory_in_use, 200)
+        self.assertEqual(self.calculator.max_cores_in_use, 2)
+
+        self.test_passed = True
+
+    def test_stop_early(self):
+
+        calculations = [(index, self.CO2, Model("HF", "STO-3G", False), [0]) for index in range(100)]
+
+        with self.get_executor(2) as executor:
+            for key, energy, log_path in executor.calculate_energies(calculations):
+                break
+
+            self.assertEqual(executor.cores_in_use, 0)
+
+        self.assertEqual(self.calculator.cores_in_use, 0)
+
+        self.test_passed = True
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestCalculationExecutor)
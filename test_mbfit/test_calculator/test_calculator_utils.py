@@ -1,10 +1,11 @@
-import unittest, os
+import unittest, os, shutil
 
 from test_mbfit.test_case_with_id import TestCaseWithId
-from mbfit.calculator import get_calculator, Psi4Calculator, QchemCalculator, fill_energies
+from mbfit.calculator import get_calculator, Psi4Calculator, QchemCalculator, fill_energies, Model, FillCheckpoint
 from mbfit.exceptions import NoSuchLibraryError
 
 from mbfit.molecule import parse_training_set_file
+from mbfit.utils import SettingsReader, constants
 
 
 class TestCalculatorUtils(TestCaseWithId):
@@ -86,4 +87,169 @@ class TestCalculatorUtils(TestCaseWithId):
         self.test_passed = True
 
 
+    def test_fill_energies_dimers(self):
+        output_folder = os.path.join(self.test_folder, "output", "fill_energies_dimers")
+        shutil.rmtree(output_folder, ignore_errors=True)
+        os.makedirs(output_folder)
+
+        settings_path = os.path.join(output_folder, "dimer.ini")
+        configs_path = os.path.join(output_folder, "configs.xyz")
+        training_set_path = os.path.join(output_folder, "training_set.xyz")
+
+        with open(settings_path, "w") as settings_file:
+            settings_file.write("[files]\nlog_path = {}\n".format(os.path.join(output_folder, "logs")))
+            settings_file.write("[energy_calculator]\ncode = analytic\n")
+            settings_file.write("[molecule]\nnames = CO2,CO2\nfragments = 3,3\ncharges = 0,0\nspins = 1,1\n"
+                                "symmetry = A1B2,A1B2\nSMILES = C(O)O,C(O)O\n")
+
+        with open(configs_path, "w") as configs_file:
+            for distance in [3, 3.5, 4]:
+                configs_file.write("6\n\nC 0.1 0 0\nO 1 0 0\nO -1 0 0\nC 0 {0} 0\nO 1 {0} 0.1\nO -1 {0} 0\n".format(distance))
+
+        fill_energies(settings_path, configs_path, [TestCalculatorUtils.CO2_settings_path], [TestCalculatorUtils.opt_path],
+                      training_set_path, "HF", "STO-3G", True)
+
+        calculator = get_calculator(settings_path, False)
+        optimized_energy = calculator.calculate_energy(list(parse_training_set_file(TestCalculatorUtils.opt_path, SettingsReader(TestCalculatorUtils.CO2_settings_path)))[0],
+                                                       Model("HF", "STO-3G", False), [0])[0]
+
+        with open(training_set_path) as training_set_file:
+            lines = training_set_file.read().splitlines()
+
+        for molecule, comment_line in zip(parse_training_set_file(configs_path, SettingsReader(settings_path)), lines[1::8]):
+            energies = [calculator.calculate_energy(molecule, Model("HF", "STO-3G", use_cp), frag_indices)[0] * constants.au_to_kcal
+                        for frag_indices, use_cp in [([0], True), ([1], True), ([0, 1], False), ([0], False), ([1], False)]]
+
+            interaction_energy = energies[2] - energies[0] - energies[1]
+            binding_energy = interaction_energy + energies[3] + energies[4] - 2 * optimized_energy * constants.au_to_kcal
+
+            self.assertAlmostEqual(float(comment_line.split()[0]), binding_energy, places=6)
+            self.assertAlmostEqual(float(comment_line.split()[1]), interaction_energy, places=6)
+
+        self.test_passed = True
+
+    def test_fill_energies_screened(self):
+        output_folder = os.path.join(self.test_folder, "output", "fill_energies_screened")
+        shutil.rmtree(output_folder, ignore_errors=True)
+        os.makedirs(output_folder)
+
+        settings_path = os.path.join(output_folder, "dimer.ini")
+        configs_path = os.path.join(output_folder, "configs.xyz")
+        training_set_path = os.path.join(output_folder, "training_set.xyz")
+
+        with open(settings_path, "w") as settings_file:
+            settings_file.write("[files]\nlog_path = {}\n".format(os.path.join(output_folder, "logs")))
+            settings_file.write("[energy_calculator]\ncode = analytic\n")
+            settings_file.write("[molecule]\nnames = CO2,CO2\nfragments = 3,3\ncharges = 0,0\nspins = 1,1\n"
+                                "symmetry = A1B2,A1B2\nSMILES = C(O)O,C(O)O\n")
+            settings_file.write("[screening]\ncutoffs = 10\n")
+
+        with open(configs_path, "w") as configs_file:
+            for distance in [3.5, 20]:
+                configs_file.write("6\n\nC 0.1 0 0\nO 1 0 0\nO -1 0 0\nC 0 {0} 0\nO 1 {0} 0.1\nO -1 {0} 0\n".format(distance))
+
+        fill_energies(settings_path, configs_path, [TestCalculatorUtils.CO2_settings_path], [TestCalculatorUtils.opt_path],
+                      training_set_path, "HF", "STO-3G", False)
+
+        calculator = get_calculator(settings_path, False)
+        model = Model("HF", "STO-3G", False)
+        optimized_energy = calculator.calculate_energy(list(parse_training_set_file(TestCalculatorUtils.opt_path, SettingsReader(TestCalculatorUtils.CO2_settings_path)))[0],
+                                                       model, [0])[0]
+
+        with open(training_set_path) as training_set_file:
+            lines = training_set_file.read().splitlines()
+
+        # the dimer 20 angstroms apart is screened, so it has no interaction energy.
+        for molecule, comment_line, is_kept in zip(parse_training_set_file(configs_path, SettingsReader(settings_path)), lines[1::8], [True, False]):
+            energies = [calculator.calculate_energy(molecule, model, frag_indices)[0] * constants.au_to_kcal
+                        for frag_indices in [[0], [1], [0, 1]]]
+
+            interaction_energy = energies[2] - energies[0] - energies[1] if is_kept else 0
+            binding_energy = interaction_energy + energies[0] + energies[1] - 2 * optimized_energy * constants.au_to_kcal
+
+            self.assertAlmostEqual(float(comment_line.split()[0]), binding_energy, places=6)
+            self.assertAlmostEqual(float(comment_line.split()[1]), interaction_energy, places=6)
+
+        self.test_passed = True
+
+
+    def test_fill_energies_checkpoint(self):
+        output_folder = os.path.join(self.test_folder, "output", "fill_energies_checkpoint")
+        shutil.rmtree(output_folder, ignore_errors=True)
+        os.makedirs(output_folder)
+
+        settings_path = os.path.join(output_folder, "dimer.ini")
+        configs_path = os.path.join(output_folder, "configs.xyz")
+        training_set_path = os.path.join(output_folder, "training_set.xyz")
+        reference_path = os.path.join(output_folder, "reference.xyz")
+
+        with open(settings_path, "w") as settings_file:
+            settings_file.write("[files]\nlog_path = {}\n".format(os.path.join(output_folder, "logs")))
+            settings_file.write("[energy_calculator]\ncode = analytic\n")
+            settings_file.write("[molecule]\nnames = CO2,CO2\nfragments = 3,3\ncharges = 0,0\nspins = 1,1\n"
+                                "symmetry = A1B2,A1B2\nSMILES = C(O)O,C(O)O\n")
+
+        with open(configs_path, "w") as configs_file:
+            for distance in [3, 3.5, 4]:
+                configs_file.write("6\n\nC 0.1 0 0\nO 1 0 0\nO -1 0 0\nC 0 {0} 0\nO 1 {0} 0.1\nO -1 {0} 0\n".format(distance))
+
+        fill_energies(settings_path, configs_path, [TestCalculatorUtils.CO2_settings_path], [TestCalculatorUtils.opt_path],
+                      reference_path, "HF", "STO-3G", False)
+
+        self.assertFalse(os.path.exists(reference_path + ".checkpoint"))
+
+        with open(reference_path) as reference_file:
+            reference = reference_file.read().splitlines()
+
+        # a run killed while writing the second configuration, after the dimer of the second was calculated.
+        with open(training_set_path, "w") as training_set_file:
+            training_set_file.write("\n".join(reference[:8]) + "\n")
+            output_size = training_set_file.tell()
+            training_set_file.write("\n".join(reference[8:11]))
+
+        optimized_energy, dimer_energy = 1, 2
+        checkpoint = FillCheckpoint(training_set_path + ".checkpoint", configs_path, [TestCalculatorUtils.opt_path],
+                                    "HF", "STO-3G", False)
+        checkpoint.optimized_energies = [optimized_energy]
+        checkpoint.next_index = 1
+        checkpoint.output_size = output_size
+        checkpoint.successes = 1
+        checkpoint.energies = {1: {((0, 1), False): dimer_energy}}
+        checkpoint.save()
+
+        fill_energies(settings_path, configs_path, [TestCalculatorUtils.CO2_settings_path], [TestCalculatorUtils.opt_path],
+                      training_set_path, "HF", "STO-3G", False)
+
+        self.assertFalse(os.path.exists(training_set_path + ".checkpoint"))
+
+        with open(training_set_path) as training_set_file:
+            lines = training_set_file.read().splitlines()
+
+        self.assertEqual(len(lines), len(reference))
+        self.assertEqual(lines[:8], reference[:8])
+
+        calculator = get_calculator(settings_path, False)
+        model = Model("HF", "STO-3G", False)
+
+        # the later configurations use the optimized energy and the dimer energy in the checkpoint instead of calculating them.
+        for index, molecule in enumerate(parse_training_set_file(configs_path, SettingsReader(settings_path))):
+            if index == 0:
+                continue
+
+            energies = [calculator.calculate_energy(molecule, model, frag_indices)[0] * constants.au_to_kcal
+                        for frag_indices in [[0], [1], [0, 1]]]
+
+            if index == 1:
+                energies[2] = dimer_energy
+
+            interaction_energy = energies[2] - energies[0] - energies[1]
+            binding_energy = interaction_energy + energies[0] + energies[1] - 2 * optimized_energy
+
+            self.assertAlmostEqual(float(lines[8 * index + 1].split()[0]), binding_energy, places=6)
+            self.assertAlmostEqual(float(lines[8 * index + 1].split()[1]), interaction_energy, places=6)
+            self.assertEqual(lines[8 * index + 2:8 * index + 8], reference[8 * index + 2:8 * index + 8])
+
+        self.test_passed = True
+
+
 suite = unittest.TestLoader().loadTestsFromTestCase(TestCalculatorUtils)
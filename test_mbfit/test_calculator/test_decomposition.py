@@ -0,0 +1,148 @@
+import unittest, itertools, random
+import numpy
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.calculator import ManyBodyDecomposition
+from mbfit.calculator.mbdecomp import mbdecomp
+
+class TestDecomposition(TestCaseWithId):
+
+    def get_energies(self, decomposition):
+        return {calculation: random.uniform(-100, 0) for calculation in decomposition.get_calculations()}
+
+    def get_binding_and_interaction_energies(self, num_fragments, cp, optimized_energies, energies):
+        # how fill_energies() found the energies before the decomposition, term by term.
+        deformation_energies = [energies[((index,), False)] - optimized_energies[index] for index in range(num_fragments)]
+
+        if num_fragments == 1:
+            return deformation_energies[0], deformation_energies[0]
+
+        interaction_energy = energies[(tuple(range(num_fragments)), False)]
+
+        for (frag_indices, use_cp), energy in energies.items():
+            if len(frag_indices) < num_fragments and use_cp is cp:
+                if (num_fragments - len(frag_indices)) % 2 == 1:
+                    interaction_energy -= energy
+                else:
+                    interaction_energy += energy
+
+        return interaction_energy + sum(deformation_energies), interaction_energy
+
+    def test_get_calculations(self):
+
+        self.assertEqual(ManyBodyDecomposition(2, False).get_calculations(),
+                         [((0,), False), ((1,), False), ((0, 1), False)])
+
+        self.assertEqual(ManyBodyDecomposition(2, True).get_calculations(),
+                         [((0,), True), ((0,), False), ((1,), True), ((1,), False), ((0, 1), False)])
+
+        self.assertEqual(ManyBodyDecomposition(3, False).get_subsets(),
+                         [(0,), (1,), (2,), (0, 1), (0, 2), (1, 2), (0, 1, 2)])
+
+        self.test_passed = True
+
+    def test_interaction_energies(self):
+
+        decomposition = ManyBodyDecomposition(3, False)
+
+        energies = {((0,), False): -1, ((1,), False): -2, ((2,), False): -4,
+                    ((0, 1), False): -10, ((0, 2), False): -20, ((1, 2), False): -40,
+                    ((0, 1, 2), False): -100}
+
+        interaction_energies = decomposition.get_interaction_energies([energies[calculation] for calculation in decomposition.get_calculations()])
+
+        self.assertEqual(list(interaction_energies), [-1, -2, -4, -7, -15, -34, -100 + 70 - 7])
+
+        self.test_passed = True
+
+    def test_nbody_energies(self):
+
+        for num_fragments in range(1, 6):
+            decomposition = ManyBodyDecomposition(num_fragments, False)
+            energies = self.get_energies(decomposition)
+
+            nmer_energies = [[energies[(subset, False)] for subset in itertools.combinations(range(num_fragments), size)]
+                             for size in range(1, num_fragments + 1)]
+
+            numpy.testing.assert_allclose(decomposition.get_nbody_energies([energies[calculation] for calculation in decomposition.get_calculations()]),
+                                          mbdecomp(nmer_energies), rtol=0, atol=1e-9)
+
+        self.test_passed = True
+
+    def test_binding_and_interaction_energies(self):
+
+        for num_fragments, cp in itertools.product(range(1, 6), [False, True]):
+            decomposition = ManyBodyDecomposition(num_fragments, cp)
+            optimized_energies = [random.uniform(-100, 0) for index in range(num_fragments)]
+            energies = self.get_energies(decomposition)
+
+            binding_energy, interaction_energy = decomposition.get_binding_and_interaction_energies(
+                    [energies[calculation] for calculation in decomposition.get_calculations()], optimized_energies)
+
+            reference_binding_energy, reference_interaction_energy = self.get_binding_and_interaction_energies(num_fragments, cp, optimized_energies, energies)
+
+            self.assertAlmostEqual(binding_energy, reference_binding_energy, places=9)
+            self.assertAlmostEqual(interaction_energy, reference_interaction_energy, places=9)
+
+        self.test_passed = True
+
+    def test_batch(self):
+
+        decomposition = ManyBodyDecomposition(3, True)
+        optimized_energies = [-1, -2, -3]
+
+        batch = numpy.array([[random.uniform(-100, 0) for calculation in decomposition.get_calculations()] for configuration in range(10)])
+
+        binding_energies, interaction_energies = decomposition.get_binding_and_interaction_energies(batch, optimized_energies)
+        nbody_energies = decomposition.get_nbody_energies(batch)
+
+        self.assertEqual(binding_energies.shape, (10,))
+        self.assertEqual(nbody_energies.shape, (10, 3))
+
+        for index, energies in enumerate(batch):
+            self.assertAlmostEqual(binding_energies[index], decomposition.get_binding_and_interaction_energies(energies, optimized_energies)[0], places=9)
+            self.assertAlmostEqual(interaction_energies[index], decomposition.get_binding_and_interaction_energies(energies, optimized_energies)[1], places=9)
+            numpy.testing.assert_allclose(nbody_energies[index], decomposition.get_nbody_energies(energies), rtol=0, atol=1e-9)
+
+        self.test_passed = True
+
+    def test_kept(self):
+
+        decomposition = ManyBodyDecomposition(3, True)
+        optimized_energies = [-1, -2, -3]
+
+        energies = self.get_energies(decomposition)
+
+        # (0, 2) and so (0, 1, 2) are screened, their energies are never calculated.
+        kept = [subset not in [(0, 2), (0, 1, 2)] for subset in decomposition.get_subsets()]
+        kept_calculations = decomposition.get_kept_calculations(kept)
+
+        self.assertEqual([calculation for calculation, is_kept in zip(decomposition.get_calculations(), kept_calculations) if not is_kept],
+                         [((0, 2), True), ((0, 2), False), ((0, 1, 2), False)])
+
+        vector = [energies[calculation] if is_kept else float("nan")
+                  for calculation, is_kept in zip(decomposition.get_calculations(), kept_calculations)]
+
+        interaction_energies = decomposition.get_interaction_energies(vector, kept)
+
+        self.assertEqual(interaction_energies[4], 0)
+        self.assertEqual(interaction_energies[6], 0)
+        self.assertAlmostEqual(interaction_energies[3], energies[((0, 1), True)] - energies[((0,), True)] - energies[((1,), True)], places=9)
+
+        numpy.testing.assert_allclose(decomposition.get_nbody_energies(vector, kept),
+                                      [sum(interaction_energies[:3]), sum(interaction_energies[3:6]), 0], rtol=0, atol=1e-9)
+
+        binding_energy, interaction_energy = decomposition.get_binding_and_interaction_energies(vector, optimized_energies, kept)
+
+        self.assertEqual(interaction_energy, 0)
+        self.assertAlmostEqual(binding_energy, sum(energies[((index,), False)] - optimized_energies[index] for index in range(3)), places=9)
+
+        # a mask of all True is the same as no mask.
+        full = [energies[calculation] for calculation in decomposition.get_calculations()]
+
+        numpy.testing.assert_allclose(decomposition.get_interaction_energies(full, [True] * 7),
+                                      decomposition.get_interaction_energies(full), rtol=0, atol=1e-9)
+
+        self.test_passed = True
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestDecomposition)
@@ -0,0 +1,267 @@
+import unittest, itertools, os, sys, time, shutil
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.calculator import QchemCalculator, QchemRunner, Model
+from mbfit.exceptions import InvalidValueError, LibraryCallError
+from mbfit.molecule import Molecule
+
+# fake qchem command, which counts the atoms in each job of the input file instead of calculating the energy, and returns
+# the input geometry from optimizations. The options in the first job change how it behaves: fake_startup makes it take
+# that many seconds to start, fake_sleep makes each job take that many seconds for each CO2 after the first,
+# fake_failures makes it fail the first few times it is run on the file, and fake_crash_job makes it fail at that job.
+FAKE_QCHEM = """#!{}
+import os, sys, time
+
+num_threads, in_path, out_path = sys.argv[2:5]
+
+with open(in_path) as in_file:
+    jobs = [job.strip().splitlines() for job in in_file.read().split("\\n@@@\\n")]
+
+options = dict(line.split() for line in jobs[0] if line.startswith("fake_"))
+
+attempts_path = in_path + ".attempts"
+attempts = int(open(attempts_path).read()) if os.path.isfile(attempts_path) else 0
+
+with open(attempts_path, "w") as attempts_file:
+    attempts_file.write(str(attempts + 1))
+
+if attempts < int(options.get("fake_failures", 0)):
+    sys.stderr.write("failed on purpose")
+    sys.exit(1)
+
+time.sleep(float(options.get("fake_startup", 0)))
+
+with open(out_path, "w") as out_file:
+    out_file.write("Welcome to fake Q-Chem\\n")
+
+    for index, lines in enumerate(jobs):
+        out_file.write("Running Job {{}} of {{}} {{}}\\n".format(index + 1, len(jobs), in_path))
+
+        if index + 1 == int(options.get("fake_crash_job", 0)):
+            sys.exit(1)
+
+        start = time.time()
+        num_atoms = lines.index("$end") - 2
+        time.sleep(float(options.get("fake_sleep", 0)) * (num_atoms // 3 - 1))
+
+        if "jobtype opt" in lines:
+            out_file.write("optimization step\\n" * 1000)
+            out_file.write("   Final energy is   -{{}}.5\\n\\n".format(num_atoms))
+            out_file.write("     ATOM                X               Y               Z\\n")
+            for atom_index, atom in enumerate(lines[2:2 + num_atoms]):
+                out_file.write("    {{}}  {{}}\\n".format(atom_index + 1, atom))
+            out_file.write(" **  OPTIMIZATION CONVERGED  **\\n")
+            continue
+
+        out_file.write("threads {{}}\\n".format(num_threads))
+        out_file.write("scratch {{}} {{}}\\n".format(os.environ["QCSCRATCH"], os.path.isdir(os.environ["QCSCRATCH"])))
+        out_file.write("time {{}} {{}}\\n".format(start, time.time()))
+        out_file.write(" Total energy in the final basis set =      -{{}}.0\\n".format(num_atoms))
+"""
+
+class TestQchemRunner(TestCaseWithId):
+    def __init__(self, *args, **kwargs):
+        super(TestQchemRunner, self).__init__(*args, **kwargs)
+        self.test_folder = os.path.dirname(os.path.abspath(__file__))
+
+    def setUp(self):
+        self.output_folder = os.path.join(self.test_folder, "output", "qchem_runner")
+        self.scratch_path = os.path.join(self.output_folder, "scratch")
+
+        shutil.rmtree(self.output_folder, ignore_errors=True)
+        os.makedirs(os.path.join(self.output_folder, "bin"))
+
+        qchem_path = os.path.join(self.output_folder, "bin", "qchem")
+
+        with open(qchem_path, "w") as qchem_file:
+            qchem_file.write(FAKE_QCHEM.format(sys.executable))
+
+        os.chmod(qchem_path, 0o755)
+
+        self.path = os.environ["PATH"]
+        os.environ["PATH"] = os.path.join(self.output_folder, "bin") + os.pathsep + self.path
+
+        self.CO2 = Molecule.read_xyz_path(os.path.join(self.test_folder, "resources", "CO2monomer.xyz"), [3], ["CO2"], [0], [1], ["A1B2"], ["C(O)O"])
+        self.dimer = Molecule(self.CO2.get_fragments() + self.CO2.get_fragments())
+        self.model = Model("HF", "STO-3G", False)
+
+    def tearDown(self):
+        os.environ["PATH"] = self.path
+
+        super(TestQchemRunner, self).tearDown()
+
+    def get_calculator(self, **settings):
+        settings_path = os.path.join(self.output_folder, "settings.ini")
+
+        with open(settings_path, "w") as settings_file:
+            settings_file.write("[files]\nlog_path = {}\n".format(os.path.join(self.output_folder, "logs")))
+            settings_file.write("[qchem]\nnum_threads = 2\nscratch_path = {}\nretry_delay = 0.05\n".format(self.scratch_path))
+
+            for prop, value in settings.items():
+                settings_file.write("{} = {}\n".format(prop, value))
+
+        return QchemCalculator(settings_path, False)
+
+    def get_attempts(self, log_path):
+        with open(log_path[:-len(".out")] + ".in.attempts") as attempts_file:
+            return int(attempts_file.read())
+
+    def test_invalid_values(self):
+
+        with self.assertRaises(InvalidValueError):
+            QchemRunner(max_jobs=0)
+
+        with self.assertRaises(InvalidValueError):
+            QchemRunner(timeout=0)
+
+        with self.assertRaises(InvalidValueError):
+            QchemRunner(max_retries=-1)
+
+        self.test_passed = True
+
+    def test_calculate_energy(self):
+
+        calculator = self.get_calculator()
+
+        energy, log_path = calculator.calculate_energy(self.dimer, self.model, [0])
+        self.assertEqual(energy, -3.0)
+
+        with open(log_path) as log_file:
+            lines = log_file.read().splitlines()
+
+        # each job gets its own scratch directory, which is removed when it is done.
+        self.assertEqual(lines[2], "threads 2")
+        scratch_path, exists = lines[3].split()[1:]
+        self.assertEqual(exists, "True")
+        self.assertEqual(os.path.dirname(scratch_path), self.scratch_path)
+        self.assertFalse(os.path.exists(scratch_path))
+
+        self.assertEqual(calculator.calculate_energy(self.dimer, self.model, [0, 1])[0], -6.0)
+
+        self.test_passed = True
+
+    def test_optimize_geometry(self):
+
+        molecule, energy, log_path = self.get_calculator().optimize_geometry(self.CO2, self.model)
+
+        self.assertEqual(energy, -3.5)
+        self.assertEqual(molecule.to_xyz(), self.CO2.to_xyz())
+        self.assertEqual(molecule.get_fragments()[0].get_name(), "CO2")
+
+        self.test_passed = True
+
+    def test_retries(self):
+
+        energy, log_path = self.get_calculator(max_retries=2).calculate_energy(self.CO2, self.model, [0], qm_options={"fake_failures": 2})
+        self.assertEqual(energy, -3.0)
+        self.assertEqual(self.get_attempts(log_path), 3)
+
+        with self.assertRaises(LibraryCallError) as context:
+            self.get_calculator(max_retries=1).calculate_energy(self.dimer, self.model, [1], qm_options={"fake_failures": 2})
+
+        self.assertEqual(self.get_attempts(context.exception.log_path), 2)
+        self.assertIn("failed on purpose", str(context.exception))
+
+        self.test_passed = True
+
+    def test_timeout(self):
+
+        calculator = self.get_calculator(timeout=0.5, max_retries=1)
+
+        start = time.time()
+
+        with self.assertRaises(LibraryCallError) as context:
+            calculator.calculate_energy(self.dimer, self.model, [0, 1], qm_options={"fake_sleep": 30})
+
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(self.get_attempts(context.exception.log_path), 2)
+        self.assertIn("timed out", str(context.exception))
+        self.assertEqual(os.listdir(self.scratch_path), [])
+
+        self.test_passed = True
+
+    def test_calculate_energies(self):
+
+        calculator = self.get_calculator(max_retries=1)
+
+        tetramer = Molecule(self.dimer.get_fragments() + self.dimer.get_fragments())
+
+        calculations = [(index, tetramer, self.model, list(frag_indices)) for index, frag_indices
+                        in enumerate(itertools.chain(itertools.combinations(range(4), 1), itertools.combinations(range(4), 2)))]
+
+        start = time.time()
+        results = list(calculator.calculate_energies(iter(calculations), qm_options={"fake_sleep": 0.5}, max_jobs=10))
+
+        # the jobs all ran at the same time.
+        self.assertLess(time.time() - start, 0.5 * 4)
+
+        self.assertEqual(sorted(key for key, energy, log_path in results), list(range(10)))
+
+        for key, energy, log_path in results:
+            self.assertEqual(energy, -3.0 * len(calculations[key][3]))
+
+        # failed calculations come back without an energy.
+        calculations = [(index, self.dimer, self.model, frag_indices) for index, frag_indices in enumerate([[0], [1], [0, 1]])]
+
+        results = list(calculator.calculate_energies(calculations, qm_options={"fake_failures": 2}, max_jobs=2))
+
+        self.assertEqual(len(results), 3)
+
+        for key, energy, log_path in results:
+            self.assertIsNone(energy)
+            self.assertEqual(self.get_attempts(log_path), 2)
+
+        # stopping early kills the jobs that are still running, the first one to finish is a monomer.
+        for key, energy, log_path in calculator.calculate_energies(calculations, qm_options={"fake_sleep": 30}, max_jobs=4):
+            break
+
+        self.assertEqual(os.listdir(self.scratch_path), [])
+
+        self.test_passed = True
+
+    def test_multi_job_inputs(self):
+
+        calculator = self.get_calculator()
+
+        tetramer = Molecule(self.dimer.get_fragments() + self.dimer.get_fragments())
+
+        calculations = [(index, tetramer, self.model, list(frag_indices)) for index, frag_indices
+                        in enumerate(itertools.chain(itertools.combinations(range(4), 1), itertools.combinations(range(4), 2)))]
+
+        # every calculation pays for starting qchem.
+        start = time.time()
+        single_results = list(calculator.calculate_energies(calculations, qm_options={"fake_startup": 0.2}, jobs_per_input=1))
+        single_time = time.time() - start
+
+        # a group of calculations pays for starting qchem once.
+        start = time.time()
+        results = list(calculator.calculate_energies(iter(calculations), qm_options={"fake_startup": 0.2}, jobs_per_input=4))
+        multi_time = time.time() - start
+
+        self.assertLess(multi_time * 2, single_time)
+
+        self.assertEqual(sorted(key for key, energy, log_path in results), list(range(10)))
+
+        for key, energy, log_path in results:
+            self.assertEqual(energy, -3.0 * len(calculations[key][3]))
+
+            # each calculation gets its own log file, with only its own job.
+            self.assertTrue(log_path.endswith("".join("_{}".format(index) for index in calculations[key][3]) + ".out"))
+
+            with open(log_path) as log_file:
+                self.assertEqual(log_file.read().count("Running Job"), 1)
+
+        self.assertEqual(sorted(results), sorted(single_results))
+
+        # if qchem fails partway through, the calculations before the failure keep their energies.
+        results = list(calculator.calculate_energies(calculations[:4], qm_options={"fake_crash_job": 3}, jobs_per_input=4))
+
+        self.assertEqual([energy for key, energy, log_path in results], [-3.0, -3.0, None, None])
+        self.assertTrue(results[3][2].endswith("_batch.out"))
+
+        with self.assertRaises(InvalidValueError):
+            list(calculator.calculate_energies(calculations, jobs_per_input=0))
+
+        self.test_passed = True
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestQchemRunner)
@@ -0,0 +1,206 @@
+import unittest, os, time
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.calculator import Calculator, ResultCache, CachedCalculator, Psi4Calculator, Model, get_calculator
+from mbfit.exceptions import InvalidValueError, LibraryCallError
+from mbfit.molecule import Molecule
+
+class CountingCalculator(Calculator):
+    """
+    Calculator that counts the calculations it performs instead of performing them, and writes a log file for each.
+    """
+
+    def __init__(self, settings_path, log_folder):
+        super(CountingCalculator, self).__init__(settings_path, False)
+
+        self.log_folder = log_folder
+        self.num_calculations = 0
+
+    def get_log_path(self):
+        self.num_calculations += 1
+
+        log_path = os.path.join(self.log_folder, "{}.log".format(self.num_calculations))
+
+        with open(log_path, "w") as log_file:
+            log_file.write("calculation {}\n".format(self.num_calculations))
+
+        return log_path
+
+    def calculate_energy(self, molecule, model, fragment_indicies, qm_options={}):
+        log_path = self.get_log_path()
+
+        if qm_options.get("fail", False):
+            raise LibraryCallError("counting", "energy", "failed on purpose", log_path=log_path)
+
+        return float(len(fragment_indicies)), log_path
+
+    def optimize_geometry(self, molecule, model, qm_options={}):
+        return molecule, -1.0, self.get_log_path()
+
+    def calculate_frequencies(self, molecule, model, qm_options={}):
+        return [[0.0]], [1.0], [2.0], self.get_log_path()
+
+class TestResultCache(TestCaseWithId):
+    def __init__(self, *args, **kwargs):
+        super(TestResultCache, self).__init__(*args, **kwargs)
+        self.test_folder = os.path.dirname(os.path.abspath(__file__))
+
+    def setUp(self):
+        self.settings_path = os.path.join(self.test_folder, "resources", "CO2monomer.ini")
+        self.output_folder = os.path.join(self.test_folder, "output", "result_cache")
+        self.cache_path = os.path.join(self.output_folder, "cache.db")
+
+        os.makedirs(self.output_folder, exist_ok=True)
+
+        for file_name in os.listdir(self.output_folder):
+            os.remove(os.path.join(self.output_folder, file_name))
+
+        self.CO2 = Molecule.read_xyz_path(os.path.join(self.test_folder, "resources", "CO2monomer.xyz"), [3], ["CO2"], [0], [1], ["A1B2"], ["C(O)O"])
+        self.dimer = Molecule(self.CO2.get_fragments() + self.CO2.get_fragments())
+
+        self.inner = CountingCalculator(self.settings_path, self.output_folder)
+        self.cache = ResultCache(self.cache_path)
+        self.calculator = CachedCalculator(self.inner, self.cache)
+
+    def tearDown(self):
+        self.cache.close()
+
+        super(TestResultCache, self).tearDown()
+
+    def test_get_key(self):
+
+        model = Model("HF", "STO-3G", False)
+
+        key = ResultCache.get_key("energy", self.dimer, model, [0])
+
+        # the same fragment is the same calculation no matter which molecule it is in.
+        self.assertEqual(key, ResultCache.get_key("energy", self.dimer, model, [1]))
+        self.assertEqual(key, ResultCache.get_key("energy", self.CO2, model, [0]))
+
+        # but not with the other fragment as ghost atoms.
+        self.assertNotEqual(ResultCache.get_key("energy", self.dimer, Model("HF", "STO-3G", True), [0]),
+                            ResultCache.get_key("energy", self.CO2, Model("HF", "STO-3G", True), [0]))
+
+        self.assertNotEqual(key, ResultCache.get_key("energy", self.dimer, model, [0, 1]))
+        self.assertNotEqual(key, ResultCache.get_key("energy", self.dimer, Model("HF", "6-31G", False), [0]))
+        self.assertNotEqual(key, ResultCache.get_key("energy", self.dimer, Model("MP2", "STO-3G", False), [0]))
+        self.assertNotEqual(key, ResultCache.get_key("energy", self.dimer, model, [0], {"scf_type": "df"}))
+        self.assertNotEqual(key, ResultCache.get_key("optimization", self.dimer, model, [0]))
+
+        self.assertEqual(ResultCache.get_key("energy", self.dimer, model, [0], {"a": 1, "b": 2}),
+                         ResultCache.get_key("energy", self.dimer, model, [0], {"b": 2, "a": 1}))
+
+        self.test_passed = True
+
+    def test_calculate_energy(self):
+
+        model = Model("HF", "STO-3G", False)
+
+        energy, log_path = self.calculator.calculate_energy(self.dimer, model, [0])
+        self.assertEqual(self.inner.num_calculations, 1)
+
+        self.assertEqual(self.calculator.calculate_energy(self.dimer, model, [1]), (energy, log_path))
+        self.assertEqual(self.calculator.calculate_energy(self.CO2, model, [0]), (energy, log_path))
+        self.assertEqual(self.inner.num_calculations, 1)
+
+        self.calculator.calculate_energy(self.dimer, model, [0, 1])
+        self.assertEqual(self.inner.num_calculations, 2)
+
+        # missing log files are written again from the cache.
+        os.remove(log_path)
+        self.calculator.calculate_energy(self.dimer, model, [0])
+
+        with open(log_path, "r") as log_file:
+            self.assertEqual(log_file.read(), "calculation 1\n")
+
+        # failed calculations are not cached.
+        for i in range(2):
+            with self.assertRaises(LibraryCallError):
+                self.calculator.calculate_energy(self.dimer, model, [0], qm_options={"fail": True})
+
+        self.assertEqual(self.inner.num_calculations, 4)
+
+        statistics = self.cache.get_statistics()
+        self.assertEqual(statistics["entries"], 2)
+        self.assertEqual(statistics["hits"]["energy"], 3)
+        self.assertEqual(statistics["misses"]["energy"], 4)
+
+        # the cache is shared with other ResultCaches of the same file.
+        other_cache = ResultCache(self.cache_path)
+        other_calculator = CachedCalculator(CountingCalculator(self.settings_path, self.output_folder), other_cache)
+        self.assertEqual(other_calculator.calculate_energy(self.dimer, model, [1]), (energy, log_path))
+        self.assertEqual(other_calculator.calculator.num_calculations, 0)
+
+        statistics = other_cache.get_statistics()
+        self.assertEqual(statistics["hits"]["energy"], 1)
+        self.assertEqual(statistics["total_hits"]["energy"], 4)
+        self.assertEqual(statistics["total_misses"]["energy"], 4)
+
+        other_cache.close()
+
+        self.test_passed = True
+
+    def test_optimize_geometry_and_frequencies(self):
+
+        model = Model("HF", "STO-3G", False)
+
+        molecule, energy, log_path = self.calculator.optimize_geometry(self.CO2, model)
+        self.assertEqual(self.calculator.optimize_geometry(self.CO2, model), (molecule, energy, log_path))
+        self.assertEqual(self.calculator.calculate_frequencies(self.CO2, model)[:3], ([[0.0]], [1.0], [2.0]))
+        self.calculator.calculate_frequencies(self.CO2, model)
+
+        self.assertEqual(self.inner.num_calculations, 2)
+        self.assertEqual(self.cache.get_statistics()["hits"], {"energy": 0, "optimization": 1, "frequencies": 1})
+
+        self.test_passed = True
+
+    def test_evict(self):
+
+        with self.assertRaises(InvalidValueError):
+            self.cache.evict(max_age=-1)
+
+        with self.assertRaises(InvalidValueError):
+            self.cache.evict(max_entries=-1)
+
+        model = Model("HF", "STO-3G", False)
+
+        for basis in ["STO-3G", "6-31G", "cc-pvdz"]:
+            self.calculator.calculate_energy(self.CO2, Model("HF", basis, False), [0])
+            time.sleep(0.01)
+
+        # using a result makes it the most recent.
+        self.calculator.calculate_energy(self.CO2, model, [0])
+
+        self.assertEqual(self.cache.evict(max_entries=2), 1)
+        self.assertEqual(self.cache.get_statistics()["entries"], 2)
+
+        self.calculator.calculate_energy(self.CO2, model, [0])
+        self.assertEqual(self.inner.num_calculations, 3)
+
+        self.calculator.calculate_energy(self.CO2, Model("HF", "6-31G", False), [0])
+        self.assertEqual(self.inner.num_calculations, 4)
+
+        self.assertEqual(self.cache.evict(max_age=3600), 0)
+        self.assertEqual(self.cache.evict(max_age=0), 3)
+        self.assertEqual(self.cache.get_statistics()["entries"], 0)
+
+        self.test_passed = True
+
+    def test_get_calculator(self):
+
+        settings_path = os.path.join(self.output_folder, "settings.ini")
+
+        with open(settings_path, "w") as settings_file:
+            settings_file.write("[energy_calculator]\ncode = psi4\nresult_cache = {}\n".format(self.cache_path))
+
+        calculator = get_calculator(settings_path)
+
+        self.assertIsInstance(calculator, CachedCalculator)
+        self.assertIsInstance(calculator.calculator, Psi4Calculator)
+        self.assertEqual(calculator.cache.path, self.cache_path)
+
+        self.assertIsInstance(get_calculator(os.path.join(self.test_folder, "resources", "psi4.ini")), Psi4Calculator)
+
+        self.test_passed = True
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestResultCache)
@@ -0,0 +1,103 @@
+import unittest, os, shutil, math
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.calculator import DistanceScreen, ManyBodyDecomposition
+from mbfit.exceptions import InvalidValueError
+from mbfit.molecule import Molecule
+from mbfit.utils import SettingsReader
+
+class TestScreening(TestCaseWithId):
+    def __init__(self, *args, **kwargs):
+        super(TestScreening, self).__init__(*args, **kwargs)
+        self.test_folder = os.path.dirname(os.path.abspath(__file__))
+
+    def get_chain(self, *positions):
+        # water molecules along the x axis, with their oxygens at the given positions.
+        xyz = "{}\n\n".format(3 * len(positions))
+
+        for x in positions:
+            xyz += "H {} 0.8 0\nH {} -0.8 0\nO {} 0 0\n".format(x - 0.6, x - 0.6, x)
+
+        return Molecule.read_xyz(xyz, [3] * len(positions), ["H2O"] * len(positions), [0] * len(positions),
+                                 [1] * len(positions), ["A2B1"] * len(positions), ["H1.HO1"] * len(positions))
+
+    def test_fragment_distances(self):
+
+        molecule = self.get_chain(0, 3, 7)
+
+        distances = DistanceScreen([5], "minimum").get_fragment_distances(molecule)
+
+        # the closest atoms are each oxygen and the hydrogens of the next molecule.
+        self.assertAlmostEqual(distances[0, 1], math.hypot(3 - 0.6, 0.8))
+        self.assertAlmostEqual(distances[1, 2], math.hypot(4 - 0.6, 0.8))
+        self.assertAlmostEqual(distances[0, 2], math.hypot(7 - 0.6, 0.8))
+        self.assertAlmostEqual(distances[1, 1], 0)
+
+        distances = DistanceScreen([5]).get_fragment_distances(molecule)
+
+        self.assertAlmostEqual(distances[0, 1], 3)
+        self.assertAlmostEqual(distances[0, 2], 7)
+        self.assertAlmostEqual(distances[2, 0], 7)
+
+        self.test_passed = True
+
+    def test_kept_subsets(self):
+
+        molecule = self.get_chain(0, 3, 7, 30)
+        subsets = ManyBodyDecomposition(4).get_subsets()
+
+        # every pair of the first three is within 7.5, but not within 5 as a trimer.
+        screen = DistanceScreen([7.5, 5])
+
+        self.assertEqual([subset for subset, kept in zip(subsets, screen.get_kept_subsets(molecule, subsets)) if kept],
+                         [(0,), (1,), (2,), (3,), (0, 1), (0, 2), (1, 2)])
+
+        self.assertEqual(screen.get_screened_subsets(molecule),
+                         [(0, 3), (1, 3), (2, 3), (0, 1, 2), (0, 1, 3), (0, 2, 3), (1, 2, 3), (0, 1, 2, 3)])
+
+        self.assertEqual(screen.get_cutoff(2), 7.5)
+        self.assertEqual(screen.get_cutoff(3), 5)
+        self.assertEqual(screen.get_cutoff(4), 5)
+
+        self.test_passed = True
+
+    def test_invalid_cutoffs(self):
+
+        with self.assertRaises(InvalidValueError):
+            DistanceScreen([])
+
+        with self.assertRaises(InvalidValueError):
+            DistanceScreen([5, -1])
+
+        with self.assertRaises(InvalidValueError):
+            DistanceScreen([5, 10])
+
+        with self.assertRaises(InvalidValueError):
+            DistanceScreen([5], "maximum")
+
+        self.test_passed = True
+
+    def test_from_settings(self):
+
+        output_folder = os.path.join(self.test_folder, "output", "screening")
+        shutil.rmtree(output_folder, ignore_errors=True)
+        os.makedirs(output_folder)
+
+        settings_path = os.path.join(output_folder, "settings.ini")
+
+        with open(settings_path, "w") as settings_file:
+            settings_file.write("[files]\nlog_path = {}\n".format(os.path.join(output_folder, "logs")))
+
+        self.assertIsNone(DistanceScreen.from_settings(SettingsReader(settings_path)))
+
+        with open(settings_path, "a") as settings_file:
+            settings_file.write("[screening]\ncutoffs = 9, 6.5\ndistance = minimum\n")
+
+        screen = DistanceScreen.from_settings(SettingsReader(settings_path))
+
+        self.assertEqual(screen.cutoffs, [9, 6.5])
+        self.assertEqual(screen.distance, "minimum")
+
+        self.test_passed = True
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestScreening)
@@ -0,0 +1,104 @@
+import unittest, os
+from concurrent.futures import wait
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.calculator.worker_pool import WorkerPool
+from mbfit.exceptions import InvalidValueError, LibraryCallError
+
+# number of times the initializer ran in this process.
+num_initializations = 0
+
+def initialize():
+    global num_initializations
+
+    num_initializations += 1
+
+def get_state(value):
+    return os.getpid(), num_initializations, value
+
+def crash():
+    os._exit(3)
+
+def raise_value_error():
+    raise ValueError("raised on purpose")
+
+def raise_library_error():
+    raise LibraryCallError("test", "raise", "raised on purpose")
+
+class TestWorkerPool(TestCaseWithId):
+
+    def test_invalid_values(self):
+
+        with self.assertRaises(InvalidValueError):
+            WorkerPool(0)
+
+        self.test_passed = True
+
+    def test_persistent_workers(self):
+
+        pool = WorkerPool(2, initializer=initialize)
+
+        results = [future.result() for future in [pool.submit(get_state, value) for value in range(20)]]
+
+        pool.shutdown()
+
+        self.assertEqual([value for pid, initializations, value in results], list(range(20)))
+
+        # every worker ran the initializer once, and performed many jobs.
+        self.assertLessEqual(len(set(pid for pid, initializations, value in results)), 2)
+        self.assertNotIn(os.getpid(), [pid for pid, initializations, value in results])
+        self.assertEqual(set(initializations for pid, initializations, value in results), {1})
+
+        with self.assertRaises(RuntimeError):
+            pool.submit(get_state, 0)
+
+        self.test_passed = True
+
+    def test_errors(self):
+
+        pool = WorkerPool(1, initializer=initialize)
+
+        with self.assertRaises(ValueError):
+            pool.submit(raise_value_error).result()
+
+        # exceptions that cannot be rebuilt from their arguments come back as their traceback.
+        with self.assertRaises(RuntimeError):
+            pool.submit(raise_library_error).result()
+
+        pid = pool.submit(get_state, 0).result()[0]
+
+        # a crash fails only the job that caused it.
+        futures = [pool.submit(get_state, 1), pool.submit(crash), pool.submit(get_state, 2)]
+        wait(futures)
+
+        self.assertEqual(futures[0].result(), (pid, 1, 1))
+
+        with self.assertRaises(LibraryCallError):
+            futures[1].result()
+
+        new_pid, initializations, value = futures[2].result()
+        self.assertNotEqual(new_pid, pid)
+        self.assertEqual((initializations, value), (1, 2))
+        self.assertEqual(pool.num_crashes, 1)
+
+        pool.shutdown()
+
+        self.test_passed = True
+
+    def test_cancel(self):
+
+        pool = WorkerPool(1)
+
+        futures = [pool.submit(get_state, value) for value in range(10)]
+
+        for future in futures[1:]:
+            future.cancel()
+
+        pool.shutdown()
+
+        self.assertEqual(futures[0].result()[2], 0)
+        self.assertTrue(all(future.cancelled() or future.done() for future in futures))
+
+        self.test_passed = True
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestWorkerPool)
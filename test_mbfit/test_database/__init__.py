@@ -1,4 +1,7 @@
 import unittest
-from . import test_database, test_database_job_reader_and_writer
+from . import test_database, test_database_pool, test_row_materializer, test_log_compression, \
+        test_database_job_reader_and_writer, test_sqlite_database
 
-suite = unittest.TestSuite([test_database.suite, test_database_job_reader_and_writer.suite])
+suite = unittest.TestSuite([test_database.suite, test_database_pool.suite, test_row_materializer.suite,
+                            test_log_compression.suite, test_database_job_reader_and_writer.suite,
+                            test_sqlite_database.suite])
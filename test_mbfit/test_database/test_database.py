@@ -1,9 +1,12 @@
-import unittest, os, random
+import unittest, os, random, tempfile
 
 from test_mbfit.test_case_with_id import TestCaseWithId
-from mbfit.database import Database
+from mbfit.calculator import DistanceScreen
+from mbfit.database import Database, generate_training_set, training_set_generator, import_calculations, \
+        parse_calculations_file
 from mbfit.exceptions import InvalidValueError, DatabaseConnectionError, DatabaseOperationError
 from mbfit.molecule import Atom, Fragment, Molecule
+from mbfit.utils import SettingsReader
 
 # only import psycopg2 if it is installed.
 try:
@@ -166,6 +169,165 @@ class TestDatabase(TestCaseWithId):
 
         self.test_passed = True
 
+    def test_set_and_get_max_batch_bytes(self):
+
+        self.database.set_max_batch_bytes(1024)
+        self.assertEqual(self.database.get_max_batch_bytes(), 1024)
+
+        with self.assertRaises(InvalidValueError):
+            self.database.set_max_batch_bytes(0)
+
+        self.assertEqual(self.database.get_max_batch_bytes(), 1024)
+
+        self.test_passed = True
+
+    def check_set_properties_logs(self, log_texts, log_retention="all"):
+        molecules = [self.get_water_monomer() for log_text in log_texts]
+
+        self.database.add_calculations(molecules, "testmethod", "testbasis", False, "database_test")
+
+        calculations = list(self.database.get_all_calculations("testclient", "database_test", calculations_to_do=len(molecules)))
+
+        calculation_results = []
+
+        for index, (molecule, method, basis, cp, use_cp, frag_indices) in enumerate(calculations):
+            calculation_results.append((molecule, method, basis, cp, use_cp, frag_indices, index % 3 != 0, index, log_texts[index]))
+
+        self.database.set_properties(calculation_results, log_retention=log_retention)
+
+        for molecule, method, basis, cp, use_cp, frag_indices, result, energy, log_text in calculation_results:
+            if log_retention == "all" or (log_retention == "failed" and not result):
+                self.assertEqual(self.database.get_log(molecule, method, basis, cp, use_cp, frag_indices), log_text)
+            else:
+                self.assertIsNone(self.database.get_log(molecule, method, basis, cp, use_cp, frag_indices))
+
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 0)
+
+    def test_set_properties_large_logs(self):
+
+        # every log is bigger than the byte budget, so each calculation is sent on its own.
+        self.database.set_max_batch_bytes(1024 * 1024)
+
+        self.check_set_properties_logs([(str(i) + " large log ") * 200000 for i in range(6)])
+
+        self.test_passed = True
+
+    def test_set_properties_small_logs(self):
+
+        self.database.set_batch_size(7)
+
+        self.check_set_properties_logs(["" if i % 2 == 0 else "log {} with 'quotes' and $$ and %s".format(i) for i in range(50)])
+
+        self.test_passed = True
+
+    def test_set_properties_uncompressed_logs(self):
+
+        database = Database(self.config, log_codec=None)
+
+        self.database.close()
+        self.database = database
+
+        self.check_set_properties_logs(["uncompressed log {}".format(i) for i in range(20)])
+
+        self.test_passed = True
+
+    def test_set_properties_duplicate_logs(self):
+
+        self.database.set_batch_size(4)
+
+        self.check_set_properties_logs(["the same log"] * 5 + ["another log"] * 5 + ["the same log"] * 5)
+
+        self.database.cursor.execute("SELECT COUNT(*) FROM log_contents")
+        self.assertEqual(self.database.cursor.fetchone()[0], 2)
+
+        self.test_passed = True
+
+    def test_set_properties_log_retention(self):
+
+        self.check_set_properties_logs(["log {}".format(i) for i in range(20)], log_retention="failed")
+
+        self.database.add_calculations([self.get_water_monomer() for i in range(10)], "testmethod", "testbasis", False, "database_test")
+        calculations = list(self.database.get_all_calculations("testclient", "database_test", calculations_to_do=10))
+
+        self.database.set_properties([(molecule, method, basis, cp, use_cp, frag_indices, False, 0, "failed log")
+                                      for molecule, method, basis, cp, use_cp, frag_indices in calculations], log_retention="none")
+
+        for molecule, method, basis, cp, use_cp, frag_indices in calculations:
+            self.assertIsNone(self.database.get_log(molecule, method, basis, cp, use_cp, frag_indices))
+
+        with self.assertRaises(InvalidValueError):
+            self.database.set_properties([], log_retention="some")
+
+        self.test_passed = True
+
+    def test_counters(self):
+
+        dimers = [self.get_water_dimer() for i in range(10)]
+        other_dimers = [self.get_water_dimer() for i in range(5)]
+
+        self.database.add_calculations(dimers, "testmethod", "testbasis", False, "database_test")
+        self.database.add_calculations(other_dimers, "testmethod", "testbasis", False, "database_test", "other_tag")
+        self.assertEqual(self.database.check_counters(), [])
+
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 45)
+        self.assertEqual(self.database.count_pending_calculations("other_tag"), 15)
+        self.assertEqual(self.database.count_dispatched_calculations(), 0)
+
+        calculations = list(self.database.get_all_calculations("testclient", "database_test", calculations_to_do=30))
+        self.assertEqual(self.database.check_counters(), [])
+
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 15)
+        self.assertEqual(self.database.count_dispatched_calculations(), 30)
+
+        self.database.set_properties([(molecule, method, basis, cp, use_cp, frag_indices, index % 4 != 0, random.random(), "log")
+                                      for index, (molecule, method, basis, cp, use_cp, frag_indices) in enumerate(calculations)])
+        self.assertEqual(self.database.check_counters(), [])
+
+        self.assertEqual(self.database.count_dispatched_calculations(), 0)
+
+        # a tag given twice is counted by scanning instead of from the counters, the results must agree.
+        for tags in [("database_test",), ("other_tag",)]:
+            self.assertEqual(self.database.get_training_set_size(["H2O", "H2O"], "testmethod", "testbasis", False, *tags),
+                             self.database.get_training_set_size(["H2O", "H2O"], "testmethod", "testbasis", False, *(tags * 2)))
+            self.assertEqual(self.database.count_pending_calculations(*tags),
+                             self.database.count_pending_calculations(*(tags * 2)))
+
+        self.database.reset_failed("database_test")
+        self.database.delete_calculations(other_dimers, "testmethod", "testbasis", False, "other_tag", delete_complete_calculations=True)
+        self.assertEqual(self.database.check_counters(), [])
+
+        self.assertEqual(self.database.count_pending_calculations("other_tag"), 0)
+
+        self.database.cursor.execute("UPDATE status_counts SET count = count + 5")
+        self.database.cursor.execute("UPDATE tags SET num_incomplete = 7")
+        self.assertNotEqual(self.database.check_counters(), [])
+
+        self.database.rebuild_counters()
+        self.assertEqual(self.database.check_counters(), [])
+
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 15 + 30 // 4 + 1)
+
+        self.test_passed = True
+
+    def test_add_existing_calculations(self):
+
+        dimers = [self.get_water_dimer() for i in range(10)]
+
+        self.database.set_batch_size(4)
+
+        self.database.add_calculations(dimers[:6], "testmethod", "testbasis", False, "database_test")
+
+        for bulk_tagging, tag in [(True, "other_tag"), (False, "third_tag")]:
+            self.database.bulk_tagging = bulk_tagging
+
+            # some of the molecules are already in the database, so only their tags are added.
+            self.database.add_calculations(dimers, "testmethod", "testbasis", False, "database_test", tag)
+
+            self.assertEqual(self.database.count_pending_calculations("database_test"), 30)
+            self.assertEqual(self.database.count_pending_calculations(tag), 30)
+
+        self.test_passed = True
+
     def test_create(self):
 
         self.test_passed = True
@@ -358,6 +520,113 @@ class TestDatabase(TestCaseWithId):
 
         self.test_passed = True
 
+    def get_cleanup_outcomes(self, tag1, tag2):
+        """
+        Resets and deletes calculations tagged tag1 and tag2, and returns how many calculations are left in each state
+        after each step.
+        """
+
+        outcomes = []
+
+        def record_outcome():
+            outcomes.append([self.database.count_pending_calculations(tag1), self.database.count_pending_calculations(tag2),
+                             self.database.get_training_set_size(["H2O", "H2O"], "testmethod", "testbasis", False, tag1),
+                             self.database.get_training_set_size(["H2O", "H2O"], "testmethod", "testbasis", False, tag2),
+                             self.database.check_counters()])
+
+        opt_mol = self.get_water_monomer()
+
+        molecules1 = [self.get_water_dimer() for i in range(10)]
+        molecules2 = [self.get_water_dimer() for i in range(10)]
+
+        self.database.add_calculations(molecules1 + molecules2, "testmethod", "testbasis", False, tag1)
+        self.database.add_calculations(molecules2, "testmethod", "testbasis", False, tag2)
+        self.database.add_calculations([opt_mol], "testmethod", "testbasis", False, tag1, optimized=True)
+
+        self.database.get_all_calculations("testclient", tag1, calculations_to_do=1000)
+
+        self.database.reset_dispatched(tag2)
+        record_outcome()
+
+        calculations = self.database.get_all_calculations("testclient", tag1, calculations_to_do=1000)
+
+        failed_hashes = [molecule.get_standard_copy().get_SHA1() for molecule in molecules2[::2]]
+
+        # the second monomer of every other dimer tagged tag2 fails.
+        self.database.set_properties([(molecule, method, basis, cp, use_cp, frag_indices,
+                                       frag_indices != [1] or molecule.get_SHA1() not in failed_hashes,
+                                       random.random(), "log")
+                                      for molecule, method, basis, cp, use_cp, frag_indices in calculations])
+        record_outcome()
+
+        self.database.reset_failed(tag2)
+        record_outcome()
+
+        self.database.delete_calculations(molecules2[:5], "testmethod", "testbasis", False, tag2)
+        record_outcome()
+
+        self.database.delete_calculations(molecules1[:5] + molecules2[:5], "testmethod", "testbasis", False, tag1)
+        record_outcome()
+
+        self.database.delete_all_calculations("H2O-H2O", "testmethod", "testbasis", False, tag2)
+        record_outcome()
+
+        self.database.delete_all_calculations("H2O-H2O", "testmethod", "testbasis", False, tag1,
+                                              delete_complete_calculations=True)
+        record_outcome()
+
+        return outcomes
+
+    def test_bulk_delete(self):
+
+        has_bulk_delete = self.database.has_bulk_delete()
+
+        self.database.set_batch_size(3)
+
+        self.database.bulk_delete = False
+        outcomes = self.get_cleanup_outcomes("database_test", "database_test2")
+
+        self.database.bulk_delete = has_bulk_delete
+        bulk_outcomes = self.get_cleanup_outcomes("database_test3", "database_test4")
+
+        self.assertEqual(bulk_outcomes, outcomes)
+
+        # deleting with delete_complete_calculations removes every calculation left with the tags.
+        self.assertEqual(outcomes[-1][:4], [0, 0, 0, 0])
+        self.assertEqual(self.database.count_pending_calculations("database_test", "database_test2", "database_test3",
+                                                                  "database_test4"), 0)
+
+        self.test_passed = True
+
+    def test_reset_all_calculations(self):
+
+        molecules = [self.get_water_dimer() for i in range(10)]
+
+        self.database.add_calculations(molecules[:5], "testmethod", "testbasis", False, "database_test")
+        self.database.add_calculations(molecules[5:], "testmethod", "testbasis", False, "database_test2")
+
+        calculations = self.database.get_all_calculations("testclient", "database_test", "database_test2",
+                                                          calculations_to_do=1000)
+
+        self.database.set_properties([(molecule, method, basis, cp, use_cp, frag_indices, True, random.random(), "log")
+                                      for molecule, method, basis, cp, use_cp, frag_indices in calculations])
+
+        self.database.reset_all_calculations("database_test")
+
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 15)
+        self.assertEqual(self.database.count_pending_calculations("database_test2"), 0)
+
+        # the reset calculations can be dispatched again.
+        self.assertEqual(len(list(self.database.get_all_calculations("testclient", "database_test",
+                                                                     calculations_to_do=1000))), 15)
+
+        self.database.reset_all_calculations()
+
+        self.assertEqual(self.database.count_pending_calculations("database_test", "database_test2"), 30)
+        self.assertEqual(self.database.check_counters(), [])
+
+        self.test_passed = True
+
     def test_set_properties_and_get_1B_training_set(self):
         opt_mol = self.get_water_monomer()
         opt_energy = random.random()
@@ -833,6 +1102,211 @@ class TestDatabase(TestCaseWithId):
 
         self.test_passed = True
 
+    def test_screen_calculations(self):
+
+        if not self.database.has_screening():
+            self.skipTest("The database was created before screen_calculations was added to init.sql.")
+
+        def get_water_chain(*positions):
+            return Molecule([Fragment([Atom("H", "A", x + random.random(), random.random(), random.random()),
+                                       Atom("H", "A", x + random.random(), random.random(), random.random()),
+                                       Atom("O", "B", x + random.random(), random.random(), random.random())],
+                                      "H2O", 0, 1, "H1.HO1") for x in positions])
+
+        opt_mol = self.get_water_monomer()
+        opt_energy = random.random()
+
+        # the third water of the far trimers is beyond the cutoff, so only the monomers and the first dimer are calculated.
+        near = [get_water_chain(0, 3, 6) for i in range(5)]
+        far = [get_water_chain(0, 3, 30) for i in range(5)]
+
+        num_screened = self.database.add_calculations(near + far, "testmethod", "testbasis", False, "database_test",
+                                                      screen=DistanceScreen([10]))
+        self.database.add_calculations([opt_mol], "testmethod", "testbasis", False, "database_test", optimized=True)
+
+        self.assertEqual(num_screened, 15)
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 5 * 7 + 5 * 4 + 1)
+
+        calculations = self.database.get_all_calculations("testclient", "database_test", calculations_to_do=100)
+
+        molecules = near + far
+        energies = {}
+        calculation_results = []
+
+        for molecule, method, basis, cp, use_cp, frag_indices in calculations:
+            if molecule == opt_mol.get_standard_copy():
+                energy = opt_energy
+            else:
+                energy = random.random()
+                index = molecules.index(molecule.get_reorder_copy(["H2O", "H2O", "H2O"], ["H1.HO1", "H1.HO1", "H1.HO1"]))
+                energies[(index, len(frag_indices))] = energies.get((index, len(frag_indices)), 0) + energy
+            calculation_results.append([molecule, method, basis, cp, use_cp, frag_indices, True, energy, "some log test"])
+
+        self.database.set_properties(calculation_results)
+
+        training_set = list(self.database.get_training_set(["H2O", "H2O", "H2O"], ["H1.HO1", "H1.HO1", "H1.HO1"],
+                                                           "testmethod", "testbasis", False, "database_test"))
+
+        self.assertEqual(len(training_set), 10)
+
+        # energies has the sum of the energies of the calculations of each number of fragments of each molecule.
+        for molecule, binding_energy, nb_energy, deformation_energies in training_set:
+            index = molecules.index(molecule)
+
+            if index >= len(near):
+                self.assertEqual(nb_energy, 0)
+            else:
+                self.assertAlmostEqual(nb_energy, energies[(index, 3)] - energies[(index, 2)] + energies[(index, 1)], places=5)
+
+            self.assertAlmostEqual(binding_energy, nb_energy + energies[(index, 1)] - 3 * opt_energy, places=5)
+
+        self.test_passed = True
+
+    def test_training_set_pages(self):
+
+        opt_mol = self.get_water_monomer()
+
+        self.database.add_calculations([self.get_water_dimer() for i in range(30)], "testmethod", "testbasis", True, "database_test")
+        self.database.add_calculations([self.get_water_dimer() for i in range(5)], "testmethod", "testbasis", True, "other_tag")
+        self.database.add_calculations([opt_mol], "testmethod", "testbasis", True, "database_test", optimized=True)
+
+        calculations = self.database.get_all_calculations("testclient", "database_test", "other_tag", calculations_to_do=1000)
+
+        self.database.set_properties([(molecule, method, basis, cp, use_cp, frag_indices, True, random.random(), "log")
+                                      for molecule, method, basis, cp, use_cp, frag_indices in calculations])
+
+        # pages smaller than the training set, so some configurations are on later pages.
+        self.database.set_batch_size(7)
+
+        training_sets = []
+        training_sets_2B = []
+
+        for training_set_pages in [True, False]:
+            self.database.training_set_pages = training_set_pages
+
+            training_sets.append(list(self.database.get_training_set(["H2O", "H2O"], ["H1.HO1", "H1.HO1"], "testmethod",
+                                                                     "testbasis", True, "database_test")))
+            training_sets_2B.append(list(self.database.get_2B_training_set("H2O-H2O", ["H2O", "H2O"], ["H1.HO1", "H1.HO1"],
+                                                                           "testmethod", "testbasis", True, "database_test")))
+
+        for paged, unpaged in [training_sets, training_sets_2B]:
+            self.assertEqual(len(paged), 30)
+            self.assertEqual(len(unpaged), 30)
+
+            unpaged = {molecule.to_xyz(): energies for molecule, *energies in unpaged}
+
+            for molecule, *energies in paged:
+                for energy, unpaged_energy in zip(energies, unpaged[molecule.to_xyz()]):
+                    if isinstance(energy, list):
+                        for e, unpaged_e in zip(energy, unpaged_energy):
+                            self.assertAlmostEqual(e, unpaged_e)
+                    else:
+                        self.assertAlmostEqual(energy, unpaged_energy)
+
+        self.test_passed = True
+
+    def test_training_set_hash_ranges(self):
+
+        opt_mol = self.get_water_monomer()
+
+        self.database.add_calculations([self.get_water_dimer() for i in range(30)], "testmethod", "testbasis", True, "database_test")
+        self.database.add_calculations([opt_mol], "testmethod", "testbasis", True, "database_test", optimized=True)
+
+        calculations = self.database.get_all_calculations("testclient", "database_test", calculations_to_do=1000)
+
+        self.database.set_properties([(molecule, method, basis, cp, use_cp, frag_indices, True, random.random(), "log")
+                                      for molecule, method, basis, cp, use_cp, frag_indices in calculations])
+        self.database.save()
+
+        self.database.set_batch_size(7)
+
+        training_set = [molecule.to_xyz() for molecule, *energies in self.database.get_training_set(
+                ["H2O", "H2O"], ["H1.HO1", "H1.HO1"], "testmethod", "testbasis", True, "database_test")]
+
+        for num_ranges in [1, 2, 5]:
+            ranged_training_set = []
+
+            for hash_range in training_set_generator.get_hash_ranges(num_ranges):
+                ranged_training_set += [molecule.to_xyz() for molecule, *energies in self.database.get_training_set(
+                        ["H2O", "H2O"], ["H1.HO1", "H1.HO1"], "testmethod", "testbasis", True, "database_test",
+                        hash_range=hash_range)]
+
+            self.assertEqual(ranged_training_set, training_set)
+
+        settings_path = os.path.join(self.test_folder, "resources", "water_dimer_psi4.ini")
+
+        with tempfile.TemporaryDirectory() as directory:
+            training_set_files = []
+
+            for num_workers in [1, 3]:
+                training_set_path = os.path.join(directory, "training_set_{}.xyz".format(num_workers))
+
+                generate_training_set(settings_path, self.config, training_set_path, "testmethod", "testbasis", True,
+                                      "database_test", num_workers=num_workers)
+
+                with open(training_set_path, "r") as training_set_file:
+                    training_set_files.append(training_set_file.read())
+
+            self.assertEqual(training_set_files[0], training_set_files[1])
+            self.assertEqual(sorted(os.listdir(directory)), ["training_set_1.xyz", "training_set_3.xyz"])
+
+        self.test_passed = True
+
+    def test_import_calculations_from_file(self):
+
+        settings_path = os.path.join(self.test_folder, "resources", "water_dimer_psi4.ini")
+        num_energies = len(Database.get_permutations(2, True))
+
+        molecule_energies_pairs = [(self.get_water_dimer(), [random.random() for i in range(num_energies)])
+                                   for i in range(25)]
+
+        # the same configuration twice in one file is only imported once.
+        molecule_energies_pairs.append(molecule_energies_pairs[0])
+
+        with tempfile.TemporaryDirectory() as directory:
+            calculations_path = os.path.join(directory, "calculations.xyz")
+
+            with open(calculations_path, "w") as calculations_file:
+                for molecule, energies in molecule_energies_pairs:
+                    calculations_file.write("{}\n{}\n{}\n\n".format(molecule.get_num_atoms(),
+                                            " ".join(str(energy) for energy in energies), molecule.to_xyz()))
+
+            parsed_pairs = list(parse_calculations_file(calculations_path, SettingsReader(settings_path)))
+
+            self.assertEqual(len(parsed_pairs), len(molecule_energies_pairs))
+
+            for (molecule, energies), (parsed_molecule, parsed_energies) in zip(molecule_energies_pairs, parsed_pairs):
+                self.assertEqual(parsed_molecule.get_SHA1(), molecule.get_SHA1())
+                self.assertEqual(parsed_energies, energies)
+
+            self.database.set_batch_size(7)
+
+            # import through the bulk merge, if the database has it, and through one molecule at a time.
+            import_calculations(settings_path, self.config, calculations_path, "testmethod", "testbasis", True, "database_test")
+            import_calculations(settings_path, self.config, calculations_path, "testmethod", "testbasis", True, "database_test")
+
+            self.database.bulk_import = False
+            self.database.import_calculations(parse_calculations_file(calculations_path, SettingsReader(settings_path)),
+                                              "othermethod", "testbasis", True, "database_test")
+
+        exported = {}
+
+        for method in ["testmethod", "othermethod"]:
+            exported[method] = sorted((molecule.get_SHA1(), [round(energy, 5) for energy in energies])
+                                      for molecule, energies in self.database.export_calculations(
+                                              ["H2O", "H2O"], ["H1.HO1", "H1.HO1"], method, "testbasis", True,
+                                              "database_test"))
+
+        self.assertEqual(len(exported["testmethod"]), 25)
+        self.assertEqual(exported["testmethod"], exported["othermethod"])
+        self.assertEqual(exported["testmethod"], sorted((molecule.get_SHA1(), [round(energy, 5) for energy in energies])
+                                                        for molecule, energies in molecule_energies_pairs[:-1]))
+
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 0)
+        self.assertEqual(self.database.check_counters(), [])
+
+        self.test_passed = True
+
     def test_set_properties_and_get_training_set_nested_symmetry(self):
 
         # no cp
@@ -1034,6 +1508,46 @@ class TestDatabase(TestCaseWithId):
 
         self.test_passed = True
 
+    def test_packed_coordinates(self):
+
+        self.assertEqual(Database.unpack_coordinates(b"\x3f\xf8\x00\x00\x00\x00\x00\x00"), [1.5])
+        self.assertEqual(Database.unpack_coordinates([1.5, 2.5]), [1.5, 2.5])
+
+        molecule_energies_pairs = []
+        for i in range(10):
+            molecule_energies_pairs.append((self.get_water_dimer(), [random.random(), random.random(), random.random()]))
+
+        self.database.import_calculations(molecule_energies_pairs, "testmethod", "testbasis", False, "database_test",
+                                          optimized=False)
+        self.database.save()
+
+        self.assertEqual(self.database.get_coordinates_function("export_calculations"), "export_calculations_packed")
+
+        text_database = Database(self.config, packed_coordinates=False)
+
+        try:
+            self.assertEqual(text_database.get_coordinates_function("export_calculations"), "export_calculations")
+
+            packed_calculations = list(self.database.export_calculations(["H2O", "H2O"], ["H1.HO1", "H1.HO1"],
+                                                                         "testmethod", "testbasis", False, "database_test"))
+            text_calculations = list(text_database.export_calculations(["H2O", "H2O"], ["H1.HO1", "H1.HO1"],
+                                                                       "testmethod", "testbasis", False, "database_test"))
+        finally:
+            text_database.close()
+
+        self.assertEqual(len(packed_calculations), 10)
+        self.assertEqual(len(text_calculations), 10)
+
+        packed_calculations.sort(key=lambda calculation: calculation[0].to_xyz())
+        text_calculations.sort(key=lambda calculation: calculation[0].to_xyz())
+
+        # coordinates should be bit for bit identical whichever way they were sent.
+        for (packed_molecule, packed_energies), (text_molecule, text_energies) in zip(packed_calculations, text_calculations):
+            self.assertEqual(packed_molecule.to_xyz(), text_molecule.to_xyz())
+            self.assertEqual(packed_energies, text_energies)
+
+        self.test_passed = True
+
     def test_read_privileges(self):
 
         # First, create the training set owned by test_user1
@@ -0,0 +1,154 @@
+import unittest, os, random, threading
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.database import Database, DatabasePool
+from mbfit.exceptions import InvalidValueError, DatabaseConnectionError
+from mbfit.molecule import Atom, Fragment, Molecule
+
+# only import psycopg2 if it is installed.
+try:
+    import psycopg2
+except ModuleNotFoundError:
+    pass
+
+def psycopg2_installed():
+    try:
+        import psycopg2
+        return True
+    except ModuleNotFoundError:
+        return False
+
+def local_db_installed():
+    try:
+        config = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_user1.ini")
+        database = Database(config)
+        database.close()
+        return True
+    except DatabaseConnectionError:
+        return False
+
+@unittest.skipUnless(psycopg2_installed() and local_db_installed(),"psycopg2 or a local test database is not installed, so database cannot be tested.")
+class TestDatabasePool(TestCaseWithId):
+    def __init__(self, *args, **kwargs):
+        super(TestDatabasePool, self).__init__(*args, **kwargs)
+        self.test_folder = os.path.dirname(os.path.abspath(__file__))
+
+    @staticmethod
+    def get_water_monomer():
+        H1 = Atom("H", "A", random.random(), random.random(), random.random())
+        H2 = Atom("H", "A", random.random(), random.random(), random.random())
+        O1 = Atom("O", "B", random.random(), random.random(), random.random())
+
+        frag1 = Fragment([H1, H2, O1], "H2O", 0, 1, "H1.HO1")
+
+        molecule = Molecule([frag1])
+
+        return molecule
+
+    def setUp(self):
+        self.config = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_user1.ini")
+
+        self.pool = DatabasePool(self.config, max_connections=2)
+
+        with Database(self.config, pool=self.pool) as database:
+            database.annihilate(confirm="confirm")
+
+    def tearDown(self):
+        with Database(self.config, pool=self.pool) as database:
+            database.annihilate(confirm="confirm")
+
+        self.pool.close()
+
+        super().tearDown()
+
+    def test_bad_connection_counts(self):
+
+        with self.assertRaises(InvalidValueError):
+            DatabasePool(self.config, min_connections=-1)
+
+        with self.assertRaises(InvalidValueError):
+            DatabasePool(self.config, min_connections=4, max_connections=2)
+
+        self.test_passed = True
+
+    def test_connection_is_reused(self):
+
+        database = Database(self.config, pool=self.pool)
+        connection = database.connection
+        database.close()
+
+        # closing twice should not give the connection back twice.
+        database.close()
+
+        database = Database(self.config, pool=self.pool)
+        self.assertIs(database.connection, connection)
+        self.assertFalse(database.connection.closed)
+        database.close()
+
+        self.test_passed = True
+
+    def test_unsaved_changes_are_rolled_back(self):
+
+        database = Database(self.config, pool=self.pool)
+        database.add_calculations([self.get_water_monomer() for i in range(5)], "testmethod", "testbasis", False, "pool_test")
+        database.close()
+
+        with Database(self.config, pool=self.pool) as database:
+            self.assertEqual(database.count_pending_calculations("pool_test"), 0)
+            database.add_calculations([self.get_water_monomer() for i in range(5)], "testmethod", "testbasis", False, "pool_test")
+
+        with Database(self.config, pool=self.pool) as database:
+            self.assertEqual(database.count_pending_calculations("pool_test"), 5)
+
+        self.test_passed = True
+
+    def test_connection_context_manager(self):
+
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        with self.assertRaises(RuntimeError):
+            with self.pool.connection() as connection:
+                raise RuntimeError("failure inside with block")
+
+        # the connection given back after the error should still be usable.
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 2")
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+        self.test_passed = True
+
+    def test_checkout_waits_for_free_connection(self):
+
+        first = self.pool.get_connection()
+        second = self.pool.get_connection()
+
+        checked_out = []
+
+        def check_out():
+            connection = self.pool.get_connection()
+            checked_out.append(connection)
+            self.pool.put_connection(connection)
+
+        thread = threading.Thread(target=check_out)
+        thread.start()
+        thread.join(0.5)
+
+        # both connections are in use, so the thread must still be waiting.
+        self.assertEqual(len(checked_out), 0)
+
+        self.pool.put_connection(first)
+        thread.join(5)
+
+        self.assertEqual(len(checked_out), 1)
+        self.assertIs(checked_out[0], first)
+
+        self.pool.put_connection(second)
+
+        self.test_passed = True
+
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestDatabasePool)
@@ -0,0 +1,60 @@
+import unittest, zlib
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.database import log_compression
+from mbfit.exceptions import InvalidValueError
+
+def zstandard_installed():
+    try:
+        import zstandard
+        return True
+    except ModuleNotFoundError:
+        return False
+
+
+class TestLogCompression(TestCaseWithId):
+
+    log_text = "  Psi4: An Open-Source Ab Initio Electronic Structure Package\n" * 500 + "  Total Energy = -76.02663 Å\n"
+
+    def test_zlib(self):
+
+        content = log_compression.compress_log(self.log_text, "zlib")
+
+        self.assertLess(len(content), len(self.log_text))
+        self.assertEqual(zlib.decompress(content).decode("utf-8"), self.log_text)
+        self.assertEqual(log_compression.decompress_log(content, "zlib"), self.log_text)
+        self.assertEqual(log_compression.decompress_log(memoryview(content), "zlib"), self.log_text)
+
+        self.test_passed = True
+
+    @unittest.skipUnless(zstandard_installed(), "zstandard is not installed, so zstd compression cannot be tested.")
+    def test_zstd(self):
+
+        content = log_compression.compress_log(self.log_text, "zstd")
+
+        self.assertLess(len(content), len(self.log_text))
+        self.assertEqual(log_compression.decompress_log(content, "zstd"), self.log_text)
+
+        self.test_passed = True
+
+    def test_bad_codec_and_retention(self):
+
+        with self.assertRaises(InvalidValueError):
+            log_compression.compress_log(self.log_text, "gzip")
+
+        with self.assertRaises(InvalidValueError):
+            log_compression.check_retention("successful")
+
+        log_compression.check_retention("failed")
+
+        self.test_passed = True
+
+    def test_log_hash(self):
+
+        self.assertEqual(log_compression.get_log_hash(self.log_text), log_compression.get_log_hash(str(self.log_text)))
+        self.assertNotEqual(log_compression.get_log_hash(self.log_text), log_compression.get_log_hash(self.log_text + " "))
+
+        self.test_passed = True
+
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestLogCompression)
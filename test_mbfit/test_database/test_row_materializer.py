@@ -0,0 +1,98 @@
+import unittest, os, random, copy, struct
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.database.row_materializer import RowMaterializer
+from mbfit.molecule import Atom, Fragment, Molecule
+
+
+class TestRowMaterializer(TestCaseWithId):
+    def __init__(self, *args, **kwargs):
+        super(TestRowMaterializer, self).__init__(*args, **kwargs)
+        self.test_folder = os.path.dirname(os.path.abspath(__file__))
+
+    @staticmethod
+    def get_I_water_water_trimer():
+
+        frag1 = Fragment([Atom("I", "A", 0, 0, 0)], "I", -1, 1, "I")
+
+        frag2 = Fragment([Atom("H", "B", 0, 0, 0),
+                          Atom("H", "B", 0, 0, 0),
+                          Atom("O", "C", 0, 0, 0)], "H2O", 0, 1, "H1.HO1")
+
+        frag3 = Fragment([Atom("H", "B", 0, 0, 0),
+                          Atom("H", "B", 0, 0, 0),
+                          Atom("O", "C", 0, 0, 0)], "H2O", 0, 1, "H1.HO1")
+
+        molecule = Molecule([frag1, frag2, frag3])
+
+        # distinct coordinates keep identical atoms apart when the reorder order is computed.
+        for index, atom in enumerate(molecule.get_atoms()):
+            atom.set_xyz(index, index, index)
+
+        return molecule
+
+    @staticmethod
+    def materialize_with_deepcopy(empty_molecule, atom_coordinates, order, frag_orders, SMILES):
+        molecule = copy.deepcopy(empty_molecule)
+
+        for atom in molecule.get_atoms():
+            atom.set_xyz(atom_coordinates[0], atom_coordinates[1], atom_coordinates[2])
+            atom_coordinates = atom_coordinates[3:]
+
+        return molecule.get_reordered_copy(order, frag_orders, SMILES)
+
+    def check_materialize(self, empty_molecule, names, SMILES):
+        order, frag_orders = empty_molecule.get_reorder_order(names, SMILES)
+
+        materializer = RowMaterializer(empty_molecule, order, frag_orders, SMILES)
+
+        for i in range(20):
+            atom_coordinates = [random.uniform(-10, 10) for j in range(empty_molecule.get_num_atoms() * 3)]
+
+            reference = self.materialize_with_deepcopy(empty_molecule, atom_coordinates, order, frag_orders, SMILES)
+
+            for coordinates in [atom_coordinates, struct.pack(">{}d".format(len(atom_coordinates)), *atom_coordinates)]:
+                molecule = materializer.materialize(coordinates)
+
+                self.assertEqual(molecule, reference)
+                self.assertEqual(molecule.to_xyz(), reference.to_xyz())
+                self.assertEqual(molecule.get_symmetry(), reference.get_symmetry())
+                self.assertEqual([fragment.get_SMILE() for fragment in molecule.get_fragments()],
+                                 [fragment.get_SMILE() for fragment in reference.get_fragments()])
+                self.assertEqual([fragment.get_charge() for fragment in molecule.get_fragments()],
+                                 [fragment.get_charge() for fragment in reference.get_fragments()])
+
+    def test_materialize_same_order(self):
+
+        self.check_materialize(self.get_I_water_water_trimer(), ["I", "H2O", "H2O"], ["I", "H1.HO1", "H1.HO1"])
+
+        self.test_passed = True
+
+    def test_materialize_reordered(self):
+
+        self.check_materialize(self.get_I_water_water_trimer(), ["H2O", "H2O", "I"], ["H1.HO1", "H1.HO1", "I"])
+
+        self.test_passed = True
+
+    def test_materialized_molecules_are_independent(self):
+        empty_molecule = self.get_I_water_water_trimer()
+
+        order, frag_orders = empty_molecule.get_reorder_order(["I", "H2O", "H2O"], ["I", "H1.HO1", "H1.HO1"])
+
+        materializer = RowMaterializer(empty_molecule, order, frag_orders, ["I", "H1.HO1", "H1.HO1"])
+
+        molecule1 = materializer.materialize([1.0] * 21)
+        molecule2 = materializer.materialize([2.0] * 21)
+
+        molecule1.translate(5, 5, 5)
+        molecule1.get_fragments()[1].set_name("water")
+
+        self.assertEqual([atom.get_x() for atom in molecule2.get_atoms()], [2.0] * 7)
+        self.assertEqual([atom.get_x() for atom in materializer.get_template().get_atoms()],
+                         [atom.get_x() for atom in empty_molecule.get_reordered_copy(order, frag_orders, ["I", "H1.HO1", "H1.HO1"]).get_atoms()])
+        self.assertEqual(molecule2.get_fragments()[1].get_name(), "H2O")
+
+        self.test_passed = True
+
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestRowMaterializer)
@@ -0,0 +1,106 @@
+import unittest, os, random, shutil, tempfile
+
+from mbfit.database import Database, DatabasePool, SQLiteDatabase
+from mbfit.exceptions import DatabaseOperationError
+
+from . import test_database
+
+class TestSQLiteDatabase(test_database.TestDatabase):
+
+    # runs every test of TestDatabase against a SQLite database file, which needs neither psycopg2 nor a server.
+    __unittest_skip__ = False
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self.config = os.path.join(self.directory, "test_sqlite.ini")
+
+        with open(self.config, "w") as config_file:
+            config_file.write("[database]\nbackend = sqlite\npath = test.sqlite\n")
+
+        with Database(self.config) as database:
+            database.create()
+
+        self.database = Database(self.config)
+        self.database2 = Database(self.config)
+        self.database3 = Database(self.config)
+
+    def tearDown(self):
+        super().tearDown()
+
+        shutil.rmtree(self.directory)
+
+    def test_backend(self):
+
+        self.assertIsInstance(self.database, SQLiteDatabase)
+        self.assertEqual(self.database.name, os.path.join(self.directory, "test.sqlite"))
+        self.assertTrue(os.path.isfile(self.database.name))
+
+        self.test_passed = True
+
+    def test_pool(self):
+
+        pool = DatabasePool(self.config, min_connections=0, max_connections=2)
+
+        with Database(self.config, pool=pool) as database:
+            self.assertIsInstance(database, SQLiteDatabase)
+            database.add_calculations([self.get_water_monomer() for i in range(5)], "testmethod", "testbasis", False, "database_test")
+
+        with Database(self.config, pool=pool) as database:
+            self.assertEqual(database.count_pending_calculations("database_test"), 5)
+
+        pool.close()
+
+        self.test_passed = True
+
+    def test_counters(self):
+
+        dimers = [self.get_water_dimer() for i in range(10)]
+        other_dimers = [self.get_water_dimer() for i in range(5)]
+
+        self.database.add_calculations(dimers, "testmethod", "testbasis", False, "database_test")
+        self.database.add_calculations(other_dimers, "testmethod", "testbasis", False, "database_test", "other_tag")
+
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 45)
+        self.assertEqual(self.database.count_pending_calculations("other_tag"), 15)
+        self.assertEqual(self.database.count_dispatched_calculations(), 0)
+
+        calculations = list(self.database.get_all_calculations("testclient", "database_test", calculations_to_do=30))
+
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 15)
+        self.assertEqual(self.database.count_dispatched_calculations(), 30)
+
+        self.database.set_properties([(molecule, method, basis, cp, use_cp, frag_indices, index % 4 != 0, random.random(), "log")
+                                      for index, (molecule, method, basis, cp, use_cp, frag_indices) in enumerate(calculations)])
+
+        self.assertEqual(self.database.count_dispatched_calculations(), 0)
+
+        self.database.reset_failed("database_test")
+        self.database.delete_calculations(other_dimers, "testmethod", "testbasis", False, "other_tag", delete_complete_calculations=True)
+
+        self.assertEqual(self.database.count_pending_calculations("other_tag"), 0)
+        self.assertEqual(self.database.count_pending_calculations("database_test"), 15 + 30 // 4 + 1)
+        self.assertEqual(self.database.check_counters(), [])
+
+        self.test_passed = True
+
+    def test_execute(self):
+
+        with self.assertRaises(DatabaseOperationError):
+            self.database.execute("SELECT * FROM no_such_table", ())
+
+        self.test_passed = True
+
+    def test_packed_coordinates(self):
+        self.skipTest("SQLite databases always store packed coordinates.")
+
+    def test_read_privileges(self):
+        self.skipTest("SQLite databases have a single user.")
+
+    def test_write_privileges(self):
+        self.skipTest("SQLite databases have a single user.")
+
+    def test_admin_privileges(self):
+        self.skipTest("SQLite databases have a single user.")
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestSQLiteDatabase)
@@ -0,0 +1,36 @@
+#include "buckingham.h"
+
+mbnrg_buck::mbnrg_buck() {}
+mbnrg_buck::~mbnrg_buck() {}
+
+mbnrg_buck::mbnrg_buck(std::vector<double> c) {
+  xyz = c;
+}
+
+std::vector<double> mbnrg_buck::get_nonlinear_terms() {
+    std::vector<double> nl_terms(3,0.0);
+        const double* coords_A_1_a = xyz.data() + 0;
+
+    const double* coords_B_1_a = xyz.data() + 3;
+
+    const double* coords_B_2_a = xyz.data() + 6;
+
+
+
+    return nl_terms;
+}
+
+double mbnrg_buck::get_buckingham() {
+
+    double buck = 0.0;
+
+    const double* coords_A_1_a = xyz.data() + 0;
+
+    const double* coords_B_1_a = xyz.data() + 3;
+
+    const double* coords_B_2_a = xyz.data() + 6;
+
+
+    return buck;
+}
+
@@ -0,0 +1,88 @@
+
+#ifndef BUCKINGHAM_H
+#define BUCKINGHAM_H
+
+#include <cmath>
+#include <algorithm>
+#include <vector>
+
+struct mbnrg_buck {
+  mbnrg_buck();
+  mbnrg_buck(std::vector<double> c);
+  ~mbnrg_buck();
+
+  double m_A_A_A = 0.0;
+  double m_A_A_B = 0.0;
+  double m_A_B_B = 0.0;
+
+  double m_b_A_A = 0.0;
+  double m_b_A_B = 0.0;
+  double m_b_B_B = 0.0;
+
+
+  std::vector<double> xyz;
+
+  double get_buckingham();
+
+  std::vector<double> get_nonlinear_terms();
+
+  inline void set_nonlinear_parameters(std::vector<double> b) {
+    m_b_A_A = b[0];
+    m_b_A_B = b[1];
+    m_b_B_B = b[2];
+
+  }
+
+  inline void set_linear_parameters(std::vector<double> a) {
+    m_A_A_A = a[0];
+    m_A_A_B = a[1];
+    m_A_B_B = a[2];
+
+  }
+
+  inline double buck_energy(const double a, const double b,
+                     const double* p1, const double* p2,
+                     double* g1, double* g2)
+  {
+
+    const double dx = p1[0] - p2[0];
+    const double dy = p1[1] - p2[1];
+    const double dz = p1[2] - p2[2];
+
+    const double rsq = dx*dx + dy*dy + dz*dz;
+    const double r = std::sqrt(rsq);
+
+    const double fac = a*exp(-b*r);
+    const double grd = b/r*fac;
+
+    g1[0] -= dx*grd;
+    g2[0] += dx*grd;
+
+    g1[1] -= dy*grd;
+    g2[1] += dy*grd;
+
+    g1[2] -= dz*grd;
+    g2[2] += dz*grd;
+
+    return fac;
+  }
+
+  inline double buck_energy(const double a, const double b,
+                     const double* p1, const double* p2)
+  {
+
+    const double dx = p1[0] - p2[0];
+    const double dy = p1[1] - p2[1];
+    const double dz = p1[2] - p2[2];
+
+    const double rsq = dx*dx + dy*dy + dz*dz;
+    const double r = std::sqrt(rsq);
+
+    const double fac = a*exp(-b*r);
+
+    return fac;
+  }
+};
+
+#endif
+
@@ -0,0 +1,36 @@
+#include "dispersion.h"
+
+mbnrg_disp::mbnrg_disp() {}
+mbnrg_disp::~mbnrg_disp() {}
+
+mbnrg_disp::mbnrg_disp(std::vector<double> c) {
+  xyz = c;
+}
+
+std::vector<double> mbnrg_disp::get_nonlinear_terms() {
+    std::vector<double> nl_terms(3,0.0);
+        const double* coords_A_1_a = xyz.data() + 0;
+
+    const double* coords_B_1_a = xyz.data() + 3;
+
+    const double* coords_B_2_a = xyz.data() + 6;
+
+
+
+    return nl_terms;
+}
+
+double mbnrg_disp::get_dispersion() {
+
+    double disp = 0.0;
+
+    const double* coords_A_1_a = xyz.data() + 0;
+
+    const double* coords_B_1_a = xyz.data() + 3;
+
+    const double* coords_B_2_a = xyz.data() + 6;
+
+
+    return disp;
+}
+
@@ -0,0 +1,182 @@
+#include <cmath>
+#include <cassert>
+#include <cstdlib>
+#include <ctime>
+#include <vector>
+
+#include <fstream>
+#include <sstream>
+#include <iomanip>
+#include <iostream>
+#include <stdexcept>
+#include <chrono>
+
+#include "fit-utils.h"
+#include "training_set.h"
+#include "mbnrg_1b_A1B2_fit.h"
+#include "electrostatics.h"
+#include "coulomb.h"
+#include "dispersion.h"
+#ifdef USE_BUCKINGHAM
+#include "buckingham.h"
+#endif
+
+#include "constants.h"
+#include "mon1.h"
+
+namespace {
+
+static mbnrg_1b_A1B2_fit::polyholder_1b_A1B2_fit model;
+
+static std::vector<tset::nb_system> training_set;
+
+} // namespace
+
+
+int main(int argc, char** argv) {
+
+    mbnrg_1b_A1B2_fit::polyholder_1b_A1B2_fit model;
+
+    std::vector<tset::nb_system> training_set;
+    std::vector<double> elec_e;
+#ifdef USE_BUCKINGHAM
+std::vector<double> buck_e;
+#endif
+std::vector<double> disp_e;
+    std::vector<double> poly_e;
+    std::vector<double> nb_energy;
+    std::vector<double> ts_weights;
+
+
+    if (argc < 3) {
+        std::cerr << "usage: ./eval-1b  <parameters.nc> <test_set.xyz> "
+                  << std::endl;
+        return 0;
+    }
+
+    argv++;
+    argc--;
+
+    try {
+        model.load_netcdf(*argv);
+
+        ++argv;
+        --argc;
+
+        size_t nsys = tset::load_nb_system(*argv, training_set);
+        std::cout << "'" << *(argv++) << "' : "
+                      << nsys << " configurations" << std::endl;
+
+    } catch (const std::exception& e) {
+        std::cerr << " ** Error ** : " << e.what() << std::endl;
+        return 1;
+    }
+
+    for (size_t n = 0; n < training_set.size(); n++) {
+        x::mon1 m1(training_set[n].xyz.data() + 0);
+
+        double elec_0 = 0.0;
+
+        {
+            int num_sites = 3;
+
+            int isw_sites[num_sites];
+
+            double xyz_sites[num_sites*3];
+            double chg_sites[num_sites];
+            double pol_sites[num_sites];
+            double polfac_sites[num_sites];
+            excluded_set_type excl12;
+            excluded_set_type excl13;
+            excluded_set_type excl14;
+
+            std::fill(isw_sites + 0, isw_sites + 0 + m1.get_nsites(), m1.is_w);
+            std::copy(m1.get_sitecrds(), m1.get_sitecrds() + 3*m1.get_nsites(), xyz_sites + 3*0);
+            std::copy(m1.get_charges(), m1.get_charges() + m1.get_nsites(), chg_sites + 0);
+            std::copy(m1.get_pol(), m1.get_pol() + m1.get_nsites(), pol_sites + 0);
+            std::copy(m1.get_polfacs(), m1.get_polfacs() + m1.get_nsites(), polfac_sites + 0);
+
+
+            for (auto i = m1.get_begin_12(); i != m1.get_end_12(); i++) {
+                std::pair<size_t,size_t> p =
+                    std::make_pair(i->first + 0,
+                                   i->second + 0);
+                excl12.insert(p);
+            }
+
+            for (auto i = m1.get_begin_13(); i != m1.get_end_13(); i++) {
+                std::pair<size_t,size_t> p =
+                    std::make_pair(i->first + 0,
+                                   i->second + 0);
+                excl13.insert(p);
+            }
+
+            for (auto i = m1.get_begin_14(); i != m1.get_end_14(); i++) {
+                std::pair<size_t,size_t> p =
+                    std::make_pair(i->first + 0,
+                                   i->second + 0);
+                excl14.insert(p);
+            }
+
+
+
+            ttm::electrostatics m_electrostatics;
+
+            ttm::smear_ttm4x smr;
+            smr.m_aDD_intra_12 = 0.3;
+            smr.m_aDD_intra_13 = 0.3;
+            smr.m_aDD_intra_14 = 0.055;
+
+            elec_0 = m_electrostatics(num_sites, chg_sites, polfac_sites, pol_sites,
+                                          xyz_sites, excl12, excl13, excl14,
+                                          isw_sites, smr, 0);
+        }
+
+        elec_e.push_back(1*(elec_0));
+
+        mbnrg_disp disp(training_set[n].xyz);
+        disp_e.push_back(disp.get_dispersion());
+        #ifdef USE_BUCKINGHAM
+        mbnrg_buck buck(training_set[n].xyz);
+        buck_e.push_back(buck.get_buckingham());
+        #endif
+
+        poly_e.push_back(model.calculate(training_set[n].xyz));
+
+        nb_energy.push_back(elec_e[n] + disp_e[n] + poly_e[n]);
+        #ifdef USE_BUCKINGHAM
+        nb_energy[n] += buck_e[n];
+        #endif
+    }
+
+    std::cerr << std::setw(9)   << "#frame["
+              << std::setw(6)   << std::setfill('.') << "###"
+              << std::setw(3)   << "]= " << std::setfill(' ')
+              << std::setw(20)  << "Calculated"
+#ifdef USE_BUCKINGHAM
+              << std::setw(20)  << "Repulsion (TTM-nrg)"
+#endif
+              << std::setw(20)  << "Polynomials"
+              << std::setw(20)  << "Dispersion"
+              << std::setw(40)  << "Electrostatics (Permanent + Induced)"
+              << std::endl;
+
+    
+    for (size_t n = 0; n < training_set.size(); n++) {
+        std::cout << std::scientific << std::setprecision(8)
+                  << std::setw(10)   << "frame["
+                  << std::setw(6)    << std::setfill('.') << n
+                  << std::setw(3)    << "]= " << std::setfill(' ')
+                  << std::setw(20)   << nb_energy[n]
+#ifdef USE_BUCKINGHAM
+                  << std::setw(20)   << buck_e[n]
+#endif
+                  << std::setw(20)   << poly_e[n]
+                  << std::setw(20)   << disp_e[n]
+                  << std::setw(40)   << elec_e[n]
+                  << std::endl;
+    }
+
+    return 0;
+}
+
@@ -0,0 +1,419 @@
+#include <cmath>
+#include <cassert>
+#include <cstdlib>
+#include <ctime>
+
+#include <fstream>
+#include <sstream>
+#include <iomanip>
+#include <iostream>
+#include <stdexcept>
+#include <chrono>
+
+#include <gsl/gsl_multimin.h>
+
+#include "rwlsq.h"
+
+#include "fit-utils.h"
+#include "training_set.h"
+#include "mbnrg_1b_A1B2_fit.h"
+#include "electrostatics.h"
+#include "coulomb.h"
+#include "dispersion.h"
+#ifdef USE_BUCKINGHAM
+#include "buckingham.h"
+#endif
+#include "constants.h"
+#include "mon1.h"
+
+namespace {
+
+static mbnrg_1b_A1B2_fit::polyholder_1b_A1B2_fit model;
+
+double alpha = 0.0005;
+
+double E_range = 20; // kcal/mol
+
+//----------------------------------------------------------------------------//
+
+static std::vector<tset::nb_system> training_set;
+static std::vector<double> elec_e;
+
+#ifdef USE_BUCKINGHAM
+static std::vector<double> buck_e;
+#endif
+static std::vector<double> disp_e;
+static std::vector<double> ts_weights;
+
+namespace linear {
+
+//----------------------------------------------------------------------------//
+
+static double* A(0);
+static double* y(0);
+static double* params(0);
+
+//----------------------------------------------------------------------------//
+
+void allocate()
+{
+    A = new double[training_set.size()*model.nparams()];
+    y = new double[training_set.size()];
+
+    params = new double[model.nparams()];
+}
+
+//----------------------------------------------------------------------------//
+
+double compute_chisq(const gsl_vector* X, void* unused)
+{
+    model.set_nonlinear_parameters(X->data);
+
+    if (model.nonlinear_parameters_out_of_range())
+        return 1.0e+6;
+
+    for (size_t n = 0; n < training_set.size(); ++n) {
+        std::vector<double> mmm(model.nparams(),0.0);
+        y[n] = training_set[n].nb_energy
+               - model.calculate_nl_part_of_terms(training_set[n].xyz, mmm);
+        for (size_t p = 0; p < model.nparams(); ++p) {
+            A[p + n*model.nparams()] = mmm[p];
+        }
+    }
+
+    double chisq;
+
+    double penaltysq;
+    kit::rwlsq::solve(training_set.size(), model.nparams(),
+                      A, y, ts_weights.data(), alpha, params, chisq, penaltysq);
+
+    std::cout << "<#> chisq = " << chisq
+              << " : penaltysq = " << penaltysq
+              << std::endl;
+
+    if (!gsl_finite (chisq)) {
+      return 10000000.0;
+    }
+
+    return chisq;
+}
+
+//----------------------------------------------------------------------------//
+
+} // namespace linear
+
+////////////////////////////////////////////////////////////////////////////////
+
+} // namespace
+
+////////////////////////////////////////////////////////////////////////////////
+
+int main(int argc, char** argv) {
+    if (argc < 2) {
+        std::cerr << "usage: ./fit-1b <training_set.xyz> [DE] [ridge_alpha] > fit.log"
+                  << std::endl;
+        return 0;
+    }
+
+    long long int duration = std::chrono::duration_cast<std::chrono::milliseconds>(
+                std::chrono::system_clock::now().time_since_epoch()).count();
+
+    srand(duration);
+
+    double x0[2];
+
+      x0[0] = ((double) rand() / (RAND_MAX)) * 3.0 + 1.0;
+      x0[1] = ((double) rand() / (RAND_MAX)) * 3.0 + 1.0;
+
+    model.set_nonlinear_parameters(x0);
+
+    std::cout << "<> using ridge regression with alpha = "
+              << alpha << std::endl;
+
+    {
+        const char fn[] = "fit-1b-initial.cdl";
+        std::ofstream ofs(fn);
+        std::cout << "\n>> dumping initial model as '" << fn << "' >>\n\n";
+        model.as_cdl(ofs);
+    }
+
+    argv++;
+    argc--;
+
+    try {
+        size_t nsys = tset::load_nb_system(*argv, training_set);
+        std::cout << "'" << *(argv++) << "' : "
+                      << nsys << " configurations" << std::endl;
+        if (--argc > 0) E_range = atof(*(argv++));
+
+        if (--argc > 0) alpha = atof(*(argv++));
+
+    } catch (const std::exception& e) {
+        std::cerr << " ** Error ** : " << e.what() << std::endl;
+        return 1;
+    }
+
+    ts_weights = std::vector<double>(training_set.size(),1.0);
+
+    double E_min;
+    size_t N_eff;
+    size_t index_min;
+
+    tset::setup_weights(training_set, E_range, E_min, index_min,
+                       ts_weights, N_eff);
+
+    std::cout << "\n>>   E_min = " << E_min << " kcal/mol; index " << index_min <<
+                 "\n>> E_range = " << E_range << " kcal/mol" <<
+                 "\n\n>> training set size = " << training_set.size()
+              << "\n>>    effective size = " << N_eff << '\n'
+              << std::endl;
+
+    std::vector<double> ts_energies(training_set.size(),0.0);
+    for (size_t n = 0; n < training_set.size(); n++) {
+        // Saving reference energies
+        ts_energies[n] = training_set[n].nb_energy ;
+        x::mon1 m1(training_set[n].xyz.data() + 0);
+
+        double elec_0 = 0.0;
+
+        {
+            int num_sites = 3;
+
+            int isw_sites[num_sites];
+
+            double xyz_sites[num_sites*3];
+            double chg_sites[num_sites];
+            double pol_sites[num_sites];
+            double polfac_sites[num_sites];
+            excluded_set_type excl12;
+            excluded_set_type excl13;
+            excluded_set_type excl14;
+
+            std::fill(isw_sites + 0, isw_sites + 0 + m1.get_nsites(), m1.is_w);
+            std::copy(m1.get_sitecrds(), m1.get_sitecrds() + 3*m1.get_nsites(), xyz_sites + 3*0);
+            std::copy(m1.get_charges(), m1.get_charges() + m1.get_nsites(), chg_sites + 0);
+            std::copy(m1.get_pol(), m1.get_pol() + m1.get_nsites(), pol_sites + 0);
+            std::copy(m1.get_polfacs(), m1.get_polfacs() + m1.get_nsites(), polfac_sites + 0);
+
+
+            for (auto i = m1.get_begin_12(); i != m1.get_end_12(); i++) {
+                std::pair<size_t,size_t> p =
+                    std::make_pair(i->first + 0,
+                                   i->second + 0);
+                excl12.insert(p);
+            }
+
+            for (auto i = m1.get_begin_13(); i != m1.get_end_13(); i++) {
+                std::pair<size_t,size_t> p =
+                    std::make_pair(i->first + 0,
+                                   i->second + 0);
+                excl13.insert(p);
+            }
+
+            for (auto i = m1.get_begin_14(); i != m1.get_end_14(); i++) {
+                std::pair<size_t,size_t> p =
+                    std::make_pair(i->first + 0,
+                                   i->second + 0);
+                excl14.insert(p);
+            }
+
+
+
+            ttm::electrostatics m_electrostatics;
+
+            ttm::smear_ttm4x smr;
+            smr.m_aDD_intra_12 = 0.3;
+            smr.m_aDD_intra_13 = 0.3;
+            smr.m_aDD_intra_14 = 0.055;
+
+            elec_0 = m_electrostatics(num_sites, chg_sites, polfac_sites, pol_sites,
+                                          xyz_sites, excl12, excl13, excl14,
+                                          isw_sites, smr, 0);
+        }
+
+        elec_e.push_back(1*(elec_0));
+
+        training_set[n].nb_energy -= elec_e[n];
+
+        mbnrg_disp disp(training_set[n].xyz);
+        disp_e.push_back(disp.get_dispersion());
+        training_set[n].nb_energy -= disp_e[n];
+
+        #ifdef USE_BUCKINGHAM
+        mbnrg_buck buck(training_set[n].xyz);
+        buck_e.push_back(buck.get_buckingham());
+        training_set[n].nb_energy -= buck_e[n];
+        #endif
+
+    }
+
+    linear::allocate();
+
+    gsl_vector* x = gsl_vector_alloc(model.get_num_nonlinear_params());
+    model.get_nonlinear_parameters(x->data);
+
+    gsl_multimin_function chisq_func;
+
+    chisq_func.n = model.get_num_nonlinear_params();
+    chisq_func.f = linear::compute_chisq;
+
+    gsl_vector* ss = gsl_vector_alloc(model.get_num_nonlinear_params());
+    gsl_vector_set_all(ss, 0.1);
+
+    std::cout << "\n<> initial simplex sides:\n";
+    for (size_t n = 0; n < model.get_num_nonlinear_params(); ++n)
+        std::cout << n << " : " << ss->data[n] << "\n";
+
+    gsl_multimin_fminimizer* s =
+        gsl_multimin_fminimizer_alloc(gsl_multimin_fminimizer_nmsimplex2rand,
+                                      model.get_num_nonlinear_params());
+
+    gsl_multimin_fminimizer_set(s, &chisq_func, x, ss);
+
+    int iter(0), status(0);
+    //
+    // Main optimization loop
+    //
+
+        do {
+        ++iter;
+        status = gsl_multimin_fminimizer_iterate(s);
+
+        if (status)
+             break;
+
+        const double size = gsl_multimin_fminimizer_size(s);
+        status = gsl_multimin_test_size(size, 1e-4);
+        //status = gsl_multimin_test_size(size, 1e-3); //changed it to test convergence
+
+        if (status == GSL_SUCCESS)
+            std::cout << "!!! converged !!!" << std::endl;
+
+        std::cout << iter << ' ' << s->fval << ' ' << size << std::endl;
+        if (iter > 0 && iter%10 == 0) {
+            std::cout << "\n<> solution:\n";
+            for (size_t n = 0; n <  model.get_num_nonlinear_params(); ++n)
+                std::cout << n << " : " << s->x->data[n] << "\n";
+            std::cout << "<>" << std::endl;
+        }
+    } while (status == GSL_CONTINUE && iter < 5000);
+
+    model.set_nonlinear_parameters(s->x->data);
+    linear::compute_chisq(s->x, 0);
+    model.set_linear_parameters(linear::params);
+
+    gsl_vector_free(x);
+    gsl_vector_free(ss);
+    gsl_multimin_fminimizer_free(s);
+
+    //
+    // report
+    //
+
+    for (size_t i = 0; i < training_set.size(); ++i)
+        training_set[i].nb_energy += elec_e[i] + disp_e[i];
+
+        #ifdef USE_BUCKINGHAM
+        for (size_t i = 0; i < training_set.size(); ++i)
+            training_set[i].nb_energy += buck_e[i];
+        #endif
+
+
+    std::ofstream correlation_file;
+    correlation_file.open ("correlation.dat");
+    
+    correlation_file << "#" << std::setw(10) << "index"
+                     << std::setw(15)       << "Reference" 
+                     << std::setw(15)       << "Calculated"
+                     << std::setw(15)       << "Error^2"
+                     << "    \n"; 
+    
+    std::ofstream terms_file;
+    terms_file.open("individual_terms.dat");
+    terms_file << std::setw(10) << "#index"
+                     << std::setw(20)       << "Reference" 
+                     << std::setw(20)       << "Calculated"
+#ifdef USE_BUCKINGHAM
+                     << std::setw(20)       << "Repulsion (TTM-nrg)"
+#endif
+                     << std::setw(20)       << "Polynomials"
+                     << std::setw(20)       << "Dispersion"
+
+                     << std::setw(40)       << "Electrostatics (Permanent + Induced)"
+                     << "    \n";
+
+    double err_L2(0), err_wL2(0), err_Linf(0);
+    double err_L2_lo(0), err_Linf_lo(0), nlo(0);
+    double weight_sum(0);
+
+    for (size_t i = 0; i < training_set.size(); ++i) {
+
+        double E_model = model.calculate(training_set[i].xyz) + elec_e[i] + disp_e[i];
+        #ifdef USE_BUCKINGHAM
+        E_model += buck_e[i];
+        #endif
+
+        const double delta = E_model - training_set[i].nb_energy;
+        if (std::abs(delta) > err_Linf)
+            err_Linf = std::abs(delta);
+
+        correlation_file <<  std::setw(10) << i+1
+                         << std::setw(15) << std::scientific
+                         << std::setprecision(8)  <<  training_set[i].nb_energy
+                         << std::setw(15) <<  E_model
+                         << std::setw(15) <<  delta*delta  << "    \n" ;
+ 
+        terms_file <<  std::setw(10) << i+1
+                         << std::setw(20) << std::scientific
+                         << std::setprecision(8)  <<  training_set[i].nb_energy
+                         << std::setw(20) <<  E_model
+#ifdef USE_BUCKINGHAM
+                         << std::setw(20) <<  buck_e[i]
+#endif
+                         << std::setw(20) << model.calculate(training_set[i].xyz)
+                         << std::setw(20) <<  disp_e[i] 
+                         << std::setw(40) <<  elec_e[i]
+                         << "    \n" ;
+
+        err_L2 += delta*delta;
+        err_wL2 += ts_weights[i]*delta*delta;
+        weight_sum += ts_weights[i];
+
+        if (training_set[i].binding_energy - E_min < E_range) {
+            nlo += 1.0;
+            err_L2_lo += delta*delta;
+            if (std::abs(delta) > err_Linf_lo)
+                err_Linf_lo = std::abs(delta);
+        }
+    }
+
+    correlation_file.close();
+    terms_file.close();
+
+    err_L2 /= training_set.size();
+    err_wL2 /= weight_sum;
+
+    err_L2_lo /= nlo;
+
+    std::cout << "      err[L2] = " << std::sqrt(err_L2) << "    #rmsd of full ts\n"
+              << "     err[wL2] = " << std::sqrt(err_wL2) << "   #weighted rmsd of full ts\n"
+              << "    err[Linf] = " << err_Linf << "   #highest error in full ts\n"
+              << "  err[L2,low] = " << std::sqrt(err_L2_lo) << "   #rmsd of low-energy ts \n"
+              << "err[Linf,low] = " << err_Linf_lo << "   #highest error in low-energy ts "
+              << std::endl;
+
+    //
+    //  save
+    //
+
+    {
+        const char fn[] = "fit-1b.cdl";
+        std::ofstream ofs(fn);
+        std::cout << "\n>> saving as '" << fn << "'\n";
+        model.as_cdl(ofs);
+    }
+
+
+    return 0;
+}
+
@@ -0,0 +1,11 @@
+#ifndef GAMMQ_H
+#define GAMMQ_H
+
+namespace ttm {
+
+double gammq(const double&, const double&);
+double gammln(const double&);
+
+} // namespace ttm
+
+#endif // GAMMQ_H
@@ -0,0 +1,189 @@
+#include "mbnrg_1b_A1B2_fit.h"
+
+////////////////////////////////////////////////////////////////////////////////
+
+namespace {
+
+//----------------------------------------------------------------------------//
+
+void error(int kode) {
+
+    std::cerr << " ** Fatal Error in polyholder_1b_A1B2_fit::load_netcdf() ** :"
+              << nc_strerror(kode) << std::endl;
+    std::exit(EXIT_FAILURE);
+}
+
+} // namespace
+
+////////////////////////////////////////////////////////////////////////////////
+
+namespace mbnrg_1b_A1B2_fit {
+
+void polyholder_1b_A1B2_fit::set_linear_parameters(const double* xxx) {
+  std::copy(xxx, xxx + nparams(), m_poly);
+}
+
+
+void polyholder_1b_A1B2_fit::set_nonlinear_parameters(const double* xxx) { 
+     m_k_x_intra_A_B_1 = *xxx++; 
+    m_k_x_intra_B_B_1 = *xxx++; 
+
+}
+
+//----------------------------------------------------------------------------//
+
+void polyholder_1b_A1B2_fit::get_nonlinear_parameters(double* xxx) 
+ { 
+    *xxx++ = m_k_x_intra_A_B_1; 
+   *xxx++ = m_k_x_intra_B_B_1; 
+
+}
+
+void polyholder_1b_A1B2_fit::write_cdl(std::ostream& os, unsigned npoly, const double* poly) {
+
+    using namespace std;
+
+    ios::fmtflags saved_flags = os.flags();
+
+    os << setprecision(15) << scientific
+       << "netcdf mbnrg_1b_A1B2_fit {" << endl
+       << "  // global attributes " << endl
+       << "  :name = \" mbnrg_1b_A1B2_fit\";" << endl;
+
+    // mbnrg_1b_A1B2_fit::as_cdl(os);
+    os        << "  :k_x_intra_A_B_1 = " << setw(22) << m_k_x_intra_A_B_1 << "; // A^(-1))" << endl 
+       << "  :k_x_intra_B_B_1 = " << setw(22) << m_k_x_intra_B_B_1 << "; // A^(-1))" << endl 
+
+         << "  :ri = " << setw(22) << m_ri << "; // A" << endl
+         << "  :ro = " << setw(22) << m_ro << "; // A" << endl
+         << "  dimensions:" << endl
+         << "  poly = " << npoly << ";" << endl
+         << "  variables:" << endl
+         << "    double poly(poly);" << endl
+         << "data:" << endl;
+
+    os << "poly =" << endl;
+
+    {
+        unsigned n(0);
+        for (n = 0; n + 1 < npoly; ++n)
+            os << std::setw(22) << poly[n] << ", // " << n << endl;
+        os <<  std::setw(22) << poly[n] << "; // " << n << endl << endl;
+    }
+
+    os << "}" << endl;
+    os.flags(saved_flags);
+}
+
+//----------------------------------------------------------------------------//
+bool polyholder_1b_A1B2_fit::nonlinear_parameters_out_of_range() { 
+    const double k_min =  0.0 ;
+    const double k_max =  50.0 ;
+    const double k_min_intra =  0.0 ;
+    const double k_max_intra =  50.0 ;
+
+    const double d_min =  0.0 ;
+    const double d_max =  50.0 ;
+    const double d_min_intra =  0.0 ;
+    const double d_max_intra =  50.0 ;
+
+return false
+       || m_k_x_intra_A_B_1 < k_min 
+       || m_k_x_intra_A_B_1 > k_max 
+       || m_k_x_intra_B_B_1 < k_min 
+       || m_k_x_intra_B_B_1 > k_max ; 
+
+}
+
+void polyholder_1b_A1B2_fit::cart_to_vars(const std::vector<double> xyz, std::vector<double> &vars, double& s, double& gs) { 
+
+
+    vars = std::vector<double>(3,0.0);
+
+    if (false ) {
+         s=0.0;
+         gs = 0.0;
+         return;
+    }
+
+    double sw = 0.0;
+
+
+    const double* coords_A_1_a = xyz.data() + 0;
+
+    const double* coords_B_1_a = xyz.data() + 3;
+
+    const double* coords_B_2_a = xyz.data() + 6;
+
+
+    double w12 =     -9.721486914088159e-02;  //from MBpol
+    double w13 =     -9.721486914088159e-02;
+    double wcross =   9.859272078406150e-02;
+
+    variable vs[3];
+
+    vars[0] = vs[0].v_exp(m_k_x_intra_A_B_1, coords_A_1_a, coords_B_1_a);
+    vars[1] = vs[1].v_exp(m_k_x_intra_A_B_1, coords_A_1_a, coords_B_2_a);
+    vars[2] = vs[2].v_exp(m_k_x_intra_B_B_1, coords_B_1_a, coords_B_2_a);
+
+
+    sw = 1.0;
+
+    s = sw;
+    gs = 0.0;
+}
+
+void polyholder_1b_A1B2_fit::load_netcdf(const char* fn)
+{
+    assert(fn);
+
+    int rc, ncid;
+    if ((rc = nc_open(fn, NC_NOWRITE, &ncid)))
+        error(rc);
+
+#   define RETRIEVE(name) \
+    if ((rc = nc_get_att_double(ncid, NC_GLOBAL, #name , &m_##name))) \
+        error(rc);
+    RETRIEVE(k_x_intra_A_B_1)
+    RETRIEVE(k_x_intra_B_B_1)
+
+
+    RETRIEVE(ri)
+    RETRIEVE(ro)
+
+#   undef RETRIEVE
+
+    int varid;
+
+    if ((rc = nc_inq_varid(ncid, "poly", &varid)))
+        error(rc);
+
+    for (size_t n = 0; n < poly_type_fit::size; ++n) {
+        if ((rc = nc_get_var1_double(ncid, varid, &n, m_poly + n)))
+            error(rc);
+    }
+
+    if ((rc = nc_close(ncid)))
+        error(rc);
+}
+
+//----------------------------------------------------------------------------//
+
+double polyholder_1b_A1B2_fit::f_switch(const double r, double& g)
+{
+    if (r > m_ro) {
+        g = 0.0;
+        return 0.0;
+    } else if (r > m_ri) {
+        const double t1 = M_PI/(m_ro - m_ri);
+        const double x = (r - m_ri)*t1;
+        g = - std::sin(x)*t1/2.0;
+        return (1.0 + std::cos(x))/2.0;
+    } else {
+        g = 0.0;
+        return 1.0;
+    }
+}
+
+} // namespace mbnrg_1b_A1B2_fit
+
@@ -0,0 +1,106 @@
+#ifndef MBNRG_1B_A1B2_FIT
+#define MBNRG_1B_A1B2_FIT
+
+#include <cmath>
+#include <cassert>
+#include <cstdlib>
+#include <iomanip>
+#include <iostream>
+#include <vector>
+
+#include <netcdf.h>
+
+
+#include "constants.h"
+#include "variable.h"
+#include "water_monomer_lp.h"
+#include "poly_1b_A1B2_fit.h"
+
+////////////////////////////////////////////////////////////////////////////////
+
+namespace mbnrg_1b_A1B2_fit {
+
+struct polyholder_1b_A1B2_fit {
+
+    typedef mb_system_fit::poly_model poly_type_fit;
+
+    void cart_to_vars(const std::vector<double> xyz, std::vector<double> &vars, double& s, double& gs);
+
+    double calculate(const std::vector<double> xyz);
+    size_t get_nvars() {return poly_type_fit::n_vars;}
+    size_t get_num_nonlinear_params() {return 2;}
+    void set_nonlinear_parameters(const double*);
+    void set_linear_parameters(const double*);
+    void get_nonlinear_parameters(double*);
+    bool nonlinear_parameters_out_of_range();
+    void load_netcdf(const char* fn);
+
+    inline double calculate_nl_part_of_terms(const std::vector<double> xyz, std::vector<double> &nl_part_of_terms);
+    inline size_t nparams() { return poly_type_fit::size;}
+
+    inline void as_cdl(std::ostream&);
+    void write_cdl(std::ostream&, unsigned, const double*);
+
+  private:
+
+    double m_k_x_intra_A_B_1;
+    double m_k_x_intra_B_B_1;
+protected:
+    double m_ri = 7.0;
+    double m_ro = 8.0;
+
+    double f_switch(const double, double&);
+
+private:
+    double m_poly[poly_type_fit::size];
+
+};
+
+// For fitting
+inline void polyholder_1b_A1B2_fit::as_cdl(std::ostream& os) {
+    write_cdl(os, poly_type_fit::size, m_poly);
+}
+
+
+inline double polyholder_1b_A1B2_fit::calculate_nl_part_of_terms(std::vector<double> xyz, std::vector<double> &nl_part_of_terms) {
+
+    double s, gs;
+    std::vector<double> v(poly_type_fit::n_vars,0.0);
+
+    cart_to_vars(xyz, v, s, gs);
+
+    poly_type_fit polyn;
+    polyn.eval(v.data(), nl_part_of_terms.data());
+    for (unsigned n = 0; n < poly_type_fit::size; ++n)
+        nl_part_of_terms[n] *= s;
+
+    return 0;
+}
+
+inline double polyholder_1b_A1B2_fit::calculate(std::vector<double> xyz) {
+
+    double s, gs;
+    std::vector<double> v(poly_type_fit::n_vars,0.0);
+    std::vector<double> nl_part_of_terms(poly_type_fit::size,0.0);
+
+    cart_to_vars(xyz, v, s, gs);
+
+    poly_type_fit polyn;
+    polyn.eval(v.data(), nl_part_of_terms.data());
+    double energy = 0.0;
+    for (unsigned n = 0; n < poly_type_fit::size; ++n) {
+        nl_part_of_terms[n] *= s*m_poly[n];
+        energy += nl_part_of_terms[n];
+    }
+
+    return energy;
+}
+
+//----------------------------------------------------------------------------//
+
+} // namespace mbnrg_1b_A1B2_fit
+
+////////////////////////////////////////////////////////////////////////////////
+
+#endif
+
@@ -0,0 +1,39 @@
+#ifndef MON1_H
+#define MON1_H
+#include "molecule.h"
+#include "constants.h"
+
+#include <algorithm>
+#include <cstddef>
+
+namespace x   {
+
+   class mon1 : public molecule {
+      public :
+      mon1();
+      ~mon1();
+
+      mon1(double* crd);
+      double* set_sitecrds(double* xyz);
+      double* set_charges(double* xyz);
+      double* set_polfacs(double* atmpolar);
+      double* set_pol();
+      void allocate();
+
+      int get_nsites();
+      int get_realsites();
+      double* get_sitecrds();
+      double* get_charges();
+      double* get_polfacs();
+      double* get_pol();
+
+      excluded_set_type::iterator get_begin_12();
+      excluded_set_type::iterator get_begin_13();
+      excluded_set_type::iterator get_begin_14();
+      excluded_set_type::iterator get_end_12();
+      excluded_set_type::iterator get_end_13();
+      excluded_set_type::iterator get_end_14();
+
+   };
+}
+#endif
@@ -0,0 +1,20 @@
+
+#include "poly_1b_A1B2_fit.h"
+
+namespace mb_system_fit {
+
+void poly_model::eval(const double x[3], double a[6])
+{
+    double p[6];
+    p[0] = x[0] + x[1];
+    p[1] = x[2];
+    p[2] = x[1]*x[2] + x[0]*x[2];
+    p[3] = x[1]*x[1] + x[0]*x[0];
+    p[4] = x[0]*x[1];
+    p[5] = x[2]*x[2];
+
+for(int i = 0; i < 6; ++i)
+        a[i] = p[i];
+
+}
+} // namespace mb_system
@@ -0,0 +1,19 @@
+
+#ifndef POLY_1B_A1B2_H
+#define POLY_1B_A1B2_H
+
+namespace mb_system_fit {
+
+struct poly_model{
+    static const unsigned degree = 2;
+    static const unsigned n_vars = 3;
+
+    static const unsigned size = 6;
+
+    void eval(const double x[n_vars], double*);
+};
+
+} // namespace
+
+#endif
+
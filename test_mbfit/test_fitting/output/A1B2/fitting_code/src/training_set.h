@@ -0,0 +1,21 @@
+#ifndef TRAINING_SET_H
+#define TRAINING_SET_H
+
+#include <cstdlib>
+#include <vector>
+
+namespace tset {
+
+struct nb_system {
+    double binding_energy;
+    double nb_energy;
+    
+    // Note: XYZ is for the real sites
+    std::vector<double> xyz;
+};
+
+size_t load_nb_system(const char* filename, std::vector<nb_system>& ts, bool is_trainig_set = true);
+
+} // namespace tset
+
+#endif // TRAINING_SET_H
@@ -0,0 +1,17 @@
+#ifndef WATER_MONOMER_LP_H
+#define WATER_MONOMER_LP_H
+
+struct monomer {
+    double oh1[3];
+    double oh2[3];
+
+    void setup(const double* ohh,
+               const double& in_plane_g, const double& out_of_plane_g,
+               double x1[3], double x2[3]);
+
+    void grads(const double* g1, const double* g2,
+               const double& in_plane_g, const double& out_of_plane_g,
+               double* grd) const;
+};
+
+#endif // WATER_MONOMER_LP_H
@@ -0,0 +1,98 @@
+#include "poly-model.h"
+    
+namespace mb_system {
+
+double poly_model::eval_direct(const double a[82], const double x[10])
+{
+    double p[82];
+    p[0] = x[0] + x[5] + x[2] + x[4] + x[7] + x[1];
+    p[1] = x[6] + x[9] + x[8] + x[3];
+    p[2] = x[0]*x[7] + x[1]*x[5] + x[2]*x[4];
+    p[3] = x[0]*x[0] + x[2]*x[2] + x[1]*x[1] + x[5]*x[5] + x[7]*x[7] + x[4]*x[4];
+    p[4] = x[3]*x[4] + x[0]*x[8] + x[4]*x[9] + x[5]*x[8] + x[2]*x[6] + x[2]*x[8] + x[0]*x[9] + x[3]*x[7] + x[1]*x[9] + x[3]*x[5] + x[6]*x[7] + x[1]*x[6];
+    p[5] = x[7]*x[8] + x[0]*x[6] + x[0]*x[3] + x[4]*x[8] + x[2]*x[3] + x[5]*x[9] + x[7]*x[9] + x[1]*x[8] + x[5]*x[6] + x[2]*x[9] + x[4]*x[6] + x[1]*x[3];
+    p[6] = x[6]*x[8] + x[3]*x[8] + x[3]*x[9] + x[6]*x[9] + x[3]*x[6] + x[8]*x[9];
+    p[7] = x[2]*x[7] + x[1]*x[7] + x[0]*x[5] + x[0]*x[2] + x[1]*x[2] + x[1]*x[4] + x[5]*x[7] + x[4]*x[7] + x[4]*x[5] + x[0]*x[4] + x[0]*x[1] + x[2]*x[5];
+    p[8] = x[9]*x[9] + x[6]*x[6] + x[8]*x[8] + x[3]*x[3];
+    p[9] = x[5]*x[7]*x[9] + x[0]*x[1]*x[3] + x[1]*x[4]*x[8] + x[1]*x[7]*x[8] + x[1]*x[2]*x[3] + x[0]*x[4]*x[6] + x[2]*x[7]*x[9] + x[4]*x[7]*x[8] + x[0]*x[2]*x[3] + x[4]*x[5]*x[6] + x[0]*x[5]*x[6] + x[2]*x[5]*x[9];
+    p[10] = x[8]*x[8]*x[8] + x[6]*x[6]*x[6] + x[3]*x[3]*x[3] + x[9]*x[9]*x[9];
+    p[11] = x[4]*x[5]*x[7] + x[0]*x[2]*x[5] + x[1]*x[2]*x[7] + x[0]*x[1]*x[4];
+    p[12] = x[1]*x[1]*x[6] + x[6]*x[7]*x[7] + x[3]*x[5]*x[5] + x[1]*x[1]*x[9] + x[3]*x[7]*x[7] + x[5]*x[5]*x[8] + x[4]*x[4]*x[9] + x[2]*x[2]*x[6] + x[0]*x[0]*x[8] + x[2]*x[2]*x[8] + x[3]*x[4]*x[4] + x[0]*x[0]*x[9];
+    p[13] = x[2]*x[6]*x[8] + x[3]*x[6]*x[7] + x[1]*x[6]*x[9] + x[0]*x[8]*x[9] + x[3]*x[5]*x[8] + x[3]*x[4]*x[9];
+    p[14] = x[3]*x[3]*x[7] + x[2]*x[8]*x[8] + x[1]*x[6]*x[6] + x[1]*x[9]*x[9] + x[0]*x[9]*x[9] + x[4]*x[9]*x[9] + x[3]*x[3]*x[5] + x[2]*x[6]*x[6] + x[6]*x[6]*x[7] + x[3]*x[3]*x[4] + x[5]*x[8]*x[8] + x[0]*x[8]*x[8];
+    p[15] = x[5]*x[5]*x[7] + x[1]*x[7]*x[7] + x[0]*x[0]*x[5] + x[0]*x[0]*x[4] + x[0]*x[5]*x[5] + x[4]*x[7]*x[7] + x[0]*x[2]*x[2] + x[0]*x[0]*x[1] + x[0]*x[1]*x[1] + x[2]*x[2]*x[7] + x[0]*x[0]*x[2] + x[5]*x[7]*x[7] + x[1]*x[2]*x[2] + x[1]*x[1]*x[2] + x[4]*x[4]*x[7] + x[2]*x[2]*x[5] + x[1]*x[1]*x[7] + x[4]*x[4]*x[5] + x[2]*x[5]*x[5] + x[1]*x[1]*x[4] + x[4]*x[5]*x[5] + x[1]*x[4]*x[4] + x[2]*x[7]*x[7] + x[0]*x[4]*x[4];
+    p[16] = x[0]*x[4]*x[8] + x[0]*x[1]*x[8] + x[0]*x[2]*x[9] + x[0]*x[2]*x[6] + x[4]*x[6]*x[7] + x[2]*x[3]*x[7] + x[0]*x[1]*x[6] + x[5]*x[6]*x[7] + x[2]*x[5]*x[6] + x[0]*x[5]*x[9] + x[1]*x[2]*x[9] + x[1]*x[7]*x[9] + x[2]*x[3]*x[5] + x[1]*x[3]*x[4] + x[0]*x[3]*x[5] + x[1]*x[2]*x[8] + x[0]*x[3]*x[4] + x[5]*x[7]*x[8] + x[1]*x[3]*x[7] + x[4]*x[7]*x[9] + x[4]*x[5]*x[8] + x[1]*x[4]*x[6] + x[2]*x[7]*x[8] + x[4]*x[5]*x[9];
+    p[17] = x[5]*x[9]*x[9] + x[5]*x[6]*x[6] + x[1]*x[3]*x[3] + x[2]*x[3]*x[3] + x[2]*x[9]*x[9] + x[4]*x[6]*x[6] + x[4]*x[8]*x[8] + x[7]*x[9]*x[9] + x[0]*x[6]*x[6] + x[1]*x[8]*x[8] + x[7]*x[8]*x[8] + x[0]*x[3]*x[3];
+    p[18] = x[1]*x[1]*x[5] + x[1]*x[5]*x[5] + x[0]*x[0]*x[7] + x[0]*x[7]*x[7] + x[2]*x[4]*x[4] + x[2]*x[2]*x[4];
+    p[19] = x[1]*x[6]*x[8] + x[3]*x[5]*x[6] + x[3]*x[7]*x[8] + x[3]*x[7]*x[9] + x[5]*x[6]*x[8] + x[0]*x[6]*x[8] + x[3]*x[5]*x[9] + x[6]*x[7]*x[8] + x[2]*x[3]*x[8] + x[0]*x[6]*x[9] + x[4]*x[6]*x[9] + x[1]*x[3]*x[9] + x[2]*x[8]*x[9] + x[0]*x[3]*x[8] + x[1]*x[3]*x[6] + x[0]*x[3]*x[9] + x[6]*x[7]*x[9] + x[1]*x[8]*x[9] + x[3]*x[4]*x[8] + x[2]*x[6]*x[9] + x[5]*x[8]*x[9] + x[4]*x[8]*x[9] + x[2]*x[3]*x[6] + x[3]*x[4]*x[6];
+    p[20] = x[0]*x[0]*x[0] + x[5]*x[5]*x[5] + x[7]*x[7]*x[7] + x[2]*x[2]*x[2] + x[1]*x[1]*x[1] + x[4]*x[4]*x[4];
+    p[21] = x[0]*x[1]*x[7] + x[2]*x[4]*x[5] + x[0]*x[2]*x[7] + x[1]*x[4]*x[5] + x[0]*x[5]*x[7] + x[1]*x[2]*x[5] + x[0]*x[1]*x[5] + x[0]*x[4]*x[7] + x[0]*x[2]*x[4] + x[1]*x[2]*x[4] + x[2]*x[4]*x[7] + x[1]*x[5]*x[7];
+    p[22] = x[5]*x[6]*x[9] + x[7]*x[8]*x[9] + x[4]*x[6]*x[8] + x[0]*x[3]*x[6] + x[1]*x[3]*x[8] + x[2]*x[3]*x[9];
+    p[23] = x[1]*x[4]*x[9] + x[3]*x[4]*x[7] + x[1]*x[2]*x[6] + x[3]*x[5]*x[7] + x[0]*x[5]*x[8] + x[1]*x[6]*x[7] + x[2]*x[6]*x[7] + x[0]*x[2]*x[8] + x[3]*x[4]*x[5] + x[0]*x[4]*x[9] + x[0]*x[1]*x[9] + x[2]*x[5]*x[8];
+    p[24] = x[0]*x[3]*x[7] + x[2]*x[4]*x[9] + x[0]*x[7]*x[8] + x[1]*x[5]*x[6] + x[2]*x[4]*x[6] + x[1]*x[5]*x[9] + x[1]*x[5]*x[8] + x[1]*x[3]*x[5] + x[2]*x[4]*x[8] + x[0]*x[6]*x[7] + x[0]*x[7]*x[9] + x[2]*x[3]*x[4];
+    p[25] = x[2]*x[2]*x[9] + x[0]*x[0]*x[3] + x[1]*x[1]*x[8] + x[5]*x[5]*x[6] + x[4]*x[4]*x[8] + x[7]*x[7]*x[9] + x[2]*x[2]*x[3] + x[1]*x[1]*x[3] + x[4]*x[4]*x[6] + x[7]*x[7]*x[8] + x[0]*x[0]*x[6] + x[5]*x[5]*x[9];
+    p[26] = x[2]*x[5]*x[7] + x[0]*x[4]*x[5] + x[1]*x[4]*x[7] + x[0]*x[1]*x[2];
+    p[27] = x[3]*x[9]*x[9] + x[6]*x[6]*x[9] + x[3]*x[3]*x[8] + x[6]*x[8]*x[8] + x[8]*x[9]*x[9] + x[3]*x[3]*x[6] + x[6]*x[6]*x[8] + x[3]*x[6]*x[6] + x[6]*x[9]*x[9] + x[3]*x[3]*x[9] + x[3]*x[8]*x[8] + x[8]*x[8]*x[9];
+    p[28] = x[6]*x[8]*x[9] + x[3]*x[6]*x[9] + x[3]*x[6]*x[8] + x[3]*x[8]*x[9];
+    p[29] = x[3]*x[3]*x[6]*x[8] + x[6]*x[6]*x[8]*x[9] + x[6]*x[8]*x[8]*x[9] + x[3]*x[3]*x[8]*x[9] + x[3]*x[3]*x[6]*x[9] + x[3]*x[8]*x[9]*x[9] + x[6]*x[8]*x[9]*x[9] + x[3]*x[8]*x[8]*x[9] + x[3]*x[6]*x[6]*x[8] + x[3]*x[6]*x[6]*x[9] + x[3]*x[6]*x[8]*x[8] + x[3]*x[6]*x[9]*x[9];
+    p[30] = x[0]*x[3]*x[3]*x[3] + x[2]*x[9]*x[9]*x[9] + x[4]*x[8]*x[8]*x[8] + x[5]*x[6]*x[6]*x[6] + x[7]*x[8]*x[8]*x[8] + x[4]*x[6]*x[6]*x[6] + x[0]*x[6]*x[6]*x[6] + x[7]*x[9]*x[9]*x[9] + x[1]*x[8]*x[8]*x[8] + x[1]*x[3]*x[3]*x[3] + x[2]*x[3]*x[3]*x[3] + x[5]*x[9]*x[9]*x[9];
+    p[31] = x[0]*x[0]*x[3]*x[7] + x[2]*x[4]*x[4]*x[8] + x[2]*x[4]*x[4]*x[6] + x[1]*x[1]*x[3]*x[5] + x[0]*x[7]*x[7]*x[9] + x[1]*x[1]*x[5]*x[8] + x[2]*x[2]*x[4]*x[9] + x[0]*x[7]*x[7]*x[8] + x[2]*x[2]*x[3]*x[4] + x[1]*x[5]*x[5]*x[9] + x[1]*x[5]*x[5]*x[6] + x[0]*x[0]*x[6]*x[7];
+    p[32] = x[0]*x[1]*x[3]*x[4] + x[0]*x[2]*x[5]*x[6] + x[4]*x[5]*x[7]*x[9] + x[0]*x[1]*x[4]*x[8] + x[4]*x[5]*x[7]*x[8] + x[1]*x[2]*x[7]*x[8] + x[0]*x[2]*x[5]*x[9] + x[4]*x[5]*x[6]*x[7] + x[0]*x[1]*x[4]*x[6] + x[0]*x[2]*x[3]*x[5] + x[1]*x[2]*x[3]*x[7] + x[1]*x[2]*x[7]*x[9];
+    p[33] = x[0]*x[1]*x[6]*x[6] + x[1]*x[3]*x[3]*x[7] + x[4]*x[5]*x[8]*x[8] + x[1]*x[2]*x[9]*x[9] + x[2]*x[3]*x[3]*x[5] + x[5]*x[6]*x[6]*x[7] + x[4]*x[7]*x[9]*x[9] + x[0]*x[2]*x[6]*x[6] + x[5]*x[7]*x[8]*x[8] + x[0]*x[4]*x[8]*x[8] + x[2]*x[5]*x[6]*x[6] + x[4]*x[5]*x[9]*x[9] + x[1]*x[2]*x[8]*x[8] + x[0]*x[2]*x[9]*x[9] + x[0]*x[5]*x[9]*x[9] + x[1]*x[4]*x[6]*x[6] + x[0]*x[1]*x[8]*x[8] + x[1]*x[7]*x[9]*x[9] + x[2]*x[7]*x[8]*x[8] + x[1]*x[3]*x[3]*x[4] + x[2]*x[3]*x[3]*x[7] + x[0]*x[3]*x[3]*x[4] + x[0]*x[3]*x[3]*x[5] + x[4]*x[6]*x[6]*x[7];
+    p[34] = x[2]*x[2]*x[4]*x[4] + x[0]*x[0]*x[7]*x[7] + x[1]*x[1]*x[5]*x[5];
+    p[35] = x[3]*x[9]*x[9]*x[9] + x[3]*x[3]*x[3]*x[9] + x[3]*x[3]*x[3]*x[6] + x[6]*x[8]*x[8]*x[8] + x[6]*x[9]*x[9]*x[9] + x[6]*x[6]*x[6]*x[8] + x[8]*x[9]*x[9]*x[9] + x[3]*x[3]*x[3]*x[8] + x[3]*x[6]*x[6]*x[6] + x[3]*x[8]*x[8]*x[8] + x[6]*x[6]*x[6]*x[9] + x[8]*x[8]*x[8]*x[9];
+    p[36] = x[1]*x[2]*x[4]*x[5] + x[0]*x[2]*x[4]*x[7] + x[0]*x[1]*x[5]*x[7];
+    p[37] = x[1]*x[6]*x[9]*x[9] + x[3]*x[3]*x[4]*x[9] + x[3]*x[6]*x[6]*x[7] + x[0]*x[8]*x[8]*x[9] + x[2]*x[6]*x[6]*x[8] + x[3]*x[3]*x[5]*x[8] + x[3]*x[4]*x[9]*x[9] + x[3]*x[3]*x[6]*x[7] + x[2]*x[6]*x[8]*x[8] + x[1]*x[6]*x[6]*x[9] + x[3]*x[5]*x[8]*x[8] + x[0]*x[8]*x[9]*x[9];
+    p[38] = x[2]*x[2]*x[4]*x[8] + x[1]*x[5]*x[5]*x[8] + x[1]*x[3]*x[5]*x[5] + x[0]*x[0]*x[7]*x[8] + x[2]*x[4]*x[4]*x[9] + x[0]*x[0]*x[7]*x[9] + x[0]*x[6]*x[7]*x[7] + x[1]*x[1]*x[5]*x[9] + x[0]*x[3]*x[7]*x[7] + x[2]*x[3]*x[4]*x[4] + x[2]*x[2]*x[4]*x[6] + x[1]*x[1]*x[5]*x[6];
+    p[39] = x[3]*x[5]*x[8]*x[9] + x[0]*x[6]*x[8]*x[9] + x[0]*x[3]*x[8]*x[9] + x[3]*x[4]*x[8]*x[9] + x[2]*x[6]*x[8]*x[9] + x[3]*x[6]*x[7]*x[9] + x[3]*x[4]*x[6]*x[9] + x[3]*x[5]*x[6]*x[8] + x[3]*x[6]*x[7]*x[8] + x[2]*x[3]*x[6]*x[8] + x[1]*x[3]*x[6]*x[9] + x[1]*x[6]*x[8]*x[9];
+    p[40] = x[0]*x[1]*x[6]*x[9] + x[2]*x[5]*x[6]*x[8] + x[2]*x[3]*x[6]*x[7] + x[2]*x[3]*x[5]*x[8] + x[1]*x[2]*x[6]*x[8] + x[0]*x[5]*x[8]*x[9] + x[0]*x[1]*x[8]*x[9] + x[3]*x[4]*x[5]*x[8] + x[1]*x[3]*x[4]*x[9] + x[2]*x[6]*x[7]*x[8] + x[0]*x[4]*x[8]*x[9] + x[3]*x[4]*x[7]*x[9] + x[1]*x[2]*x[6]*x[9] + x[0]*x[2]*x[8]*x[9] + x[0]*x[3]*x[4]*x[9] + x[3]*x[4]*x[5]*x[9] + x[3]*x[5]*x[6]*x[7] + x[1]*x[6]*x[7]*x[9] + x[1]*x[4]*x[6]*x[9] + x[0]*x[2]*x[6]*x[8] + x[3]*x[5]*x[7]*x[8] + x[3]*x[4]*x[6]*x[7] + x[1]*x[3]*x[6]*x[7] + x[0]*x[3]*x[5]*x[8];
+    p[41] = x[0]*x[0]*x[0]*x[1] + x[4]*x[4]*x[4]*x[5] + x[4]*x[5]*x[5]*x[5] + x[2]*x[7]*x[7]*x[7] + x[1]*x[1]*x[1]*x[2] + x[1]*x[4]*x[4]*x[4] + x[0]*x[0]*x[0]*x[4] + x[0]*x[1]*x[1]*x[1] + x[0]*x[5]*x[5]*x[5] + x[4]*x[7]*x[7]*x[7] + x[0]*x[2]*x[2]*x[2] + x[2]*x[5]*x[5]*x[5] + x[5]*x[5]*x[5]*x[7] + x[2]*x[2]*x[2]*x[7] + x[1]*x[1]*x[1]*x[4] + x[1]*x[2]*x[2]*x[2] + x[4]*x[4]*x[4]*x[7] + x[0]*x[0]*x[0]*x[2] + x[1]*x[1]*x[1]*x[7] + x[0]*x[0]*x[0]*x[5] + x[2]*x[2]*x[2]*x[5] + x[1]*x[7]*x[7]*x[7] + x[0]*x[4]*x[4]*x[4] + x[5]*x[7]*x[7]*x[7];
+    p[42] = x[3]*x[4]*x[8]*x[8] + x[6]*x[7]*x[8]*x[8] + x[0]*x[3]*x[3]*x[8] + x[1]*x[3]*x[3]*x[9] + x[3]*x[7]*x[8]*x[8] + x[2]*x[3]*x[3]*x[6] + x[3]*x[4]*x[6]*x[6] + x[5]*x[8]*x[9]*x[9] + x[0]*x[6]*x[6]*x[8] + x[3]*x[7]*x[9]*x[9] + x[3]*x[5]*x[6]*x[6] + x[0]*x[6]*x[6]*x[9] + x[3]*x[5]*x[9]*x[9] + x[4]*x[8]*x[8]*x[9] + x[6]*x[7]*x[9]*x[9] + x[2]*x[8]*x[9]*x[9] + x[1]*x[3]*x[3]*x[6] + x[2]*x[3]*x[3]*x[8] + x[5]*x[6]*x[6]*x[8] + x[1]*x[6]*x[8]*x[8] + x[1]*x[8]*x[8]*x[9] + x[4]*x[6]*x[6]*x[9] + x[2]*x[6]*x[9]*x[9] + x[0]*x[3]*x[3]*x[9];
+    p[43] = x[0]*x[4]*x[6]*x[9] + x[3]*x[5]*x[7]*x[9] + x[1]*x[4]*x[8]*x[9] + x[1]*x[6]*x[7]*x[8] + x[0]*x[1]*x[3]*x[9] + x[0]*x[2]*x[3]*x[8] + x[2]*x[6]*x[7]*x[9] + x[3]*x[4]*x[7]*x[8] + x[2]*x[5]*x[8]*x[9] + x[1]*x[2]*x[3]*x[6] + x[0]*x[5]*x[6]*x[8] + x[3]*x[4]*x[5]*x[6];
+    p[44] = x[0]*x[3]*x[4]*x[5] + x[1]*x[4]*x[6]*x[7] + x[2]*x[5]*x[7]*x[8] + x[0]*x[1]*x[2]*x[9] + x[0]*x[4]*x[5]*x[9] + x[2]*x[3]*x[5]*x[7] + x[1]*x[3]*x[4]*x[7] + x[2]*x[5]*x[6]*x[7] + x[1]*x[4]*x[7]*x[9] + x[0]*x[1]*x[2]*x[6] + x[0]*x[4]*x[5]*x[8] + x[0]*x[1]*x[2]*x[8];
+    p[45] = x[0]*x[2]*x[4]*x[5] + x[0]*x[2]*x[5]*x[7] + x[1]*x[2]*x[4]*x[7] + x[2]*x[4]*x[5]*x[7] + x[0]*x[1]*x[4]*x[7] + x[0]*x[1]*x[4]*x[5] + x[0]*x[4]*x[5]*x[7] + x[0]*x[1]*x[2]*x[5] + x[0]*x[1]*x[2]*x[7] + x[1]*x[2]*x[5]*x[7] + x[1]*x[4]*x[5]*x[7] + x[0]*x[1]*x[2]*x[4];
+    p[46] = x[0]*x[0]*x[1]*x[5] + x[1]*x[2]*x[2]*x[5] + x[2]*x[4]*x[5]*x[5] + x[2]*x[4]*x[7]*x[7] + x[0]*x[1]*x[1]*x[7] + x[0]*x[0]*x[2]*x[4] + x[1]*x[4]*x[4]*x[5] + x[0]*x[4]*x[4]*x[7] + x[0]*x[5]*x[5]*x[7] + x[1]*x[5]*x[7]*x[7] + x[1]*x[1]*x[2]*x[4] + x[0]*x[2]*x[2]*x[7];
+    p[47] = x[5]*x[5]*x[5]*x[8] + x[4]*x[4]*x[4]*x[9] + x[3]*x[5]*x[5]*x[5] + x[6]*x[7]*x[7]*x[7] + x[1]*x[1]*x[1]*x[9] + x[0]*x[0]*x[0]*x[9] + x[3]*x[4]*x[4]*x[4] + x[2]*x[2]*x[2]*x[6] + x[2]*x[2]*x[2]*x[8] + x[1]*x[1]*x[1]*x[6] + x[3]*x[7]*x[7]*x[7] + x[0]*x[0]*x[0]*x[8];
+    p[48] = x[1]*x[3]*x[4]*x[6] + x[0]*x[1]*x[6]*x[8] + x[5]*x[6]*x[7]*x[8] + x[4]*x[5]*x[8]*x[9] + x[1]*x[3]*x[7]*x[9] + x[0]*x[3]*x[4]*x[8] + x[0]*x[3]*x[5]*x[9] + x[2]*x[3]*x[5]*x[6] + x[2]*x[3]*x[7]*x[8] + x[1]*x[2]*x[8]*x[9] + x[4]*x[6]*x[7]*x[9] + x[0]*x[2]*x[6]*x[9];
+    p[49] = x[0]*x[0]*x[4]*x[8] + x[5]*x[6]*x[7]*x[7] + x[0]*x[0]*x[5]*x[9] + x[1]*x[3]*x[4]*x[4] + x[5]*x[5]*x[7]*x[8] + x[0]*x[0]*x[2]*x[9] + x[0]*x[3]*x[5]*x[5] + x[0]*x[2]*x[2]*x[6] + x[0]*x[0]*x[1]*x[8] + x[1]*x[1]*x[7]*x[9] + x[1]*x[3]*x[7]*x[7] + x[4]*x[4]*x[5]*x[9] + x[1]*x[1]*x[2]*x[9] + x[0]*x[1]*x[1]*x[6] + x[1]*x[2]*x[2]*x[8] + x[2]*x[3]*x[5]*x[5] + x[4]*x[5]*x[5]*x[8] + x[4]*x[4]*x[7]*x[9] + x[4]*x[6]*x[7]*x[7] + x[2]*x[2]*x[7]*x[8] + x[2]*x[2]*x[5]*x[6] + x[2]*x[3]*x[7]*x[7] + x[1]*x[1]*x[4]*x[6] + x[0]*x[3]*x[4]*x[4];
+    p[50] = x[1]*x[2]*x[7]*x[7] + x[4]*x[4]*x[5]*x[7] + x[4]*x[5]*x[7]*x[7] + x[0]*x[0]*x[2]*x[5] + x[0]*x[2]*x[2]*x[5] + x[0]*x[0]*x[1]*x[4] + x[1]*x[2]*x[2]*x[7] + x[0]*x[2]*x[5]*x[5] + x[0]*x[1]*x[4]*x[4] + x[1]*x[1]*x[2]*x[7] + x[0]*x[1]*x[1]*x[4] + x[4]*x[5]*x[5]*x[7];
+    p[51] = x[0]*x[0]*x[2]*x[2] + x[5]*x[5]*x[7]*x[7] + x[1]*x[1]*x[2]*x[2] + x[4]*x[4]*x[7]*x[7] + x[0]*x[0]*x[1]*x[1] + x[4]*x[4]*x[5]*x[5] + x[0]*x[0]*x[5]*x[5] + x[1]*x[1]*x[4]*x[4] + x[2]*x[2]*x[7]*x[7] + x[2]*x[2]*x[5]*x[5] + x[1]*x[1]*x[7]*x[7] + x[0]*x[0]*x[4]*x[4];
+    p[52] = x[1]*x[1]*x[9]*x[9] + x[3]*x[3]*x[7]*x[7] + x[2]*x[2]*x[6]*x[6] + x[6]*x[6]*x[7]*x[7] + x[1]*x[1]*x[6]*x[6] + x[4]*x[4]*x[9]*x[9] + x[5]*x[5]*x[8]*x[8] + x[0]*x[0]*x[8]*x[8] + x[3]*x[3]*x[5]*x[5] + x[2]*x[2]*x[8]*x[8] + x[0]*x[0]*x[9]*x[9] + x[3]*x[3]*x[4]*x[4];
+    p[53] = x[5]*x[7]*x[8]*x[9] + x[1]*x[3]*x[7]*x[8] + x[0]*x[4]*x[6]*x[8] + x[0]*x[3]*x[4]*x[6] + x[4]*x[6]*x[7]*x[8] + x[2]*x[3]*x[5]*x[9] + x[1]*x[3]*x[4]*x[8] + x[0]*x[1]*x[3]*x[6] + x[0]*x[2]*x[3]*x[6] + x[1]*x[2]*x[3]*x[8] + x[5]*x[6]*x[7]*x[9] + x[2]*x[5]*x[6]*x[9] + x[0]*x[1]*x[3]*x[8] + x[2]*x[3]*x[7]*x[9] + x[1]*x[4]*x[6]*x[8] + x[4]*x[5]*x[6]*x[8] + x[4]*x[7]*x[8]*x[9] + x[0]*x[5]*x[6]*x[9] + x[4]*x[5]*x[6]*x[9] + x[0]*x[3]*x[5]*x[6] + x[0]*x[2]*x[3]*x[9] + x[1]*x[2]*x[3]*x[9] + x[1]*x[7]*x[8]*x[9] + x[2]*x[7]*x[8]*x[9];
+    p[54] = x[1]*x[1]*x[1]*x[3] + x[4]*x[4]*x[4]*x[8] + x[7]*x[7]*x[7]*x[8] + x[7]*x[7]*x[7]*x[9] + x[2]*x[2]*x[2]*x[9] + x[1]*x[1]*x[1]*x[8] + x[2]*x[2]*x[2]*x[3] + x[0]*x[0]*x[0]*x[3] + x[5]*x[5]*x[5]*x[9] + x[5]*x[5]*x[5]*x[6] + x[0]*x[0]*x[0]*x[6] + x[4]*x[4]*x[4]*x[6];
+    p[55] = x[1]*x[7]*x[8]*x[8] + x[2]*x[7]*x[9]*x[9] + x[2]*x[5]*x[9]*x[9] + x[0]*x[2]*x[3]*x[3] + x[4]*x[7]*x[8]*x[8] + x[1]*x[2]*x[3]*x[3] + x[0]*x[4]*x[6]*x[6] + x[4]*x[5]*x[6]*x[6] + x[0]*x[5]*x[6]*x[6] + x[5]*x[7]*x[9]*x[9] + x[0]*x[1]*x[3]*x[3] + x[1]*x[4]*x[8]*x[8];
+    p[56] = x[2]*x[6]*x[6]*x[9] + x[2]*x[8]*x[8]*x[9] + x[6]*x[6]*x[7]*x[9] + x[2]*x[3]*x[6]*x[6] + x[2]*x[3]*x[8]*x[8] + x[3]*x[3]*x[5]*x[9] + x[0]*x[6]*x[9]*x[9] + x[1]*x[3]*x[6]*x[6] + x[5]*x[8]*x[8]*x[9] + x[1]*x[3]*x[9]*x[9] + x[0]*x[3]*x[8]*x[8] + x[0]*x[6]*x[8]*x[8] + x[5]*x[6]*x[8]*x[8] + x[3]*x[3]*x[4]*x[8] + x[1]*x[6]*x[6]*x[8] + x[3]*x[3]*x[7]*x[9] + x[3]*x[3]*x[5]*x[6] + x[3]*x[3]*x[4]*x[6] + x[6]*x[6]*x[7]*x[8] + x[3]*x[3]*x[7]*x[8] + x[0]*x[3]*x[9]*x[9] + x[1]*x[8]*x[9]*x[9] + x[4]*x[8]*x[9]*x[9] + x[4]*x[6]*x[9]*x[9];
+    p[57] = x[0]*x[3]*x[6]*x[8] + x[6]*x[7]*x[8]*x[9] + x[3]*x[5]*x[6]*x[9] + x[0]*x[3]*x[6]*x[9] + x[5]*x[6]*x[8]*x[9] + x[3]*x[7]*x[8]*x[9] + x[2]*x[3]*x[8]*x[9] + x[2]*x[3]*x[6]*x[9] + x[3]*x[4]*x[6]*x[8] + x[4]*x[6]*x[8]*x[9] + x[1]*x[3]*x[6]*x[8] + x[1]*x[3]*x[8]*x[9];
+    p[58] = x[1]*x[1]*x[1]*x[1] + x[0]*x[0]*x[0]*x[0] + x[7]*x[7]*x[7]*x[7] + x[4]*x[4]*x[4]*x[4] + x[5]*x[5]*x[5]*x[5] + x[2]*x[2]*x[2]*x[2];
+    p[59] = x[0]*x[3]*x[7]*x[8] + x[0]*x[6]*x[7]*x[8] + x[2]*x[3]*x[4]*x[8] + x[1]*x[3]*x[5]*x[9] + x[2]*x[3]*x[4]*x[6] + x[0]*x[6]*x[7]*x[9] + x[2]*x[4]*x[6]*x[9] + x[1]*x[5]*x[6]*x[8] + x[0]*x[3]*x[7]*x[9] + x[1]*x[5]*x[8]*x[9] + x[2]*x[4]*x[8]*x[9] + x[1]*x[3]*x[5]*x[6];
+    p[60] = x[3]*x[3]*x[3]*x[3] + x[9]*x[9]*x[9]*x[9] + x[6]*x[6]*x[6]*x[6] + x[8]*x[8]*x[8]*x[8];
+    p[61] = x[3]*x[6]*x[8]*x[9];
+    p[62] = x[6]*x[6]*x[9]*x[9] + x[8]*x[8]*x[9]*x[9] + x[3]*x[3]*x[9]*x[9] + x[3]*x[3]*x[6]*x[6] + x[6]*x[6]*x[8]*x[8] + x[3]*x[3]*x[8]*x[8];
+    p[63] = x[4]*x[4]*x[6]*x[8] + x[2]*x[2]*x[3]*x[9] + x[7]*x[7]*x[8]*x[9] + x[1]*x[1]*x[3]*x[8] + x[0]*x[0]*x[3]*x[6] + x[5]*x[5]*x[6]*x[9];
+    p[64] = x[1]*x[4]*x[7]*x[8] + x[0]*x[4]*x[5]*x[6] + x[0]*x[1]*x[2]*x[3] + x[2]*x[5]*x[7]*x[9];
+    p[65] = x[3]*x[3]*x[4]*x[5] + x[2]*x[5]*x[8]*x[8] + x[1]*x[4]*x[9]*x[9] + x[1]*x[6]*x[6]*x[7] + x[3]*x[3]*x[5]*x[7] + x[0]*x[4]*x[9]*x[9] + x[2]*x[6]*x[6]*x[7] + x[1]*x[2]*x[6]*x[6] + x[3]*x[3]*x[4]*x[7] + x[0]*x[5]*x[8]*x[8] + x[0]*x[1]*x[9]*x[9] + x[0]*x[2]*x[8]*x[8];
+    p[66] = x[1]*x[5]*x[6]*x[6] + x[1]*x[5]*x[8]*x[8] + x[2]*x[3]*x[3]*x[4] + x[2]*x[4]*x[8]*x[8] + x[2]*x[4]*x[9]*x[9] + x[0]*x[7]*x[9]*x[9] + x[1]*x[5]*x[9]*x[9] + x[0]*x[6]*x[6]*x[7] + x[0]*x[7]*x[8]*x[8] + x[0]*x[3]*x[3]*x[7] + x[2]*x[4]*x[6]*x[6] + x[1]*x[3]*x[3]*x[5];
+    p[67] = x[0]*x[2]*x[3]*x[4] + x[2]*x[4]*x[7]*x[8] + x[1]*x[2]*x[5]*x[9] + x[0]*x[2]*x[7]*x[9] + x[1]*x[2]*x[3]*x[4] + x[0]*x[2]*x[4]*x[6] + x[2]*x[4]*x[5]*x[6] + x[1]*x[5]*x[7]*x[8] + x[1]*x[5]*x[7]*x[9] + x[0]*x[1]*x[5]*x[6] + x[1]*x[2]*x[4]*x[8] + x[0]*x[5]*x[7]*x[9] + x[1]*x[4]*x[5]*x[6] + x[2]*x[4]*x[7]*x[9] + x[0]*x[4]*x[6]*x[7] + x[1]*x[2]*x[3]*x[5] + x[0]*x[1]*x[3]*x[5] + x[0]*x[5]*x[6]*x[7] + x[2]*x[4]*x[5]*x[9] + x[0]*x[4]*x[7]*x[8] + x[0]*x[2]*x[3]*x[7] + x[0]*x[1]*x[7]*x[8] + x[0]*x[1]*x[3]*x[7] + x[1]*x[4]*x[5]*x[8];
+    p[68] = x[0]*x[0]*x[0]*x[7] + x[2]*x[4]*x[4]*x[4] + x[0]*x[7]*x[7]*x[7] + x[2]*x[2]*x[2]*x[4] + x[1]*x[1]*x[1]*x[5] + x[1]*x[5]*x[5]*x[5];
+    p[69] = x[3]*x[5]*x[5]*x[9] + x[0]*x[0]*x[6]*x[8] + x[2]*x[2]*x[6]*x[9] + x[1]*x[1]*x[3]*x[9] + x[3]*x[7]*x[7]*x[8] + x[0]*x[0]*x[3]*x[9] + x[2]*x[2]*x[3]*x[6] + x[3]*x[4]*x[4]*x[8] + x[3]*x[4]*x[4]*x[6] + x[1]*x[1]*x[6]*x[8] + x[2]*x[2]*x[3]*x[8] + x[1]*x[1]*x[8]*x[9] + x[3]*x[7]*x[7]*x[9] + x[5]*x[5]*x[8]*x[9] + x[1]*x[1]*x[3]*x[6] + x[4]*x[4]*x[6]*x[9] + x[3]*x[5]*x[5]*x[6] + x[0]*x[0]*x[6]*x[9] + x[5]*x[5]*x[6]*x[8] + x[2]*x[2]*x[8]*x[9] + x[0]*x[0]*x[3]*x[8] + x[4]*x[4]*x[8]*x[9] + x[6]*x[7]*x[7]*x[9] + x[6]*x[7]*x[7]*x[8];
+    p[70] = x[1]*x[2]*x[5]*x[5] + x[1]*x[1]*x[4]*x[5] + x[0]*x[1]*x[5]*x[5] + x[2]*x[4]*x[4]*x[5] + x[0]*x[1]*x[7]*x[7] + x[1]*x[2]*x[2]*x[4] + x[0]*x[2]*x[2]*x[4] + x[0]*x[2]*x[4]*x[4] + x[0]*x[2]*x[7]*x[7] + x[2]*x[2]*x[4]*x[5] + x[0]*x[1]*x[1]*x[5] + x[2]*x[4]*x[4]*x[7] + x[0]*x[4]*x[7]*x[7] + x[1]*x[5]*x[5]*x[7] + x[0]*x[5]*x[7]*x[7] + x[0]*x[0]*x[5]*x[7] + x[0]*x[0]*x[4]*x[7] + x[0]*x[0]*x[2]*x[7] + x[1]*x[4]*x[5]*x[5] + x[1]*x[2]*x[4]*x[4] + x[1]*x[1]*x[5]*x[7] + x[0]*x[0]*x[1]*x[7] + x[1]*x[1]*x[2]*x[5] + x[2]*x[2]*x[4]*x[7];
+    p[71] = x[2]*x[2]*x[3]*x[3] + x[4]*x[4]*x[6]*x[6] + x[5]*x[5]*x[9]*x[9] + x[5]*x[5]*x[6]*x[6] + x[7]*x[7]*x[8]*x[8] + x[0]*x[0]*x[3]*x[3] + x[4]*x[4]*x[8]*x[8] + x[7]*x[7]*x[9]*x[9] + x[1]*x[1]*x[3]*x[3] + x[1]*x[1]*x[8]*x[8] + x[2]*x[2]*x[9]*x[9] + x[0]*x[0]*x[6]*x[6];
+    p[72] = x[0]*x[3]*x[6]*x[6] + x[4]*x[6]*x[8]*x[8] + x[7]*x[8]*x[9]*x[9] + x[4]*x[6]*x[6]*x[8] + x[5]*x[6]*x[6]*x[9] + x[5]*x[6]*x[9]*x[9] + x[0]*x[3]*x[3]*x[6] + x[7]*x[8]*x[8]*x[9] + x[2]*x[3]*x[3]*x[9] + x[1]*x[3]*x[8]*x[8] + x[2]*x[3]*x[9]*x[9] + x[1]*x[3]*x[3]*x[8];
+    p[73] = x[2]*x[4]*x[6]*x[8] + x[2]*x[3]*x[4]*x[9] + x[0]*x[3]*x[6]*x[7] + x[1]*x[5]*x[6]*x[9] + x[1]*x[3]*x[5]*x[8] + x[0]*x[7]*x[8]*x[9];
+    p[74] = x[3]*x[4]*x[5]*x[5] + x[3]*x[4]*x[7]*x[7] + x[0]*x[4]*x[4]*x[9] + x[2]*x[6]*x[7]*x[7] + x[3]*x[4]*x[4]*x[7] + x[1]*x[1]*x[2]*x[6] + x[0]*x[0]*x[5]*x[8] + x[2]*x[5]*x[5]*x[8] + x[1]*x[1]*x[6]*x[7] + x[0]*x[0]*x[2]*x[8] + x[3]*x[4]*x[4]*x[5] + x[1]*x[1]*x[4]*x[9] + x[1]*x[6]*x[7]*x[7] + x[1]*x[4]*x[4]*x[9] + x[2]*x[2]*x[6]*x[7] + x[0]*x[2]*x[2]*x[8] + x[3]*x[5]*x[5]*x[7] + x[3]*x[5]*x[7]*x[7] + x[2]*x[2]*x[5]*x[8] + x[0]*x[0]*x[1]*x[9] + x[0]*x[1]*x[1]*x[9] + x[1]*x[2]*x[2]*x[6] + x[0]*x[5]*x[5]*x[8] + x[0]*x[0]*x[4]*x[9];
+    p[75] = x[6]*x[6]*x[6]*x[7] + x[2]*x[6]*x[6]*x[6] + x[4]*x[9]*x[9]*x[9] + x[0]*x[9]*x[9]*x[9] + x[5]*x[8]*x[8]*x[8] + x[3]*x[3]*x[3]*x[7] + x[0]*x[8]*x[8]*x[8] + x[1]*x[6]*x[6]*x[6] + x[2]*x[8]*x[8]*x[8] + x[3]*x[3]*x[3]*x[5] + x[1]*x[9]*x[9]*x[9] + x[3]*x[3]*x[3]*x[4];
+    p[76] = x[3]*x[5]*x[5]*x[8] + x[3]*x[4]*x[4]*x[9] + x[0]*x[0]*x[8]*x[9] + x[3]*x[6]*x[7]*x[7] + x[1]*x[1]*x[6]*x[9] + x[2]*x[2]*x[6]*x[8];
+    p[77] = x[2]*x[5]*x[5]*x[7] + x[1]*x[4]*x[4]*x[7] + x[0]*x[4]*x[4]*x[5] + x[0]*x[1]*x[2]*x[2] + x[0]*x[4]*x[5]*x[5] + x[0]*x[0]*x[4]*x[5] + x[1]*x[4]*x[7]*x[7] + x[2]*x[2]*x[5]*x[7] + x[0]*x[0]*x[1]*x[2] + x[2]*x[5]*x[7]*x[7] + x[1]*x[1]*x[4]*x[7] + x[0]*x[1]*x[1]*x[2];
+    p[78] = x[3]*x[4]*x[5]*x[7] + x[1]*x[2]*x[6]*x[7] + x[0]*x[2]*x[5]*x[8] + x[0]*x[1]*x[4]*x[9];
+    p[79] = x[0]*x[2]*x[4]*x[9] + x[0]*x[2]*x[7]*x[8] + x[0]*x[4]*x[7]*x[9] + x[2]*x[4]*x[6]*x[7] + x[2]*x[4]*x[5]*x[8] + x[0]*x[5]*x[7]*x[8] + x[0]*x[3]*x[5]*x[7] + x[2]*x[3]*x[4]*x[7] + x[1]*x[3]*x[4]*x[5] + x[1]*x[2]*x[4]*x[6] + x[0]*x[3]*x[4]*x[7] + x[0]*x[1]*x[5]*x[9] + x[1]*x[4]*x[5]*x[9] + x[1]*x[2]*x[5]*x[6] + x[0]*x[2]*x[4]*x[8] + x[0]*x[1]*x[6]*x[7] + x[0]*x[1]*x[7]*x[9] + x[1]*x[5]*x[6]*x[7] + x[0]*x[1]*x[5]*x[8] + x[0]*x[2]*x[6]*x[7] + x[1]*x[2]*x[5]*x[8] + x[1]*x[3]*x[5]*x[7] + x[1]*x[2]*x[4]*x[9] + x[2]*x[3]*x[4]*x[5];
+    p[80] = x[4]*x[4]*x[6]*x[7] + x[2]*x[2]*x[3]*x[5] + x[4]*x[7]*x[7]*x[9] + x[4]*x[5]*x[5]*x[9] + x[0]*x[0]*x[3]*x[5] + x[1]*x[7]*x[7]*x[9] + x[1]*x[1]*x[3]*x[4] + x[0]*x[2]*x[2]*x[9] + x[2]*x[2]*x[3]*x[7] + x[1]*x[1]*x[2]*x[8] + x[0]*x[0]*x[3]*x[4] + x[0]*x[1]*x[1]*x[8] + x[5]*x[5]*x[6]*x[7] + x[2]*x[7]*x[7]*x[8] + x[1]*x[4]*x[4]*x[6] + x[1]*x[2]*x[2]*x[9] + x[2]*x[5]*x[5]*x[6] + x[5]*x[7]*x[7]*x[8] + x[0]*x[0]*x[2]*x[6] + x[4]*x[4]*x[5]*x[8] + x[0]*x[5]*x[5]*x[9] + x[1]*x[1]*x[3]*x[7] + x[0]*x[0]*x[1]*x[6] + x[0]*x[4]*x[4]*x[8];
+    p[81] = x[4]*x[4]*x[7]*x[8] + x[2]*x[7]*x[7]*x[9] + x[0]*x[0]*x[2]*x[3] + x[2]*x[2]*x[5]*x[9] + x[0]*x[2]*x[2]*x[3] + x[1]*x[1]*x[7]*x[8] + x[0]*x[4]*x[4]*x[6] + x[1]*x[7]*x[7]*x[8] + x[2]*x[5]*x[5]*x[9] + x[1]*x[4]*x[4]*x[8] + x[1]*x[1]*x[4]*x[8] + x[4]*x[4]*x[5]*x[6] + x[5]*x[7]*x[7]*x[9] + x[4]*x[5]*x[5]*x[6] + x[0]*x[0]*x[5]*x[6] + x[2]*x[2]*x[7]*x[9] + x[0]*x[0]*x[4]*x[6] + x[1]*x[1]*x[2]*x[3] + x[0]*x[5]*x[5]*x[6] + x[1]*x[2]*x[2]*x[3] + x[0]*x[1]*x[1]*x[3] + x[5]*x[5]*x[7]*x[9] + x[4]*x[7]*x[7]*x[8] + x[0]*x[0]*x[1]*x[3];
+
+    double energy(0);
+    for(int i = 0; i < 82; ++i)
+        energy += p[i]*a[i];
+
+    return energy;
+
+}
+} // namespace mb_system
\ No newline at end of file
@@ -0,0 +1,13 @@
+
+// <-> variables <->
+
+    x[0] = @VAR@-|x-intra-A+A-1|(A1aA2a;
+    x[1] = @VAR@-|x-intra-A+A-1|(A1aA3a;
+    x[2] = @VAR@-|x-intra-A+A-1|(A1aA4a;
+    x[3] = @VAR@-|x-intra-A+B-1|(A1aB1a;
+    x[4] = @VAR@-|x-intra-A+A-1|(A2aA3a;
+    x[5] = @VAR@-|x-intra-A+A-1|(A2aA4a;
+    x[6] = @VAR@-|x-intra-A+B-1|(A2aB1a;
+    x[7] = @VAR@-|x-intra-A+A-1|(A3aA4a;
+    x[8] = @VAR@-|x-intra-A+B-1|(A3aB1a;
+    x[9] = @VAR@-|x-intra-A+B-1|(A4aB1a;
@@ -1,4 +1,4 @@
 import unittest
-from . import test_constants, test_math, test_files, test_system, test_settings_reader, test_quaternion
+from . import test_constants, test_math, test_files, test_system, test_settings_reader, test_quaternion, test_log_file
 
-suite = unittest.TestSuite([test_constants.suite, test_math.suite, test_files.suite, test_system.suite, test_settings_reader.suite, test_quaternion.suite])
+suite = unittest.TestSuite([test_constants.suite, test_math.suite, test_files.suite, test_system.suite, test_settings_reader.suite, test_quaternion.suite, test_log_file.suite])
@@ -0,0 +1,78 @@
+import unittest, os
+
+from test_mbfit.test_case_with_id import TestCaseWithId
+from mbfit.utils import LogFile
+
+class TestLogFile(TestCaseWithId):
+    def __init__(self, *args, **kwargs):
+        super(TestLogFile, self).__init__(*args, **kwargs)
+        self.test_folder = os.path.dirname(os.path.abspath(__file__))
+
+    def setUp(self):
+        self.log_path = os.path.join(self.test_folder, "output", "log_file.out")
+
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+
+    def write_log(self, content):
+        with open(self.log_path, "wb") as log_file:
+            log_file.write(content)
+
+    def test_find_last(self):
+
+        self.write_log(b"header\n energy = -1.0\n middle\n energy = -2.5\n footer")
+
+        with LogFile(self.log_path) as log_file:
+            self.assertEqual(log_file.get_size(), 52)
+            self.assertEqual(log_file.find_last("energy ="), 31)
+            self.assertEqual(log_file.find_last("energy =", 31), 8)
+            self.assertEqual(log_file.find_last("missing"), -1)
+
+            self.assertEqual(log_file.get_text_after_last("energy ="), " -2.5")
+            self.assertEqual(log_file.get_text_after_last("foot"), "er")
+            self.assertIsNone(log_file.get_text_after_last("missing"))
+
+        self.test_passed = True
+
+    def test_read_lines(self):
+
+        self.write_log(b"header\n energy = -1.0\n middle\n energy = -2.5\n footer")
+
+        with LogFile(self.log_path) as log_file:
+            # lines start from the start of the line the offset is in.
+            self.assertEqual(list(log_file.read_lines(log_file.find_last("energy ="))), [" energy = -2.5\n", " footer"])
+            self.assertEqual(list(log_file.read_lines()), ["header\n", " energy = -1.0\n", " middle\n", " energy = -2.5\n", " footer"])
+
+            self.assertEqual(log_file.get_text(), "header\n energy = -1.0\n middle\n energy = -2.5\n footer")
+
+        self.test_passed = True
+
+    def test_split(self):
+
+        self.write_log(b"header\n Running Job 1 of 2\n energy = -1.0\n Running Job 2 of 2\n energy = -2.5\n")
+
+        with LogFile(self.log_path) as log_file:
+            self.assertEqual(log_file.split("Running Job"), ["header\n Running Job 1 of 2\n energy = -1.0\n",
+                                                             " Running Job 2 of 2\n energy = -2.5\n"])
+            self.assertEqual(log_file.split("header"), [log_file.get_text()])
+            self.assertEqual(log_file.split("missing"), [])
+
+        self.test_passed = True
+
+    def test_empty_and_binary(self):
+
+        self.write_log(b"")
+
+        with LogFile(self.log_path) as log_file:
+            self.assertEqual(log_file.get_text(), "")
+            self.assertEqual(log_file.find_last("energy"), -1)
+            self.assertEqual(list(log_file.read_lines()), [])
+
+        self.write_log(b"bad byte \xff\nenergy = -1.0\n")
+
+        with LogFile(self.log_path) as log_file:
+            self.assertEqual(log_file.get_text(), "bad byte �\nenergy = -1.0\n")
+            self.assertEqual(float(log_file.get_text_after_last("energy =")), -1.0)
+
+        self.test_passed = True
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestLogFile)